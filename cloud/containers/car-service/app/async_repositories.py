@@ -0,0 +1,272 @@
+"""Asyncio Firestore repository.
+
+Mirrors the read functions in app.repositories on top of the Firestore
+AsyncClient so routes can await Firestore directly instead of hopping into
+a worker thread. Selected with CAR_DATA_PATH=async (see app.routes).
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import AsyncIterator, Optional, Dict, List, Tuple
+from uuid import UUID
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from app.schemas import Car, CarSummary
+from app.documents import DOCUMENT_PAGE_SIZE, iter_car_documents, parse_car_documents
+from app.firebase import get_async_firestore_client
+from app.known_ids import known_car_ids
+from app.facets import FACET_FIELD_PATHS, STATS_COUNTS_FIELD, STATS_TOTAL_FIELD, FacetValues, document_facets
+from app.repositories import (
+    CARS_COLLECTION, CAR_SUMMARY_FIELDS, FACET_STATS_DOCUMENT, STATS_COLLECTION, build_spec_query,
+)
+from app.specs import SpecQuery
+from app.storage import get_model_urls_for_volume_ids_async
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def _sign_model_urls(cars: List[Car]) -> None:
+    """Fill in signed model URLs for every car that needs one, in one batch."""
+    pending = [car for car in cars if car.volumeId and not car.modelUrl]
+    if not pending:
+        return
+    urls = await get_model_urls_for_volume_ids_async(car.volumeId for car in pending)
+    for car in pending:
+        car.modelUrl = urls.get(car.volumeId)
+
+
+async def get_cars() -> List[Car]:
+    """
+    Get all cars from Firestore.
+    
+    Returns:
+        List of Car objects with signed model URLs
+    """
+    try:
+        db = get_async_firestore_client()
+        cars_ref = db.collection(CARS_COLLECTION)
+        
+        docs = [doc async for doc in cars_ref.stream()]
+        cars = [car for _, car in iter_car_documents(docs)]
+        
+        await _sign_model_urls(cars)
+        
+        logger.info(f"Retrieved {len(cars)} cars from Firestore")
+        return cars
+        
+    except Exception as e:
+        logger.error(f"Error retrieving cars from Firestore: {e}")
+        return []
+
+
+async def query_cars(query: SpecQuery) -> List[Car]:
+    """
+    Get the cars matching range filters and ordering on canonical SI specs.
+    
+    See app.repositories.query_cars.
+    
+    Returns:
+        List of Car objects with signed model URLs, in query order
+    """
+    db = get_async_firestore_client()
+    firestore_query = build_spec_query(db.collection(CARS_COLLECTION), query)
+    
+    docs = [doc async for doc in firestore_query.stream()]
+    cars = [car for _, car in iter_car_documents(docs)]
+    await _sign_model_urls(cars)
+    
+    logger.info(f"Query matched {len(cars)} cars")
+    return cars
+
+
+async def get_car_summaries() -> List[CarSummary]:
+    """
+    Get the summary fields of every car from Firestore (projection query).
+    
+    Returns:
+        List of CarSummary objects
+    """
+    try:
+        db = get_async_firestore_client()
+        
+        summaries = []
+        async for doc in db.collection(CARS_COLLECTION).select(CAR_SUMMARY_FIELDS).stream():
+            try:
+                summaries.append(CarSummary(id=doc.id, **doc.to_dict()))
+            except Exception as e:
+                logger.error(f"Error parsing car document {doc.id}: {e}")
+                continue
+        
+        return summaries
+        
+    except Exception as e:
+        logger.error(f"Error retrieving car summaries from Firestore: {e}")
+        return []
+
+
+async def get_facet_stats() -> Optional[Tuple[int, Dict[str, Dict[str, int]], datetime]]:
+    """
+    Get the unfiltered facet counts kept in the stats document.
+    
+    See app.repositories.get_facet_stats.
+    """
+    db = get_async_firestore_client()
+    snapshot = await db.collection(STATS_COLLECTION).document(FACET_STATS_DOCUMENT).get()
+    if not snapshot.exists:
+        return None
+    data = snapshot.to_dict() or {}
+    return data.get(STATS_TOTAL_FIELD, 0), data.get(STATS_COUNTS_FIELD) or {}, snapshot.update_time
+
+
+async def get_facet_rows(query: Optional[SpecQuery] = None) -> List[FacetValues]:
+    """
+    Get the facet values of every car matching a spec query (projection query).
+    
+    See app.repositories.get_facet_rows.
+    """
+    db = get_async_firestore_client()
+    firestore_query = db.collection(CARS_COLLECTION).select(FACET_FIELD_PATHS)
+    if query is not None and query.active:
+        firestore_query = build_spec_query(firestore_query, query)
+    rows = [document_facets(doc.to_dict()) async for doc in firestore_query.stream()]
+    logger.info(f"Read facets of {len(rows)} cars")
+    return rows
+
+
+async def iter_cars() -> AsyncIterator[Car]:
+    """
+    Stream all cars from Firestore one document at a time.
+    
+    Yields:
+        Car objects without signed model URLs
+    """
+    try:
+        db = get_async_firestore_client()
+        page = []
+        async for doc in db.collection(CARS_COLLECTION).stream():
+            page.append(doc)
+            if len(page) >= DOCUMENT_PAGE_SIZE:
+                for _, car in parse_car_documents(page):
+                    yield car
+                page = []
+        for _, car in parse_car_documents(page):
+            yield car
+    except Exception as e:
+        logger.error(f"Error streaming cars from Firestore: {e}")
+
+
+async def get_car(car_id: str) -> Optional[Car]:
+    """
+    Get a single car by ID from Firestore.
+    
+    IDs known not to exist (see app.known_ids) aren't read.
+    
+    Args:
+        car_id: UUID string of the car
+        
+    Returns:
+        Car object with signed model URL if found, None otherwise
+    """
+    try:
+        try:
+            UUID(car_id)
+        except ValueError:
+            logger.warning(f"Invalid UUID format: {car_id}")
+            return None
+        
+        if not known_car_ids.might_exist(car_id):
+            logger.info(f"Car not found: {car_id} (known missing)")
+            return None
+        
+        db = get_async_firestore_client()
+        doc = await db.collection(CARS_COLLECTION).document(car_id).get()
+        
+        if not doc.exists:
+            logger.info(f"Car not found: {car_id}")
+            known_car_ids.record_missing(car_id)
+            return None
+        
+        parsed = parse_car_documents([doc])
+        if not parsed:
+            return None
+        car = parsed[0][1]
+        
+        await _sign_model_urls([car])
+        
+        logger.info(f"Retrieved car: {car_id}")
+        return car
+        
+    except Exception as e:
+        logger.error(f"Error retrieving car {car_id} from Firestore: {e}")
+        return None
+
+
+async def get_car_by_key(field: str, value: str) -> Optional[Car]:
+    """
+    Get a car by a secondary key (volumeId or slug) from Firestore.
+    
+    See app.repositories.get_car_by_key.
+    """
+    db = get_async_firestore_client()
+    query = db.collection(CARS_COLLECTION).where(filter=FieldFilter(field, "==", value)).limit(1)
+    cars = [car for _, car in iter_car_documents([doc async for doc in query.stream()])]
+    if not cars:
+        logger.info(f"No car with {field} {value}")
+        return None
+    await _sign_model_urls(cars)
+    return cars[0]
+
+
+async def get_cars_by_ids(car_ids: List[str]) -> Dict[str, Car]:
+    """
+    Get several cars by ID from Firestore in a single round trip.
+    
+    Args:
+        car_ids: Canonical UUID strings of the cars
+        
+    Returns:
+        Dictionary mapping car ID to Car object for every ID that exists
+        
+    Raises:
+        google.api_core.exceptions.GoogleAPICallError: If the read fails
+    """
+    if not car_ids:
+        return {}
+    
+    db = get_async_firestore_client()
+    collection = db.collection(CARS_COLLECTION)
+    refs = [collection.document(car_id) for car_id in car_ids]
+    
+    docs = [doc async for doc in db.get_all(refs)]
+    cars: Dict[str, Car] = {doc.id: car for doc, car in iter_car_documents(docs)}
+    
+    await _sign_model_urls(list(cars.values()))
+    
+    logger.info(f"Retrieved {len(cars)}/{len(car_ids)} cars in batch")
+    return cars
+
+
+async def get_car_versions(car_ids: List[str]) -> Dict[str, Tuple[Car, datetime]]:
+    """
+    Get cars with their Firestore document update_time in one round trip.
+    
+    Model URLs are not signed (see app.repositories.get_car_versions).
+    
+    Args:
+        car_ids: Canonical UUID strings of the cars
+        
+    Returns:
+        Dictionary mapping car ID to (Car, update_time) for every car that
+        exists and parses
+        
+    Raises:
+        Exception: Firestore errors are propagated
+    """
+    if not car_ids:
+        return {}
+    db = get_async_firestore_client()
+    collection = db.collection(CARS_COLLECTION)
+    docs = [doc async for doc in db.get_all([collection.document(car_id) for car_id in car_ids])]
+    return {doc.id: (car, doc.update_time) for doc, car in iter_car_documents(docs)}
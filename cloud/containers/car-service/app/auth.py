@@ -0,0 +1,50 @@
+"""Authentication for catalog writes.
+
+Reads are public, but car writes need a Firebase ID
+token in `Authorization: Bearer <token>` whose user carries the
+CAR_WRITER_CLAIM custom claim set to true. Grant it with the Admin SDK:
+
+    firebase_admin.auth.set_custom_user_claims(uid, {"carWriter": True})
+
+The Cloud Run service stays publicly invocable for reads, so this check is
+what keeps anonymous callers from replacing the catalog.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import Header
+from firebase_admin import auth
+
+from common.errors import ForbiddenError, ServiceUnavailableError, UnauthorizedError
+
+logger = logging.getLogger(__name__)
+
+# Custom claim a user needs to write cars
+CAR_WRITER_CLAIM = os.getenv("CAR_WRITER_CLAIM", "carWriter")
+
+
+def require_car_writer(authorization: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    """FastAPI dependency: the verified token claims of a user allowed to write cars.
+    
+    Raises:
+        UnauthorizedError: If the bearer token is missing, invalid, expired or revoked
+        ForbiddenError: If the user lacks CAR_WRITER_CLAIM
+        ServiceUnavailableError: If Google's token signing keys can't be fetched
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise UnauthorizedError("A Firebase ID token is required (Authorization: Bearer <token>)")
+    try:
+        claims = auth.verify_id_token(token.strip(), check_revoked=True)
+    except auth.CertificateFetchError as e:
+        logger.error(f"Could not fetch ID token signing keys: {e}")
+        raise ServiceUnavailableError("Could not verify the ID token; try again")
+    except (ValueError, auth.InvalidIdTokenError, auth.UserDisabledError) as e:
+        raise UnauthorizedError(f"Invalid ID token: {e}")
+    if claims.get(CAR_WRITER_CLAIM) is not True:
+        logger.warning(f"User {claims.get('uid')} tried to write cars without the {CAR_WRITER_CLAIM} claim")
+        raise ForbiddenError(f"The {CAR_WRITER_CLAIM} claim is required to write cars")
+    return claims
@@ -0,0 +1,163 @@
+"""Compact binary encodings (MessagePack, CBOR) of the API models.
+
+The encoder walks the models in app.schemas directly instead of going
+through JSON:
+
+- enums are sent as their raw values (the same strings as in JSON)
+- Measurement* structs become two-element arrays [value, unit]
+- None fields are omitted
+- UUIDs and datetimes are sent as the same strings JSON uses
+
+Both formats frame an array as a header followed by the concatenated
+items, so cached per-car fragments can be joined into a list response
+without re-encoding.
+"""
+from __future__ import annotations
+
+import enum
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+
+import app.schemas as schemas
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional dependency
+    cbor2 = None
+
+logger = logging.getLogger(__name__)
+
+JSON_FORMAT = "json"
+MSGPACK_FORMAT = "msgpack"
+CBOR_FORMAT = "cbor"
+
+MEDIA_TYPES: Dict[str, str] = {
+    JSON_FORMAT: "application/json",
+    MSGPACK_FORMAT: "application/msgpack",
+    CBOR_FORMAT: "application/cbor",
+}
+
+# Formats whose encoder is installed, in server preference order
+AVAILABLE_FORMATS: Tuple[str, ...] = tuple(
+    fmt for fmt, module in ((MSGPACK_FORMAT, msgpack), (CBOR_FORMAT, cbor2)) if module is not None
+)
+
+# Every {value, unit} model in the schema
+MEASUREMENT_TYPES: Tuple[Type[BaseModel], ...] = tuple(
+    cls for cls in vars(schemas).values()
+    if isinstance(cls, type) and issubclass(cls, BaseModel) and cls is not BaseModel
+    and set(cls.model_fields) == {"value", "unit"}
+)
+
+_FIELD_NAMES: Dict[Type[BaseModel], Tuple[str, ...]] = {}
+
+
+def _field_names(cls: Type[BaseModel]) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(cls.model_fields)
+    return names
+
+
+def _format_datetime(value: datetime) -> str:
+    if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    return value.isoformat()
+
+
+def to_compact(value: Any) -> Any:
+    """Convert models (and anything nested in them) to compact plain values."""
+    if isinstance(value, BaseModel):
+        if isinstance(value, MEASUREMENT_TYPES):
+            return [value.value, to_compact(value.unit)]
+        compact = {}
+        for name in _field_names(type(value)):
+            field_value = getattr(value, name, None)
+            if field_value is not None:
+                compact[name] = to_compact(field_value)
+        return compact
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {key: to_compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_compact(item) for item in value]
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    return value
+
+
+def encode(value: Any, fmt: str) -> bytes:
+    """Encode a model (or list/dict of models) in a binary format."""
+    compact = to_compact(value)
+    if fmt == MSGPACK_FORMAT:
+        return msgpack.packb(compact, use_bin_type=True)
+    if fmt == CBOR_FORMAT:
+        return cbor2.dumps(compact)
+    raise ValueError(f"Unsupported binary format: {fmt}")
+
+
+def array_header(length: int, fmt: str) -> bytes:
+    """Header that frames `length` concatenated items as an array."""
+    if fmt == MSGPACK_FORMAT:
+        if length < 16:
+            return bytes([0x90 | length])
+        if length < 2 ** 16:
+            return b"\xdc" + length.to_bytes(2, "big")
+        return b"\xdd" + length.to_bytes(4, "big")
+    if fmt == CBOR_FORMAT:
+        if length < 24:
+            return bytes([0x80 | length])
+        for marker, size in ((0x98, 1), (0x99, 2), (0x9a, 4), (0x9b, 8)):
+            if length < 2 ** (8 * size):
+                return bytes([marker]) + length.to_bytes(size, "big")
+    raise ValueError(f"Unsupported binary format: {fmt}")
+
+
+def encode_array(items: List[bytes], fmt: str) -> bytes:
+    """Join already-encoded items into one array."""
+    return array_header(len(items), fmt) + b"".join(items)
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Pick the response format from an Accept header.
+    
+    A binary format is used only when it is named explicitly and not ranked
+    below application/json; wildcards always mean JSON.
+    """
+    if not accept:
+        return JSON_FORMAT
+    weights: Dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, raw = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        weights[media_type.strip().lower()] = q
+    
+    best, best_q = JSON_FORMAT, weights.get(MEDIA_TYPES[JSON_FORMAT], 0.0)
+    for fmt in AVAILABLE_FORMATS:
+        q = weights.get(MEDIA_TYPES[fmt], 0.0)
+        if q > 0 and q >= best_q and best == JSON_FORMAT:
+            best, best_q = fmt, q
+        elif q > best_q:
+            best, best_q = fmt, q
+    return best
@@ -0,0 +1,52 @@
+"""In-process cache invalidation.
+
+Read-side caches register a listener here, and write paths call
+invalidate_cars() with the IDs they touched. Bulk writes call it once for the
+whole batch, so listeners can rebuild once instead of once per document.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable, FrozenSet, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+InvalidationListener = Callable[[FrozenSet[str]], None]
+
+_listeners: List[InvalidationListener] = []
+
+
+def register_invalidation_listener(listener: InvalidationListener) -> None:
+    """Register a callback invoked with the set of car IDs that changed.
+    
+    Args:
+        listener: Callable taking a frozenset of car ID strings
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unregister_invalidation_listener(listener: InvalidationListener) -> None:
+    """Remove a previously registered invalidation callback."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def invalidate_cars(car_ids: Iterable[str]) -> None:
+    """Notify every registered cache that the given cars changed.
+    
+    A failing listener is logged and skipped so one broken cache can't stop
+    the others from being invalidated.
+    
+    Args:
+        car_ids: IDs of the cars that were created, updated or deleted
+    """
+    ids = frozenset(car_ids)
+    if not ids:
+        return
+    
+    for listener in list(_listeners):
+        try:
+            listener(ids)
+        except Exception as e:
+            logger.error(f"Cache invalidation listener {listener!r} failed: {e}")
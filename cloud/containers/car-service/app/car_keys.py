@@ -0,0 +1,81 @@
+"""Secondary keys: looking cars up by volumeId or slug instead of UUID.
+
+Both keys are unique across the catalog. Uniqueness is enforced at write
+time with one claim document per key value in the car_keys collection
+(ID "<field>:<value>", holding the owning car's ID): a write that gives a
+car a new key value creates its claim in the same batch, which fails if
+another car already holds it, and releases the claim of the value it
+replaces.
+
+Reads are served from app.key_index when the catalog cache is on, or from
+an equality query on the cars collection when it is off.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import quote
+
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.compact import CompactCar, leaf_slot
+from app.schemas import Car
+from app.text import tokenize
+
+KEY_FIELDS = ("volumeId", "slug")
+
+# Claim document field holding the owning car's ID
+CLAIM_CAR_ID_FIELD = "carId"
+
+# Field -> value, for the keys a car has
+CarKeys = Dict[str, str]
+
+_SLOTS = {field: leaf_slot((field,))[0] for field in KEY_FIELDS}
+
+
+def slugify(text: str) -> str:
+    """URL slug of a text ("Mercedes-Benz G63 2020" -> "mercedes-benz-g63-2020")."""
+    return "-".join(tokenize(text))
+
+
+def default_slug(car: Car) -> str:
+    """The slug a car gets when none is given: make, model and year."""
+    return slugify(" ".join(str(part) for part in (car.make, car.model, car.year) if part))
+
+
+def car_keys(car: Car) -> CarKeys:
+    """Secondary keys of a car."""
+    return {field: getattr(car, field) for field in KEY_FIELDS if getattr(car, field)}
+
+
+def document_keys(data: Optional[Mapping[str, Any]]) -> CarKeys:
+    """Secondary keys of a car document's data."""
+    data = data or {}
+    return {field: data[field] for field in KEY_FIELDS if isinstance(data.get(field), str) and data[field]}
+
+
+def record_keys(record: CompactCar) -> CarKeys:
+    """Secondary keys of a cached record."""
+    return {field: record.strings[index] for field, index in _SLOTS.items() if record.strings[index]}
+
+
+def touches_keys(field_updates: Mapping[str, Any]) -> bool:
+    """Whether a set of field-path updates may change a car's keys."""
+    return any(FieldPath.from_string(path).parts[0] in KEY_FIELDS for path in field_updates)
+
+
+def patched_keys(current: Mapping[str, Any], field_updates: Mapping[str, Any]) -> CarKeys:
+    """Secondary keys after applying field-path updates (see patch_car) to a document."""
+    keys = document_keys(current)
+    for field in KEY_FIELDS:
+        if field in field_updates:
+            value = field_updates[field]
+            if isinstance(value, str) and value:
+                keys[field] = value
+            else:
+                keys.pop(field, None)
+    return keys
+
+
+def claim_document_id(field: str, value: str) -> str:
+    """ID of the claim document for a key value (safe for any value)."""
+    return f"{field}:{quote(value, safe='')}"
@@ -0,0 +1,223 @@
+"""In-memory catalog cache.
+
+Holds every car with its Firestore update_time so list and detail reads
+don't touch Firestore on every request. The whole collection is reloaded
+when the TTL expires, and cars written through this instance are reloaded
+individually on their next read (via app.cache invalidation).
+
+Cars are held as CompactCar records (see app.compact) and only rebuilt
+as pydantic models when a read has to render them.
+
+Reloads read Firestore outside the snapshot lock, one thread at a time,
+and swap the new snapshot in when done.
+
+Change listeners receive the IDs that changed or disappeared on every
+refresh, so derived indexes can update incrementally instead of rebuilding.
+
+Disabled when CATALOG_CACHE_TTL_SECONDS is 0 (the default).
+"""
+from __future__ import annotations
+
+import os
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
+
+import app.repositories as repo
+from app.cache import register_invalidation_listener
+from app.compact import CompactCar
+from app.known_ids import known_car_ids
+from app.schemas import Car
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "0"))
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    record: CompactCar
+    update_time: datetime
+
+    @classmethod
+    def from_car(cls, car: Car, update_time: datetime) -> "CatalogEntry":
+        return cls(CompactCar.from_car(car), update_time)
+
+    @property
+    def car(self) -> Car:
+        """The public Car, rebuilt from the record on every access."""
+        return self.record.to_car()
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Immutable snapshot of the cached catalog."""
+    version: int
+    entries: Mapping[str, CatalogEntry]
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of every (ID, update_time), identical across instances."""
+        digest = hashlib.blake2b(digest_size=16)
+        for car_id, entry in self.entries.items():
+            digest.update(f"{car_id}\0{entry.update_time.isoformat()}\n".encode())
+        return digest.hexdigest()
+
+
+ChangeListener = Callable[[Catalog, FrozenSet[str], FrozenSet[str]], None]
+
+
+class CatalogCache:
+    """TTL cache of the whole car collection with per-car invalidation."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Held by the one thread reading Firestore
+        self._refresh_lock = threading.Lock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._snapshot: Optional[Catalog] = None
+        self._loaded_at = 0.0
+        self._dirty: Set[str] = set()
+        self._version = 0
+        self._listeners: List[ChangeListener] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        """Register a callback invoked with (catalog, changed IDs, removed IDs)."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_change_listener(self, listener: ChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def invalidate(self, car_ids: FrozenSet[str]) -> None:
+        """Mark cars as stale so they are re-read on the next access."""
+        with self._lock:
+            self._dirty.update(car_ids)
+
+    def clear(self) -> None:
+        """Drop everything; the next access reloads the whole catalog."""
+        with self._lock:
+            self._entries = {}
+            self._snapshot = None
+            self._loaded_at = 0.0
+            self._dirty.clear()
+
+    def peek(self) -> Optional[Catalog]:
+        """Current snapshot without refreshing it (None if never loaded)."""
+        return self._snapshot
+
+    def get(self) -> Catalog:
+        """Return a fresh snapshot, refreshing from Firestore if needed.
+        
+        Firestore is read outside the snapshot lock by one thread at a time.
+        Once the TTL has expired, readers keep getting the previous snapshot
+        while that thread reloads the collection. Only the first load and
+        re-reads of invalidated cars within the TTL are waited for.
+        
+        If Firestore fails and a previous snapshot exists, the previous
+        snapshot is served and the refresh is retried on the next call.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            expired = self._expired()
+            if not expired and not self._dirty:
+                return snapshot
+        
+        if snapshot is not None and expired:
+            if not self._refresh_lock.acquire(blocking=False):
+                # Another thread is reloading the collection
+                return snapshot
+        else:
+            self._refresh_lock.acquire()
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _expired(self) -> bool:
+        return self._snapshot is None or time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def _refresh(self) -> Catalog:
+        """Reload whatever is stale; the caller holds _refresh_lock."""
+        with self._lock:
+            snapshot = self._snapshot
+            expired = self._expired()
+            dirty = frozenset(self._dirty)
+            if not expired and not dirty:
+                # Refreshed while this thread waited
+                return snapshot
+        
+        # Only the refreshing thread replaces _entries, so it can be read here
+        try:
+            if expired:
+                entries, changed, removed = self._reload_all()
+            else:
+                entries, changed, removed = self._reload_dirty(dirty)
+        except Exception as e:
+            logger.error(f"Error refreshing catalog cache: {e}")
+            if snapshot is None:
+                raise
+            return snapshot
+        
+        with self._lock:
+            self._entries = entries
+            if expired:
+                self._loaded_at = time.monotonic()
+            self._dirty -= dirty
+            if changed or removed or self._snapshot is None:
+                self._version += 1
+                # Sorted by ID to match Firestore's default collection order
+                self._snapshot = Catalog(self._version, MappingProxyType(dict(sorted(entries.items()))))
+            snapshot = self._snapshot
+        
+        # Listeners run under _refresh_lock, so they see versions in order
+        if changed or removed:
+            self._notify(snapshot, changed, removed)
+        return snapshot
+
+    def _reload_all(self) -> Tuple[Dict[str, CatalogEntry], FrozenSet[str], FrozenSet[str]]:
+        versions = repo.get_car_versions()
+        entries = {car_id: CatalogEntry.from_car(car, update_time) for car_id, (car, update_time) in versions.items()}
+        
+        changed = frozenset(
+            car_id for car_id, entry in entries.items()
+            if car_id not in self._entries or self._entries[car_id].update_time != entry.update_time
+        )
+        removed = frozenset(self._entries.keys() - entries.keys())
+        logger.info(f"Catalog cache loaded {len(entries)} cars ({len(changed)} changed, {len(removed)} removed)")
+        return entries, changed, removed
+
+    def _reload_dirty(self, dirty: FrozenSet[str]) -> Tuple[Dict[str, CatalogEntry], FrozenSet[str], FrozenSet[str]]:
+        versions = repo.get_car_versions(sorted(dirty))
+        
+        entries = dict(self._entries)
+        for car_id, (car, update_time) in versions.items():
+            entries[car_id] = CatalogEntry.from_car(car, update_time)
+        removed = frozenset(car_id for car_id in dirty if car_id not in versions and car_id in entries)
+        for car_id in removed:
+            del entries[car_id]
+        return entries, frozenset(versions), removed
+
+    def _notify(self, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(catalog, changed, removed)
+            except Exception as e:
+                logger.error(f"Catalog change listener {listener!r} failed: {e}")
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_TTL_SECONDS)
+register_invalidation_listener(catalog_cache.invalidate)
+catalog_cache.add_change_listener(known_car_ids.on_catalog_change)
@@ -0,0 +1,250 @@
+"""Memory-compact read model for cached cars.
+
+A pydantic Car with its Engine, Performance, Dimensions, Drivetrain and
+Measurement* objects costs several kilobytes of small objects and
+per-instance dicts. The catalog cache keeps thousands of them for the
+lifetime of the instance, so it stores CompactCar records instead:
+
+- every int/float leaf (including measurement values) packed into one
+  array('d'), with NaN for missing values
+- every enum leaf (including measurement units) as a one-byte member index
+- every string leaf interned, in one tuple
+- one bitmask recording which nested objects are present
+
+The slot layout is derived from the Car schema once at import, so new
+schema fields are picked up automatically. Records convert back to the
+public Car only when they are rendered.
+"""
+from __future__ import annotations
+
+import enum
+import math
+import sys
+import typing
+from array import array
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas import Car
+
+_NUMBER, _CODE, _STRING, _MODEL = range(4)
+
+# Car fields held directly on the record rather than in a slot
+_RECORD_FIELDS = ("id", "otherSpecs", "updatedAt")
+
+_NO_CODE = 0xFF
+
+
+class _Slot(NamedTuple):
+    name: str
+    kind: int
+    index: int
+    # int/float for numbers, the Enum class for codes, the nested layout for models
+    type: Any
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if typing.get_origin(annotation) is typing.Union and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _build_layout(model: Type[BaseModel], counts: Dict[int, int]) -> Tuple[_Slot, ...]:
+    slots = []
+    for name, field in model.model_fields.items():
+        if model is Car and name in _RECORD_FIELDS:
+            continue
+        annotation = _unwrap_optional(field.annotation)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            kind, slot_type = _MODEL, None
+        elif isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+            kind, slot_type = _CODE, annotation
+        elif annotation in (int, float):
+            kind, slot_type = _NUMBER, annotation
+        elif annotation is str:
+            kind, slot_type = _STRING, str
+        else:
+            raise TypeError(f"No compact slot for {model.__name__}.{name}: {annotation!r}")
+        index = counts[kind]
+        counts[kind] += 1
+        if kind == _MODEL:
+            slot_type = _build_layout(annotation, counts)
+        slots.append(_Slot(name, kind, index, slot_type))
+    return tuple(slots)
+
+
+_COUNTS = {_NUMBER: 0, _CODE: 0, _STRING: 0, _MODEL: 0}
+LAYOUT = _build_layout(Car, _COUNTS)
+
+_EMPTY_NUMBERS = array("d", [math.nan] * _COUNTS[_NUMBER])
+_EMPTY_CODES = bytes([_NO_CODE] * _COUNTS[_CODE])
+_MEMBERS: Dict[Type[enum.Enum], Tuple[enum.Enum, ...]] = {}
+_CODES: Dict[Type[enum.Enum], Dict[enum.Enum, int]] = {}
+
+
+def _index_enums(layout: Tuple[_Slot, ...]) -> None:
+    for slot in layout:
+        if slot.kind == _MODEL:
+            _index_enums(slot.type)
+        elif slot.kind == _CODE and slot.type not in _MEMBERS:
+            members = tuple(slot.type)
+            if len(members) >= _NO_CODE:
+                raise TypeError(f"{slot.type.__name__} has too many members for a one-byte code")
+            _MEMBERS[slot.type] = members
+            _CODES[slot.type] = {member: i for i, member in enumerate(members)}
+
+
+_index_enums(LAYOUT)
+
+_STRING_INDEX = {slot.name: slot.index for slot in LAYOUT if slot.kind == _STRING}
+
+
+class MeasurementSlot(NamedTuple):
+    """Where one Measurement* object lives in a record."""
+    path: Tuple[str, ...]
+    value_index: int
+    unit_index: int
+    unit_type: Type[enum.Enum]
+
+
+def _measurement_slots(layout: Tuple[_Slot, ...], prefix: Tuple[str, ...]) -> list:
+    slots = []
+    for slot in layout:
+        if slot.kind != _MODEL:
+            continue
+        children = {child.name: child for child in slot.type}
+        if children.keys() == {"value", "unit"}:
+            value, unit = children["value"], children["unit"]
+            slots.append(MeasurementSlot(prefix + (slot.name,), value.index, unit.index, unit.type))
+        else:
+            slots.extend(_measurement_slots(slot.type, prefix + (slot.name,)))
+    return slots
+
+
+MEASUREMENT_SLOTS: Tuple[MeasurementSlot, ...] = tuple(_measurement_slots(LAYOUT, ()))
+
+
+def leaf_slot(path: Tuple[str, ...]) -> Tuple[int, Any]:
+    """Index and type of a leaf in a record's numbers, codes or strings.
+
+    The type says which: int/float for numbers, the Enum class for codes,
+    str for strings.
+
+    Raises:
+        KeyError: If the path isn't a number, enum or string field of Car
+    """
+    layout = LAYOUT
+    for depth, name in enumerate(path):
+        slot = next((slot for slot in layout if slot.name == name), None)
+        if slot is None:
+            break
+        if depth == len(path) - 1 and slot.kind != _MODEL:
+            return slot.index, slot.type
+        if slot.kind != _MODEL:
+            break
+        layout = slot.type
+    raise KeyError(".".join(path))
+
+
+def unit_code(member: enum.Enum) -> int:
+    """One-byte code of an enum member inside records."""
+    return _CODES[type(member)][member]
+
+
+def unit_member(unit_type: Type[enum.Enum], code: int) -> Optional[enum.Enum]:
+    """Enum member for a record code (None for a missing value)."""
+    return None if code == _NO_CODE else _MEMBERS[unit_type][code]
+
+
+def _pack(obj: BaseModel, layout: Tuple[_Slot, ...], numbers: array, codes: bytearray, strings: list) -> int:
+    present = 0
+    for slot in layout:
+        value = getattr(obj, slot.name)
+        if value is None:
+            continue
+        if slot.kind == _NUMBER:
+            numbers[slot.index] = value
+        elif slot.kind == _CODE:
+            codes[slot.index] = _CODES[slot.type][value]
+        elif slot.kind == _STRING:
+            strings[slot.index] = sys.intern(value)
+        else:
+            present |= 1 << slot.index
+            present |= _pack(value, slot.type, numbers, codes, strings)
+    return present
+
+
+class CompactCar:
+    """Slotted, packed form of a Car for long-lived caches."""
+
+    __slots__ = ("id", "strings", "numbers", "codes", "present", "otherSpecs", "updatedAt")
+
+    def __init__(
+        self,
+        id: UUID,
+        strings: Tuple[Optional[str], ...],
+        numbers: array,
+        codes: bytes,
+        present: int,
+        otherSpecs: Optional[Dict[str, str]],
+        updatedAt: Optional[datetime],
+    ):
+        self.id = id
+        self.strings = strings
+        self.numbers = numbers
+        self.codes = codes
+        self.present = present
+        self.otherSpecs = otherSpecs
+        self.updatedAt = updatedAt
+
+    @classmethod
+    def from_car(cls, car: Car) -> "CompactCar":
+        numbers = array("d", _EMPTY_NUMBERS)
+        codes = bytearray(_EMPTY_CODES)
+        strings: list = [None] * _COUNTS[_STRING]
+        present = _pack(car, LAYOUT, numbers, codes, strings)
+        other_specs = {sys.intern(key): sys.intern(value) for key, value in car.otherSpecs.items()} or None
+        return cls(car.id, tuple(strings), numbers, bytes(codes), present, other_specs, car.updatedAt)
+
+    def replace(self, numbers: array, codes: bytes) -> "CompactCar":
+        """Copy of the record with different packed numbers and codes."""
+        return CompactCar(self.id, self.strings, numbers, codes, self.present, self.otherSpecs, self.updatedAt)
+
+    @property
+    def volumeId(self) -> Optional[str]:
+        return self.strings[_STRING_INDEX["volumeId"]]
+
+    @property
+    def modelUrl(self) -> Optional[str]:
+        return self.strings[_STRING_INDEX["modelUrl"]]
+
+    def _unpack(self, layout: Tuple[_Slot, ...]) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for slot in layout:
+            if slot.kind == _NUMBER:
+                value = self.numbers[slot.index]
+                if not math.isnan(value):
+                    data[slot.name] = int(value) if slot.type is int else value
+            elif slot.kind == _CODE:
+                code = self.codes[slot.index]
+                if code != _NO_CODE:
+                    data[slot.name] = _MEMBERS[slot.type][code]
+            elif slot.kind == _STRING:
+                value = self.strings[slot.index]
+                if value is not None:
+                    data[slot.name] = value
+            elif self.present >> slot.index & 1:
+                data[slot.name] = self._unpack(slot.type)
+        return data
+
+    def to_car(self) -> Car:
+        """Rebuild the public Car model."""
+        data = self._unpack(LAYOUT)
+        data["id"] = self.id
+        data["otherSpecs"] = dict(self.otherSpecs) if self.otherSpecs else {}
+        data["updatedAt"] = self.updatedAt
+        return Car.model_validate(data)
@@ -0,0 +1,242 @@
+"""Side-by-side comparison tables of several cars.
+
+A comparison has one column per car and one row per spec the cars have:
+year and body style, every Engine, Performance, Dimensions and Drivetrain
+field in schema order, then otherSpecs keys. Each measurement row is
+quoted in one unit: the unit system's unit for that dimension, or for
+?units=native the unit most of the cars use.
+
+Measurement values come from the packed CompactCar arrays of all compared
+cars at once: they are converted to SI (see app.spec_index) and from SI to
+the row's unit as whole rows, and best/worst columns are found with
+row-wise max/min over the SI values.
+
+Tables are cached by the sorted set of car IDs, their update_times and the
+unit system, and reordered to the requested column order on the way out.
+"""
+from __future__ import annotations
+
+import os
+import enum
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from app.compact import MEASUREMENT_SLOTS, CompactCar, leaf_slot, unit_code, unit_member
+from app.schemas import Car, CarComparison, CarSummary, ComparisonRow, UnitSystem
+from app.spec_index import packed_matrices, spec_index
+from app.specs import SI_FACTORS, SI_RECIPROCALS, SPECS
+from app.units import UNIT_DIGITS, system_unit
+
+COMPARISON_CACHE_SIZE = int(os.getenv("COMPARISON_CACHE_SIZE", "512"))
+
+# Rows where a larger SI value is better (+1) or worse (-1); other rows
+# aren't ranked
+RANKED_SPECS: Dict[Tuple[str, ...], int] = {
+    ("performance", "horsepower"): 1,
+    ("performance", "torque"): 1,
+    ("performance", "zeroToSixty"): -1,
+    ("performance", "topSpeed"): 1,
+    ("performance", "epaCity"): 1,
+    ("performance", "epaHighway"): 1,
+    ("dimensions", "curbWeight"): -1,
+    ("dimensions", "cargoRearSeatsUp"): 1,
+}
+
+_SPEC_SECTIONS = ("engine", "performance", "dimensions", "drivetrain")
+_SPEC_ROWS = {spec.path: row for row, spec in enumerate(SPECS)}
+_SLOTS_BY_PATH = {slot.path: slot for slot in MEASUREMENT_SLOTS}
+
+
+def _row_paths() -> Tuple[Tuple[str, ...], ...]:
+    paths = [("year",), ("bodyStyle",)]
+    for section in _SPEC_SECTIONS:
+        model = Car.model_fields[section].annotation.__args__[0]
+        paths.extend((section, name) for name in model.model_fields)
+    return tuple(paths)
+
+
+ROW_PATHS = _row_paths()
+
+_DIRECTIONS = np.array([RANKED_SPECS.get(spec.path, 0) for spec in SPECS], dtype=float)
+
+
+def _leaf(record: CompactCar, path: Tuple[str, ...]):
+    """Value of a number, enum or string leaf of a record (None if missing)."""
+    index, leaf_type = leaf_slot(path)
+    if leaf_type is str:
+        return record.strings[index]
+    if isinstance(leaf_type, type) and issubclass(leaf_type, enum.Enum):
+        return unit_member(leaf_type, record.codes[index])
+    value = record.numbers[index]
+    if np.isnan(value):
+        return None
+    return int(value) if leaf_type is int else value
+
+
+def _summary(record: CompactCar) -> CarSummary:
+    return CarSummary.model_construct(
+        id=record.id,
+        **{name: _leaf(record, (name,)) for name in CarSummary.model_fields if name != "id"},
+    )
+
+
+def _row_unit(path: Tuple[str, ...], codes, system: UnitSystem):
+    """The unit a measurement row is quoted in."""
+    slot = _SLOTS_BY_PATH[path]
+    unit = system_unit(path, slot.unit_type, system)
+    if unit is not None:
+        return unit
+    # Native (or no unit for this system): the unit most cars use
+    counts = Counter(int(code) for code in codes[:, slot.unit_index] if unit_member(slot.unit_type, code) is not None)
+    if not counts:
+        return None
+    # Ties go to the earlier member, whatever the column order
+    code = min(counts, key=lambda code: (-counts[code], code))
+    return unit_member(slot.unit_type, code)
+
+
+def _from_si(si_row, unit):
+    """Convert a row of SI values into the given unit (NaN stays NaN)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if unit in SI_RECIPROCALS:
+            values = SI_RECIPROCALS[unit] / si_row
+            values[~np.isfinite(values)] = np.nan
+            return values
+        return si_row / SI_FACTORS[unit]
+
+
+def _ranked(si_values) -> Tuple[np.ndarray, np.ndarray]:
+    """Best and worst masks per spec row, for rows that rank and differ."""
+    signed = si_values * _DIRECTIONS[:, None]
+    known = ~np.isnan(signed)
+    filled_high = np.where(known, signed, -np.inf)
+    filled_low = np.where(known, signed, np.inf)
+    highest = filled_high.max(axis=1, keepdims=True)
+    lowest = filled_low.min(axis=1, keepdims=True)
+    ranks = (_DIRECTIONS[:, None] != 0) & (known.sum(axis=1, keepdims=True) >= 2) & (highest > lowest)
+    return ranks & (signed == highest), ranks & (signed == lowest)
+
+
+def build_comparison(records: Sequence[CompactCar], system: UnitSystem) -> CarComparison:
+    """Comparison table of the records, one column each, in the given order."""
+    numbers, codes = packed_matrices(list(records))
+    si_values = spec_index.si_values(numbers, codes)
+    best, worst = _ranked(si_values)
+
+    rows: List[ComparisonRow] = []
+    for path in ROW_PATHS:
+        if path in _SLOTS_BY_PATH:
+            spec_row = _SPEC_ROWS[path]
+            unit = _row_unit(path, codes, system)
+            if unit is None or np.isnan(si_values[spec_row]).all():
+                continue
+            slot = _SLOTS_BY_PATH[path]
+            converted = _from_si(si_values[spec_row], unit)
+            digits = UNIT_DIGITS.get(unit, 3)
+            # Values already in the row's unit are shown exactly as stored
+            stored = numbers[:, slot.value_index]
+            converted = np.where(codes[:, slot.unit_index] == unit_code(unit), stored, np.round(converted, digits))
+            values = [None if np.isnan(value) else float(value) for value in converted.tolist()]
+            rows.append(ComparisonRow.model_construct(
+                spec=".".join(path),
+                unit=unit.value,
+                values=values,
+                best=np.flatnonzero(best[spec_row]).tolist(),
+                worst=np.flatnonzero(worst[spec_row]).tolist(),
+            ))
+        else:
+            values = [_leaf(record, path) for record in records]
+            values = [value.value if isinstance(value, enum.Enum) else value for value in values]
+            if any(value is not None for value in values):
+                rows.append(ComparisonRow.model_construct(spec=".".join(path), unit=None, values=values, best=[], worst=[]))
+
+    other_keys = sorted({key for record in records for key in (record.otherSpecs or {})})
+    for key in other_keys:
+        values = [(record.otherSpecs or {}).get(key) for record in records]
+        rows.append(ComparisonRow.model_construct(spec=f"otherSpecs.{key}", unit=None, values=values, best=[], worst=[]))
+
+    return CarComparison.model_construct(units=system, cars=[_summary(record) for record in records], rows=rows)
+
+
+def reorder(comparison: CarComparison, order: Sequence[int]) -> CarComparison:
+    """The same table with its columns in a different order.
+
+    Args:
+        order: For each output column, the input column it comes from
+    """
+    new_position = {old: new for new, old in enumerate(order)}
+    return CarComparison.model_construct(
+        units=comparison.units,
+        cars=[comparison.cars[old] for old in order],
+        rows=[
+            ComparisonRow.model_construct(
+                spec=row.spec,
+                unit=row.unit,
+                values=[row.values[old] for old in order],
+                best=sorted(new_position[old] for old in row.best),
+                worst=sorted(new_position[old] for old in row.worst),
+            )
+            for row in comparison.rows
+        ],
+    )
+
+
+class ComparisonKey(NamedTuple):
+    ids: Tuple[str, ...]              # sorted
+    versions: Tuple[datetime, ...]    # update_time of each car, same order
+    units: str
+
+
+class ComparisonCache:
+    """LRU of comparison tables for sorted ID sets."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[ComparisonKey, CarComparison]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+    def compare(
+        self,
+        ids: Sequence[str],
+        versions: Dict[str, Tuple[CompactCar, datetime]],
+        system: UnitSystem,
+    ) -> CarComparison:
+        """Comparison of the given cars in request order, built at most once per version set.
+
+        Args:
+            ids: Car IDs in column order (distinct)
+            versions: Record and update_time of every car in ids
+            system: Unit system measurements are quoted in
+        """
+        sorted_ids = tuple(sorted(ids))
+        key = ComparisonKey(sorted_ids, tuple(versions[car_id][1] for car_id in sorted_ids), system.value)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+
+        if table is None:
+            table = build_comparison([versions[car_id][0] for car_id in sorted_ids], system)
+            if self.max_entries > 0:
+                with self._lock:
+                    self._tables[key] = table
+                    while len(self._tables) > self.max_entries:
+                        self._tables.popitem(last=False)
+
+        positions = {car_id: i for i, car_id in enumerate(sorted_ids)}
+        order = [positions[car_id] for car_id in ids]
+        return table if order == sorted(order) else reorder(table, order)
+
+
+comparison_cache = ComparisonCache(COMPARISON_CACHE_SIZE)
@@ -0,0 +1,176 @@
+"""Precompressed response bodies.
+
+Versioned bodies (those with an ETag) are compressed once per resource,
+ETag and encoding and kept in an LRU, so repeat requests for the same catalog or
+car version pay no compression CPU. Brotli and zstd are used when their
+packages are installed; gzip is always available.
+"""
+from __future__ import annotations
+
+import os
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this go out uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "9"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "9"))
+COMPRESSED_CACHE_MAX_BYTES = int(os.getenv("COMPRESSED_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+# Server preference order, best ratio first
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    COMPRESSORS["br"] = _brotli
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _zstd
+COMPRESSORS["gzip"] = _gzip
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick a content coding from an Accept-Encoding header.
+    
+    Args:
+        accept_encoding: Raw header value, e.g. 'gzip, br;q=0.8'
+        
+    Returns:
+        The accepted encoding with the highest q-value (server preference
+        breaks ties), or None for identity
+    """
+    if not accept_encoding:
+        return None
+    
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            weights[coding] = q
+    
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in COMPRESSORS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (resource, ETag, encoding), with a byte budget.
+
+    The resource (the request path and query) keeps bodies apart even if
+    two differently parameterized responses were ever given the same ETag.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Total bytes currently held."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._size = 0
+
+    def get_or_compress(self, etag: Optional[str], encoding: str, body: bytes, resource: str = "") -> bytes:
+        """Return body compressed with encoding, reusing the cached copy for resource and etag.
+        
+        Bodies without an ETag are compressed but not cached.
+        """
+        if etag is None:
+            return COMPRESSORS[encoding](body)
+        
+        key = (resource, etag, encoding)
+        with self._lock:
+            compressed = self._bodies.get(key)
+            if compressed is not None:
+                self._bodies.move_to_end(key)
+                return compressed
+        
+        compressed = COMPRESSORS[encoding](body)
+        if 0 < len(compressed) <= self.max_bytes:
+            with self._lock:
+                previous = self._bodies.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous)
+                self._bodies[key] = compressed
+                self._size += len(compressed)
+                while self._size > self.max_bytes:
+                    _, evicted = self._bodies.popitem(last=False)
+                    self._size -= len(evicted)
+        return compressed
+
+
+compressed_cache = CompressedBodyCache(COMPRESSED_CACHE_MAX_BYTES)
+
+
+def compress_body(
+    body: bytes,
+    etag: Optional[str],
+    accept_encoding: Optional[str],
+    resource: str = "",
+) -> Tuple[bytes, Optional[str]]:
+    """Compress a response body for the client, if it is worth it.
+    
+    Args:
+        body: Uncompressed body
+        etag: ETag of the body, used as the cache key (None to skip caching)
+        accept_encoding: Client's Accept-Encoding header
+        resource: Canonical request path and query; part of the cache key
+        
+    Returns:
+        (body, encoding) where encoding is None if the body is unchanged
+    """
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return body, None
+    return compressed_cache.get_or_compress(etag, encoding, body, resource), encoding
@@ -0,0 +1,75 @@
+"""Bulk parsing of Firestore car documents.
+
+A page of documents is validated with one TypeAdapter call instead of one
+Car(**data) per document. One bad document never takes a page down with it:
+documents that fail validation are logged and skipped, as the
+per-document loop used to do, and the rest of the page is validated again.
+"""
+from __future__ import annotations
+
+import os
+import logging
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas import Car
+
+logger = logging.getLogger(__name__)
+
+# Documents validated per TypeAdapter call when parsing a stream
+DOCUMENT_PAGE_SIZE = int(os.getenv("DOCUMENT_PAGE_SIZE", "300"))
+
+CAR_LIST_ADAPTER = TypeAdapter(List[Car])
+
+
+def parse_car_documents(docs: Iterable[Any]) -> List[Tuple[Any, Car]]:
+    """Parse a page of Firestore car documents.
+    
+    Args:
+        docs: Document snapshots that exist
+        
+    Returns:
+        (document, Car) pairs in input order, without the documents that
+        failed to parse
+    """
+    pending: List[Tuple[Any, Dict[str, Any]]] = []
+    for doc in docs:
+        car_data = doc.to_dict()
+        car_data['id'] = doc.id
+        pending.append((doc, car_data))
+    
+    while pending:
+        try:
+            cars = CAR_LIST_ADAPTER.validate_python([car_data for _, car_data in pending])
+        except ValidationError as e:
+            failed: Dict[int, List[str]] = {}
+            for error in e.errors():
+                if error["loc"]:
+                    path = ".".join(str(part) for part in error["loc"][1:])
+                    failed.setdefault(error["loc"][0], []).append(f"{path}: {error['msg']}")
+            if not failed:
+                logger.error(f"Error parsing car documents: {e}")
+                return []
+            for position, messages in sorted(failed.items()):
+                logger.error(f"Error parsing car document {pending[position][0].id}: {'; '.join(messages)}")
+            pending = [item for position, item in enumerate(pending) if position not in failed]
+            continue
+        return [(doc, car) for (doc, _), car in zip(pending, cars)]
+    
+    return []
+
+
+def iter_car_documents(docs: Iterable[Any], page_size: Optional[int] = None) -> Iterator[Tuple[Any, Car]]:
+    """Parse a document stream page by page (see parse_car_documents).
+    
+    Missing documents (from get_all) are skipped.
+    """
+    iterator = (doc for doc in docs if doc.exists)
+    page_size = page_size or DOCUMENT_PAGE_SIZE
+    while True:
+        page = list(islice(iterator, page_size))
+        if not page:
+            return
+        yield from parse_car_documents(page)
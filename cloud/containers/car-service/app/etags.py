@@ -0,0 +1,154 @@
+"""ETag helpers for Firestore document versions.
+
+A car's ETag is its document update_time rendered as an RFC 3339 timestamp
+with nanosecond precision, which is exactly what Firestore needs for a
+last_update_time write precondition.
+
+Read responses also embed a signed model URL, so GET ETags append the
+signed-URL window after a ';'. The suffix is ignored when the tag comes
+back in If-Match, so a GET ETag can be used directly for PATCH.
+
+Catalog-wide responses that depend on request parameters (filters, a
+search query, a car and k) add a digest of those parameters, so a tag
+names exactly one body. Non-default representations (binary formats, the
+summary view, converted units) add a variant segment, and compressed
+representations append their content coding as one more ';' segment,
+since a strong ETag must differ per encoding.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from app.binary_formats import JSON_FORMAT
+from app.schemas import CarView, UnitSystem
+
+
+def representation_variant(
+    fmt: str,
+    view: CarView = CarView.full,
+    units: UnitSystem = UnitSystem.native,
+) -> Optional[str]:
+    """ETag variant for a format, view and unit system (None for full native JSON)."""
+    parts = [
+        part for part in (
+            fmt != JSON_FORMAT and fmt,
+            view == CarView.summary and view.value,
+            view == CarView.full and units != UnitSystem.native and units.value,
+        )
+        if part
+    ]
+    return ";".join(parts) or None
+
+
+def _with_variant(tag: str, variant: Optional[str]) -> str:
+    return tag if variant is None else f"{tag};{variant}"
+
+
+def format_update_time_etag(
+    update_time: DatetimeWithNanoseconds,
+    window: Optional[int] = None,
+    variant: Optional[str] = None,
+) -> str:
+    """Render a document update_time as a strong ETag value (quoted).
+    
+    variant distinguishes other representations of the same version
+    (e.g. a binary format); JSON has none.
+    """
+    if window is None:
+        return f'"{update_time.rfc3339()}"'
+    return f'"{_with_variant(f"{update_time.rfc3339()};{window}", variant)}"'
+
+
+def _with_parameters(tag: str, parameters: Optional[str]) -> str:
+    if not parameters:
+        return tag
+    return f"{tag};{hashlib.blake2b(parameters.encode(), digest_size=8).hexdigest()}"
+
+
+def format_catalog_etag(
+    fingerprint: str,
+    window: int,
+    variant: Optional[str] = None,
+    parameters: Optional[str] = None,
+) -> str:
+    """Render a catalog fingerprint and signed-URL window as a strong ETag.
+    
+    parameters is the canonical form of the request parameters the body
+    depends on; it is added as a digest.
+    """
+    return f'"{_with_variant(_with_parameters(f"{fingerprint};{window}", parameters), variant)}"'
+
+
+def format_content_etag(digest: str, variant: Optional[str] = None, parameters: Optional[str] = None) -> str:
+    """Render a digest of a response's content (or of its source) as a strong ETag."""
+    return f'"{_with_variant(_with_parameters(digest, parameters), variant)}"'
+
+
+CONTENT_CODINGS = ("gzip", "br", "zstd")
+
+
+def with_content_encoding(etag: str, encoding: Optional[str]) -> str:
+    """ETag of the given content coding of a representation."""
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]};{encoding}"'
+
+
+def _strip_content_encoding(etag: str) -> str:
+    for encoding in CONTENT_CODINGS:
+        suffix = f';{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def parse_update_time_etag(value: str) -> Optional[DatetimeWithNanoseconds]:
+    """Parse an If-Match header value back into a document update_time.
+    
+    Args:
+        value: Raw header value, e.g. '"2025-01-01T00:00:00.123456789Z"' or '*'
+        
+    Returns:
+        The update_time, or None for the '*' wildcard
+        
+    Raises:
+        ValueError: If the value is not an update_time ETag
+    """
+    value = value.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        raise ValueError("Weak ETags cannot be used as write preconditions")
+    if len(value) < 2 or not (value.startswith('"') and value.endswith('"')):
+        raise ValueError(f"Malformed ETag: {value}")
+    return DatetimeWithNanoseconds.from_rfc3339(value[1:-1].split(";", 1)[0])
+
+
+def matching_etag(if_none_match: Optional[str], etag: Optional[str]) -> Optional[str]:
+    """The If-None-Match entry that matches an ETag, or None.
+    
+    Uses the weak comparison RFC 9110 requires for If-None-Match, so a
+    'W/' prefix added by an intermediary still matches, and any content
+    coding of the representation matches too. The returned tag has no 'W/'
+    prefix and keeps its coding suffix, so a 304 can echo the variant the
+    client holds.
+    """
+    if not if_none_match or not etag:
+        return None
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return etag
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if _strip_content_encoding(candidate) == etag:
+            return candidate
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches an ETag (see matching_etag)."""
+    return matching_etag(if_none_match, etag) is not None
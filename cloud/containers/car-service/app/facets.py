@@ -0,0 +1,220 @@
+"""Facet counts: how many cars have each make, body style, fuel, etc.
+
+Facet values are plain strings (enum values, years as digits). Counts are
+disjunctive, the way filter UIs expect: each facet is counted over the cars
+matching every other facet's selection and the spec filters, so picking
+one make still shows how many cars every other make has.
+
+Unfiltered counts are also kept in one Firestore stats document, updated
+in the same batch as every car write with increments computed from the
+car's facet values before and after the write. `python backfill.py facets`
+recounts it from scratch.
+"""
+from __future__ import annotations
+
+import enum
+import math
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from google.cloud.firestore import DELETE_FIELD, Increment
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.compact import CompactCar, leaf_slot, unit_member
+from app.schemas import Car, CarFacets, FacetCount
+
+# Facet name -> Car field path
+FACETS: Dict[str, Tuple[str, ...]] = {
+    "make": ("make",),
+    "bodyStyle": ("bodyStyle",),
+    "fuel": ("engine", "fuel"),
+    "transmission": ("drivetrain", "transmission"),
+    "layout": ("drivetrain", "layout"),
+    "year": ("year",),
+}
+
+# Document fields a write has to read to know a car's facets
+FACET_FIELD_PATHS = [".".join(path) for path in FACETS.values()]
+
+STATS_TOTAL_FIELD = "total"
+STATS_COUNTS_FIELD = "counts"
+
+# Facet name -> value, for the facets a car has
+FacetValues = Dict[str, str]
+
+# Facet name -> values to keep (any of them)
+FacetSelection = Dict[str, FrozenSet[str]]
+
+_SLOTS = {name: leaf_slot(path) for name, path in FACETS.items()}
+
+
+def _facet_value(value: Any) -> Optional[str]:
+    if isinstance(value, enum.Enum):
+        value = value.value
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def _dig(data: Any, path: Tuple[str, ...]) -> Any:
+    for name in path:
+        if not isinstance(data, Mapping):
+            return None
+        data = data.get(name)
+    return data
+
+
+def car_facets(car: Car) -> FacetValues:
+    """Facet values of a car."""
+    values = {}
+    for name, path in FACETS.items():
+        value: Any = car
+        for part in path:
+            value = getattr(value, part, None)
+        value = _facet_value(value)
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def document_facets(data: Optional[Mapping[str, Any]]) -> FacetValues:
+    """Facet values of a car document's data (e.g. a projection of FACET_FIELD_PATHS)."""
+    values = {}
+    for name, path in FACETS.items():
+        value = _facet_value(_dig(data or {}, path))
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def record_facets(record: CompactCar) -> FacetValues:
+    """Facet values of a cached record."""
+    values = {}
+    for name, (index, leaf_type) in _SLOTS.items():
+        if leaf_type is str:
+            value = record.strings[index]
+        elif isinstance(leaf_type, type) and issubclass(leaf_type, enum.Enum):
+            value = unit_member(leaf_type, record.codes[index])
+        else:
+            number = record.numbers[index]
+            value = None if math.isnan(number) else int(number)
+        value = _facet_value(value)
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def touches_facets(field_updates: Mapping[str, Any]) -> bool:
+    """Whether a set of field-path updates may change a car's facets."""
+    paths = [tuple(FieldPath.from_string(path).parts) for path in field_updates]
+    return any(facet[:len(path)] == path for facet in FACETS.values() for path in paths)
+
+
+def patched_facets(current: Mapping[str, Any], field_updates: Mapping[str, Any]) -> FacetValues:
+    """Facet values after applying field-path updates (see patch_car) to a document."""
+    paths = {tuple(FieldPath.from_string(path).parts): value for path, value in field_updates.items()}
+    values = {}
+    for name, path in FACETS.items():
+        value = _dig(current, path)
+        for depth in range(1, len(path) + 1):
+            if path[:depth] in paths:
+                replaced = paths[path[:depth]]
+                value = None if replaced is DELETE_FIELD else _dig(replaced, path[depth:])
+                break
+        value = _facet_value(value)
+        if value is not None:
+            values[name] = value
+    return values
+
+
+def stats_increments(before: Optional[FacetValues], after: Optional[FacetValues]) -> Dict[str, Any]:
+    """Stats document update (for set(..., merge=True)) for one car's write.
+
+    Args:
+        before: The car's facets before the write (None if it didn't exist)
+        after: The car's facets after the write (None if it was deleted)
+
+    Returns:
+        Nested Increment transforms for the counts that change (empty if none)
+    """
+    return summed_increments([(before, after)])
+
+
+def summed_increments(changes: Iterable[Tuple[Optional[FacetValues], Optional[FacetValues]]]) -> Dict[str, Any]:
+    """Stats document update for many cars' writes (see stats_increments)."""
+    deltas: Counter = Counter()
+    total = 0
+    for before, after in changes:
+        for facets, sign in ((before, -1), (after, 1)):
+            for name, value in (facets or {}).items():
+                deltas[(name, value)] += sign
+        total += (after is not None) - (before is not None)
+
+    counts: Dict[str, Dict[str, Any]] = {}
+    for (name, value), delta in deltas.items():
+        if delta:
+            counts.setdefault(name, {})[value] = Increment(delta)
+    update: Dict[str, Any] = {}
+    if counts:
+        update[STATS_COUNTS_FIELD] = counts
+    if total:
+        update[STATS_TOTAL_FIELD] = Increment(total)
+    return update
+
+
+def count_facets(rows: Iterable[FacetValues], selection: FacetSelection) -> Tuple[int, Dict[str, Counter]]:
+    """Disjunctive facet counts over facet values of the cars matching spec filters.
+
+    Returns:
+        Cars matching every selection, and per facet the count of each value
+        over the cars matching every other facet's selection
+    """
+    total = 0
+    counts: Dict[str, Counter] = {name: Counter() for name in FACETS}
+    for values in rows:
+        misses = [name for name, allowed in selection.items() if values.get(name) not in allowed]
+        if len(misses) > 1:
+            continue
+        if not misses:
+            total += 1
+        for name, value in values.items():
+            # A car outside only this facet's selection still counts for it
+            if not misses or misses == [name]:
+                counts[name][value] += 1
+    return total, counts
+
+
+def facet_response(total: int, counts: Mapping[str, Mapping[str, int]]) -> CarFacets:
+    """Response body: every facet's values, most cars first, then by value."""
+    return CarFacets.model_construct(
+        total=total,
+        facets={
+            name: [
+                FacetCount.model_construct(value=value, cars=cars)
+                for value, cars in sorted((counts.get(name) or {}).items(), key=lambda item: (-item[1], item[0]))
+                if cars > 0
+            ]
+            for name in FACETS
+        },
+    )
+
+
+def parse_facet_selection(raw: Mapping[str, Optional[List[str]]]) -> FacetSelection:
+    """Selections from repeated or comma-separated query values, per facet.
+
+    Raises:
+        ValueError: If a facet name is unknown
+    """
+    selection = {}
+    for name, values in raw.items():
+        if name not in FACETS:
+            raise ValueError(f"Unknown facet '{name}' (expected one of {', '.join(FACETS)})")
+        allowed = frozenset(value.strip() for raw_value in values or [] for value in raw_value.split(",") if value.strip())
+        if allowed:
+            selection[name] = allowed
+    return selection
+
+
+def canonical_selection(selection: FacetSelection) -> str:
+    """The selection as a string, equal for equal selections ("" if empty); used in ETags."""
+    return "&".join(f"{name}={','.join(sorted(selection[name]))}" for name in sorted(selection))
@@ -6,12 +6,13 @@ import logging
 from typing import Optional
 
 import firebase_admin
-from firebase_admin import credentials, firestore
-from google.cloud.firestore import Client
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud.firestore import AsyncClient, Client
 
 logger = logging.getLogger(__name__)
 
 _db: Optional[Client] = None
+_async_db: Optional[AsyncClient] = None
 
 
 def initialize_firebase() -> None:
@@ -71,3 +72,27 @@ def get_firestore_client() -> Client:
         )
     return _db
 
+
+
+def get_async_firestore_client() -> AsyncClient:
+    """Get the asyncio Firestore client instance.
+    
+    The client is created lazily on first use so the sync-only deployment
+    never opens an asyncio gRPC channel.
+    
+    Returns:
+        Async Firestore client
+        
+    Raises:
+        RuntimeError: If Firebase hasn't been initialized
+    """
+    global _async_db
+    
+    if _db is None:
+        raise RuntimeError(
+            "Firebase not initialized. Call initialize_firebase() first."
+        )
+    if _async_db is None:
+        _async_db = firestore_async.client()
+        logger.info("Async Firestore client created successfully")
+    return _async_db
@@ -0,0 +1,81 @@
+"""In-memory secondary key lookups over the cached catalog.
+
+KeyIndex maps every volumeId and slug (see app.car_keys) to its car's ID,
+follows catalog change events and re-keys only the cars that changed.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, FrozenSet, Optional
+
+from app.car_keys import KEY_FIELDS, CarKeys, record_keys
+from app.catalog import Catalog, catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+class KeyIndex:
+    """Key value -> car ID maps kept in step with the catalog cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._ids: Dict[str, Dict[str, str]] = {field: {} for field in KEY_FIELDS}
+        # Each car's keys, to drop them when it changes
+        self._car_keys: Dict[str, CarKeys] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._ids = {field: {} for field in KEY_FIELDS}
+            self._car_keys = {}
+
+    def lookup(self, catalog: Catalog, field: str, value: str) -> Optional[str]:
+        """ID of the car with a key value, or None."""
+        with self._lock:
+            if self._version != catalog.version:
+                self._build(catalog)
+            return self._ids[field].get(value)
+
+    def on_catalog_change(self, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        """Catalog change listener: re-key only the cars that changed."""
+        with self._lock:
+            if self._version is None or self._version >= catalog.version:
+                return
+            if self._version + 1 != catalog.version:
+                # Missed a change; rebuild on the next lookup
+                self._version = -1
+                return
+            for car_id in removed | changed:
+                self._remove(car_id)
+            for car_id in changed:
+                entry = catalog.entries.get(car_id)
+                if entry is not None:
+                    self._add(car_id, record_keys(entry.record))
+            self._version = catalog.version
+
+    def _build(self, catalog: Catalog) -> None:
+        self._ids = {field: {} for field in KEY_FIELDS}
+        self._car_keys = {}
+        for car_id, entry in catalog.entries.items():
+            self._add(car_id, record_keys(entry.record))
+        self._version = catalog.version
+        logger.info(f"Key index built for {len(self._car_keys)} cars")
+
+    def _add(self, car_id: str, keys: CarKeys) -> None:
+        self._car_keys[car_id] = keys
+        for field, value in keys.items():
+            owner = self._ids[field].setdefault(value, car_id)
+            if owner != car_id:
+                # Only possible for cars written before claims existed
+                logger.warning(f"Cars {owner} and {car_id} share {field} '{value}'")
+
+    def _remove(self, car_id: str) -> None:
+        for field, value in self._car_keys.pop(car_id, {}).items():
+            if self._ids[field].get(value) == car_id:
+                del self._ids[field][value]
+
+
+key_index = KeyIndex()
+catalog_cache.add_change_listener(key_index.on_catalog_change)
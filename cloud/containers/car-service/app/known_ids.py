@@ -0,0 +1,189 @@
+"""Known car IDs: skip Firestore reads for cars that don't exist.
+
+KnownCarIds answers "might this car exist?" before get_car reads Firestore:
+
+- A Bloom filter of every car ID, rebuilt from the catalog cache on each
+  change event and updated with every ID written through this instance
+  (via app.cache invalidation). An ID it doesn't contain definitely isn't
+  in the catalog, so the read is skipped. It is sized for
+  CAR_ID_FILTER_FALSE_POSITIVE_RATE; a false positive only costs the read
+  the filter was meant to save.
+- A short-TTL negative cache of IDs Firestore just reported missing, so
+  scanners and stale clients retrying a deleted car don't read it again
+  until MISSING_CAR_CACHE_TTL_SECONDS pass. Writes drop their IDs from it.
+
+The Bloom filter needs the catalog cache; without it only the negative
+cache applies. A car created through another instance is unknown here
+until the next catalog reload, so it can 404 for up to
+CATALOG_CACHE_TTL_SECONDS, the same staleness list reads already have.
+
+Set MISSING_CAR_CACHE_TTL_SECONDS to 0 to disable the negative cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Optional
+
+from app.cache import register_invalidation_listener
+
+if TYPE_CHECKING:
+    from app.catalog import Catalog
+
+logger = logging.getLogger(__name__)
+
+CAR_ID_FILTER_FALSE_POSITIVE_RATE = float(os.getenv("CAR_ID_FILTER_FALSE_POSITIVE_RATE", "0.01"))
+MISSING_CAR_CACHE_TTL_SECONDS = float(os.getenv("MISSING_CAR_CACHE_TTL_SECONDS", "5"))
+MISSING_CAR_CACHE_SIZE = int(os.getenv("MISSING_CAR_CACHE_SIZE", "10000"))
+
+# Filters are sized for twice the catalog (at least this many IDs), so cars
+# added between rebuilds don't push the false-positive rate over target
+_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings.
+
+    Bit positions come from one BLAKE2b digest per item, split into two
+    64-bit hashes and combined by double hashing.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.bits = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current number of items."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+class KnownCarIds:
+    """Bloom filter of existing car IDs plus a negative cache of missing ones."""
+
+    def __init__(self, false_positive_rate: float, missing_ttl_seconds: float, missing_max_size: int):
+        self.false_positive_rate = false_positive_rate
+        self.missing_ttl_seconds = missing_ttl_seconds
+        self.missing_max_size = missing_max_size
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._version: Optional[int] = None
+        # Car ID -> monotonic expiry, oldest first
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        self._filtered = 0
+        self._false_positives = 0
+        self._missing_hits = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._version = None
+            self._missing.clear()
+            self._filtered = self._false_positives = self._missing_hits = 0
+
+    def might_exist(self, car_id: str) -> bool:
+        """False if the car definitely doesn't exist, so Firestore needn't be read."""
+        with self._lock:
+            expiry = self._missing.get(car_id)
+            if expiry is not None:
+                if expiry > time.monotonic():
+                    self._missing_hits += 1
+                    return False
+                del self._missing[car_id]
+            if self._filter is not None and car_id not in self._filter:
+                self._filtered += 1
+                return False
+            return True
+
+    def record_missing(self, car_id: str) -> None:
+        """Remember a car Firestore reported missing."""
+        with self._lock:
+            if self._filter is not None:
+                # The filter let it through, so it was a false positive
+                self._false_positives += 1
+            if self.missing_ttl_seconds <= 0:
+                return
+            self._missing[car_id] = time.monotonic() + self.missing_ttl_seconds
+            self._missing.move_to_end(car_id)
+            while len(self._missing) > self.missing_max_size:
+                self._missing.popitem(last=False)
+
+    def on_invalidate(self, car_ids: FrozenSet[str]) -> None:
+        """Invalidation listener: let the next reads of cars written here through."""
+        with self._lock:
+            for car_id in car_ids:
+                self._missing.pop(car_id, None)
+                if self._filter is not None:
+                    self._filter.add(car_id)
+
+    def on_catalog_change(self, catalog: "Catalog", changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        """Catalog change listener: add new cars, rebuild when cars were removed."""
+        with self._lock:
+            if self._version is not None and self._version >= catalog.version:
+                return
+            current = self._filter
+            if (
+                current is None or removed or self._version + 1 != catalog.version
+                or current.count + len(changed) > current.capacity
+            ):
+                # Bloom filters can't forget, so deleted cars need a fresh one
+                self._filter = self._build(catalog.entries.keys())
+            else:
+                for car_id in changed:
+                    current.add(car_id)
+            self._version = catalog.version
+
+    def _build(self, car_ids: Iterable[str]) -> BloomFilter:
+        car_ids = list(car_ids)
+        bloom = BloomFilter(max(_MIN_CAPACITY, 2 * len(car_ids)), self.false_positive_rate)
+        for car_id in car_ids:
+            bloom.add(car_id)
+        logger.info(
+            f"Car ID filter built for {len(car_ids)} cars: {bloom.bits} bits, {bloom.hashes} hashes, "
+            f"expected false-positive rate {bloom.false_positive_rate:.4%}"
+        )
+        return bloom
+
+    def stats(self) -> Dict[str, Any]:
+        """Filter size, expected and observed false-positive rates, and reads saved."""
+        with self._lock:
+            bloom = self._filter
+            absent = self._filtered + self._false_positives
+            return {
+                "filterIds": bloom.count if bloom else None,
+                "filterBits": bloom.bits if bloom else None,
+                "filterHashes": bloom.hashes if bloom else None,
+                "targetFalsePositiveRate": self.false_positive_rate,
+                "expectedFalsePositiveRate": bloom.false_positive_rate if bloom else None,
+                "observedFalsePositiveRate": self._false_positives / absent if absent else None,
+                "filteredReads": self._filtered,
+                "missingCacheHits": self._missing_hits,
+                "missingCacheSize": len(self._missing),
+            }
+
+
+known_car_ids = KnownCarIds(
+    CAR_ID_FILTER_FALSE_POSITIVE_RATE, MISSING_CAR_CACHE_TTL_SECONDS, MISSING_CAR_CACHE_SIZE,
+)
+register_invalidation_listener(known_car_ids.on_invalidate)
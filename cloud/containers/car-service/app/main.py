@@ -5,6 +5,7 @@ import logging
 
 from app.routes import router
 from app.firebase import initialize_firebase
+from app.known_ids import known_car_ids
 from common.errors import APIError
 
 logger = logging.getLogger(__name__)
@@ -39,7 +40,7 @@ async def startup_event():
 # Health endpoint for readiness probes
 @app.get("/health", tags=["Health"], summary="Health check")
 async def health_check():
-    return {"status": "ok", "service": "car-service"}
+    return {"status": "ok", "service": "car-service", "knownCarIds": known_car_ids.stats()}
 
 # Include the inventory item routes
 app.include_router(router)
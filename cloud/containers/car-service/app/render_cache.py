@@ -0,0 +1,165 @@
+"""Cache of each car's rendered bytes.
+
+Fragments are keyed by (car ID, Firestore update_time, signed-URL window,
+format, view, unit system), so a new write or a new URL window naturally misses and stale
+fragments age out of the LRU. List responses are built by joining cached
+fragments without touching any model fields.
+"""
+from __future__ import annotations
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from app.binary_formats import JSON_FORMAT, encode, encode_array
+from app.catalog import CatalogEntry
+from app.schemas import Car, CarSummary, CarView, UnitSystem
+from app.serialization import dump_car_json, dump_summary_json
+from app.storage import current_url_window, get_cached_model_urls
+from app.units import convert_record
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# (car ID, update_time, URL window, format, view, exclude_none, unit system)
+FragmentKey = Tuple[str, datetime, int, str, str, bool, str]
+
+
+def _render_car(car: Car, fmt: str, view: CarView, exclude_none: bool) -> bytes:
+    if view == CarView.summary:
+        summary = CarSummary.from_car(car)
+        return dump_summary_json(summary) if fmt == JSON_FORMAT else encode(summary, fmt)
+    return dump_car_json(car, exclude_none) if fmt == JSON_FORMAT else encode(car, fmt)
+
+
+class RenderCache:
+    """LRU of rendered cars with a total byte budget."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._fragments: "OrderedDict[FragmentKey, bytes]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Total bytes currently held."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+            self._size = 0
+
+    def render(
+        self,
+        entries: Iterable[CatalogEntry],
+        window: Optional[int] = None,
+        fmt: str = JSON_FORMAT,
+        view: CarView = CarView.full,
+        exclude_none: bool = False,
+        units: UnitSystem = UnitSystem.native,
+    ) -> List[bytes]:
+        """Return the fragment for each entry, rendering only misses.
+        
+        Misses are signed in one batch and serialized once; everything else
+        is a dictionary lookup. Cars whose model URL couldn't be signed are
+        rendered without it and not cached.
+        
+        Args:
+            entries: Catalog entries to render, in response order
+            window: Signed-URL window (defaults to the current one)
+            fmt: Output format (see app.binary_formats)
+            view: Full cars, or summaries (which carry no model URL)
+            exclude_none: Omit null fields from full JSON cars
+            units: Unit system measurements are converted to
+            
+        Returns:
+            One encoded car per entry, in the same order
+        """
+        signed = view == CarView.full
+        # Summaries don't depend on the URL window, and binary formats and
+        # summaries never contain nulls
+        window = (current_url_window() if window is None else window) if signed else 0
+        exclude_none = exclude_none or fmt != JSON_FORMAT or not signed
+        # Summaries carry no measurements
+        units = units if signed else UnitSystem.native
+        entries = list(entries)
+        keys = [
+            (entry.record.id, entry.update_time, window, fmt, view.value, exclude_none, units.value)
+            for entry in entries
+        ]
+        
+        fragments: List[Optional[bytes]] = [None] * len(entries)
+        missing: List[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                fragment = self._fragments.get(key)
+                if fragment is None:
+                    missing.append(i)
+                else:
+                    self._fragments.move_to_end(key)
+                    fragments[i] = fragment
+        
+        if missing:
+            unsigned = [
+                entries[i].record.volumeId for i in missing
+                if signed and entries[i].record.volumeId and not entries[i].record.modelUrl
+            ]
+            urls = get_cached_model_urls(unsigned, window) if unsigned else {}
+            rendered = []
+            for i in missing:
+                car = convert_record(entries[i].record, units).to_car()
+                needs_url = signed and bool(car.volumeId) and not car.modelUrl
+                url = urls.get(car.volumeId) if needs_url else None
+                if url:
+                    car = car.model_copy(update={"modelUrl": url})
+                fragments[i] = _render_car(car, fmt, view, exclude_none)
+                # A car whose URL couldn't be signed is re-rendered next time
+                # rather than served without one for the rest of the window
+                if url or not needs_url:
+                    rendered.append((keys[i], fragments[i]))
+            self._store(rendered)
+        
+        return fragments
+
+    def render_list(
+        self,
+        entries: Iterable[CatalogEntry],
+        window: Optional[int] = None,
+        fmt: str = JSON_FORMAT,
+        view: CarView = CarView.full,
+        exclude_none: bool = False,
+        units: UnitSystem = UnitSystem.native,
+    ) -> bytes:
+        """Render entries as an array by concatenating cached fragments."""
+        fragments = self.render(entries, window, fmt, view, exclude_none, units)
+        if fmt == JSON_FORMAT:
+            return b"[" + b",".join(fragments) + b"]"
+        return encode_array(fragments, fmt)
+
+    def _store(self, rendered: List[Tuple[FragmentKey, bytes]]) -> None:
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            for key, fragment in rendered:
+                if len(fragment) > self.max_bytes:
+                    continue
+                previous = self._fragments.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous)
+                self._fragments[key] = fragment
+                self._size += len(fragment)
+            while self._size > self.max_bytes:
+                _, evicted = self._fragments.popitem(last=False)
+                self._size -= len(evicted)
+
+
+render_cache = RenderCache(RENDER_CACHE_MAX_BYTES)
@@ -1,17 +1,160 @@
 from __future__ import annotations
 
-from typing import Optional, Dict, Any, List
+import os
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from uuid import UUID
 
-from app.schemas import Car
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore import SERVER_TIMESTAMP, Query
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.bulk_writer import BulkRetry, BulkWriterOptions
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.schemas import Car, CarSummary
+from app.cache import invalidate_cars
+from app.car_keys import (
+    CLAIM_CAR_ID_FIELD, KEY_FIELDS, CarKeys, car_keys, claim_document_id, default_slug, document_keys,
+    patched_keys, touches_keys,
+)
+from app.documents import iter_car_documents
+from app.facets import (
+    FACET_FIELD_PATHS, STATS_COUNTS_FIELD, STATS_TOTAL_FIELD, FacetValues, car_facets, document_facets,
+    patched_facets, stats_increments, summed_increments, touches_facets,
+)
 from app.firebase import get_firestore_client
-from app.storage import get_model_url_for_volume_id
+from app.known_ids import known_car_ids
+from app.specs import (
+    SI_FIELD, SpecQuery, derived_field_updates, si_field_updates, si_fields, touches_derived_specs,
+)
+from app.storage import get_model_url_for_volume_id, get_model_urls_for_volume_ids
 
 import logging
 logger = logging.getLogger(__name__)
 
-# Firestore collection name
+# Firestore collection names
 CARS_COLLECTION = "cars"
+TOMBSTONES_COLLECTION = "car_tombstones"
+STATS_COLLECTION = "stats"
+KEYS_COLLECTION = "car_keys"
+
+# Stats document holding unfiltered facet counts (see app.facets)
+FACET_STATS_DOCUMENT = "car_facets"
+
+# Document fields read for the summary view (the ID is the document name)
+CAR_SUMMARY_FIELDS = [name for name in CarSummary.model_fields if name != "id"]
+
+# Maintained on every write; the change feed orders by it
+UPDATED_AT_FIELD = "updatedAt"
+DELETED_AT_FIELD = "deletedAt"
+
+# Change feed cursor: (timestamp, document ID) of the last item returned
+ChangeCursor = Tuple[datetime, str]
+
+# BulkWriter throttling: starts at the initial rate and ramps up (500/50/5
+# rule) to the max rate; failed writes are retried with exponential backoff
+BULK_WRITE_INITIAL_OPS_PER_SECOND = int(os.getenv("BULK_WRITE_INITIAL_OPS_PER_SECOND", "500"))
+BULK_WRITE_MAX_OPS_PER_SECOND = int(os.getenv("BULK_WRITE_MAX_OPS_PER_SECOND", "2000"))
+BULK_WRITE_MAX_ATTEMPTS = int(os.getenv("BULK_WRITE_MAX_ATTEMPTS", "5"))
+
+# Patches that change an input of a derived spec, a facet or a secondary
+# key read the stored document first; the update is retried this many times if another
+# write lands in between
+PATCH_DERIVED_ATTEMPTS = 3
+
+# Cars whose current facets and keys bulk_upsert_cars reads per get_all
+# round trip (each car and its claim writes, at most five, must fit in one
+# 500-write batch)
+BULK_FACET_READ_BATCH = 100
+
+# Fields a write reads from the stored car to maintain facet stats and key claims
+STORED_FIELD_PATHS = FACET_FIELD_PATHS + list(KEY_FIELDS)
+
+
+def _document_data(car: Car) -> Dict[str, Any]:
+    """Serialize a car for Firestore, stamping the write time and SI shadow fields."""
+    car_data = car.model_dump(mode='json', exclude={'id'})
+    car_data[UPDATED_AT_FIELD] = SERVER_TIMESTAMP
+    car_data[SI_FIELD] = si_fields(car)
+    return car_data
+
+
+def _facet_stats_document(db):
+    return db.collection(STATS_COLLECTION).document(FACET_STATS_DOCUMENT)
+
+
+def _claim_document(db, field: str, value: str):
+    return db.collection(KEYS_COLLECTION).document(claim_document_id(field, value))
+
+
+def _stored_fields(doc_ref) -> Optional[Dict[str, Any]]:
+    """Facet and key fields of a stored car, or None if it doesn't exist."""
+    snapshot = doc_ref.get(field_paths=STORED_FIELD_PATHS)
+    return (snapshot.to_dict() or {}) if snapshot.exists else None
+
+
+def _facets_of(stored: Optional[Dict[str, Any]]) -> Optional[FacetValues]:
+    return None if stored is None else document_facets(stored)
+
+
+def _add_facet_stats(db, batch, before: Optional[FacetValues], after: Optional[FacetValues]) -> None:
+    """Add the stats document increments for one car's write to a batch."""
+    update = stats_increments(before, after)
+    if update:
+        batch.set(_facet_stats_document(db), update, merge=True)
+
+
+def _add_key_claims(db, batch, car_id: str, before: CarKeys, after: CarKeys) -> None:
+    """Claim a car's new key values and release the ones they replace, in a batch.
+    
+    Claims are created, so the batch fails with AlreadyExists if another
+    car holds one of them.
+    """
+    for field in KEY_FIELDS:
+        old, new = before.get(field), after.get(field)
+        if old == new:
+            continue
+        if new:
+            batch.create(_claim_document(db, field, new), {CLAIM_CAR_ID_FIELD: car_id})
+        if old:
+            batch.delete(_claim_document(db, field, old))
+
+
+def _with_slug(car: Car, stored: CarKeys, owner_of) -> Car:
+    """The car with a slug: its own, else its stored one, else its default slug.
+    
+    A default slug another car already holds (owner_of returns the holder's
+    ID) gets the start of the car's ID appended.
+    """
+    if car.slug:
+        return car
+    slug = stored.get("slug")
+    if slug is None:
+        slug = default_slug(car)
+        if not slug:
+            return car
+        if owner_of(slug) not in (None, str(car.id)):
+            slug = f"{slug}-{str(car.id)[:8]}"
+    return car.model_copy(update={"slug": slug})
+
+
+def _slug_owner(db):
+    """owner_of for _with_slug, reading the slug's claim document."""
+    def owner_of(slug: str) -> Optional[str]:
+        claim = _claim_document(db, "slug", slug).get()
+        return (claim.to_dict() or {}).get(CLAIM_CAR_ID_FIELD) if claim.exists else None
+    return owner_of
+
+
+def _sign_model_urls(cars: Iterable[Car]) -> None:
+    """Fill in signed model URLs for every car that needs one, in one batch."""
+    pending = [car for car in cars if car.volumeId and not car.modelUrl]
+    if not pending:
+        return
+    urls = get_model_urls_for_volume_ids(car.volumeId for car in pending)
+    for car in pending:
+        car.modelUrl = urls.get(car.volumeId)
 
 
 def get_cars() -> List[Car]:
@@ -27,34 +170,149 @@ def get_cars() -> List[Car]:
         docs = cars_ref.stream()
         
         cars = []
+        for _, car in iter_car_documents(docs):
+            # Generate signed URL for 3D model if volumeId exists
+            if car.volumeId and not car.modelUrl:
+                car.modelUrl = get_model_url_for_volume_id(car.volumeId)
+            
+            cars.append(car)
+        
+        logger.info(f"Retrieved {len(cars)} cars from Firestore")
+        return cars
+        
+    except Exception as e:
+        logger.error(f"Error retrieving cars from Firestore: {e}")
+        return []
+
+
+def build_spec_query(collection, query: SpecQuery):
+    """Apply spec range filters and ordering to a (sync or async) collection."""
+    firestore_query = collection
+    for spec, bound in query.minimums:
+        firestore_query = firestore_query.where(filter=FieldFilter(f"{SI_FIELD}.{spec.name}", ">=", bound))
+    for spec, bound in query.maximums:
+        firestore_query = firestore_query.where(filter=FieldFilter(f"{SI_FIELD}.{spec.name}", "<=", bound))
+    direction = Query.DESCENDING if query.descending else Query.ASCENDING
+    return firestore_query.order_by(f"{SI_FIELD}.{query.order.name}", direction=direction)
+
+
+def query_cars(query: SpecQuery) -> List[Car]:
+    """
+    Get the cars matching range filters and ordering on canonical SI specs.
+    
+    Runs as an indexed Firestore query on the _si shadow fields. Cars
+    missing a filtered or ordered spec are not returned. Filters on more
+    than one spec need a composite index.
+    
+    Args:
+        query: Parsed spec query (see app.specs.parse_spec_query)
+        
+    Returns:
+        List of Car objects with signed model URLs, in query order
+        
+    Raises:
+        google.api_core.exceptions.GoogleAPICallError: If the query fails
+            (e.g. the composite index it needs doesn't exist)
+    """
+    db = get_firestore_client()
+    firestore_query = build_spec_query(db.collection(CARS_COLLECTION), query)
+    
+    cars = [car for _, car in iter_car_documents(firestore_query.stream())]
+    _sign_model_urls(cars)
+    
+    logger.info(f"Query matched {len(cars)} cars")
+    return cars
+
+
+def get_car_summaries() -> List[CarSummary]:
+    """
+    Get the summary fields of every car from Firestore.
+    
+    Uses a projection query, so only the CarSummary fields are read and
+    validated, and no model URLs are signed.
+    
+    Returns:
+        List of CarSummary objects
+    """
+    try:
+        db = get_firestore_client()
+        docs = db.collection(CARS_COLLECTION).select(CAR_SUMMARY_FIELDS).stream()
+        
+        summaries = []
         for doc in docs:
             try:
-                car_data = doc.to_dict()
-                # Firestore ID is the string UUID
-                car_data['id'] = doc.id
-                car = Car(**car_data)
-                
-                # Generate signed URL for 3D model if volumeId exists
-                if car.volumeId and not car.modelUrl:
-                    car.modelUrl = get_model_url_for_volume_id(car.volumeId)
-                
-                cars.append(car)
+                summaries.append(CarSummary(id=doc.id, **doc.to_dict()))
             except Exception as e:
                 logger.error(f"Error parsing car document {doc.id}: {e}")
                 continue
         
-        logger.info(f"Retrieved {len(cars)} cars from Firestore")
-        return cars
+        logger.info(f"Retrieved {len(summaries)} car summaries from Firestore")
+        return summaries
         
     except Exception as e:
-        logger.error(f"Error retrieving cars from Firestore: {e}")
+        logger.error(f"Error retrieving car summaries from Firestore: {e}")
         return []
 
 
+def get_facet_stats() -> Optional[Tuple[int, Dict[str, Dict[str, int]], datetime]]:
+    """
+    Get the unfiltered facet counts kept in the stats document.
+    
+    Returns:
+        (total cars, facet -> value -> count, document update_time), or None
+        if the document doesn't exist yet (see backfill.py facets)
+    """
+    snapshot = _facet_stats_document(get_firestore_client()).get()
+    if not snapshot.exists:
+        return None
+    data = snapshot.to_dict() or {}
+    return data.get(STATS_TOTAL_FIELD, 0), data.get(STATS_COUNTS_FIELD) or {}, snapshot.update_time
+
+
+def get_facet_rows(query: Optional[SpecQuery] = None) -> List[FacetValues]:
+    """
+    Get the facet values of every car matching a spec query (projection query).
+    
+    Args:
+        query: Spec range filters, or None for every car
+        
+    Returns:
+        One facet values dict per car
+    """
+    db = get_firestore_client()
+    firestore_query = db.collection(CARS_COLLECTION).select(FACET_FIELD_PATHS)
+    if query is not None and query.active:
+        firestore_query = build_spec_query(firestore_query, query)
+    rows = [document_facets(doc.to_dict()) for doc in firestore_query.stream()]
+    logger.info(f"Read facets of {len(rows)} cars")
+    return rows
+
+
+def iter_cars() -> Iterator[Car]:
+    """
+    Stream all cars from Firestore one document at a time.
+    
+    Unlike get_cars this never holds the collection in memory and does not
+    sign model URLs; callers sign in small batches as they go. A Firestore
+    error ends the stream early (it is logged).
+    
+    Yields:
+        Car objects without signed model URLs
+    """
+    try:
+        db = get_firestore_client()
+        for _, car in iter_car_documents(db.collection(CARS_COLLECTION).stream()):
+            yield car
+    except Exception as e:
+        logger.error(f"Error streaming cars from Firestore: {e}")
+
+
 def get_car(car_id: str) -> Optional[Car]:
     """
     Get a single car by ID from Firestore.
     
+    IDs known not to exist (see app.known_ids) aren't read.
+    
     Args:
         car_id: UUID string of the car
         
@@ -69,17 +327,23 @@ def get_car(car_id: str) -> Optional[Car]:
             logger.warning(f"Invalid UUID format: {car_id}")
             return None
         
+        if not known_car_ids.might_exist(car_id):
+            logger.info(f"Car not found: {car_id} (known missing)")
+            return None
+        
         db = get_firestore_client()
         doc_ref = db.collection(CARS_COLLECTION).document(car_id)
         doc = doc_ref.get()
         
         if not doc.exists:
             logger.info(f"Car not found: {car_id}")
+            known_car_ids.record_missing(car_id)
             return None
         
-        car_data = doc.to_dict()
-        car_data['id'] = doc.id
-        car = Car(**car_data)
+        parsed = list(iter_car_documents([doc]))
+        if not parsed:
+            return None
+        car = parsed[0][1]
         
         # Generate signed URL for 3D model if volumeId exists
         if car.volumeId and not car.modelUrl:
@@ -93,6 +357,90 @@ def get_car(car_id: str) -> Optional[Car]:
         return None
 
 
+def get_car_by_key(field: str, value: str) -> Optional[Car]:
+    """
+    Get a car by a secondary key (volumeId or slug) from Firestore.
+    
+    Runs an equality query, served by Firestore's automatic single-field
+    index.
+    
+    Args:
+        field: One of app.car_keys.KEY_FIELDS
+        value: The key value
+        
+    Returns:
+        Car object with signed model URL if found, None otherwise
+    """
+    db = get_firestore_client()
+    query = db.collection(CARS_COLLECTION).where(filter=FieldFilter(field, "==", value)).limit(1)
+    cars = [car for _, car in iter_car_documents(query.stream())]
+    if not cars:
+        logger.info(f"No car with {field} {value}")
+        return None
+    _sign_model_urls(cars)
+    return cars[0]
+
+
+def get_cars_by_ids(car_ids: List[str]) -> Dict[str, Car]:
+    """
+    Get several cars by ID from Firestore in a single round trip.
+    
+    Args:
+        car_ids: Canonical UUID strings of the cars
+        
+    Returns:
+        Dictionary mapping car ID to Car object (with signed model URL) for
+        every ID that exists. Missing IDs are simply absent from the result.
+        
+    Raises:
+        google.api_core.exceptions.GoogleAPICallError: If the read fails, so
+            callers don't report every car as missing during an outage
+    """
+    if not car_ids:
+        return {}
+    
+    db = get_firestore_client()
+    collection = db.collection(CARS_COLLECTION)
+    refs = [collection.document(car_id) for car_id in car_ids]
+    
+    cars: Dict[str, Car] = {doc.id: car for doc, car in iter_car_documents(db.get_all(refs))}
+    
+    _sign_model_urls(cars.values())
+    
+    logger.info(f"Retrieved {len(cars)}/{len(car_ids)} cars in batch")
+    return cars
+
+
+def get_car_versions(car_ids: Optional[List[str]] = None) -> Dict[str, Tuple[Car, datetime]]:
+    """
+    Get cars with their Firestore document update_time, for caching.
+    
+    Model URLs are not signed here; the cache signs them at render time so a
+    cached car outlives any single signed URL.
+    
+    Args:
+        car_ids: IDs to fetch in one get_all round trip, or None for the
+                 whole collection
+        
+    Returns:
+        Dictionary mapping car ID to (Car, update_time) for every car that
+        exists and parses
+        
+    Raises:
+        Exception: Firestore errors are propagated so a cache can keep
+            serving its previous contents
+    """
+    db = get_firestore_client()
+    collection = db.collection(CARS_COLLECTION)
+    
+    if car_ids is None:
+        docs = collection.stream()
+    else:
+        docs = db.get_all([collection.document(car_id) for car_id in car_ids]) if car_ids else []
+    
+    return {doc.id: (car, doc.update_time) for doc, car in iter_car_documents(docs)}
+
+
 def create_car(car: Car) -> bool:
     """
     Create a new car document in Firestore.
@@ -106,12 +454,20 @@ def create_car(car: Car) -> bool:
     try:
         db = get_firestore_client()
         car_id = str(car.id)
+        doc_ref = db.collection(CARS_COLLECTION).document(car_id)
+        stored = _stored_fields(doc_ref)
+        car = _with_slug(car, document_keys(stored), _slug_owner(db))
         
         # Convert to dict and remove id (it's the document ID)
-        car_data = car.model_dump(mode='json', exclude={'id'})
+        car_data = _document_data(car)
         
-        db.collection(CARS_COLLECTION).document(car_id).set(car_data)
+        batch = db.batch()
+        batch.set(doc_ref, car_data)
+        _add_facet_stats(db, batch, _facets_of(stored), car_facets(car))
+        _add_key_claims(db, batch, car_id, document_keys(stored), car_keys(car))
+        batch.commit()
         logger.info(f"Created car: {car_id}")
+        invalidate_cars([car_id])
         return True
         
     except Exception as e:
@@ -132,12 +488,20 @@ def update_car(car_id: str, car: Car) -> bool:
     """
     try:
         db = get_firestore_client()
+        doc_ref = db.collection(CARS_COLLECTION).document(car_id)
+        stored = _stored_fields(doc_ref)
+        car = _with_slug(car, document_keys(stored), _slug_owner(db))
         
         # Convert to dict and remove id
-        car_data = car.model_dump(mode='json', exclude={'id'})
+        car_data = _document_data(car)
         
-        db.collection(CARS_COLLECTION).document(car_id).update(car_data)
+        batch = db.batch()
+        batch.update(doc_ref, car_data)
+        _add_facet_stats(db, batch, _facets_of(stored), car_facets(car))
+        _add_key_claims(db, batch, car_id, document_keys(stored), car_keys(car))
+        batch.commit()
         logger.info(f"Updated car: {car_id}")
+        invalidate_cars([car_id])
         return True
         
     except Exception as e:
@@ -145,6 +509,146 @@ def update_car(car_id: str, car: Car) -> bool:
         return False
 
 
+def patch_car(
+    car_id: str,
+    field_updates: Dict[str, Any],
+    last_update_time: Optional[datetime] = None,
+) -> datetime:
+    """
+    Apply field-level updates to an existing car document in Firestore.
+    
+    Only the given field paths are sent, so untouched nested fields are
+    neither rewritten nor re-indexed.
+    
+    Args:
+        car_id: UUID string of the car
+        field_updates: Mapping of Firestore field paths (e.g. "engine.code")
+                       to new values or firestore.DELETE_FIELD
+        last_update_time: If given, the write only succeeds when the document
+                          was last updated at exactly this time
+        
+    Returns:
+        The document's new update_time
+        
+    Raises:
+        google.api_core.exceptions.NotFound: If the car doesn't exist
+        google.api_core.exceptions.FailedPrecondition: If last_update_time no
+            longer matches the stored document
+        google.api_core.exceptions.AlreadyExists: If the patch gives the car a
+            volumeId or slug another car already has
+    """
+    db = get_firestore_client()
+    doc_ref = db.collection(CARS_COLLECTION).document(car_id)
+    
+    si_updates = si_field_updates(field_updates)
+    derived = touches_derived_specs(si_updates)
+    facets = touches_facets(field_updates)
+    keys = touches_keys(field_updates)
+    if derived or facets or keys:
+        result = _patch_with_read(db, doc_ref, field_updates, si_updates, last_update_time, derived, facets, keys)
+    else:
+        option = None
+        if last_update_time is not None:
+            option = db.write_option(last_update_time=last_update_time)
+        updates = {**field_updates, **si_updates, UPDATED_AT_FIELD: SERVER_TIMESTAMP}
+        result = doc_ref.update(updates, option=option)
+    logger.info(f"Patched car {car_id}: {', '.join(field_updates)}")
+    invalidate_cars([car_id])
+    return result.update_time
+
+
+def _patch_with_read(db, doc_ref, field_updates, si_updates, last_update_time, derived, facets, keys):
+    """Apply a patch based on the stored document, in one batch with what
+    follows from it: recomputed derived specs from its _si map, facet stats
+    increments from its facet fields and key claims from its keys.
+    
+    The update is conditioned on the version that was read, so derived
+    values never mix inputs from two different writes, and facet counts and
+    claims move from the values that were actually replaced.
+    """
+    field_paths = (
+        ([SI_FIELD] if derived else [])
+        + (FACET_FIELD_PATHS if facets else [])
+        + (list(KEY_FIELDS) if keys else [])
+    )
+    for attempt in range(PATCH_DERIVED_ATTEMPTS):
+        snapshot = doc_ref.get(field_paths=field_paths)
+        if not snapshot.exists:
+            raise gcp_exceptions.NotFound(f"Car {doc_ref.id} not found")
+        if last_update_time is not None and snapshot.update_time != last_update_time:
+            raise gcp_exceptions.FailedPrecondition(f"Car {doc_ref.id} changed since {last_update_time}")
+        
+        current = snapshot.to_dict() or {}
+        updates = {**field_updates, **si_updates}
+        if derived:
+            updates.update(derived_field_updates(si_updates, current.get(SI_FIELD) or {}))
+        updates[UPDATED_AT_FIELD] = SERVER_TIMESTAMP
+        
+        batch = db.batch()
+        batch.update(doc_ref, updates, option=db.write_option(last_update_time=snapshot.update_time))
+        if facets:
+            _add_facet_stats(db, batch, document_facets(current), patched_facets(current, field_updates))
+        if keys:
+            _add_key_claims(db, batch, doc_ref.id, document_keys(current), patched_keys(current, field_updates))
+        try:
+            return batch.commit()[0]
+        except gcp_exceptions.FailedPrecondition:
+            if last_update_time is not None or attempt == PATCH_DERIVED_ATTEMPTS - 1:
+                raise
+            logger.info(f"Car {doc_ref.id} changed while patching, retrying")
+
+
+def _ordered_after(collection, field: str, cursor: Optional[ChangeCursor], limit: int):
+    """Query documents ordered by (field, document ID), strictly after cursor."""
+    query = collection.order_by(field).order_by(FieldPath.document_id())
+    if cursor is not None:
+        query = query.start_after({field: cursor[0], FieldPath.document_id(): cursor[1]})
+    return query.limit(limit).stream()
+
+
+def get_changes(
+    car_cursor: Optional[ChangeCursor],
+    tombstone_cursor: Optional[ChangeCursor],
+    limit: int,
+) -> Tuple[List[Tuple[datetime, str, Optional[Car]]], List[Tuple[datetime, str]]]:
+    """
+    Get cars written and deleted after the given change feed cursors.
+    
+    Args:
+        car_cursor: (updatedAt, car ID) of the last change already seen, or
+                    None to start from the beginning
+        tombstone_cursor: (deletedAt, car ID) of the last deletion already seen
+        limit: Maximum number of items to read from each collection
+        
+    Returns:
+        Tuple of (changed, deleted). changed holds (updatedAt, car ID, Car)
+        in feed order, with Car None for documents that failed to parse;
+        deleted holds (deletedAt, car ID) in feed order.
+    """
+    db = get_firestore_client()
+    
+    changed: List[Tuple[datetime, str, Optional[Car]]] = []
+    for doc in _ordered_after(db.collection(CARS_COLLECTION), UPDATED_AT_FIELD, car_cursor, limit):
+        car_data = doc.to_dict()
+        updated_at = car_data.get(UPDATED_AT_FIELD)
+        try:
+            car_data['id'] = doc.id
+            changed.append((updated_at, doc.id, Car(**car_data)))
+        except Exception as e:
+            logger.error(f"Error parsing car document {doc.id}: {e}")
+            changed.append((updated_at, doc.id, None))
+    
+    _sign_model_urls(car for _, _, car in changed if car is not None)
+    
+    deleted = [
+        (doc.to_dict().get(DELETED_AT_FIELD), doc.id)
+        for doc in _ordered_after(db.collection(TOMBSTONES_COLLECTION), DELETED_AT_FIELD, tombstone_cursor, limit)
+    ]
+    
+    logger.info(f"Change feed read {len(changed)} changed and {len(deleted)} deleted cars")
+    return changed, deleted
+
+
 def delete_car(car_id: str) -> bool:
     """
     Delete a car document from Firestore.
@@ -157,10 +661,273 @@ def delete_car(car_id: str) -> bool:
     """
     try:
         db = get_firestore_client()
-        db.collection(CARS_COLLECTION).document(car_id).delete()
+        
+        # Delete and leave a tombstone atomically so the change feed sees it
+        doc_ref = db.collection(CARS_COLLECTION).document(car_id)
+        batch = db.batch()
+        batch.delete(doc_ref)
+        batch.set(
+            db.collection(TOMBSTONES_COLLECTION).document(car_id),
+            {DELETED_AT_FIELD: SERVER_TIMESTAMP},
+        )
+        stored = _stored_fields(doc_ref)
+        _add_facet_stats(db, batch, _facets_of(stored), None)
+        _add_key_claims(db, batch, car_id, document_keys(stored), {})
+        batch.commit()
         logger.info(f"Deleted car: {car_id}")
+        invalidate_cars([car_id])
         return True
         
     except Exception as e:
         logger.error(f"Error deleting car {car_id} from Firestore: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+# A car bulk_upsert_cars writes with its claims: (car, facets before, claim
+# IDs created, claim IDs deleted)
+ClaimedWrite = Tuple[Car, Optional[FacetValues], List[str], List[str]]
+
+
+def bulk_upsert_cars(cars: Iterable[Car]) -> Dict[str, Optional[str]]:
+    """
+    Create or overwrite many car documents through a Firestore BulkWriter.
+    
+    Cars are consumed lazily, so a streaming caller can keep validating input
+    while earlier writes are already in flight. Each chunk of
+    BULK_FACET_READ_BATCH cars has its stored facets and keys, and the
+    claims of its key values, read in get_all round trips before it is
+    queued. Cars whose volumeId or slug another car holds are rejected.
+    Cars whose keys change are written in one batch with their claims, like
+    create_car: new claims are created, and a replaced claim is deleted only
+    if the car owns it and it is unchanged since it was read. If the batch
+    fails, its cars are retried one batch each. The other cars go through
+    the BulkWriter. Caches are invalidated and the facet stats document
+    updated once, after the whole batch has been flushed.
+    
+    Args:
+        cars: Iterable of Car objects to write (document ID is the car ID)
+        
+    Returns:
+        Dictionary mapping each car ID to None on success or an error message
+    """
+    outcomes: Dict[str, Optional[str]] = {}
+    lock = threading.Lock()
+    
+    def on_result(reference, result, writer) -> None:
+        with lock:
+            outcomes[reference.id] = None
+    
+    def on_error(failure, writer) -> bool:
+        if failure.attempts < BULK_WRITE_MAX_ATTEMPTS:
+            return True
+        car_id = failure.operation.reference.id
+        logger.error(f"Bulk write failed for car {car_id}: {failure.message}")
+        with lock:
+            outcomes[car_id] = failure.message or f"Write failed with code {failure.code}"
+        return False
+    
+    db = get_firestore_client()
+    collection = db.collection(CARS_COLLECTION)
+    writer = db.bulk_writer(options=BulkWriterOptions(
+        initial_ops_per_second=BULK_WRITE_INITIAL_OPS_PER_SECOND,
+        max_ops_per_second=BULK_WRITE_MAX_OPS_PER_SECOND,
+        retry=BulkRetry.exponential,
+    ))
+    writer.on_write_result(on_result)
+    writer.on_write_error(on_error)
+    
+    # Cars queued on the BulkWriter
+    submitted: List[str] = []
+    # Car ID -> (facets before the first write, facets after the last)
+    facet_changes: Dict[str, Tuple[Optional[FacetValues], FacetValues]] = {}
+    # Car ID -> keys as of its last write in this upload
+    written_keys: Dict[str, CarKeys] = {}
+    # Claim document ID -> (owning car ID or None if free, claim update time),
+    # as read or written so far
+    owners: Dict[str, Tuple[Optional[str], Optional[datetime]]] = {}
+    # Claim document ID -> claim document reference
+    claims: Dict[str, Any] = {}
+    
+    def read_owners(chunk: List[Car], stored: Dict[str, Dict[str, Any]]) -> None:
+        wanted = {}
+        for car in chunk:
+            values = list(car_keys(car).items()) + list(document_keys(stored.get(str(car.id))).items())
+            if not car.slug and default_slug(car):
+                values.append(("slug", default_slug(car)))
+            for field, value in values:
+                claim_id = claim_document_id(field, value)
+                if claim_id not in owners:
+                    wanted[claim_id] = _claim_document(db, field, value)
+        if wanted:
+            for doc in db.get_all(list(wanted.values()), field_paths=[CLAIM_CAR_ID_FIELD]):
+                if doc.exists:
+                    owners[doc.id] = ((doc.to_dict() or {}).get(CLAIM_CAR_ID_FIELD), doc.update_time)
+                else:
+                    owners[doc.id] = (None, None)
+    
+    def owner(field: str, value: str) -> Optional[str]:
+        return owners.get(claim_document_id(field, value), (None, None))[0]
+    
+    def record(car: Car, before_facets: Optional[FacetValues]) -> None:
+        car_id = str(car.id)
+        if car_id in facet_changes:
+            before_facets = facet_changes[car_id][0]
+        facet_changes[car_id] = (before_facets, car_facets(car))
+        written_keys[car_id] = car_keys(car)
+    
+    def claim_writes(car: Car, before: CarKeys) -> Tuple[List[str], List[str]]:
+        """Claims a car's write creates, and the claims it owns that the write deletes."""
+        car_id = str(car.id)
+        after = car_keys(car)
+        creates, deletes = [], []
+        for field in KEY_FIELDS:
+            old, new = before.get(field), after.get(field)
+            if old == new:
+                continue
+            if new and owner(field, new) != car_id:
+                creates.append(claim_document_id(field, new))
+                claims[creates[-1]] = _claim_document(db, field, new)
+            if old and owner(field, old) == car_id:
+                deletes.append(claim_document_id(field, old))
+                claims[deletes[-1]] = _claim_document(db, field, old)
+        return creates, deletes
+    
+    def commit_claimed(group: List[ClaimedWrite]) -> Optional[Exception]:
+        """Write cars with their claims in one batch, updating owners on success."""
+        if any(str(item[0].id) in submitted for item in group):
+            # An earlier BulkWriter write of the same car must land first
+            writer.flush()
+        batch = db.batch()
+        for car, _, creates, deletes in group:
+            car_id = str(car.id)
+            batch.set(collection.document(car_id), _document_data(car))
+            for claim_id in creates:
+                batch.create(claims[claim_id], {CLAIM_CAR_ID_FIELD: car_id})
+            for claim_id in deletes:
+                update_time = owners[claim_id][1]
+                option = db.write_option(last_update_time=update_time) if update_time else None
+                batch.delete(claims[claim_id], option=option)
+        try:
+            results = list(batch.commit() or [])
+        except Exception as e:
+            return e
+        # Write results follow the batch order: each car, its creates, its deletes
+        position = 0
+        for car, before_facets, creates, deletes in group:
+            car_id = str(car.id)
+            position += 1
+            for claim_id in creates:
+                update_time = results[position].update_time if position < len(results) else None
+                owners[claim_id] = (car_id, update_time)
+                position += 1
+            for claim_id in deletes:
+                owners[claim_id] = (None, None)
+                position += 1
+            record(car, before_facets)
+            with lock:
+                outcomes[car_id] = None
+        return None
+    
+    def write_claimed(group: List[ClaimedWrite]) -> None:
+        if not group:
+            return
+        error = commit_claimed(group)
+        if error is None:
+            return
+        if len(group) > 1:
+            logger.warning(f"Bulk upsert batch of {len(group)} cars failed, retrying one at a time: {error}")
+            for item in group:
+                write_claimed([item])
+            return
+        car, _, creates, deletes = group[0]
+        car_id = str(car.id)
+        logger.error(f"Bulk upsert could not write car {car_id}: {error}")
+        # The claims may have moved; read them again if they come up later
+        for claim_id in creates + deletes:
+            owners.pop(claim_id, None)
+        if isinstance(error, gcp_exceptions.AlreadyExists):
+            message = "volumeId or slug already used by another car"
+        elif isinstance(error, gcp_exceptions.FailedPrecondition):
+            message = "volumeId or slug changed concurrently; retry"
+        else:
+            message = f"Write failed: {error}"
+        with lock:
+            outcomes[car_id] = message
+    
+    def submit(chunk: List[Car]) -> None:
+        refs = {str(car.id): collection.document(str(car.id)) for car in chunk}
+        try:
+            docs = db.get_all(list(refs.values()), field_paths=STORED_FIELD_PATHS)
+            stored = {doc.id: doc.to_dict() or {} for doc in docs if doc.exists}
+            read_owners(chunk, stored)
+        except Exception as e:
+            logger.error(f"Bulk upsert could not read {len(chunk)} stored cars: {e}")
+            with lock:
+                for car_id in refs:
+                    outcomes[car_id] = f"Could not read the stored car: {e}"
+            return
+        
+        # Cars whose keys change, written with their claims. A car or claim
+        # comes up at most once per batch; a repeat starts the next one.
+        group: List[ClaimedWrite] = []
+        touched: set = set()
+        for car in chunk:
+            car_id = str(car.id)
+            before = written_keys[car_id] if car_id in written_keys else document_keys(stored.get(car_id))
+            before_facets = _facets_of(stored.get(car_id))
+            car = _with_slug(car, before, lambda slug: owner("slug", slug))
+            after = car_keys(car)
+            taken = [
+                (field, value) for field, value in after.items()
+                if before.get(field) != value and owner(field, value) not in (None, car_id)
+            ]
+            if taken:
+                field, value = taken[0]
+                with lock:
+                    outcomes[car_id] = f"{field} '{value}' is already used by car {owner(field, value)}"
+                continue
+            if after == before:
+                writer.set(refs[car_id], _document_data(car))
+                record(car, before_facets)
+                submitted.append(car_id)
+                continue
+            keys = {car_id} | {claim_document_id(*key) for key in list(before.items()) + list(after.items())}
+            if keys & touched:
+                write_claimed(group)
+                group, touched = [], set()
+            group.append((car, before_facets, *claim_writes(car, before)))
+            touched |= keys
+        write_claimed(group)
+    
+    try:
+        chunk: List[Car] = []
+        for car in cars:
+            chunk.append(car)
+            if len(chunk) >= BULK_FACET_READ_BATCH:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+    finally:
+        # Flush everything queued so far, even if the input stream failed
+        writer.close()
+    
+    for car_id in submitted:
+        outcomes.setdefault(car_id, "Write was not acknowledged")
+    
+    written = [car_id for car_id, error in outcomes.items() if error is None]
+    logger.info(f"Bulk upserted {len(written)}/{len(outcomes)} cars")
+    _apply_facet_changes(db, [facet_changes[car_id] for car_id in written])
+    invalidate_cars(written)
+    return outcomes
+
+
+def _apply_facet_changes(db, changes: List[Tuple[Optional[FacetValues], Optional[FacetValues]]]) -> None:
+    """Add the summed facet count changes of many car writes to the stats document."""
+    update = summed_increments(changes)
+    if not update:
+        return
+    try:
+        _facet_stats_document(db).set(update, merge=True)
+    except Exception as e:
+        logger.error(f"Error updating facet stats after bulk upsert (run backfill.py facets): {e}")
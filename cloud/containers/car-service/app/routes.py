@@ -1,35 +1,599 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Request
-from anyio import to_thread
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlencode
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query, Body, Header
+from fastapi.responses import StreamingResponse
+from anyio import to_thread, from_thread
 
-from app.schemas import Car
+from app.auth import require_car_writer
+from app.schemas import (
+    Car, CarComparison, CarFacets, CarSummary, CarView, Suggestion, UnitSystem, BatchGetRequest, BatchGetResponse, BulkUpsertResponse, PatchCarResponse, CarChangesResponse
+)
+from app.serialization import JSONBytesResponse, RenderedBody
+from app.binary_formats import CBOR_FORMAT, JSON_FORMAT, MEDIA_TYPES, MSGPACK_FORMAT, encode, negotiate_format
+from app.compression import compress_body
+from app.etags import matching_etag, with_content_encoding
 from app.services.get_cars import get_cars as get_cars_service
+from app.services.get_cars import get_cars_async as get_cars_async_service
+from app.services.stream_cars import NDJSON_MEDIA_TYPE
+from app.services.stream_cars import stream_cars as stream_cars_service
+from app.services.stream_cars import stream_cars_async as stream_cars_async_service
 from app.services.get_car import get_car as get_car_service
+from app.services.get_car import get_car_async as get_car_async_service
+from app.services.batch_get_cars import batch_get_cars as batch_get_cars_service
+from app.services.batch_get_cars import batch_get_cars_async as batch_get_cars_async_service
+from app.services.bulk_upsert_cars import bulk_upsert_cars as bulk_upsert_cars_service
+from app.services.compare_cars import compare_cars as compare_cars_service
+from app.services.compare_cars import compare_cars_async as compare_cars_async_service
+from app.services.patch_car import patch_car as patch_car_service
+from app.services.get_changes import get_changes as get_changes_service
+from app.services.get_similar_cars import get_similar_cars as get_similar_cars_service
+from app.services.get_similar_cars import get_similar_cars_async as get_similar_cars_async_service
+from app.services.search_cars import search_cars as search_cars_service
+from app.services.search_cars import search_cars_async as search_cars_async_service
+from app.services.suggest_cars import suggest_cars as suggest_cars_service
+from app.services.suggest_cars import suggest_cars_async as suggest_cars_async_service
+from app.services.get_facets import get_facets as get_facets_service
+from app.services.get_facets import get_facets_async as get_facets_async_service
+from app.services.get_car_by_key import get_car_by_key as get_car_by_key_service
+from app.services.get_car_by_key import get_car_by_key_async as get_car_by_key_async_service
+
+# "sync" runs the Firestore client in worker threads, "async" awaits the
+# Firestore AsyncClient directly on the event loop
+CAR_DATA_PATH = os.getenv("CAR_DATA_PATH", "sync").lower()
+
+# Cache-Control for car reads. With max-age 0 clients revalidate every time
+# and get a 304 if nothing changed; keep max-age + stale-while-revalidate
+# below MODEL_URL_CACHE_WINDOW_SECONDS so cached signed URLs stay valid.
+CAR_CACHE_MAX_AGE_SECONDS = int(os.getenv("CAR_CACHE_MAX_AGE_SECONDS", "0"))
+CAR_CACHE_STALE_WHILE_REVALIDATE_SECONDS = int(os.getenv("CAR_CACHE_STALE_WHILE_REVALIDATE_SECONDS", "0"))
 
 router = APIRouter(prefix="/v1/cars", tags=["Cars"])
 
+
+async def _call_service(sync_service, async_service, payload):
+    """Run a service on the configured data path."""
+    if CAR_DATA_PATH == "async":
+        return await async_service(payload)
+    return await to_thread.run_sync(sync_service, payload)
+
+
+# Binary alternatives to JSON, selected with the Accept header
+UNITS_DESCRIPTION = "metric or imperial converts every measurement; native returns them as stored"
+
+BINARY_RESPONSE_CONTENT = {
+    MEDIA_TYPES[MSGPACK_FORMAT]: {"schema": {"type": "string", "format": "binary"}},
+    MEDIA_TYPES[CBOR_FORMAT]: {"schema": {"type": "string", "format": "binary"}},
+}
+
+
+def _response_format(request: Request) -> str:
+    """Negotiate JSON, MessagePack or CBOR from the Accept header."""
+    return negotiate_format(request.headers.get("accept"))
+
+
+def _cache_control() -> str:
+    """Cache-Control value for car reads."""
+    if CAR_CACHE_MAX_AGE_SECONDS <= 0:
+        directives = ["no-cache"]
+    else:
+        directives = [f"max-age={CAR_CACHE_MAX_AGE_SECONDS}"]
+    if CAR_CACHE_STALE_WHILE_REVALIDATE_SECONDS > 0:
+        directives.append(f"stale-while-revalidate={CAR_CACHE_STALE_WHILE_REVALIDATE_SECONDS}")
+    return ", ".join(directives)
+
+
+def _resource_key(request: Request) -> str:
+    """Digest of the request path and query, parameters in name order (repeats keep theirs)."""
+    params = sorted(request.query_params.multi_items(), key=lambda item: item[0])
+    return hashlib.blake2b(f"{request.url.path}?{urlencode(params)}".encode(), digest_size=16).hexdigest()
+
+
+def _rendered_response(
+    request: Request,
+    result: RenderedBody,
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> Response:
+    """Turn a rendered body into a (possibly compressed) 200, or a bodyless 304."""
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if result.etag is not None:
+        headers["Cache-Control"] = _cache_control()
+    
+    if result.body is None:
+        # Echo the variant the client holds
+        headers["ETag"] = matching_etag(if_none_match, result.etag) or result.etag
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    body, encoding = compress_body(result.body, result.etag, accept_encoding, _resource_key(request))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if result.etag is not None:
+        headers["ETag"] = with_content_encoding(result.etag, encoding)
+    return JSONBytesResponse(body, headers=headers, media_type=result.media_type)
+
+
+def _iter_request_body(request: Request):
+    """Yield request body chunks inside a worker thread, pulling each from the event loop."""
+    stream = request.stream()
+    while True:
+        try:
+            yield from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+
+
 # ------------------------------------------------------------------
 # Get all cars
 # ------------------------------------------------------------------
-@router.get("", response_model=List[Car], status_code=status.HTTP_200_OK)
-async def get_cars(request: Request):  
+@router.get(
+    "",
+    response_model=Union[List[Car], List[CarSummary]],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}, **BINARY_RESPONSE_CONTENT}}},
+)
+async def get_cars(
+    request: Request,
+    view: CarView = Query(default=CarView.full, description="summary returns only the fields the catalog grid shows"),
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    min_specs: List[str] = Query(default=[], alias="min", description="spec:value lower bound in SI units, e.g. power_w:300000"),
+    max_specs: List[str] = Query(default=[], alias="max", description="spec:value upper bound in SI units, e.g. curb_weight_kg:1600"),
+    sort: Optional[str] = Query(default=None, description="spec to order by, prefixed with - for descending"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):  
     """
     Get list of all cars.
+    
+    Returns 304 Not Modified when If-None-Match matches the catalog ETag.
+    With Accept: application/x-ndjson the catalog is streamed one car per line;
+    application/msgpack and application/cbor return a compact binary array.
+    Null fields are omitted; view=summary returns CarSummary objects.
+    units=metric or units=imperial converts every measurement to that system.
+    min, max and sort filter and order by canonical SI specs (see app.specs);
+    cars missing a filtered or sorted spec are left out.
+    """
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        stream_payload = {"units": units, "min": min_specs, "max": max_specs, "sort": sort}
+        if CAR_DATA_PATH == "async":
+            chunks = stream_cars_async_service(stream_payload)
+        else:
+            # StreamingResponse pulls sync iterators from a worker thread
+            chunks = stream_cars_service(stream_payload)
+        return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+    
+    payload = {
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "view": view,
+        "units": units,
+        "min": min_specs,
+        "max": max_specs,
+        "sort": sort,
+    }
+    result = await _call_service(get_cars_service, get_cars_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Batch get cars by ID
+# ------------------------------------------------------------------
+@router.get(
+    ":batchGet",
+    response_model=BatchGetResponse,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def batch_get_cars(
+    request: Request,
+    ids: List[str] = Query(...),
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+):
+    """
+    Get several cars by ID in one request.
+
+    IDs may be repeated (`ids=a&ids=b`) or comma-separated (`ids=a,b`).
     """
-    payload = {}
-    result = await to_thread.run_sync(get_cars_service, payload)
+    fmt = _response_format(request)
+    payload = {
+        "ids": ids,
+        "format": fmt,
+        "units": units,
+    }
+    result = await _call_service(batch_get_cars_service, batch_get_cars_async_service, payload)
+    return JSONBytesResponse(result, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
+
+@router.post(
+    ":batchGet",
+    response_model=BatchGetResponse,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def batch_get_cars_post(
+    request: Request,
+    body: BatchGetRequest,
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+):
+    """
+    Get several cars by ID in one request (for lists too long for a query string).
+    """
+    fmt = _response_format(request)
+    payload = {
+        "ids": body.ids,
+        "format": fmt,
+        "units": units,
+    }
+    result = await _call_service(batch_get_cars_service, batch_get_cars_async_service, payload)
+    return JSONBytesResponse(result, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
+
+# ------------------------------------------------------------------
+# Compare cars side by side
+# ------------------------------------------------------------------
+@router.get(
+    ":compare",
+    response_model=CarComparison,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def compare_cars(
+    request: Request,
+    ids: List[str] = Query(...),
+    units: UnitSystem = Query(default=UnitSystem.metric, description="unit system every measurement row is quoted in; native uses the unit most of the cars use"),
+):
+    """
+    Compare two or more cars in one aligned table.
+
+    IDs may be repeated (`ids=a&ids=b`) or comma-separated (`ids=a,b`); columns
+    follow their order. Each row holds one spec for every car, in one unit,
+    with the best and worst columns flagged for specs that rank.
+    """
+    fmt = _response_format(request)
+    payload = {
+        "ids": ids,
+        "format": fmt,
+        "units": units,
+    }
+    result = await _call_service(compare_cars_service, compare_cars_async_service, payload)
+    return JSONBytesResponse(result, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
+
+# ------------------------------------------------------------------
+# Bulk upsert cars from NDJSON
+# ------------------------------------------------------------------
+@router.post(
+    ":bulkUpsert",
+    response_model=BulkUpsertResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_car_writer)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def bulk_upsert_cars(request: Request):
+    """
+    Create or overwrite cars from an NDJSON body (one car per line).
+
+    Each line is reported individually; invalid lines don't abort the upload.
+    Needs a Firebase ID token with the car writer claim (see app.auth).
+    """
+    payload = {
+        "chunks": _iter_request_body(request),
+    }
+    result = await to_thread.run_sync(bulk_upsert_cars_service, payload)
+    return result
+
+# ------------------------------------------------------------------
+# Change feed for delta sync
+# ------------------------------------------------------------------
+@router.get(
+    "/changes",
+    response_model=CarChangesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_changes(
+    request: Request,
+    since: Optional[str] = Query(default=None, description="nextToken from the previous sync"),
+    limit: Optional[int] = Query(default=None, ge=1),
+):
+    """
+    Get cars changed or deleted since a sync token.
+
+    Omit `since` for a full sync. Keep calling with `nextToken` while
+    `hasMore` is true, then store the last `nextToken` for the next launch.
+    """
+    payload = {
+        "since": since,
+        "limit": limit,
+    }
+    result = await to_thread.run_sync(get_changes_service, payload)
+    fmt = _response_format(request)
+    if fmt != JSON_FORMAT:
+        # Re-validate so measurements get their compact binary encoding
+        body = encode(CarChangesResponse.model_validate(result), fmt)
+        return Response(body, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
     return result
 
+# ------------------------------------------------------------------
+# Full-text search
+# ------------------------------------------------------------------
+@router.get(
+    "/search",
+    response_model=Union[List[Car], List[CarSummary]],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def search_cars(
+    request: Request,
+    q: str = Query(..., min_length=1, description="words to look for in make, model, blurb, engine code, differential and otherSpecs"),
+    limit: int = Query(default=20, ge=1, le=100, description="maximum number of cars to return"),
+    view: CarView = Query(default=CarView.full, description="summary returns only the fields the catalog grid shows"),
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Search cars by text, best match first.
+
+    Cars are ranked with BM25 (see app.search); cars matching none of the
+    words are left out. Returns 304 Not Modified when If-None-Match matches
+    the catalog ETag.
+    """
+    payload = {
+        "q": q,
+        "limit": limit,
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "view": view,
+        "units": units,
+    }
+    result = await _call_service(search_cars_service, search_cars_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Typeahead suggestions
+# ------------------------------------------------------------------
+@router.get(
+    "/suggest",
+    response_model=List[Suggestion],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def suggest_cars(
+    request: Request,
+    prefix: str = Query(..., min_length=1, description="what the user has typed so far"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get makes, models and engine codes starting with a prefix, most cars first.
+
+    The prefix may match any word ("m3" finds "BMW M3"), ignoring case and
+    accents. Returns 304 Not Modified when If-None-Match matches; the ETag
+    only changes when this prefix's suggestions do.
+    """
+    payload = {
+        "prefix": prefix,
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+    }
+    result = await _call_service(suggest_cars_service, suggest_cars_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Facet counts
+# ------------------------------------------------------------------
+FACET_DESCRIPTION = "values to keep, repeated or comma-separated"
+
+@router.get(
+    "/facets",
+    response_model=CarFacets,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_facets(
+    request: Request,
+    min_specs: List[str] = Query(default=[], alias="min", description="spec:value lower bound in SI units, e.g. power_w:300000"),
+    max_specs: List[str] = Query(default=[], alias="max", description="spec:value upper bound in SI units, e.g. curb_weight_kg:1600"),
+    make: List[str] = Query(default=[], description=FACET_DESCRIPTION),
+    body_style: List[str] = Query(default=[], alias="bodyStyle", description=FACET_DESCRIPTION),
+    fuel: List[str] = Query(default=[], description=FACET_DESCRIPTION),
+    transmission: List[str] = Query(default=[], description=FACET_DESCRIPTION),
+    layout: List[str] = Query(default=[], description=FACET_DESCRIPTION),
+    year: List[str] = Query(default=[], description=FACET_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get how many cars have each make, body style, fuel, transmission,
+    drivetrain layout and year, most cars first.
+
+    min and max filter by canonical SI specs like GET /v1/cars; the facet
+    parameters select values. Each facet is counted over the cars matching
+    every other selection, so selecting one make still counts the others.
+    Returns 304 Not Modified when If-None-Match matches.
+    """
+    payload = {
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "min": min_specs,
+        "max": max_specs,
+        "facets": {
+            "make": make,
+            "bodyStyle": body_style,
+            "fuel": fuel,
+            "transmission": transmission,
+            "layout": layout,
+            "year": year,
+        },
+    }
+    result = await _call_service(get_facets_service, get_facets_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Get single car by volumeId or slug
+# ------------------------------------------------------------------
+async def _get_car_by_key(request, field, value, units, if_none_match, accept_encoding):
+    payload = {
+        "field": field,
+        "value": value,
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "units": units,
+    }
+    result = await _call_service(get_car_by_key_service, get_car_by_key_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+
+@router.get(
+    "/by-volume/{volumeId}",
+    response_model=Car,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_car_by_volume(
+    request: Request,
+    volumeId: str,
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the car whose 3D model has this volumeId (e.g. BMW_M4_f82).
+    
+    Responds like GET /v1/cars/{carId}, including 304 Not Modified.
+    """
+    return await _get_car_by_key(request, "volumeId", volumeId, units, if_none_match, accept_encoding)
+
+
+@router.get(
+    "/by-slug/{slug}",
+    response_model=Car,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_car_by_slug(
+    request: Request,
+    slug: str,
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the car with this slug (e.g. bmw-m3-2020).
+    
+    Responds like GET /v1/cars/{carId}, including 304 Not Modified.
+    """
+    return await _get_car_by_key(request, "slug", slug, units, if_none_match, accept_encoding)
+
 # ------------------------------------------------------------------
 # Get single car by ID
 # ------------------------------------------------------------------
-@router.get("/{carId}", response_model=Car, status_code=status.HTTP_200_OK)
-async def get_car(request: Request, carId: str):
+@router.get(
+    "/{carId}",
+    response_model=Car,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_car(
+    request: Request,
+    carId: str,
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get car information by ID.
+    
+    Returns 304 Not Modified when If-None-Match matches the car's ETag.
+    units=metric or units=imperial converts every measurement to that system.
+    """
+    payload = {
+        "carId": carId,
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "units": units,
+    }
+    result = await _call_service(get_car_service, get_car_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Similar cars
+# ------------------------------------------------------------------
+@router.get(
+    "/{carId}/similar",
+    response_model=Union[List[Car], List[CarSummary]],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": BINARY_RESPONSE_CONTENT}},
+)
+async def get_similar_cars(
+    request: Request,
+    carId: str,
+    k: int = Query(default=10, ge=1, le=100, description="number of similar cars to return"),
+    view: CarView = Query(default=CarView.full, description="summary returns only the fields the catalog grid shows"),
+    units: UnitSystem = Query(default=UnitSystem.native, description=UNITS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the k cars most similar to a car, nearest first.
+
+    Similarity compares engine, performance, dimension and drivetrain specs
+    and body style (see app.similarity). The car itself is not included.
+    Returns 304 Not Modified when If-None-Match matches the catalog ETag.
+    """
+    payload = {
+        "carId": carId,
+        "k": k,
+        "ifNoneMatch": if_none_match,
+        "format": _response_format(request),
+        "view": view,
+        "units": units,
+    }
+    result = await _call_service(get_similar_cars_service, get_similar_cars_async_service, payload)
+    return _rendered_response(request, result, if_none_match, accept_encoding)
+
+# ------------------------------------------------------------------
+# Partially update a car (JSON merge patch)
+# ------------------------------------------------------------------
+@router.patch(
+    "/{carId}",
+    response_model=PatchCarResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_car_writer)],
+)
+async def patch_car(
+    request: Request,
+    response: Response,
+    carId: str,
+    patch: Dict[str, Any] = Body(..., media_type="application/merge-patch+json"),
+    if_match: Optional[str] = Header(default=None, alias="If-Match"),
+):
+    """
+    Update only the fields present in a JSON merge patch (RFC 7396).
+
+    Send `If-Match` with the car's ETag to reject the write if the car has
+    changed since it was read. Needs a Firebase ID token with the car writer
+    claim (see app.auth).
     """
     payload = {
         "carId": carId,
+        "patch": patch,
+        "ifMatch": if_match,
     }
-    result = await to_thread.run_sync(get_car_service, payload)
+    result = await to_thread.run_sync(patch_car_service, payload)
+    response.headers["ETag"] = result.pop("etag")
     return result
@@ -1,8 +1,9 @@
 # app.py
 from __future__ import annotations
 
+from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from uuid import UUID, uuid4
 
 from fastapi import FastAPI
@@ -187,6 +188,10 @@ class Drivetrain(BaseModel):
 # Car model
 # ---------------------------
 
+# Lower-case words joined by single hyphens
+SLUG_PATTERN = r"^[a-z0-9]+(?:-[a-z0-9]+)*$"
+
+
 class Car(BaseModel):
     # Required
     id: UUID = Field(default_factory=uuid4)
@@ -202,6 +207,7 @@ class Car(BaseModel):
     interiorColor: Optional[str] = None
     interiorPanoramaAssetName: Optional[str] = None
     volumeId: Optional[str] = None
+    slug: Optional[str] = Field(default=None, pattern=SLUG_PATTERN)  # e.g. "bmw-m3-2020"
     modelUrl: Optional[str] = None  # Signed GCS URL for 3D model (USDZ)
 
     # Typed substructures
@@ -213,6 +219,9 @@ class Car(BaseModel):
     # Escape hatch
     otherSpecs: Dict[str, str] = Field(default_factory=dict)
 
+    # Server timestamp of the last write (maintained by the repository)
+    updatedAt: Optional[datetime] = None
+
     class Config:
         # Keep the exact field names (camelCase) to match Swift Codable payloads
         populate_by_name = True
@@ -220,6 +229,141 @@ class Car(BaseModel):
             UUID: str
         }
 
+# ---------------------------
+# List views
+# ---------------------------
+
+class CarView(str, Enum):
+    summary = "summary"
+    full = "full"
+
+
+class UnitSystem(str, Enum):
+    native = "native"      # As stored
+    metric = "metric"
+    imperial = "imperial"
+
+
+class CarSummary(BaseModel):
+    """The fields the catalog grid shows (GET /v1/cars?view=summary)."""
+    id: UUID
+    make: str
+    model: str
+    year: Optional[int] = Field(default=None, ge=1886, le=3000)
+    bodyStyle: Optional[BodyStyle] = None
+    iconAssetName: Optional[str] = None
+
+    @classmethod
+    def from_car(cls, car: Car) -> "CarSummary":
+        """Project an already validated Car without validating again."""
+        return cls.model_construct(**{name: getattr(car, name) for name in cls.model_fields})
+
+# ---------------------------
+# Batch get
+# ---------------------------
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(min_length=1)
+
+
+class BatchGetResult(BaseModel):
+    id: str
+    found: bool
+    car: Optional[Car] = None
+
+
+class BatchGetResponse(BaseModel):
+    results: List[BatchGetResult]
+
+# ---------------------------
+# Compare
+# ---------------------------
+
+class ComparisonRow(BaseModel):
+    spec: str                     # Field path, e.g. "performance.horsepower" or "otherSpecs.seats"
+    unit: Optional[str] = None    # Unit of every value in the row, for measurements
+    values: List[Optional[Union[int, float, str]]]  # One per car, in column order
+    best: List[int] = Field(default_factory=list)   # Columns with the best value, if the row ranks
+    worst: List[int] = Field(default_factory=list)
+
+
+class CarComparison(BaseModel):
+    units: UnitSystem
+    cars: List[CarSummary]        # Columns, in request order
+    rows: List[ComparisonRow]
+
+# ---------------------------
+# Suggest
+# ---------------------------
+
+class SuggestionKind(str, Enum):
+    make = "make"
+    model = "model"               # Make and model, e.g. "BMW M3"
+    engineCode = "engineCode"
+
+
+class Suggestion(BaseModel):
+    text: str                     # As most cars spell it, e.g. "BMW M3"
+    kind: SuggestionKind
+    cars: int                     # Cars it matches; suggestions are ranked by it
+
+# ---------------------------
+# Facets
+# ---------------------------
+
+class FacetCount(BaseModel):
+    value: str                    # Enum value, make or year, e.g. "sedan" or "2020"
+    cars: int
+
+
+class CarFacets(BaseModel):
+    total: int                    # Cars matching every filter
+    facets: Dict[str, List[FacetCount]]  # Per facet, most cars first
+
+# ---------------------------
+# Bulk upsert
+# ---------------------------
+
+class BulkUpsertStatus(str, Enum):
+    ok = "ok"
+    error = "error"
+
+
+class BulkUpsertResult(BaseModel):
+    line: int
+    id: Optional[str] = None
+    status: BulkUpsertStatus
+    error: Optional[str] = None
+
+
+class BulkUpsertResponse(BaseModel):
+    written: int
+    failed: int
+    results: List[BulkUpsertResult]
+
+# ---------------------------
+# Partial update (PATCH)
+# ---------------------------
+
+class PatchCarResponse(BaseModel):
+    id: str
+    updatedFields: List[str]
+    updateTime: str
+
+# ---------------------------
+# Change feed
+# ---------------------------
+
+class DeletedCar(BaseModel):
+    id: str
+    deletedAt: datetime
+
+
+class CarChangesResponse(BaseModel):
+    changed: List[Car]
+    deleted: List[DeletedCar]
+    nextToken: str
+    hasMore: bool
 
 
 # ---------------------------
@@ -0,0 +1,271 @@
+"""Full-text search over the cached catalog.
+
+Each car is one document made of its make, model, blurb, engine code,
+differential and otherSpecs values. Text is case-folded, stripped of
+accents and split into words. The index keeps every car's term counts and
+an inverted index of term -> {car ID: count}, and ranks matches with BM25.
+
+The index follows catalog change events and re-tokenizes only the cars
+that changed. When SEARCH_INDEX_SNAPSHOT_PATH is set, every car's term
+counts and update_time are written there (gzipped JSON) after a full
+build, and at most every SEARCH_INDEX_SNAPSHOT_INTERVAL_SECONDS after
+changes, from a background thread. The first build of a new instance
+loads the snapshot and only tokenizes cars whose update_time differs
+from it.
+"""
+from __future__ import annotations
+
+import os
+import gzip
+import json
+import heapq
+import logging
+import math
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.catalog import Catalog, catalog_cache
+from app.compact import CompactCar, leaf_slot
+from app.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_SNAPSHOT_PATH = os.getenv("SEARCH_INDEX_SNAPSHOT_PATH", "")
+SEARCH_INDEX_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SEARCH_INDEX_SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+# String fields searched, besides every otherSpecs value
+SEARCH_FIELDS: Tuple[Tuple[str, ...], ...] = (
+    ("make",),
+    ("model",),
+    ("blurb",),
+    ("engine", "code"),
+    ("drivetrain", "differential"),
+)
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Bump when tokenization changes, so older snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+_STRING_INDEXES = [leaf_slot(path)[0] for path in SEARCH_FIELDS]
+
+
+def document_terms(record: CompactCar) -> Dict[str, int]:
+    """Term counts of a car's searchable text."""
+    texts = [record.strings[index] for index in _STRING_INDEXES]
+    texts.extend((record.otherSpecs or {}).values())
+    return dict(Counter(term for text in texts if text for term in tokenize(text)))
+
+
+class SearchHit(NamedTuple):
+    """One matching car."""
+    car_id: str
+    score: float
+
+
+class _Document(NamedTuple):
+    update_time: str  # isoformat, to match snapshots across instances
+    terms: Dict[str, int]
+    length: int
+
+
+def _document(record: CompactCar, update_time: str) -> _Document:
+    terms = document_terms(record)
+    return _Document(update_time, terms, sum(terms.values()))
+
+
+class SearchIndex:
+    """BM25 inverted index kept in step with the catalog cache."""
+
+    def __init__(
+        self,
+        snapshot_path: str = SEARCH_INDEX_SNAPSHOT_PATH,
+        snapshot_interval: float = SEARCH_INDEX_SNAPSHOT_INTERVAL_SECONDS,
+    ):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        # Catalog version the index reflects (None until built)
+        self._version: Optional[int] = None
+        self._documents: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._snapshot_loaded = False
+        self._saved_at: Optional[float] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._documents = {}
+            self._postings = {}
+            self._total_length = 0
+
+    def search(self, catalog: Catalog, text: str, limit: int) -> List[SearchHit]:
+        """The best matches for a query, highest score first.
+
+        Args:
+            catalog: Catalog snapshot to search
+            text: Free-text query; every word is a BM25 term
+            limit: Maximum number of hits
+
+        Returns:
+            Hits ordered by score and then by ID (empty if no word matches)
+        """
+        terms = set(tokenize(text))
+        with self._lock:
+            self._sync(catalog)
+            scores = self._scores(terms)
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [SearchHit(car_id, score) for car_id, score in best]
+
+    def on_catalog_change(self, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        """Catalog change listener: re-tokenize only the cars that changed."""
+        with self._lock:
+            if self._version is None or self._version >= catalog.version:
+                # Not built yet (build on first search), or already current
+                return
+            if self._version + 1 != catalog.version:
+                # Missed a change; the next search re-syncs, reusing
+                # every document whose update_time still matches
+                self._version = -1
+                return
+            for car_id in removed | changed:
+                self._remove(car_id)
+            for car_id in changed:
+                entry = catalog.entries.get(car_id)
+                if entry is not None:
+                    self._add(car_id, _document(entry.record, entry.update_time.isoformat()))
+            self._version = catalog.version
+            self._snapshot()
+
+    def flush(self) -> None:
+        """Wait for a snapshot write in progress."""
+        writer = self._writer
+        if writer is not None:
+            writer.join()
+
+    def _scores(self, terms: Iterable[str]) -> Dict[str, float]:
+        count = len(self._documents)
+        scores: Dict[str, float] = defaultdict(float)
+        if not count:
+            return scores
+        average_length = self._total_length / count or 1.0
+        # Length normalization k1 * (1 - b + b * length / average), as base + slope * length
+        base = BM25_K1 * (1 - BM25_B)
+        slope = BM25_K1 * BM25_B / average_length
+        documents = self._documents
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            weight = idf * (BM25_K1 + 1)
+            for car_id, frequency in postings.items():
+                scores[car_id] += weight * frequency / (frequency + base + slope * documents[car_id].length)
+        return scores
+
+    def _sync(self, catalog: Catalog) -> None:
+        """Rebuild for a catalog version the index hasn't followed, snapshotting any change."""
+        if self._version == catalog.version:
+            return
+        known = dict(self._documents)
+        if not self._snapshot_loaded:
+            self._snapshot_loaded = True
+            for car_id, document in self._load_snapshot().items():
+                known.setdefault(car_id, document)
+
+        self._documents = {}
+        self._postings = {}
+        self._total_length = 0
+        tokenized = 0
+        for car_id, entry in catalog.entries.items():
+            update_time = entry.update_time.isoformat()
+            document = known.get(car_id)
+            if document is None or document.update_time != update_time:
+                document = _document(entry.record, update_time)
+                tokenized += 1
+            self._add(car_id, document)
+        self._version = catalog.version
+        logger.info(f"Search index built for {len(self._documents)} cars ({tokenized} tokenized)")
+
+        if not tokenized and len(known) == len(self._documents):
+            # Whatever is on disk already matches
+            self._saved_at = time.monotonic()
+            return
+        self._snapshot(force=True)
+
+    def _add(self, car_id: str, document: _Document) -> None:
+        self._documents[car_id] = document
+        self._total_length += document.length
+        for term, frequency in document.terms.items():
+            self._postings.setdefault(term, {})[car_id] = frequency
+
+    def _remove(self, car_id: str) -> None:
+        document = self._documents.pop(car_id, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[car_id]
+            if not postings:
+                del self._postings[term]
+
+    def _snapshot(self, force: bool = False) -> None:
+        """Start writing a snapshot if one is configured and due (with the lock held)."""
+        if not self.snapshot_path:
+            return
+        if not force and self._saved_at is not None and time.monotonic() - self._saved_at < self.snapshot_interval:
+            return
+        if self._writer is not None and self._writer.is_alive():
+            # One write at a time; a snapshot skipped here is taken at the next change
+            self._saved_at = None
+            return
+        self._saved_at = time.monotonic()
+        # Documents are never mutated, so a shallow copy is a consistent view
+        documents = dict(self._documents)
+        self._writer = threading.Thread(target=self._save_snapshot, args=(documents,), name="search-snapshot", daemon=True)
+        self._writer.start()
+
+    def _save_snapshot(self, documents: Dict[str, _Document]) -> None:
+        body = {
+            "format": SNAPSHOT_FORMAT,
+            "documents": {car_id: [document.update_time, document.terms] for car_id, document in documents.items()},
+        }
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        try:
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as file:
+                with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=1) as compressed:
+                    compressed.write(json.dumps(body, separators=(",", ":")).encode())
+            os.replace(file.name, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write search index snapshot to {self.snapshot_path}: {e}")
+            return
+        logger.info(f"Search index snapshot written for {len(documents)} cars")
+
+    def _load_snapshot(self) -> Dict[str, _Document]:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return {}
+        try:
+            with gzip.open(self.snapshot_path, "rb") as file:
+                body = json.loads(file.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable search index snapshot {self.snapshot_path}: {e}")
+            return {}
+        if body.get("format") != SNAPSHOT_FORMAT:
+            logger.info(f"Ignoring search index snapshot in format {body.get('format')}")
+            return {}
+        return {
+            car_id: _Document(update_time, terms, sum(terms.values()))
+            for car_id, (update_time, terms) in body["documents"].items()
+        }
+
+
+search_index = SearchIndex()
+catalog_cache.add_change_listener(search_index.on_catalog_change)
@@ -0,0 +1,105 @@
+"""Single-pass JSON serialization for car responses.
+
+Repository output is already validated Car objects, so routes return the
+bytes produced here directly instead of dumping to dicts and letting
+FastAPI validate them against response_model a second time.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, NamedTuple, Optional
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES, encode, encode_array
+from app.schemas import Car, CarComparison, CarFacets, CarSummary, BatchGetResponse, Suggestion
+
+CAR_ADAPTER = TypeAdapter(Car)
+CAR_LIST_ADAPTER = TypeAdapter(List[Car])
+CAR_SUMMARY_ADAPTER = TypeAdapter(CarSummary)
+CAR_SUMMARY_LIST_ADAPTER = TypeAdapter(List[CarSummary])
+BATCH_GET_ADAPTER = TypeAdapter(BatchGetResponse)
+COMPARISON_ADAPTER = TypeAdapter(CarComparison)
+SUGGESTION_LIST_ADAPTER = TypeAdapter(List[Suggestion])
+FACETS_ADAPTER = TypeAdapter(CarFacets)
+
+
+def dump_car_json(car: Car, exclude_none: bool = False) -> bytes:
+    """Serialize one car to JSON bytes."""
+    return CAR_ADAPTER.dump_json(car, exclude_none=exclude_none)
+
+
+def dump_cars_json(cars: Iterable[Car], exclude_none: bool = False) -> bytes:
+    """Serialize a list of cars to a JSON array in one pydantic-core call."""
+    return CAR_LIST_ADAPTER.dump_json(list(cars), exclude_none=exclude_none)
+
+
+def dump_summary_json(summary: CarSummary) -> bytes:
+    """Serialize one car summary to JSON bytes, without null fields."""
+    return CAR_SUMMARY_ADAPTER.dump_json(summary, exclude_none=True)
+
+
+def dump_batch_get_json(response: BatchGetResponse) -> bytes:
+    """Serialize a batch get response to JSON bytes."""
+    return BATCH_GET_ADAPTER.dump_json(response)
+
+
+def dump_car(car: Car, fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize one car in the negotiated format."""
+    return dump_car_json(car) if fmt == JSON_FORMAT else encode(car, fmt)
+
+
+def dump_cars(cars: Iterable[Car], fmt: str = JSON_FORMAT, exclude_none: bool = False) -> bytes:
+    """Serialize a list of cars in the negotiated format.
+    
+    Binary formats always omit null fields.
+    """
+    if fmt == JSON_FORMAT:
+        return dump_cars_json(cars, exclude_none)
+    return encode_array([encode(car, fmt) for car in cars], fmt)
+
+
+def dump_summaries(summaries: Iterable[CarSummary], fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize a list of car summaries in the negotiated format, without null fields."""
+    if fmt == JSON_FORMAT:
+        return CAR_SUMMARY_LIST_ADAPTER.dump_json(list(summaries), exclude_none=True)
+    return encode_array([encode(summary, fmt) for summary in summaries], fmt)
+
+
+def dump_batch_get(response: BatchGetResponse, fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize a batch get response in the negotiated format."""
+    return dump_batch_get_json(response) if fmt == JSON_FORMAT else encode(response, fmt)
+
+
+def dump_comparison(comparison: CarComparison, fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize a comparison table in the negotiated format."""
+    return COMPARISON_ADAPTER.dump_json(comparison) if fmt == JSON_FORMAT else encode(comparison, fmt)
+
+
+def dump_suggestions(suggestions: Iterable[Suggestion], fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize a list of suggestions in the negotiated format."""
+    if fmt == JSON_FORMAT:
+        return SUGGESTION_LIST_ADAPTER.dump_json(list(suggestions))
+    return encode_array([encode(suggestion, fmt) for suggestion in suggestions], fmt)
+
+
+def dump_facets(facets: CarFacets, fmt: str = JSON_FORMAT) -> bytes:
+    """Serialize facet counts in the negotiated format."""
+    return FACETS_ADAPTER.dump_json(facets) if fmt == JSON_FORMAT else encode(facets, fmt)
+
+
+class RenderedBody(NamedTuple):
+    """Serialized body with its ETag.
+    
+    body is None when the request's If-None-Match already matched etag, so
+    nothing was rendered. etag is None when the data path doesn't know
+    document versions.
+    """
+    body: Optional[bytes]
+    etag: Optional[str] = None
+    media_type: str = MEDIA_TYPES[JSON_FORMAT]
+
+
+class JSONBytesResponse(Response):
+    """Response for bodies that are already serialized JSON bytes."""
+    media_type = "application/json"
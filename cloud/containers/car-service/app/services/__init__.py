@@ -1,2 +1,13 @@
-from .get_car import get_car
-from .get_cars import get_cars
\ No newline at end of file
+from .get_car import get_car, get_car_async
+from .get_cars import get_cars, get_cars_async
+from .stream_cars import stream_cars, stream_cars_async
+from .batch_get_cars import batch_get_cars, batch_get_cars_async
+from .bulk_upsert_cars import bulk_upsert_cars
+from .patch_car import patch_car
+from .get_changes import get_changes
+from .get_similar_cars import get_similar_cars, get_similar_cars_async
+from .compare_cars import compare_cars, compare_cars_async
+from .search_cars import search_cars, search_cars_async
+from .suggest_cars import suggest_cars, suggest_cars_async
+from .get_facets import get_facets, get_facets_async
+from .get_car_by_key import get_car_by_key, get_car_by_key_async
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+from google.api_core import exceptions as gcp_exceptions
+import app.repositories as repo
+import app.async_repositories as async_repo
+from app.schemas import BatchGetResponse, BatchGetResult, UnitSystem
+from app.binary_formats import JSON_FORMAT
+from app.serialization import dump_batch_get
+from app.units import convert_car
+from common.errors import BadRequestError, ServiceUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on distinct IDs per batch (GET and POST forms)
+MAX_BATCH_GET_IDS = int(os.getenv("MAX_BATCH_GET_IDS", "500"))
+
+
+def parse_car_ids(raw_ids: List[str], limit: Optional[int] = None) -> List[str]:
+    """Split, validate and deduplicate requested car IDs, preserving order.
+    
+    Raises:
+        BadRequestError: If any ID is invalid, none are given or more than
+            limit (defaults to MAX_BATCH_GET_IDS)
+    """
+    limit = MAX_BATCH_GET_IDS if limit is None else limit
+    ids: List[str] = []
+    invalid: List[str] = []
+    
+    for raw in raw_ids:
+        for part in raw.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                ids.append(str(UUID(part)))
+            except ValueError:
+                invalid.append(part)
+    
+    if invalid:
+        raise BadRequestError(f"Invalid car IDs: {', '.join(invalid)}")
+    
+    # dict preserves insertion order, so first occurrence wins
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise BadRequestError("At least one car ID is required")
+    if len(ids) > limit:
+        raise BadRequestError(f"At most {limit} car IDs can be requested at once")
+    return ids
+
+
+def batch_get_cars(data: Dict[str, Any]) -> bytes:
+    """Get several cars by ID in a single Firestore round trip.
+    
+    Args:
+        data: Dictionary containing ids (list of UUID strings, comma-separated
+              values are accepted), optional format (json, msgpack or cbor)
+              and optional units (native, metric or imperial)
+        
+    Returns:
+        Serialized object with one result per distinct ID, in request order. Each
+        result carries a found flag and, when found, the car data.
+        
+    Raises:
+        BadRequestError: If any ID is not a valid UUID or too many are requested
+        ServiceUnavailableError: If Firestore can't be read
+    """
+    ids = parse_car_ids(data.get("ids") or [])
+    try:
+        cars = repo.get_cars_by_ids(ids)
+    except gcp_exceptions.GoogleAPICallError as e:
+        raise _read_failed(e)
+    units = UnitSystem(data.get("units", UnitSystem.native))
+    return _build_results(ids, cars, data.get("format", JSON_FORMAT), units)
+
+
+async def batch_get_cars_async(data: Dict[str, Any]) -> bytes:
+    """Get several cars by ID using the asyncio data path.
+    
+    See batch_get_cars for the request and response shape.
+    """
+    ids = parse_car_ids(data.get("ids") or [])
+    try:
+        cars = await async_repo.get_cars_by_ids(ids)
+    except gcp_exceptions.GoogleAPICallError as e:
+        raise _read_failed(e)
+    units = UnitSystem(data.get("units", UnitSystem.native))
+    return _build_results(ids, cars, data.get("format", JSON_FORMAT), units)
+
+
+def _read_failed(error: gcp_exceptions.GoogleAPICallError) -> ServiceUnavailableError:
+    # Answering found:false for every car would tell clients they were deleted
+    logger.error(f"Error batch retrieving cars from Firestore: {error}")
+    return ServiceUnavailableError("Could not read the cars; try again")
+
+
+def _build_results(ids: List[str], cars: Dict[str, Any], fmt: str, units: UnitSystem = UnitSystem.native) -> bytes:
+    """Lay out batch results in request order with not-found markers."""
+    cars = {car_id: convert_car(car, units) for car_id, car in cars.items()}
+    # The cars are validated repository output, so assemble without re-validating
+    results = [
+        BatchGetResult.model_construct(id=car_id, found=car_id in cars, car=cars.get(car_id))
+        for car_id in ids
+    ]
+    return dump_batch_get(BatchGetResponse.model_construct(results=results), fmt)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from pydantic import ValidationError
+import app.repositories as repo
+from app.schemas import Car
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on records accepted in a single NDJSON upload
+BULK_UPSERT_MAX_RECORDS = int(os.getenv("BULK_UPSERT_MAX_RECORDS", "10000"))
+
+# Upper bound on one record's line; Firestore documents are at most 1 MiB
+BULK_UPSERT_MAX_LINE_BYTES = int(os.getenv("BULK_UPSERT_MAX_LINE_BYTES", str(1024 * 1024)))
+
+
+def iter_ndjson_lines(chunks: Iterable[bytes], max_line_bytes: Optional[int] = None) -> Iterator[Optional[bytes]]:
+    """Split a stream of body chunks into NDJSON lines without buffering the whole body.
+    
+    Lines longer than max_line_bytes (default BULK_UPSERT_MAX_LINE_BYTES)
+    are dropped as they stream in and yielded as None.
+    """
+    limit = BULK_UPSERT_MAX_LINE_BYTES if max_line_bytes is None else max_line_bytes
+    buffer = b""
+    # Inside an oversized line, discarding bytes up to its newline
+    skipping = False
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+                yield None
+            else:
+                yield line if len(line) <= limit else None
+        if len(buffer) > limit:
+            skipping = True
+            buffer = b""
+    if skipping:
+        yield None
+    elif buffer:
+        yield buffer if len(buffer) <= limit else None
+
+
+def _describe(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def bulk_upsert_cars(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create or overwrite cars from an NDJSON upload.
+    
+    Records are validated one line at a time as the body streams in, and
+    valid ones are handed straight to the repository's BulkWriter. Invalid
+    records are reported without aborting the rest of the upload.
+    
+    Args:
+        data: Dictionary containing chunks (iterable of raw NDJSON body bytes)
+        
+    Returns:
+        Dictionary with written/failed counts and one result per record line
+    """
+    results: List[Dict[str, Any]] = []
+    
+    def valid_cars() -> Iterator[Car]:
+        records = 0
+        for line_no, line in enumerate(iter_ndjson_lines(data.get("chunks") or []), start=1):
+            if line is not None and not line.strip():
+                continue
+            records += 1
+            if records > BULK_UPSERT_MAX_RECORDS:
+                results.append({
+                    "line": line_no, "id": None, "status": "error",
+                    "error": f"Upload exceeds {BULK_UPSERT_MAX_RECORDS} records; remaining lines ignored",
+                })
+                return
+            if line is None:
+                results.append({
+                    "line": line_no, "id": None, "status": "error",
+                    "error": f"Record exceeds {BULK_UPSERT_MAX_LINE_BYTES} bytes",
+                })
+                continue
+            try:
+                car = Car.model_validate_json(line)
+            except ValidationError as e:
+                results.append({"line": line_no, "id": None, "status": "error", "error": _describe(e)})
+                continue
+            results.append({"line": line_no, "id": str(car.id), "status": None, "error": None})
+            yield car
+    
+    outcomes = repo.bulk_upsert_cars(valid_cars())
+    
+    for result in results:
+        if result["status"] is None:
+            error = outcomes.get(result["id"])
+            result["status"] = "ok" if error is None else "error"
+            result["error"] = error
+    
+    written = sum(1 for r in results if r["status"] == "ok")
+    logger.info(f"Bulk upsert: {written} written, {len(results) - written} failed")
+    return {"written": written, "failed": len(results) - written, "results": results}
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List
+
+import app.repositories as repo
+import app.async_repositories as async_repo
+from anyio import to_thread
+from app.binary_formats import JSON_FORMAT
+from app.catalog import catalog_cache
+from app.compact import CompactCar
+from app.comparison import comparison_cache
+from app.schemas import UnitSystem
+from app.serialization import dump_comparison
+from app.services.batch_get_cars import parse_car_ids
+from common.errors import BadRequestError, NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cars in one comparison
+MAX_COMPARE_IDS = int(os.getenv("MAX_COMPARE_IDS", "20"))
+
+
+def _parse(data: Dict[str, Any]) -> List[str]:
+    ids = parse_car_ids(data.get("ids") or [], MAX_COMPARE_IDS)
+    if len(ids) < 2:
+        raise BadRequestError("At least two car IDs are required to compare")
+    return ids
+
+
+def _compare(ids: List[str], versions: Dict[str, Any], data: Dict[str, Any]) -> bytes:
+    missing = [car_id for car_id in ids if car_id not in versions]
+    if missing:
+        raise NotFoundError(f"Cars not found: {', '.join(missing)}")
+    units = UnitSystem(data.get("units", UnitSystem.metric))
+    comparison = comparison_cache.compare(ids, versions, units)
+    return dump_comparison(comparison, data.get("format", JSON_FORMAT))
+
+
+def _records(versions: Dict[str, Any]) -> Dict[str, Any]:
+    return {car_id: (CompactCar.from_car(car), update_time) for car_id, (car, update_time) in versions.items()}
+
+
+def compare_cars(data: Dict[str, Any]) -> bytes:
+    """Compare several cars side by side.
+    
+    Args:
+        data: Dictionary containing ids (list of UUID strings, comma-separated
+              values are accepted), optional format (json, msgpack or cbor)
+              and optional units (metric, imperial or native; defaults to metric)
+        
+    Returns:
+        Serialized CarComparison with one column per distinct ID, in request
+        order. Cars come from the catalog cache when it is on, otherwise from
+        one batched Firestore read.
+        
+    Raises:
+        BadRequestError: If an ID is invalid, or fewer than two or too many are given
+        NotFoundError: If any car doesn't exist
+    """
+    ids = _parse(data)
+    if catalog_cache.enabled:
+        entries = catalog_cache.get().entries
+        versions = {
+            car_id: (entries[car_id].record, entries[car_id].update_time)
+            for car_id in ids if car_id in entries
+        }
+    else:
+        versions = _records(repo.get_car_versions(ids))
+    return _compare(ids, versions, data)
+
+
+async def compare_cars_async(data: Dict[str, Any]) -> bytes:
+    """Compare several cars using the asyncio data path.
+    
+    See compare_cars for the request and response shape.
+    """
+    if catalog_cache.enabled:
+        return await to_thread.run_sync(compare_cars, data)
+    ids = _parse(data)
+    versions = _records(await async_repo.get_car_versions(ids))
+    return _compare(ids, versions, data)
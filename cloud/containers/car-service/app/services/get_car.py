@@ -2,31 +2,87 @@ from __future__ import annotations
 
 from typing import Dict, Any
 import app.repositories as repo
+import app.async_repositories as async_repo
+from anyio import to_thread
+from app.catalog import catalog_cache
+from app.render_cache import render_cache
+from app.etags import etag_matches, format_update_time_etag, representation_variant
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.serialization import RenderedBody, dump_car
+from app.schemas import UnitSystem
+from app.storage import current_url_window
+from app.units import convert_car
+from common.errors import NotFoundError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_car(data: Dict[str, Any]) -> Dict[str, Any]:
+def get_car(data: Dict[str, Any]) -> RenderedBody:
     """Get a car by ID.
     
     Args:
-        data: Dictionary containing carId
+        data: Dictionary containing carId and optional ifNoneMatch,
+              format (json, msgpack or cbor; defaults to json) and
+              units (native, metric or imperial; defaults to native)
         
     Returns:
-        Dictionary with car data
+        Serialized car. Cars served from the catalog cache
+        carry an ETag, and the body is None when ifNoneMatch matches it.
         
     Raises:
         ValueError: If carId is missing or invalid
-        LookupError: If car not found
+        NotFoundError: If car not found
     """
     
     car_id = data.get("carId")
     if not car_id:
         raise ValueError("carId is required")
     
+    fmt = data.get("format", JSON_FORMAT)
+    units = UnitSystem(data.get("units", UnitSystem.native))
+    media_type = MEDIA_TYPES[fmt]
+    
+    if catalog_cache.enabled:
+        entry = catalog_cache.get().entries.get(car_id)
+        if entry is not None:
+            window = current_url_window()
+            etag = format_update_time_etag(entry.update_time, window, representation_variant(fmt, units=units))
+            if etag_matches(data.get("ifNoneMatch"), etag):
+                return RenderedBody(None, etag, media_type)
+            return RenderedBody(render_cache.render([entry], window, fmt, units=units)[0], etag, media_type)
+    
     car = repo.get_car(car_id)
     if not car:
-        raise LookupError(f"Car with ID {car_id} not found")
+        raise NotFoundError(f"Car with ID {car_id} not found")
+    
+    return RenderedBody(dump_car(convert_car(car, units), fmt), None, media_type)
+
+
+async def get_car_async(data: Dict[str, Any]) -> RenderedBody:
+    """Get a car by ID using the asyncio data path.
+    
+    Args:
+        data: Dictionary containing carId and optional ifNoneMatch, format and units
+        
+    Returns:
+        Serialized car
+        
+    Raises:
+        ValueError: If carId is missing or invalid
+        NotFoundError: If car not found
+    """
+    car_id = data.get("carId")
+    if not car_id:
+        raise ValueError("carId is required")
+    
+    if catalog_cache.enabled:
+        return await to_thread.run_sync(get_car, data)
+    
+    car = await async_repo.get_car(car_id)
+    if not car:
+        raise NotFoundError(f"Car with ID {car_id} not found")
     
-    return car.model_dump(mode='json')
+    fmt = data.get("format", JSON_FORMAT)
+    units = UnitSystem(data.get("units", UnitSystem.native))
+    return RenderedBody(dump_car(convert_car(car, units), fmt), None, MEDIA_TYPES[fmt])
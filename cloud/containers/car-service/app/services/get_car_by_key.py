@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Dict, Any
+import app.repositories as repo
+import app.async_repositories as async_repo
+from anyio import to_thread
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.car_keys import KEY_FIELDS
+from app.catalog import catalog_cache
+from app.key_index import key_index
+from app.schemas import UnitSystem
+from app.serialization import RenderedBody, dump_car
+from app.services.get_car import get_car
+from app.units import convert_car
+from common.errors import BadRequestError, NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _key(data: Dict[str, Any]):
+    field, value = data.get("field"), data.get("value")
+    if field not in KEY_FIELDS or not value:
+        raise BadRequestError(f"Lookup needs one of {', '.join(KEY_FIELDS)} and a value")
+    return field, value
+
+
+def _render(car, data: Dict[str, Any]) -> RenderedBody:
+    fmt = data.get("format", JSON_FORMAT)
+    units = UnitSystem(data.get("units", UnitSystem.native))
+    return RenderedBody(dump_car(convert_car(car, units), fmt), None, MEDIA_TYPES[fmt])
+
+
+def get_car_by_key(data: Dict[str, Any]) -> RenderedBody:
+    """Get a car by volumeId or slug.
+    
+    With the catalog cache the key is resolved in memory (see
+    app.key_index) and the car rendered like GET /v1/cars/{carId}, ETag
+    included. Keys the index doesn't know, and every lookup without the
+    cache, go to a Firestore equality query.
+    
+    Args:
+        data: Dictionary containing field (volumeId or slug), value and
+              optional ifNoneMatch, format and units
+        
+    Returns:
+        Serialized car
+        
+    Raises:
+        BadRequestError: If field or value is missing or invalid
+        NotFoundError: If no car has the key
+    """
+    field, value = _key(data)
+    
+    if catalog_cache.enabled:
+        car_id = key_index.lookup(catalog_cache.get(), field, value)
+        if car_id is not None:
+            return get_car({**data, "carId": car_id})
+    
+    car = repo.get_car_by_key(field, value)
+    if car is None:
+        raise NotFoundError(f"Car with {field} {value} not found")
+    return _render(car, data)
+
+
+async def get_car_by_key_async(data: Dict[str, Any]) -> RenderedBody:
+    """Get a car by volumeId or slug using the asyncio data path.
+    
+    Args:
+        data: Dictionary containing field, value and optional ifNoneMatch, format and units
+        
+    Returns:
+        Serialized car
+        
+    Raises:
+        BadRequestError: If field or value is missing or invalid
+        NotFoundError: If no car has the key
+    """
+    field, value = _key(data)
+    
+    if catalog_cache.enabled:
+        return await to_thread.run_sync(get_car_by_key, data)
+    
+    car = await async_repo.get_car_by_key(field, value)
+    if car is None:
+        raise NotFoundError(f"Car with {field} {value} not found")
+    return _render(car, data)
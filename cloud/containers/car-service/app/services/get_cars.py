@@ -1,25 +1,140 @@
+from anyio import to_thread
+from google.api_core import exceptions as gcp_exceptions
+
 import app.repositories as repo
-from typing import Dict, Any, List
+import app.async_repositories as async_repo
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.catalog import catalog_cache
+from app.etags import etag_matches, format_catalog_etag, representation_variant
+from app.render_cache import render_cache
+from app.schemas import CarSummary, CarView, UnitSystem
+from app.serialization import RenderedBody, dump_cars, dump_summaries
+from app.spec_index import spec_index
+from app.specs import SpecQuery, parse_spec_query
+from app.storage import current_url_window
+from app.units import convert_car
+from common.errors import BadRequestError, ServiceUnavailableError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_cars(payload: dict) -> List[Dict[str, Any]]:
+def _spec_query(payload: dict) -> SpecQuery:
+    """Parse the min/max/sort spec filters of a list request."""
+    try:
+        return parse_spec_query(payload.get("min") or [], payload.get("max") or [], payload.get("sort"))
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+
+def _index_missing(error: gcp_exceptions.FailedPrecondition) -> ServiceUnavailableError:
+    # Firestore's message names the missing composite index and links to it
+    logger.error(f"Spec query needs an index: {error.message}")
+    return ServiceUnavailableError("These spec filters need a Firestore index that hasn't been created")
+
+
+def query_cars(query: SpecQuery):
+    """Run a spec query on Firestore, mapping a missing index to a 503."""
+    try:
+        return repo.query_cars(query)
+    except gcp_exceptions.FailedPrecondition as e:
+        raise _index_missing(e)
+
+
+async def query_cars_async(query: SpecQuery):
+    """Run a spec query on the Firestore AsyncClient, mapping a missing index to a 503."""
+    try:
+        return await async_repo.query_cars(query)
+    except gcp_exceptions.FailedPrecondition as e:
+        raise _index_missing(e)
+
+
+def _dump_queried(cars, view: CarView, fmt: str) -> bytes:
+    if view == CarView.summary:
+        return dump_summaries([CarSummary.from_car(car) for car in cars], fmt)
+    return dump_cars(cars, fmt, exclude_none=True)
+
+
+def get_cars(payload: dict) -> RenderedBody:
     """
     Get list of all cars.
     
     Args:
-        payload: Dictionary (currently unused, for future filters)
+        payload: Dictionary with optional ifNoneMatch header value,
+                 format (json, msgpack or cbor; defaults to json),
+                 view (summary or full; defaults to full),
+                 units (native, metric or imperial; defaults to native),
+                 and min/max ("spec:value" lists) and sort ("spec" or
+                 "-spec") over canonical SI specs (see app.specs)
     
     Returns:
-        List of car dictionaries
+        Array of cars without null fields, serialized once straight from
+        the models or joined from cached per-car fragments when the catalog
+        cache is on. With the catalog cache the body carries an ETag, and is
+        None when ifNoneMatch already matches it.
+        
+    Raises:
+        BadRequestError: If a spec filter or sort is invalid
+        ServiceUnavailableError: If the spec filters need a Firestore
+            composite index that doesn't exist
     """
+    fmt = payload.get("format", JSON_FORMAT)
+    view = CarView(payload.get("view", CarView.full))
+    units = UnitSystem(payload.get("units", UnitSystem.native))
+    query = _spec_query(payload)
+    media_type = MEDIA_TYPES[fmt]
+
+    if catalog_cache.enabled:
+        catalog = catalog_cache.get()
+        window = current_url_window()
+        etag = format_catalog_etag(
+            catalog.fingerprint, window, representation_variant(fmt, view, units), query.canonical,
+        )
+        if etag_matches(payload.get("ifNoneMatch"), etag):
+            return RenderedBody(None, etag, media_type)
+        entries = list(catalog.entries.values())
+        if query.active:
+            entries = [entries[i] for i in spec_index.query(catalog, query)]
+        body = render_cache.render_list(entries, window, fmt, view, exclude_none=True, units=units)
+        return RenderedBody(body, etag, media_type)
+
+    if query.active:
+        cars = [convert_car(car, units) for car in query_cars(query)]
+        return RenderedBody(_dump_queried(cars, view, fmt), None, media_type)
+
+    if view == CarView.summary:
+        return RenderedBody(dump_summaries(repo.get_car_summaries(), fmt), None, media_type)
 
     # Get all cars from repository
-    cars = repo.get_cars()
+    cars = [convert_car(car, units) for car in repo.get_cars()]
+    
+    return RenderedBody(dump_cars(cars, fmt, exclude_none=True), None, media_type)
+
+
+async def get_cars_async(payload: dict) -> RenderedBody:
+    """
+    Get list of all cars using the asyncio data path.
     
-    # Convert Pydantic models to dicts with JSON serialization
-    cars_data = [car.model_dump(mode='json') for car in cars]
+    Args:
+        payload: Dictionary with optional ifNoneMatch, format, view, units
+                 and min/max/sort spec filters
     
-    return cars_data
+    Returns:
+        Array of cars
+    """
+    if catalog_cache.enabled:
+        # Cached reads are memory-bound; one thread hop covers any refresh
+        return await to_thread.run_sync(get_cars, payload)
+    fmt = payload.get("format", JSON_FORMAT)
+    view = CarView(payload.get("view", CarView.full))
+    query = _spec_query(payload)
+    if query.active:
+        units = UnitSystem(payload.get("units", UnitSystem.native))
+        cars = [convert_car(car, units) for car in await query_cars_async(query)]
+        return RenderedBody(_dump_queried(cars, view, fmt), None, MEDIA_TYPES[fmt])
+    if view == CarView.summary:
+        summaries = await async_repo.get_car_summaries()
+        return RenderedBody(dump_summaries(summaries, fmt), None, MEDIA_TYPES[fmt])
+    units = UnitSystem(payload.get("units", UnitSystem.native))
+    cars = [convert_car(car, units) for car in await async_repo.get_cars()]
+    return RenderedBody(dump_cars(cars, fmt, exclude_none=True), None, MEDIA_TYPES[fmt])
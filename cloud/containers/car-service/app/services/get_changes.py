@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+import app.repositories as repo
+from common.errors import BadRequestError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Page size for the change feed when the client doesn't ask for one
+CHANGES_DEFAULT_PAGE_SIZE = int(os.getenv("CHANGES_DEFAULT_PAGE_SIZE", "100"))
+CHANGES_MAX_PAGE_SIZE = int(os.getenv("CHANGES_MAX_PAGE_SIZE", "500"))
+
+
+def _format_time(value: datetime) -> str:
+    """RFC 3339 with full (nanosecond when available) precision."""
+    if isinstance(value, DatetimeWithNanoseconds):
+        return value.rfc3339()
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def encode_token(
+    car_cursor: Optional[repo.ChangeCursor],
+    tombstone_cursor: Optional[repo.ChangeCursor],
+) -> str:
+    """Encode both collection cursors into an opaque, URL-safe sync token."""
+    state = {
+        "c": [_format_time(car_cursor[0]), car_cursor[1]] if car_cursor else None,
+        "d": [_format_time(tombstone_cursor[0]), tombstone_cursor[1]] if tombstone_cursor else None,
+    }
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Tuple[Optional[repo.ChangeCursor], Optional[repo.ChangeCursor]]:
+    """Decode a sync token back into (car cursor, tombstone cursor).
+    
+    Raises:
+        BadRequestError: If the token wasn't produced by encode_token
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw)
+        cursors = []
+        for key in ("c", "d"):
+            value = state.get(key)
+            if value is None:
+                cursors.append(None)
+            else:
+                timestamp, doc_id = value
+                cursors.append((DatetimeWithNanoseconds.from_rfc3339(timestamp), str(doc_id)))
+        return cursors[0], cursors[1]
+    except Exception:
+        raise BadRequestError("Invalid sync token")
+
+
+def get_changes(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get cars changed or deleted since a sync token.
+    
+    Writes and deletions are merged into one timeline ordered by server
+    timestamp and cut at the page size, so every item on a page happened
+    before every item on later pages. Within a page, clients should apply
+    deletions before changes.
+    
+    Args:
+        data: Dictionary containing since (sync token, omitted for a full
+              sync) and limit (page size)
+        
+    Returns:
+        Dictionary with changed cars, deleted car IDs, nextToken and hasMore
+        
+    Raises:
+        BadRequestError: If the token or page size is invalid
+    """
+    car_cursor, tombstone_cursor = None, None
+    if data.get("since"):
+        car_cursor, tombstone_cursor = decode_token(data["since"])
+    
+    limit = data.get("limit") or CHANGES_DEFAULT_PAGE_SIZE
+    if not 1 <= limit <= CHANGES_MAX_PAGE_SIZE:
+        raise BadRequestError(f"limit must be between 1 and {CHANGES_MAX_PAGE_SIZE}")
+    
+    # Read one extra item per collection to know whether more pages follow
+    changed, deleted = repo.get_changes(car_cursor, tombstone_cursor, limit + 1)
+    
+    timeline: List[Tuple[datetime, str, Any]] = sorted(
+        [(updated_at, car_id, ("changed", car)) for updated_at, car_id, car in changed]
+        + [(deleted_at, car_id, ("deleted", None)) for deleted_at, car_id in deleted],
+        key=lambda item: (item[0], item[1]),
+    )
+    page, has_more = timeline[:limit], len(timeline) > limit
+    
+    changed_cars: List[Dict[str, Any]] = []
+    deleted_cars: List[Dict[str, Any]] = []
+    for timestamp, car_id, (kind, car) in page:
+        if kind == "changed":
+            car_cursor = (timestamp, car_id)
+            if car is not None:
+                changed_cars.append(car.model_dump(mode='json'))
+        else:
+            tombstone_cursor = (timestamp, car_id)
+            deleted_cars.append({"id": car_id, "deletedAt": _format_time(timestamp)})
+    
+    return {
+        "changed": changed_cars,
+        "deleted": deleted_cars,
+        "nextToken": encode_token(car_cursor, tombstone_cursor),
+        "hasMore": has_more,
+    }
@@ -0,0 +1,107 @@
+from typing import Tuple
+
+from anyio import to_thread
+
+import app.repositories as repo
+import app.async_repositories as async_repo
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.catalog import catalog_cache
+from app.etags import etag_matches, format_content_etag, representation_variant
+from app.facet_index import facet_index
+from app.facets import (
+    FacetSelection, canonical_selection, count_facets, facet_response, parse_facet_selection,
+)
+from app.serialization import RenderedBody, dump_facets
+from app.specs import SpecQuery, parse_spec_query
+from common.errors import BadRequestError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _filters(payload: dict) -> Tuple[SpecQuery, FacetSelection]:
+    """Parse the min/max spec filters and facet selections of a facets request."""
+    try:
+        query = parse_spec_query(payload.get("min") or [], payload.get("max") or [], None)
+        return query, parse_facet_selection(payload.get("facets") or {})
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+
+def _stats_body(stats, fmt: str, if_none_match) -> RenderedBody:
+    """Render the unfiltered counts of the stats document, versioned by its update_time."""
+    total, counts, update_time = stats
+    etag = format_content_etag(update_time.rfc3339(), representation_variant(fmt))
+    if etag_matches(if_none_match, etag):
+        return RenderedBody(None, etag, MEDIA_TYPES[fmt])
+    return RenderedBody(dump_facets(facet_response(total, counts), fmt), etag, MEDIA_TYPES[fmt])
+
+
+def _counted_body(rows, selection: FacetSelection, fmt: str) -> RenderedBody:
+    total, counts = count_facets(rows, selection)
+    return RenderedBody(dump_facets(facet_response(total, counts), fmt), None, MEDIA_TYPES[fmt])
+
+
+def get_facets(payload: dict) -> RenderedBody:
+    """
+    Get how many cars have each make, body style, fuel, transmission,
+    drivetrain layout and year.
+
+    Counts are disjunctive: each facet is counted over the cars matching
+    the spec filters and every other facet's selection (see app.facets).
+
+    Args:
+        payload: Dictionary with optional ifNoneMatch, format, min/max
+                 ("spec:value" lists, see app.specs) and facets (facet name
+                 -> list of selected values, comma-separated or repeated)
+
+    Returns:
+        Total matching cars and per facet its values, most cars first.
+        With the catalog cache counts are computed in memory and carry a
+        catalog ETag. Without it, unfiltered counts come from the stats
+        document (ETag from its update time) and filtered counts from a
+        projection query (no ETag).
+
+    Raises:
+        BadRequestError: If a spec filter or facet name is invalid
+    """
+    fmt = payload.get("format", JSON_FORMAT)
+    query, selection = _filters(payload)
+
+    if catalog_cache.enabled:
+        catalog = catalog_cache.get()
+        parameters = "&".join(part for part in (query.canonical, canonical_selection(selection)) if part)
+        etag = format_content_etag(catalog.fingerprint, representation_variant(fmt), parameters)
+        if etag_matches(payload.get("ifNoneMatch"), etag):
+            return RenderedBody(None, etag, MEDIA_TYPES[fmt])
+        total, counts = facet_index.counts(catalog, query, selection)
+        return RenderedBody(dump_facets(facet_response(total, counts), fmt), etag, MEDIA_TYPES[fmt])
+
+    if not query.active and not selection:
+        stats = repo.get_facet_stats()
+        if stats is not None:
+            return _stats_body(stats, fmt, payload.get("ifNoneMatch"))
+        logger.warning("Facet stats document missing; counting every car (run backfill.py facets)")
+    return _counted_body(repo.get_facet_rows(query), selection, fmt)
+
+
+async def get_facets_async(payload: dict) -> RenderedBody:
+    """
+    Get facet counts using the asyncio data path.
+
+    Args:
+        payload: Dictionary with optional ifNoneMatch, format, min/max and facets
+
+    Returns:
+        Total matching cars and per facet its values
+    """
+    if catalog_cache.enabled:
+        return await to_thread.run_sync(get_facets, payload)
+    fmt = payload.get("format", JSON_FORMAT)
+    query, selection = _filters(payload)
+    if not query.active and not selection:
+        stats = await async_repo.get_facet_stats()
+        if stats is not None:
+            return _stats_body(stats, fmt, payload.get("ifNoneMatch"))
+        logger.warning("Facet stats document missing; counting every car (run backfill.py facets)")
+    return _counted_body(await async_repo.get_facet_rows(query), selection, fmt)
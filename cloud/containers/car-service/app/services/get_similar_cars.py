@@ -0,0 +1,79 @@
+from anyio import to_thread
+
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.catalog import catalog_cache
+from app.etags import etag_matches, format_catalog_etag, representation_variant
+from app.render_cache import render_cache
+from app.schemas import CarView, UnitSystem
+from app.serialization import RenderedBody
+from app.similarity import similarity_index
+from app.storage import current_url_window
+from common.errors import BadRequestError, NotFoundError, ServiceUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILAR_CARS = 10
+
+
+def get_similar_cars(payload: dict) -> RenderedBody:
+    """
+    Get the cars most similar to one car, nearest first.
+
+    Similarity is distance between normalized spec vectors (see
+    app.similarity), which live in memory alongside the catalog cache.
+
+    Args:
+        payload: Dictionary with carId and optional k (number of cars;
+                 defaults to 10), ifNoneMatch, format, view and units
+
+    Returns:
+        Array of cars without null fields, with an ETag. The body is None
+        when ifNoneMatch already matches it.
+
+    Raises:
+        BadRequestError: If carId is missing or k is less than 1
+        NotFoundError: If the car doesn't exist
+        ServiceUnavailableError: If the catalog cache is disabled
+    """
+    if not catalog_cache.enabled:
+        raise ServiceUnavailableError("Similar cars need the catalog cache (CATALOG_CACHE_TTL_SECONDS)")
+    car_id = payload.get("carId")
+    if not car_id:
+        raise BadRequestError("carId is required")
+    k = payload.get("k") or DEFAULT_SIMILAR_CARS
+    if k < 1:
+        raise BadRequestError("k must be at least 1")
+    fmt = payload.get("format", JSON_FORMAT)
+    view = CarView(payload.get("view", CarView.full))
+    units = UnitSystem(payload.get("units", UnitSystem.native))
+    media_type = MEDIA_TYPES[fmt]
+
+    catalog = catalog_cache.get()
+    if car_id not in catalog.entries:
+        raise NotFoundError(f"Car with ID {car_id} not found")
+
+    window = current_url_window()
+    # Neighbours can change whenever any car does
+    etag = format_catalog_etag(
+        catalog.fingerprint, window, representation_variant(fmt, view, units), f"carId={car_id}&k={k}",
+    )
+    if etag_matches(payload.get("ifNoneMatch"), etag):
+        return RenderedBody(None, etag, media_type)
+
+    neighbours = similarity_index.neighbours(catalog, [car_id], k)[0]
+    entries = list(catalog.entries.values())
+    body = render_cache.render_list(
+        [entries[neighbour.position] for neighbour in neighbours],
+        window, fmt, view, exclude_none=True, units=units,
+    )
+    return RenderedBody(body, etag, media_type)
+
+
+async def get_similar_cars_async(payload: dict) -> RenderedBody:
+    """
+    Get the cars most similar to one car using the asyncio data path.
+
+    The search is CPU-bound over in-memory data, so it runs in one thread hop.
+    """
+    return await to_thread.run_sync(get_similar_cars, payload)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import typing
+from typing import Dict, Any, List, Optional, Type
+from uuid import UUID
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore import DELETE_FIELD
+from google.cloud.firestore_v1.field_path import FieldPath
+from pydantic import BaseModel, ValidationError
+import app.repositories as repo
+from app.car_keys import KEY_FIELDS
+from app.etags import format_update_time_etag, parse_update_time_etag
+from app.schemas import Car
+from common.errors import BadRequestError, ConflictError, NotFoundError, PreconditionFailedError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields that identify the document or are maintained server-side
+_IMMUTABLE_FIELDS = {"id", "updatedAt"}
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Return the BaseModel inside an annotation such as Optional[Engine]."""
+    candidates = typing.get_args(annotation) or (annotation,)
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def _is_mapping(annotation: Any) -> bool:
+    """True for free-form string maps such as otherSpecs: Dict[str, str]."""
+    return typing.get_origin(annotation) is dict
+
+
+def _has_required_fields(model: Type[BaseModel]) -> bool:
+    return any(field.is_required() for field in model.model_fields.values())
+
+
+def _validate_value(model: Type[BaseModel], key: str, value: Any, path: List[str]) -> Any:
+    """Validate one field value against the schema and return its JSON form."""
+    instance = model.model_construct()
+    try:
+        model.__pydantic_validator__.validate_assignment(instance, key, value)
+    except ValidationError as e:
+        raise BadRequestError(f"{'.'.join(path)}: {e.errors()[0]['msg']}")
+    return instance.model_dump(mode='json', include={key})[key]
+
+
+def merge_patch_to_field_updates(
+    patch: Dict[str, Any],
+    model: Type[BaseModel] = Car,
+    prefix: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Translate a JSON merge patch (RFC 7396) into Firestore field-path updates.
+    
+    Nested objects are descended into so only the leaves that change are
+    written; null removes a field. Objects whose schema has required members
+    (the Measurement* structs) are validated and replaced as a whole, so a
+    patch can never leave a measurement without its unit.
+    
+    Args:
+        patch: Merge patch document
+        model: Schema the patch applies to
+        prefix: Field path of the object being patched (for recursion)
+        
+    Returns:
+        Mapping of dotted Firestore field paths to values or DELETE_FIELD
+        
+    Raises:
+        BadRequestError: If a field is unknown, immutable or invalid
+    """
+    prefix = prefix or []
+    updates: Dict[str, Any] = {}
+    
+    for key, value in patch.items():
+        path = prefix + [key]
+        field = model.model_fields.get(key)
+        if field is None:
+            raise BadRequestError(f"Unknown field: {'.'.join(path)}")
+        if model is Car and key in _IMMUTABLE_FIELDS:
+            raise BadRequestError(f"Field cannot be patched: {key}")
+        
+        if value is None:
+            if field.is_required():
+                raise BadRequestError(f"Required field cannot be removed: {'.'.join(path)}")
+            updates[FieldPath(*path).to_api_repr()] = DELETE_FIELD
+            continue
+        
+        nested = _nested_model(field.annotation)
+        if isinstance(value, dict) and nested is not None and not _has_required_fields(nested):
+            updates.update(merge_patch_to_field_updates(value, nested, path))
+        elif isinstance(value, dict) and _is_mapping(field.annotation):
+            for entry_key, entry_value in value.items():
+                entry_path = FieldPath(*path, entry_key).to_api_repr()
+                if entry_value is None:
+                    updates[entry_path] = DELETE_FIELD
+                elif isinstance(entry_value, str):
+                    updates[entry_path] = entry_value
+                else:
+                    raise BadRequestError(f"{'.'.join(path + [entry_key])}: Input should be a valid string")
+        else:
+            updates[FieldPath(*path).to_api_repr()] = _validate_value(model, key, value, path)
+    
+    return updates
+
+
+def patch_car(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Partially update a car with JSON merge-patch semantics.
+    
+    Args:
+        data: Dictionary containing carId, patch (merge patch document) and
+              optionally ifMatch (ETag of the version the patch was based on)
+        
+    Returns:
+        Dictionary with the car ID, patched field paths, new update time and ETag
+        
+    Raises:
+        BadRequestError: If the ID, patch or If-Match value is invalid
+        NotFoundError: If the car doesn't exist
+        PreconditionFailedError: If the car changed since the If-Match version
+        ConflictError: If another car already has the patched volumeId or slug
+    """
+    car_id = data.get("carId")
+    try:
+        car_id = str(UUID(car_id))
+    except (TypeError, ValueError):
+        raise BadRequestError(f"Invalid car ID: {car_id}")
+    
+    patch = data.get("patch")
+    if not isinstance(patch, dict):
+        raise BadRequestError("Merge patch must be a JSON object")
+    
+    last_update_time = None
+    if data.get("ifMatch"):
+        try:
+            last_update_time = parse_update_time_etag(data["ifMatch"])
+        except ValueError as e:
+            raise BadRequestError(f"Invalid If-Match header: {e}")
+    
+    field_updates = merge_patch_to_field_updates(patch)
+    if not field_updates:
+        raise BadRequestError("Merge patch does not change any fields")
+    
+    try:
+        update_time = repo.patch_car(car_id, field_updates, last_update_time)
+    except gcp_exceptions.NotFound:
+        raise NotFoundError(f"Car with ID {car_id} not found")
+    except gcp_exceptions.FailedPrecondition:
+        raise PreconditionFailedError(f"Car with ID {car_id} was modified since the If-Match version")
+    except gcp_exceptions.AlreadyExists:
+        raise ConflictError(f"Another car already has this {' or '.join(key for key in KEY_FIELDS if key in field_updates)}")
+    
+    return {
+        "id": car_id,
+        "updatedFields": list(field_updates),
+        "updateTime": update_time.rfc3339(),
+        "etag": format_update_time_etag(update_time),
+    }
@@ -0,0 +1,78 @@
+from anyio import to_thread
+
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.catalog import catalog_cache
+from app.etags import etag_matches, format_catalog_etag, representation_variant
+from app.render_cache import render_cache
+from app.schemas import CarView, UnitSystem
+from app.search import search_index
+from app.serialization import RenderedBody
+from app.storage import current_url_window
+from app.text import tokenize
+from common.errors import BadRequestError, ServiceUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+
+
+def search_cars(payload: dict) -> RenderedBody:
+    """
+    Search cars by text, best match first.
+
+    Cars are ranked with BM25 over their make, model, blurb, engine code,
+    differential and otherSpecs values (see app.search), using an index that
+    lives in memory alongside the catalog cache.
+
+    Args:
+        payload: Dictionary with q and optional limit (defaults to 20),
+                 ifNoneMatch, format, view and units
+
+    Returns:
+        Array of cars without null fields, with an ETag. The body is None
+        when ifNoneMatch already matches it.
+
+    Raises:
+        BadRequestError: If q is missing or limit is less than 1
+        ServiceUnavailableError: If the catalog cache is disabled
+    """
+    text = (payload.get("q") or "").strip()
+    if not text:
+        raise BadRequestError("q is required")
+    limit = payload.get("limit") or DEFAULT_SEARCH_LIMIT
+    if limit < 1:
+        raise BadRequestError("limit must be at least 1")
+    fmt = payload.get("format", JSON_FORMAT)
+    view = CarView(payload.get("view", CarView.full))
+    units = UnitSystem(payload.get("units", UnitSystem.native))
+    media_type = MEDIA_TYPES[fmt]
+    if not catalog_cache.enabled:
+        raise ServiceUnavailableError("Search needs the catalog cache (CATALOG_CACHE_TTL_SECONDS)")
+
+    catalog = catalog_cache.get()
+    window = current_url_window()
+    # Results can change whenever any car does. Queries with the same terms
+    # rank the same, so the ETag carries the normalized terms and the limit.
+    terms = " ".join(sorted(set(tokenize(text))))
+    etag = format_catalog_etag(
+        catalog.fingerprint, window, representation_variant(fmt, view, units), f"q={terms}&limit={limit}",
+    )
+    if etag_matches(payload.get("ifNoneMatch"), etag):
+        return RenderedBody(None, etag, media_type)
+
+    hits = search_index.search(catalog, text, limit)
+    body = render_cache.render_list(
+        [catalog.entries[hit.car_id] for hit in hits],
+        window, fmt, view, exclude_none=True, units=units,
+    )
+    return RenderedBody(body, etag, media_type)
+
+
+async def search_cars_async(payload: dict) -> RenderedBody:
+    """
+    Search cars by text using the asyncio data path.
+
+    Scoring is CPU-bound over in-memory data, so it runs in one thread hop.
+    """
+    return await to_thread.run_sync(search_cars, payload)
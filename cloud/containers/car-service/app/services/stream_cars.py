@@ -0,0 +1,155 @@
+"""Stream the whole catalog as NDJSON, one car per line.
+
+Cars are pulled from Firestore's document stream and signed in small
+windows, so memory stays bounded by the window size rather than the
+catalog size and the first bytes go out after the first window.
+"""
+from __future__ import annotations
+
+import os
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from anyio import to_thread
+from starlette.concurrency import iterate_in_threadpool
+
+import app.repositories as repo
+import app.async_repositories as async_repo
+from app.catalog import catalog_cache
+from app.render_cache import render_cache
+from app.schemas import Car, UnitSystem
+from app.spec_index import spec_index
+from app.specs import SpecQuery, parse_spec_query
+from app.serialization import dump_car_json
+from app.storage import current_url_window, get_cached_model_urls
+from app.units import convert_car
+from common.errors import BadRequestError
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Cars signed and written per chunk
+NDJSON_WINDOW_SIZE = int(os.getenv("NDJSON_WINDOW_SIZE", "32"))
+
+
+def _windows(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
+def _sign_and_render(cars: List[Car], units: UnitSystem = UnitSystem.native) -> bytes:
+    """Sign a window of cars in one batch and render it as NDJSON lines."""
+    cars = [convert_car(car, units) for car in cars]
+    urls = get_cached_model_urls(car.volumeId for car in cars if car.volumeId and not car.modelUrl)
+    lines = []
+    for car in cars:
+        url = urls.get(car.volumeId) if car.volumeId and not car.modelUrl else None
+        if url:
+            car = car.model_copy(update={"modelUrl": url})
+        lines.append(dump_car_json(car))
+        lines.append(b"\n")
+    return b"".join(lines)
+
+
+def _parse_payload(payload: Dict[str, Any]) -> Tuple[UnitSystem, SpecQuery]:
+    """Validate the request up front, before any bytes are streamed."""
+    units = UnitSystem(payload.get("units", UnitSystem.native))
+    try:
+        query = parse_spec_query(payload.get("min") or [], payload.get("max") or [], payload.get("sort"))
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    return units, query
+
+
+def stream_cars(payload: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Stream all cars as NDJSON chunks.
+    
+    Args:
+        payload: Dictionary with optional units (native, metric or imperial)
+                 and min/max/sort spec filters (see get_cars)
+        
+    Returns:
+        Iterator of NDJSON chunks, one per window of cars
+        
+    Raises:
+        BadRequestError: If a spec filter or sort is invalid
+    """
+    return _stream(*_parse_payload(payload))
+
+
+def _stream(units: UnitSystem, query: SpecQuery) -> Iterator[bytes]:
+    if catalog_cache.enabled:
+        window = current_url_window()
+        catalog = catalog_cache.get()
+        entries = list(catalog.entries.values())
+        if query.active:
+            entries = [entries[i] for i in spec_index.query(catalog, query)]
+        for chunk in _windows(entries, NDJSON_WINDOW_SIZE):
+            yield b"".join(fragment + b"\n" for fragment in render_cache.render(chunk, window, units=units))
+        return
+    
+    cars = repo.query_cars(query) if query.active else repo.iter_cars()
+    for window in _windows(cars, NDJSON_WINDOW_SIZE):
+        yield _sign_and_render(window, units)
+
+
+def stream_cars_async(payload: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    Stream all cars as NDJSON chunks using the asyncio data path.
+    
+    Each window is signed in a worker thread while the next window is read
+    from Firestore, so signing overlaps with I/O.
+    
+    Args:
+        payload: Dictionary with optional units and min/max/sort spec filters
+        
+    Returns:
+        Async iterator of NDJSON chunks, one per window of cars
+        
+    Raises:
+        BadRequestError: If a spec filter or sort is invalid
+    """
+    return _stream_async(*_parse_payload(payload))
+
+
+async def _queried_cars(query: SpecQuery) -> AsyncIterator[Car]:
+    for car in await async_repo.query_cars(query):
+        yield car
+
+
+async def _stream_async(units: UnitSystem, query: SpecQuery) -> AsyncIterator[bytes]:
+    if catalog_cache.enabled:
+        async for chunk in iterate_in_threadpool(_stream(units, query)):
+            yield chunk
+        return
+    
+    pending: Optional[asyncio.Task] = None
+    window: List[Car] = []
+    try:
+        async for car in (_queried_cars(query) if query.active else async_repo.iter_cars()):
+            window.append(car)
+            if len(window) < NDJSON_WINDOW_SIZE:
+                continue
+            task = asyncio.ensure_future(to_thread.run_sync(_sign_and_render, window, units))
+            window = []
+            if pending is not None:
+                yield await pending
+            pending = task
+        
+        if pending is not None:
+            yield await pending
+            pending = None
+        if window:
+            yield await to_thread.run_sync(_sign_and_render, window, units)
+    finally:
+        # Client went away mid-stream
+        if pending is not None:
+            pending.cancel()
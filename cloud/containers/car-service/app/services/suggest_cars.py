@@ -0,0 +1,54 @@
+from anyio import to_thread
+
+from app.binary_formats import JSON_FORMAT, MEDIA_TYPES
+from app.catalog import catalog_cache
+from app.etags import etag_matches, format_content_etag, representation_variant
+from app.serialization import RenderedBody, dump_suggestions
+from app.suggest import suggest_index
+from common.errors import BadRequestError, ServiceUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def suggest_cars(payload: dict) -> RenderedBody:
+    """
+    Get typeahead suggestions (makes, models and engine codes) for a prefix.
+
+    Suggestions come from a prefix index kept alongside the catalog cache
+    (see app.suggest), most popular first.
+
+    Args:
+        payload: Dictionary with prefix and optional ifNoneMatch and format
+
+    Returns:
+        Array of suggestions with an ETag that only changes when this
+        prefix's suggestions do. The body is None when ifNoneMatch already
+        matches it.
+
+    Raises:
+        BadRequestError: If prefix is missing
+        ServiceUnavailableError: If the catalog cache is disabled
+    """
+    prefix = payload.get("prefix") or ""
+    if not prefix.strip():
+        raise BadRequestError("prefix is required")
+    fmt = payload.get("format", JSON_FORMAT)
+    media_type = MEDIA_TYPES[fmt]
+    if not catalog_cache.enabled:
+        raise ServiceUnavailableError("Suggestions need the catalog cache (CATALOG_CACHE_TTL_SECONDS)")
+
+    suggestions = suggest_index.suggest(catalog_cache.get(), prefix)
+    etag = format_content_etag(suggestions.digest, representation_variant(fmt))
+    if etag_matches(payload.get("ifNoneMatch"), etag):
+        return RenderedBody(None, etag, media_type)
+    return RenderedBody(dump_suggestions(suggestions.items, fmt), etag, media_type)
+
+
+async def suggest_cars_async(payload: dict) -> RenderedBody:
+    """
+    Get typeahead suggestions using the asyncio data path.
+
+    The lookup is in-memory, so it runs in one thread hop.
+    """
+    return await to_thread.run_sync(suggest_cars, payload)
@@ -0,0 +1,214 @@
+"""Similar cars: nearest neighbours over normalized spec vectors.
+
+Every cached car gets a feature vector built from its Engine,
+Performance, Dimensions, Drivetrain and bodyStyle:
+
+- each measurement as its canonical SI value (see app.specs), plus
+  cylinder and gear counts, standardized to zero mean and unit variance
+  across the catalog
+- each enum (body style, fuel, induction, layout, transmission) one-hot
+  encoded and scaled so that a mismatch costs as much as one standard
+  deviation of a numeric spec
+
+Missing values are imputed with the catalog mean, so they neither attract
+nor repel. Raw features are kept as catalog columns (see
+app.spec_index.ColumnIndex) and refreshed only for changed cars; the
+normalized matrix is recomputed from them, vectorized, once per catalog
+version. Neighbours come from one matrix product per batch of queried cars
+and an argpartition, and results are cached until the catalog changes.
+"""
+from __future__ import annotations
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.catalog import Catalog, catalog_cache
+from app.compact import CompactCar, leaf_slot
+from app.schemas import BodyStyle, DriveLayout, FuelType, Induction, Transmission
+from app.spec_index import ColumnIndex, packed_matrices, spec_index
+from app.specs import SPECS
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_CARS_CACHE_SIZE = int(os.getenv("SIMILAR_CARS_CACHE_SIZE", "4096"))
+
+# Plain numbers used as-is
+COUNT_FEATURES: Tuple[Tuple[str, ...], ...] = (
+    ("engine", "cylinders"),
+    ("drivetrain", "gears"),
+)
+
+# Enums one-hot encoded, one feature per member
+CATEGORY_FEATURES: Tuple[Tuple[Tuple[str, ...], type], ...] = (
+    (("bodyStyle",), BodyStyle),
+    (("engine", "fuel"), FuelType),
+    (("engine", "induction"), Induction),
+    (("drivetrain", "layout"), DriveLayout),
+    (("drivetrain", "transmission"), Transmission),
+)
+
+# A one-hot mismatch differs in two features, each by this much
+CATEGORY_WEIGHT = 0.5 ** 0.5
+
+NUMERIC_FEATURES = len(SPECS) + len(COUNT_FEATURES)
+
+_COUNT_INDEXES = [leaf_slot(path)[0] for path in COUNT_FEATURES]
+_CATEGORY_INDEXES = [(leaf_slot(path)[0], len(enum_type)) for path, enum_type in CATEGORY_FEATURES]
+FEATURES = NUMERIC_FEATURES + sum(size for _, size in _CATEGORY_INDEXES)
+
+
+class Neighbour(NamedTuple):
+    """One similar car."""
+    position: int  # in the catalog snapshot's entry order
+    distance: float
+
+
+class FeatureMatrix:
+    """Normalized (car, feature) matrix for one catalog version."""
+
+    __slots__ = ("version", "ids", "vectors", "norms")
+
+    def __init__(self, version: int, ids, vectors):
+        self.version = version
+        self.ids = ids
+        # float32, C-contiguous so each car's vector is one row
+        self.vectors = vectors
+        # Squared length of each row, for |a - b|^2 = |a|^2 + |b|^2 - 2ab
+        self.norms = np.einsum("ij,ij->i", vectors, vectors)
+
+
+def normalize(raw) -> "np.ndarray":
+    """Turn raw (feature, car) columns into normalized (car, feature) vectors."""
+    known = ~np.isnan(raw)
+    # Features nobody has get a mean of 0 and contribute nothing
+    means = np.nansum(raw, axis=1, keepdims=True) / np.maximum(known.sum(axis=1, keepdims=True), 1)
+    filled = np.where(known, raw, means)
+
+    numeric = filled[:NUMERIC_FEATURES]
+    deviations = numeric.std(axis=1, keepdims=True)
+    deviations[deviations == 0] = 1.0
+    scaled = np.empty_like(filled)
+    scaled[:NUMERIC_FEATURES] = (numeric - means[:NUMERIC_FEATURES]) / deviations
+    scaled[NUMERIC_FEATURES:] = filled[NUMERIC_FEATURES:] * CATEGORY_WEIGHT
+    return np.ascontiguousarray(scaled.T, dtype=np.float32)
+
+
+class SimilarityIndex(ColumnIndex):
+    """Raw feature columns plus the normalized matrix and a result cache."""
+
+    def __init__(self, cache_size: int = SIMILAR_CARS_CACHE_SIZE):
+        super().__init__()
+        self.cache_size = cache_size
+        self._matrix: Optional[FeatureMatrix] = None
+        self._matrix_lock = threading.Lock()
+        # (catalog version, car ID, k) -> neighbours
+        self._results: "OrderedDict[Tuple[int, str, int], List[Neighbour]]" = OrderedDict()
+
+    def clear(self) -> None:
+        super().clear()
+        with self._matrix_lock:
+            self._matrix = None
+            self._results.clear()
+
+    def matrix(self, catalog: Catalog) -> FeatureMatrix:
+        """Normalized feature matrix for the given catalog snapshot."""
+        matrix = self._matrix
+        if matrix is not None and matrix.version == catalog.version:
+            return matrix
+        columns = self.columns(catalog)
+        with self._matrix_lock:
+            if self._matrix is None or self._matrix.version != catalog.version:
+                self._matrix = FeatureMatrix(columns.version, columns.ids, normalize(columns.values))
+                # Every neighbour list may have changed
+                self._results.clear()
+            return self._matrix
+
+    def neighbours(self, catalog: Catalog, car_ids: Sequence[str], k: int) -> List[List[Neighbour]]:
+        """The k nearest cars to each of the given cars, nearest first.
+
+        Args:
+            catalog: Catalog snapshot the positions refer to
+            car_ids: Cars to find neighbours of; all must be in the catalog
+            k: Neighbours per car (fewer if the catalog is smaller)
+
+        Returns:
+            For each car, (catalog position, distance) pairs ordered by
+            distance and then by ID, never including the car itself
+        """
+        results: List[Optional[List[Neighbour]]] = [None] * len(car_ids)
+        missing = []
+        with self._matrix_lock:
+            for i, car_id in enumerate(car_ids):
+                key = (catalog.version, car_id, k)
+                cached = self._results.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._results.move_to_end(key)
+                    results[i] = cached
+
+        if missing:
+            matrix = self.matrix(catalog)
+            computed = self._search(matrix, [car_ids[i] for i in missing], k)
+            with self._matrix_lock:
+                for i, neighbours in zip(missing, computed):
+                    results[i] = neighbours
+                    if matrix is self._matrix and self.cache_size > 0:
+                        self._results[(catalog.version, car_ids[i], k)] = neighbours
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return results
+
+    def _search(self, matrix: FeatureMatrix, car_ids: Sequence[str], k: int) -> List[List[Neighbour]]:
+        positions = np.searchsorted(matrix.ids, car_ids)
+        count = min(k, len(matrix.ids) - 1)
+        if count <= 0:
+            return [[] for _ in car_ids]
+
+        # Squared distances to every car, less the queried car's own |a|^2
+        # (constant per row, so it doesn't change the ranking), in one product
+        distances = matrix.vectors[positions] @ matrix.vectors.T
+        distances *= -2
+        distances += matrix.norms
+        distances[np.arange(len(positions)), positions] = np.inf
+
+        nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        results = []
+        for row, candidates in enumerate(nearest):
+            # Positions follow ID order, so they break ties by ID
+            candidates = candidates[np.lexsort((candidates, distances[row, candidates]))]
+            squared = np.maximum(distances[row, candidates] + matrix.norms[positions[row]], 0)
+            results.append([
+                Neighbour(int(position), float(distance))
+                for position, distance in zip(candidates, np.sqrt(squared))
+            ])
+        return results
+
+    def _convert(self, records: List[CompactCar]):
+        """Raw features of a batch of records as a (feature, record) matrix."""
+        values = np.full((FEATURES, len(records)), np.nan)
+        if not records:
+            return values
+        numbers, codes = packed_matrices(records)
+        values[:len(SPECS)] = spec_index.si_values(numbers, codes)
+        for row, index in enumerate(_COUNT_INDEXES, start=len(SPECS)):
+            values[row] = numbers[:, index]
+        row = NUMERIC_FEATURES
+        for index, size in _CATEGORY_INDEXES:
+            member_codes = codes[:, index]
+            known = member_codes < size
+            block = np.zeros((size, len(records)))
+            block[member_codes[known], np.flatnonzero(known)] = 1.0
+            block[:, ~known] = np.nan
+            values[row:row + size] = block
+            row += size
+        return values
+
+
+similarity_index = SimilarityIndex()
+catalog_cache.add_change_listener(similarity_index.on_catalog_change)
@@ -0,0 +1,228 @@
+"""Columnar indexes over the cached catalog.
+
+ColumnIndex keeps a float64 matrix of per-car values, aligned with the
+catalog's ID order and refreshed from catalog change events. SpecIndex
+keeps one row per queryable spec (see app.specs), with NaN for missing
+values. Range filters become vectorized boolean masks and sorts an
+argsort, instead of a Python loop over every cached car.
+
+Columns are built straight from the CompactCar packed arrays: every
+record's numbers and unit codes are stacked into matrices once and each
+spec is converted to SI with a per-unit-code factor table. On catalog
+changes only the changed cars are converted; everyone else's values are
+carried over by position.
+
+Results match app.specs.filter_records, the plain Python reference.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import FrozenSet, List, Optional, Sequence
+
+import numpy as np
+
+from app.catalog import Catalog, catalog_cache
+from app.compact import MEASUREMENT_SLOTS, CompactCar, unit_member
+from app.specs import (
+    DERIVED_SPECS, QUERYABLE_SPECS, SI_FACTORS, SI_RECIPROCALS, SPECS, SpecQuery,
+)
+
+logger = logging.getLogger(__name__)
+
+_SLOTS_BY_PATH = {slot.path: slot for slot in MEASUREMENT_SLOTS}
+_SPEC_ROWS = {spec: row for row, spec in enumerate(QUERYABLE_SPECS)}
+
+
+def _unit_tables():
+    """Per spec: SI factor and reciprocal flag indexed by unit code."""
+    factors = np.full((len(SPECS), 256), np.nan)
+    reciprocal = np.zeros((len(SPECS), 256), dtype=bool)
+    for row, spec in enumerate(SPECS):
+        unit_type = _SLOTS_BY_PATH[spec.path].unit_type
+        for code in range(256):
+            unit = unit_member(unit_type, code) if code < len(unit_type) else None
+            if unit in SI_RECIPROCALS:
+                factors[row, code] = SI_RECIPROCALS[unit]
+                reciprocal[row, code] = True
+            elif unit in SI_FACTORS:
+                factors[row, code] = SI_FACTORS[unit]
+    return factors, reciprocal
+
+
+class CatalogColumns:
+    """Immutable per-car columns for one catalog version."""
+
+    __slots__ = ("version", "ids", "values")
+
+    def __init__(self, version: int, ids, values):
+        self.version = version
+        # Sorted car IDs (numpy unicode array), one per column position
+        self.ids = ids
+        # float64 matrix, one row per feature and one column per car
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class ColumnIndex(ABC):
+    """Per-car columns kept in step with the catalog cache.
+
+    Subclasses implement _convert, turning a batch of records into a
+    (feature, record) float64 matrix; building, versioning and
+    incremental refresh are shared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns: Optional[CatalogColumns] = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._columns = None
+
+    def columns(self, catalog: Catalog) -> CatalogColumns:
+        """Columns for the given catalog snapshot, building them if needed."""
+        columns = self._columns
+        if columns is not None and columns.version == catalog.version:
+            return columns
+        with self._lock:
+            if self._columns is None or self._columns.version != catalog.version:
+                self._columns = self._build(catalog)
+            return self._columns
+
+    def on_catalog_change(self, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        """Catalog change listener: convert only the cars that changed."""
+        with self._lock:
+            previous = self._columns
+            if previous is None:
+                # Nothing to carry over; build on first query
+                return
+            if previous.version >= catalog.version:
+                return
+            if previous.version + 1 != catalog.version:
+                # Missed a change; rebuild on the next query
+                self._columns = None
+                return
+            self._columns = self._update(previous, catalog, changed, removed)
+
+    @abstractmethod
+    def _convert(self, records: List[CompactCar]):
+        """A (feature, record) float64 matrix for the given records."""
+
+    def _build(self, catalog: Catalog) -> CatalogColumns:
+        ids = np.array(list(catalog.entries.keys()), dtype=str)
+        values = self._convert([entry.record for entry in catalog.entries.values()])
+        logger.info(f"{type(self).__name__} built for {len(ids)} cars")
+        return CatalogColumns(catalog.version, ids, values)
+
+    def _update(
+        self, previous: CatalogColumns, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str],
+    ) -> CatalogColumns:
+        if not removed and len(catalog.entries) == len(previous):
+            # Same IDs (the common case of a few edited cars): keep the ID
+            # column and overwrite the changed positions in a copy
+            changed_ids = sorted(changed)
+            positions = np.searchsorted(previous.ids, changed_ids)
+            values = previous.values.copy()
+            if changed_ids:
+                values[:, positions] = self._convert([catalog.entries[car_id].record for car_id in changed_ids])
+            return CatalogColumns(catalog.version, previous.ids, values)
+
+        ids = np.array(list(catalog.entries.keys()), dtype=str)
+        values = np.full((previous.values.shape[0], len(ids)), np.nan)
+
+        fresh = np.ones(len(ids), dtype=bool)
+        if len(previous.ids):
+            old_positions = np.searchsorted(previous.ids, ids).clip(max=len(previous.ids) - 1)
+            carried = previous.ids[old_positions] == ids
+            if changed:
+                carried &= ~np.isin(ids, list(changed))
+            values[:, carried] = previous.values[:, old_positions[carried]]
+            fresh = ~carried
+
+        entries = list(catalog.entries.values())
+        fresh_positions = np.flatnonzero(fresh)
+        values[:, fresh_positions] = self._convert([entries[i].record for i in fresh_positions])
+        return CatalogColumns(catalog.version, ids, values)
+
+
+def packed_matrices(records: List[CompactCar]):
+    """Stack the records' packed numbers and unit codes into two (record, slot) matrices."""
+    numbers = np.frombuffer(b"".join(record.numbers.tobytes() for record in records), dtype=np.float64)
+    codes = np.frombuffer(b"".join(record.codes for record in records), dtype=np.uint8)
+    return numbers.reshape(len(records), -1), codes.reshape(len(records), -1)
+
+
+def derived_values(measured):
+    """Derived spec rows (DERIVED_SPECS order) from measured SI rows (SPECS order)."""
+    rows = {spec.name: measured[row] for row, spec in enumerate(SPECS)}
+    derived = np.full((len(DERIVED_SPECS), measured.shape[1]), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for row, spec in enumerate(DERIVED_SPECS):
+            values = spec.derive(*(rows[name] for name in spec.inputs))
+            derived[row] = np.where(np.isfinite(values), values, np.nan)
+    return derived
+
+
+class SpecIndex(ColumnIndex):
+    """Canonical spec columns (one row per spec in QUERYABLE_SPECS order)."""
+
+    def __init__(self):
+        super().__init__()
+        self._tables = _unit_tables()
+
+    def query(self, catalog: Catalog, query: SpecQuery) -> Sequence[int]:
+        """Positions of the catalog entries matching a spec query, in result order."""
+        order = self.columns(catalog).values[_SPEC_ROWS[query.order]]
+        positions = np.flatnonzero(self.mask(catalog, query))
+        # Positions follow ID order, so they break ties by ID
+        ranked = positions[np.lexsort((positions, order[positions]))]
+        if query.descending:
+            ranked = ranked[::-1]
+        return ranked.tolist()
+
+    def mask(self, catalog: Catalog, query: SpecQuery):
+        """Boolean mask over the catalog's entries: which match a spec query's filters.
+
+        Like the Firestore query, cars missing the spec the results are
+        ordered by don't match.
+        """
+        values = self.columns(catalog).values
+        mask = np.ones(values.shape[1], dtype=bool)
+        if query.order is not None:
+            mask &= ~np.isnan(values[_SPEC_ROWS[query.order]])
+        for spec, bound in query.minimums:
+            mask &= values[_SPEC_ROWS[spec]] >= bound
+        for spec, bound in query.maximums:
+            mask &= values[_SPEC_ROWS[spec]] <= bound
+        return mask
+
+    def _convert(self, records: List[CompactCar]):
+        """SI values of a batch of records as a (spec, record) matrix."""
+        if not records:
+            return np.full((len(QUERYABLE_SPECS), 0), np.nan)
+        numbers, codes = packed_matrices(records)
+        measured = self.si_values(numbers, codes)
+        return np.vstack([measured, derived_values(measured)])
+
+    def si_values(self, numbers, codes):
+        """SI values of every measured spec from stacked packed arrays (see packed_matrices)."""
+        values = np.full((len(SPECS), len(numbers)), np.nan)
+        factors, reciprocal = self._tables
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for row, spec in enumerate(SPECS):
+                slot = _SLOTS_BY_PATH[spec.path]
+                raw = numbers[:, slot.value_index]
+                unit_codes = codes[:, slot.unit_index]
+                factor = factors[row, unit_codes]
+                converted = np.where(reciprocal[row, unit_codes], factor / raw, raw * factor)
+                # Zero consumption has no distance-per-volume equivalent
+                converted[reciprocal[row, unit_codes] & (raw == 0)] = np.nan
+                values[row] = converted
+        return values
+
+spec_index = SpecIndex()
+catalog_cache.add_change_listener(spec_index.on_catalog_change)
@@ -0,0 +1,321 @@
+"""Canonical SI values of numeric car specs.
+
+Measurements keep the unit they were entered in, so "horsepower" may hold
+kilowatts for one car and horsepower for another, and Firestore can't
+range-filter or sort on them. Every write therefore also stores each
+measurement converted to one canonical unit under the _si map (e.g.
+_si.power_w), and numeric queries run against those shadow fields.
+
+Derived metrics (power-to-weight, specific output, ...) are computed from
+those canonical values at write time and stored in _si next to them, so
+they filter and sort like any other spec.
+
+The same conversion is applied to cached CompactCar records, so filters
+answered from the catalog cache agree with the Firestore query.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from google.cloud.firestore import DELETE_FIELD
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from app.compact import MEASUREMENT_SLOTS, CompactCar, unit_member
+from app.schemas import (
+    Car,
+    VolumeUnit, PowerUnit, TorqueUnit, DurationUnit, SpeedUnit, LengthUnit, MassUnit, FuelEfficiencyUnit,
+)
+
+SI_FIELD = "_si"
+
+
+class Spec(NamedTuple):
+    name: str
+    path: Tuple[str, ...]
+
+
+# Queryable specs: shadow field name (suffixed with its unit) and the
+# measurement it is derived from
+SPECS: Tuple[Spec, ...] = (
+    Spec("displacement_m3", ("engine", "displacement")),
+    Spec("power_w", ("performance", "horsepower")),
+    Spec("torque_nm", ("performance", "torque")),
+    Spec("zero_to_sixty_s", ("performance", "zeroToSixty")),
+    Spec("top_speed_mps", ("performance", "topSpeed")),
+    Spec("epa_city_km_per_l", ("performance", "epaCity")),
+    Spec("epa_highway_km_per_l", ("performance", "epaHighway")),
+    Spec("wheelbase_m", ("dimensions", "wheelbase")),
+    Spec("length_m", ("dimensions", "length")),
+    Spec("width_m", ("dimensions", "width")),
+    Spec("height_m", ("dimensions", "height")),
+    Spec("curb_weight_kg", ("dimensions", "curbWeight")),
+    Spec("cargo_volume_m3", ("dimensions", "cargoRearSeatsUp")),
+    Spec("fuel_tank_m3", ("dimensions", "fuelTank")),
+)
+
+
+class DerivedSpec(NamedTuple):
+    name: str
+    # Names of the specs it is computed from, passed to derive in this order
+    inputs: Tuple[str, ...]
+    # Works on floats and on numpy arrays alike
+    derive: Callable[..., Any]
+
+
+def _epa_combined(city: Any, highway: Any) -> Any:
+    # EPA weighting: 55% city, 45% highway, averaged over fuel used
+    return 1 / (0.55 / city + 0.45 / highway)
+
+
+# Metrics computed from the canonical specs, stored and queryable like them
+DERIVED_SPECS: Tuple[DerivedSpec, ...] = (
+    DerivedSpec("power_to_weight_w_per_kg", ("power_w", "curb_weight_kg"), lambda power, weight: power / weight),
+    DerivedSpec("torque_to_weight_nm_per_kg", ("torque_nm", "curb_weight_kg"), lambda torque, weight: torque / weight),
+    DerivedSpec("specific_output_w_per_m3", ("power_w", "displacement_m3"), lambda power, volume: power / volume),
+    DerivedSpec("epa_combined_km_per_l", ("epa_city_km_per_l", "epa_highway_km_per_l"), _epa_combined),
+)
+
+AnySpec = Union[Spec, DerivedSpec]
+
+QUERYABLE_SPECS: Tuple[AnySpec, ...] = SPECS + DERIVED_SPECS
+
+SPECS_BY_NAME: Dict[str, AnySpec] = {spec.name: spec for spec in QUERYABLE_SPECS}
+
+_DERIVED_INPUTS = frozenset(name for spec in DERIVED_SPECS for name in spec.inputs)
+
+# Canonical value of one unit
+SI_FACTORS: Dict[object, float] = {
+    VolumeUnit.liters: 0.001,
+    VolumeUnit.gallons: 0.003785411784,
+    PowerUnit.kilowatts: 1000.0,
+    PowerUnit.horsepower: 745.699872,
+    TorqueUnit.newtonMeters: 1.0,
+    TorqueUnit.poundForceFeet: 1.3558179483,
+    DurationUnit.seconds: 1.0,
+    SpeedUnit.kilometersPerHour: 1 / 3.6,
+    SpeedUnit.milesPerHour: 0.44704,
+    LengthUnit.millimeters: 0.001,
+    LengthUnit.centimeters: 0.01,
+    LengthUnit.meters: 1.0,
+    LengthUnit.inches: 0.0254,
+    MassUnit.kilograms: 1.0,
+    MassUnit.pounds: 0.45359237,
+    FuelEfficiencyUnit.milesPerGallon: 0.425143707,
+}
+
+# Consumption units, canonicalized as 100 / value (km per liter)
+SI_RECIPROCALS: Dict[object, float] = {
+    FuelEfficiencyUnit.litersPer100km: 100.0,
+}
+
+_SLOTS_BY_PATH = {slot.path: slot for slot in MEASUREMENT_SLOTS}
+
+
+def to_si(value: float, unit: Any) -> Optional[float]:
+    """Convert a measurement value to its canonical unit."""
+    if unit in SI_RECIPROCALS:
+        return SI_RECIPROCALS[unit] / value if value else None
+    return value * SI_FACTORS[unit]
+
+
+def _measurement(car: Car, path: Tuple[str, ...]) -> Any:
+    value: Any = car
+    for name in path:
+        value = getattr(value, name, None)
+        if value is None:
+            return None
+    return value
+
+
+def derived_fields(fields: Dict[str, float]) -> Dict[str, float]:
+    """Every derived spec computable from a set of canonical values."""
+    derived = {}
+    for spec in DERIVED_SPECS:
+        try:
+            value = spec.derive(*(fields[name] for name in spec.inputs))
+        except (KeyError, ZeroDivisionError):
+            continue
+        if math.isfinite(value):
+            derived[spec.name] = value
+    return derived
+
+
+def si_fields(car: Car) -> Dict[str, float]:
+    """Canonical values of every spec the car has, for the _si map."""
+    fields = {}
+    for spec in SPECS:
+        measurement = _measurement(car, spec.path)
+        if measurement is not None:
+            value = to_si(measurement.value, measurement.unit)
+            if value is not None:
+                fields[spec.name] = value
+    fields.update(derived_fields(fields))
+    return fields
+
+
+def record_si_value(record: CompactCar, spec: AnySpec) -> Optional[float]:
+    """Canonical value of one spec of a cached record (None if missing)."""
+    if isinstance(spec, DerivedSpec):
+        inputs = {name: record_si_value(record, SPECS_BY_NAME[name]) for name in spec.inputs}
+        return derived_fields({name: value for name, value in inputs.items() if value is not None}).get(spec.name)
+    slot = _SLOTS_BY_PATH[spec.path]
+    unit = unit_member(slot.unit_type, record.codes[slot.unit_index])
+    if unit is None:
+        return None
+    return to_si(record.numbers[slot.value_index], unit)
+
+
+def si_field_updates(field_updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Shadow-field writes that keep _si in step with a set of field updates.
+
+    Args:
+        field_updates: Firestore field-path updates (see patch_car), where
+                       measurements are always written whole
+
+    Returns:
+        _si field-path updates: new values for replaced measurements and
+        DELETE_FIELD for removed ones (including removed parents)
+    """
+    paths = {tuple(FieldPath.from_string(path).parts): value for path, value in field_updates.items()}
+    updates: Dict[str, Any] = {}
+    for spec in SPECS:
+        for depth in range(1, len(spec.path) + 1):
+            if spec.path[:depth] not in paths:
+                continue
+            value = paths[spec.path[:depth]]
+            si_path = FieldPath(SI_FIELD, spec.name).to_api_repr()
+            if depth == len(spec.path) and isinstance(value, dict):
+                si_value = to_si(value["value"], _unit_type(spec)(value["unit"]))
+                updates[si_path] = DELETE_FIELD if si_value is None else si_value
+            else:
+                updates[si_path] = DELETE_FIELD
+            break
+    return updates
+
+
+def touches_derived_specs(si_updates: Dict[str, Any]) -> bool:
+    """Whether a set of _si updates changes an input of a derived spec."""
+    return any(FieldPath.from_string(path).parts[-1] in _DERIVED_INPUTS for path in si_updates)
+
+
+def derived_field_updates(si_updates: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived-spec writes that keep _si consistent after a set of _si updates.
+
+    Args:
+        si_updates: Measurement shadow-field updates (see si_field_updates)
+        current: The document's _si map before the update
+
+    Returns:
+        _si field-path updates for every derived spec whose inputs changed:
+        the new value, or DELETE_FIELD if it can no longer be computed
+    """
+    changed = {FieldPath.from_string(path).parts[-1]: value for path, value in si_updates.items()}
+    affected = [spec for spec in DERIVED_SPECS if changed.keys() & set(spec.inputs)]
+    if not affected:
+        return {}
+    merged = dict(current)
+    for name, value in changed.items():
+        if value is DELETE_FIELD:
+            merged.pop(name, None)
+        else:
+            merged[name] = value
+    derived = derived_fields(merged)
+    return {
+        FieldPath(SI_FIELD, spec.name).to_api_repr(): derived.get(spec.name, DELETE_FIELD)
+        for spec in affected
+    }
+
+
+def _unit_type(spec: Spec):
+    return _SLOTS_BY_PATH[spec.path].unit_type
+
+
+def parse_spec_bound(raw: str) -> Tuple[AnySpec, float]:
+    """Parse a "spec:value" query bound.
+
+    Raises:
+        ValueError: If the spec is unknown or the value isn't a number
+    """
+    name, _, value = raw.partition(":")
+    spec = SPECS_BY_NAME.get(name.strip())
+    if spec is None:
+        raise ValueError(f"Unknown spec '{name}' (expected one of {', '.join(SPECS_BY_NAME)})")
+    try:
+        return spec, float(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: '{value}'")
+
+
+class SpecQuery(NamedTuple):
+    """Range filters and ordering over canonical spec values."""
+    minimums: List[Tuple[AnySpec, float]]
+    maximums: List[Tuple[AnySpec, float]]
+    sort: Optional[AnySpec]
+    descending: bool
+
+    @property
+    def active(self) -> bool:
+        return bool(self.minimums or self.maximums or self.sort)
+
+    @property
+    def order(self) -> Optional[AnySpec]:
+        """Spec results are ordered by: the sort spec, else the first filtered spec."""
+        if self.sort is not None:
+            return self.sort
+        bounds = self.minimums + self.maximums
+        return bounds[0][0] if bounds else None
+
+    @property
+    def canonical(self) -> str:
+        """The query as a string, equal for equal queries ("" if inactive); used in ETags."""
+        parts = [f"min={spec.name}:{value!r}" for spec, value in self.minimums]
+        parts += [f"max={spec.name}:{value!r}" for spec, value in self.maximums]
+        if self.sort is not None:
+            parts.append(f"sort={'-' if self.descending else ''}{self.sort.name}")
+        return "&".join(parts)
+
+
+def parse_spec_query(minimums: List[str], maximums: List[str], sort: Optional[str]) -> SpecQuery:
+    """Parse ?min=, ?max= and ?sort= (prefix "-" for descending).
+
+    Raises:
+        ValueError: If any bound or the sort spec is invalid
+    """
+    sort_spec = None
+    descending = False
+    if sort:
+        descending = sort.startswith("-")
+        name = sort.lstrip("-")
+        sort_spec = SPECS_BY_NAME.get(name)
+        if sort_spec is None:
+            raise ValueError(f"Unknown sort spec '{name}' (expected one of {', '.join(SPECS_BY_NAME)})")
+    return SpecQuery(
+        [parse_spec_bound(raw) for raw in minimums],
+        [parse_spec_bound(raw) for raw in maximums],
+        sort_spec,
+        descending,
+    )
+
+
+def filter_records(records: List[CompactCar], query: SpecQuery) -> List[int]:
+    """Positions of the records matching a spec query, in result order.
+
+    Matches the Firestore query over _si: records missing a filtered or
+    ordered spec are excluded, and ties are broken by car ID.
+    """
+    order = query.order
+    matches: List[Tuple[float, str, int]] = []
+    for position, record in enumerate(records):
+        values = {}
+        for spec in {spec for spec, _ in query.minimums + query.maximums} | {order}:
+            values[spec] = record_si_value(record, spec)
+        if any(value is None for value in values.values()):
+            continue
+        if any(values[spec] < bound for spec, bound in query.minimums):
+            continue
+        if any(values[spec] > bound for spec, bound in query.maximums):
+            continue
+        matches.append((values[order], str(record.id), position))
+    matches.sort(reverse=query.descending)
+    return [position for _, _, position in matches]
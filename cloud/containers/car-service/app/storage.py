@@ -2,10 +2,13 @@
 from __future__ import annotations
 
 import os
+import time
 import logging
+import threading
 from datetime import timedelta
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple
 
+from anyio import to_thread
 from google.cloud import storage
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,16 @@ logger = logging.getLogger(__name__)
 STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "carinspectinator-car-models")
 MODEL_URL_EXPIRATION_HOURS = int(os.getenv("MODEL_URL_EXPIRATION_HOURS", "24"))
 
+# Signed URLs are reused within a window of this length. Defaults to half the
+# expiration, so a URL handed out is always valid for at least that long.
+MODEL_URL_CACHE_WINDOW_SECONDS = int(os.getenv(
+    "MODEL_URL_CACHE_WINDOW_SECONDS", str(MODEL_URL_EXPIRATION_HOURS * 3600 // 2)
+))
+
+# (volumeId, window) -> signed URL
+_url_cache: Dict[Tuple[str, int], str] = {}
+_url_cache_lock = threading.Lock()
+
 
 def get_storage_client() -> storage.Client:
     """Get Google Cloud Storage client.
@@ -88,6 +101,121 @@ def get_model_url_for_volume_id(volume_id: str) -> Optional[str]:
     return generate_signed_url(blob_name)
 
 
+def get_model_urls_for_volume_ids(volume_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Get signed URLs for several cars' 3D models in one pass.
+    
+    Duplicate volumeIds are signed once, and a single storage client and
+    bucket handle are reused for the whole batch.
+    
+    Args:
+        volume_ids: volumeIds of the cars (e.g., ["vw_golf_5_gti", "BMW_M4_f82"])
+        
+    Returns:
+        Dictionary mapping each volumeId to its signed URL, or None if not found
+    """
+    unique_ids = list(dict.fromkeys(v for v in volume_ids if v))
+    if not unique_ids:
+        return {}
+    
+    urls: Dict[str, Optional[str]] = {volume_id: None for volume_id in unique_ids}
+    
+    try:
+        if not STORAGE_BUCKET:
+            logger.error("No storage bucket configured")
+            return urls
+        
+        client = get_storage_client()
+        bucket = client.bucket(STORAGE_BUCKET)
+    except Exception as e:
+        logger.error(f"Error creating storage client for batch signing: {e}")
+        return urls
+    
+    for volume_id in unique_ids:
+        blob_name = f"models/{volume_id}.usdz"
+        try:
+            blob = bucket.blob(blob_name)
+            if not blob.exists():
+                logger.warning(f"Blob does not exist: {blob_name}")
+                continue
+            urls[volume_id] = blob.generate_signed_url(
+                version="v4",
+                expiration=timedelta(hours=MODEL_URL_EXPIRATION_HOURS),
+                method="GET"
+            )
+        except Exception as e:
+            logger.error(f"Error generating signed URL for {blob_name}: {e}")
+    
+    logger.info(f"Generated {sum(1 for u in urls.values() if u)} signed URLs in batch")
+    return urls
+
+
+async def get_model_urls_for_volume_ids_async(volume_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Async variant of get_model_urls_for_volume_ids for the asyncio data path.
+    
+    The storage client has no asyncio API, so the existence checks and
+    signing for the whole batch run in a single worker thread. A request
+    therefore pays at most one thread handoff, and none when every car
+    already carries a model URL.
+    
+    Args:
+        volume_ids: volumeIds of the cars
+        
+    Returns:
+        Dictionary mapping each volumeId to its signed URL, or None if not found
+    """
+    unique_ids = list(dict.fromkeys(v for v in volume_ids if v))
+    if not unique_ids:
+        return {}
+    return await to_thread.run_sync(get_model_urls_for_volume_ids, unique_ids)
+
+
+def current_url_window() -> int:
+    """Index of the current signed-URL reuse window."""
+    return int(time.time() // max(MODEL_URL_CACHE_WINDOW_SECONDS, 1))
+
+
+def get_cached_model_urls(volume_ids: Iterable[str], window: Optional[int] = None) -> Dict[str, Optional[str]]:
+    """Get signed model URLs, reusing URLs signed earlier in the same window.
+    
+    Only volumeIds without a URL for the window are signed, in one batch.
+    Entries from earlier windows are dropped as soon as a new window starts.
+    Misses (missing model or signing error) are not cached, so they are
+    retried on the next call.
+    
+    Args:
+        volume_ids: volumeIds of the cars
+        window: Reuse window (defaults to current_url_window())
+        
+    Returns:
+        Dictionary mapping each volumeId to its signed URL, or None if not found
+    """
+    window = current_url_window() if window is None else window
+    unique_ids = list(dict.fromkeys(v for v in volume_ids if v))
+    
+    with _url_cache_lock:
+        urls = {v: _url_cache[(v, window)] for v in unique_ids if (v, window) in _url_cache}
+    
+    missing = [v for v in unique_ids if v not in urls]
+    if missing:
+        signed = get_model_urls_for_volume_ids(missing)
+        with _url_cache_lock:
+            stale = [key for key in _url_cache if key[1] != window]
+            for key in stale:
+                del _url_cache[key]
+            for volume_id, url in signed.items():
+                if url:
+                    _url_cache[(volume_id, window)] = url
+        urls.update(signed)
+    
+    return urls
+
+
+def clear_url_cache() -> None:
+    """Drop every cached signed URL."""
+    with _url_cache_lock:
+        _url_cache.clear()
+
+
 def upload_model(
     local_path: str,
     volume_id: str,
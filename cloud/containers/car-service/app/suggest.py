@@ -0,0 +1,203 @@
+"""Typeahead suggestions for makes, models and engine codes.
+
+Every distinct make, make + model and engine code in the catalog is a
+suggestion, ranked by how many cars it matches. Text is normalized like
+search terms (see app.text.tokenize), and each suggestion is indexed
+under every word it contains, so "m3" and "bmw m" both find "BMW M3".
+
+Indexed strings are kept in one sorted array, so the suggestions for a
+prefix are a contiguous range. The top SUGGEST_TOP_K of every prefix that
+has any are precomputed, so a lookup is one dict access. On catalog
+changes only suggestions whose counts changed are touched, and only the
+prefixes of their indexed strings are re-ranked.
+"""
+from __future__ import annotations
+
+import os
+import bisect
+import hashlib
+import heapq
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.catalog import Catalog, catalog_cache
+from app.compact import CompactCar, leaf_slot
+from app.schemas import Suggestion, SuggestionKind
+from app.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "8"))
+
+_MAKE, _MODEL, _CODE = (leaf_slot(path)[0] for path in (("make",), ("model",), ("engine", "code")))
+# Ties in popularity list makes before models before engine codes
+_KIND_ORDER = {kind: order for order, kind in enumerate(SuggestionKind)}
+
+
+class SuggestionKey(NamedTuple):
+    kind: SuggestionKind
+    normalized: str  # space-joined tokens, e.g. "bmw m3"
+
+
+class Suggestions(NamedTuple):
+    """Ranked suggestions for one prefix and a digest of them, for ETags."""
+    items: Tuple[Suggestion, ...]
+    digest: str
+
+
+EMPTY = Suggestions((), hashlib.blake2b(b"", digest_size=8).hexdigest())
+
+
+# Makes, models and codes repeat across cars, so most lookups hit
+@lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    """Lookup form of a text or prefix ("Citroën  C4" -> "citroen c4")."""
+    return " ".join(tokenize(text))
+
+
+def car_suggestions(record: CompactCar) -> List[Tuple[SuggestionKey, str]]:
+    """Suggestion keys of a car, each with the car's spelling of it."""
+    make, model, code = record.strings[_MAKE], record.strings[_MODEL], record.strings[_CODE]
+    texts = [
+        (SuggestionKind.make, make),
+        (SuggestionKind.model, f"{make} {model}" if make and model else None),
+        (SuggestionKind.engineCode, code),
+    ]
+    keys = []
+    for kind, text in texts:
+        normalized = normalize(text) if text else ""
+        if normalized:
+            keys.append((SuggestionKey(kind, normalized), text))
+    return keys
+
+
+def _indexed(key: SuggestionKey) -> List[str]:
+    """Strings a suggestion is found by: its normalized text from each word on."""
+    words = key.normalized.split(" ")
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+class SuggestIndex:
+    """Sorted-array prefix index with precomputed top-k per prefix."""
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        # Each car's suggestions, to retract them when it changes
+        self._car_keys: Dict[str, List[Tuple[SuggestionKey, str]]] = {}
+        # Spellings of each suggestion, each with the number of cars using it
+        self._spellings: Dict[SuggestionKey, Counter] = {}
+        # (indexed string, kind order, key), sorted
+        self._entries: List[Tuple[str, int, SuggestionKey]] = []
+        self._top: Dict[str, Suggestions] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._car_keys = {}
+            self._spellings = {}
+            self._entries = []
+            self._top = {}
+
+    def suggest(self, catalog: Catalog, prefix: str) -> Suggestions:
+        """The most popular suggestions starting with a prefix (any word of them)."""
+        normalized = normalize(prefix)
+        with self._lock:
+            if self._version != catalog.version:
+                self._build(catalog)
+            if not normalized:
+                return EMPTY
+            return self._top.get(normalized, EMPTY)
+
+    def on_catalog_change(self, catalog: Catalog, changed: FrozenSet[str], removed: FrozenSet[str]) -> None:
+        """Catalog change listener: re-rank only the prefixes of changed suggestions."""
+        with self._lock:
+            if self._version is None or self._version >= catalog.version:
+                return
+            if self._version + 1 != catalog.version:
+                # Missed a change; rebuild on the next lookup
+                self._version = -1
+                return
+            touched: Set[SuggestionKey] = set()
+            for car_id in removed | changed:
+                for key, text in self._car_keys.pop(car_id, ()):
+                    self._count(key, text, -1)
+                    touched.add(key)
+            for car_id in changed:
+                entry = catalog.entries.get(car_id)
+                if entry is not None:
+                    keys = car_suggestions(entry.record)
+                    self._car_keys[car_id] = keys
+                    for key, text in keys:
+                        self._count(key, text, 1)
+                        touched.add(key)
+            self._reindex(touched)
+            self._version = catalog.version
+
+    def _build(self, catalog: Catalog) -> None:
+        self._car_keys = {car_id: car_suggestions(entry.record) for car_id, entry in catalog.entries.items()}
+        self._spellings = {}
+        for keys in self._car_keys.values():
+            for key, text in keys:
+                self._count(key, text, 1)
+        self._entries = sorted(
+            (indexed, _KIND_ORDER[key.kind], key) for key in self._spellings for indexed in _indexed(key)
+        )
+        self._top = {}
+        self._rank({indexed[:end] for indexed, _, _ in self._entries for end in range(1, len(indexed) + 1)})
+        self._version = catalog.version
+        logger.info(f"Suggest index built: {len(self._spellings)} suggestions, {len(self._top)} prefixes")
+
+    def _count(self, key: SuggestionKey, text: str, delta: int) -> None:
+        spellings = self._spellings.setdefault(key, Counter())
+        spellings[text] += delta
+        if spellings[text] <= 0:
+            del spellings[text]
+
+    def _reindex(self, touched: Iterable[SuggestionKey]) -> None:
+        """Update entries and re-rank prefixes after counts of some suggestions changed."""
+        prefixes = set()
+        for key in touched:
+            alive = bool(self._spellings.get(key))
+            for indexed in _indexed(key):
+                entry = (indexed, _KIND_ORDER[key.kind], key)
+                position = bisect.bisect_left(self._entries, entry)
+                present = position < len(self._entries) and self._entries[position] == entry
+                if alive and not present:
+                    self._entries.insert(position, entry)
+                elif not alive and present:
+                    del self._entries[position]
+                prefixes.update(indexed[:end] for end in range(1, len(indexed) + 1))
+            if not alive:
+                self._spellings.pop(key, None)
+        self._rank(prefixes)
+
+    def _rank(self, prefixes: Iterable[str]) -> None:
+        for prefix in prefixes:
+            start = bisect.bisect_left(self._entries, (prefix,))
+            end = bisect.bisect_left(self._entries, (prefix + "\U0010ffff",))
+            if start == end:
+                self._top.pop(prefix, None)
+                continue
+            keys = {key for _, _, key in self._entries[start:end]}
+            best = heapq.nsmallest(self.top_k, keys, key=self._rank_key)
+            items = tuple(self._suggestion(key) for key in best)
+            digest = hashlib.blake2b(repr([(item.text, item.kind.value, item.cars) for item in items]).encode(), digest_size=8)
+            self._top[prefix] = Suggestions(items, digest.hexdigest())
+
+    def _rank_key(self, key: SuggestionKey):
+        return -sum(self._spellings[key].values()), _KIND_ORDER[key.kind], key.normalized
+
+    def _suggestion(self, key: SuggestionKey) -> Suggestion:
+        spellings = self._spellings[key]
+        # The most common spelling, ties to the first alphabetically
+        text = min(spellings, key=lambda text: (-spellings[text], text))
+        return Suggestion.model_construct(text=text, kind=key.kind, cars=sum(spellings.values()))
+
+
+suggest_index = SuggestIndex()
+catalog_cache.add_change_listener(suggest_index.on_catalog_change)
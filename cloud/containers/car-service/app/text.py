@@ -0,0 +1,16 @@
+"""Text normalization shared by search, suggestions and slugs."""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case, accent-free words of a text ("Citroën C4" -> ["citroen", "c4"])."""
+    if text.isascii():
+        return _WORD.findall(text.lower())
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return _WORD.findall("".join(char for char in decomposed if not unicodedata.combining(char)))
@@ -0,0 +1,173 @@
+"""Unit-system conversion of car specs.
+
+Measurements are stored in whatever unit the source used. For
+?units=metric or ?units=imperial, every measurement whose unit isn't
+already part of the requested system is converted to that system's unit
+for its dimension, using the tables below.
+
+The tables are compiled per system into one rule per (measurement slot,
+stored unit code). Converting a CompactCar is then a single pass over its
+packed value and unit arrays, with no per-field model traversal. The
+render cache keys fragments by unit system, so each car version is
+converted at most once per system.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.compact import MEASUREMENT_SLOTS, CompactCar, unit_code
+from app.schemas import (
+    Car, UnitSystem,
+    VolumeUnit, PowerUnit, TorqueUnit, SpeedUnit, LengthUnit, MassUnit, FuelEfficiencyUnit,
+)
+
+# Liters per US gallon times miles per 100 km: L/100km = this / mpg and back
+_MPG_L100KM = 235.214583
+
+# Value of one unit in the base unit of its dimension
+UNIT_FACTORS: Dict[object, float] = {
+    VolumeUnit.liters: 1.0,
+    VolumeUnit.gallons: 3.785411784,
+    PowerUnit.kilowatts: 1.0,
+    PowerUnit.horsepower: 0.745699872,
+    TorqueUnit.newtonMeters: 1.0,
+    TorqueUnit.poundForceFeet: 1.3558179483,
+    SpeedUnit.kilometersPerHour: 1.0,
+    SpeedUnit.milesPerHour: 1.609344,
+    LengthUnit.millimeters: 1.0,
+    LengthUnit.centimeters: 10.0,
+    LengthUnit.meters: 1000.0,
+    LengthUnit.inches: 25.4,
+    MassUnit.kilograms: 1.0,
+    MassUnit.pounds: 0.45359237,
+}
+
+# Units that are consumption rather than distance per volume
+RECIPROCAL_UNITS = frozenset({FuelEfficiencyUnit.litersPer100km})
+
+# Units each system accepts as-is; the first one listed for a dimension is
+# the conversion target
+SYSTEM_UNITS: Dict[UnitSystem, Tuple[object, ...]] = {
+    UnitSystem.metric: (
+        VolumeUnit.liters, PowerUnit.kilowatts, TorqueUnit.newtonMeters, SpeedUnit.kilometersPerHour,
+        LengthUnit.millimeters, LengthUnit.centimeters, LengthUnit.meters, MassUnit.kilograms,
+        FuelEfficiencyUnit.litersPer100km,
+    ),
+    UnitSystem.imperial: (
+        VolumeUnit.gallons, PowerUnit.horsepower, TorqueUnit.poundForceFeet, SpeedUnit.milesPerHour,
+        LengthUnit.inches, MassUnit.pounds, FuelEfficiencyUnit.milesPerGallon,
+    ),
+}
+
+# Measurements quoted in the same unit everywhere (US spec sheets give
+# displacement in liters too)
+FIXED_UNITS: Dict[Tuple[str, ...], object] = {
+    ("engine", "displacement"): VolumeUnit.liters,
+}
+
+# Decimal places kept after converting into a unit
+UNIT_DIGITS: Dict[object, int] = {
+    VolumeUnit.liters: 1,
+    VolumeUnit.gallons: 1,
+    PowerUnit.kilowatts: 0,
+    PowerUnit.horsepower: 0,
+    TorqueUnit.newtonMeters: 0,
+    TorqueUnit.poundForceFeet: 0,
+    SpeedUnit.kilometersPerHour: 0,
+    SpeedUnit.milesPerHour: 0,
+    LengthUnit.millimeters: 0,
+    LengthUnit.inches: 1,
+    MassUnit.kilograms: 0,
+    MassUnit.pounds: 0,
+    FuelEfficiencyUnit.litersPer100km: 1,
+    FuelEfficiencyUnit.milesPerGallon: 0,
+}
+
+
+class _Rule(NamedTuple):
+    target_code: int
+    factor: float
+    reciprocal: bool
+    digits: int
+
+
+def system_unit(path: Tuple[str, ...], unit_type: type, system: UnitSystem):
+    """The one unit a measurement is quoted in for a system.
+
+    None when the system doesn't name a unit for that dimension (e.g.
+    durations, or the native system).
+    """
+    fixed = FIXED_UNITS.get(path)
+    if fixed is not None:
+        return fixed
+    return next((unit for unit in SYSTEM_UNITS.get(system, ()) if type(unit) is unit_type), None)
+
+
+def _target(unit, system: UnitSystem, path: Tuple[str, ...]):
+    fixed = FIXED_UNITS.get(path)
+    if fixed is not None:
+        return fixed
+    accepted = [candidate for candidate in SYSTEM_UNITS[system] if type(candidate) is type(unit)]
+    if not accepted or unit in accepted:
+        return unit
+    return accepted[0]
+
+
+def _rule(unit, target) -> Optional[_Rule]:
+    if target is unit:
+        return None
+    digits = UNIT_DIGITS[target]
+    if (unit in RECIPROCAL_UNITS) != (target in RECIPROCAL_UNITS):
+        return _Rule(unit_code(target), _MPG_L100KM, True, digits)
+    return _Rule(unit_code(target), UNIT_FACTORS[unit] / UNIT_FACTORS[target], False, digits)
+
+
+def _compile(system: UnitSystem) -> Tuple[Tuple[int, int, Dict[int, _Rule]], ...]:
+    plan = []
+    for slot in MEASUREMENT_SLOTS:
+        rules = {}
+        for unit in slot.unit_type:
+            rule = _rule(unit, _target(unit, system, slot.path))
+            if rule is not None:
+                rules[unit_code(unit)] = rule
+        if rules:
+            plan.append((slot.value_index, slot.unit_index, rules))
+    return tuple(plan)
+
+
+_PLANS = {system: _compile(system) for system in SYSTEM_UNITS}
+
+
+def convert_record(record: CompactCar, system: UnitSystem) -> CompactCar:
+    """Return the record with every measurement in the given unit system."""
+    plan = _PLANS.get(system)
+    if not plan:
+        return record
+    numbers: Optional[array] = None
+    codes: Optional[bytearray] = None
+    for value_index, unit_index, rules in plan:
+        rule = rules.get(record.codes[unit_index])
+        if rule is None:
+            continue
+        if numbers is None:
+            numbers, codes = array("d", record.numbers), bytearray(record.codes)
+        value = numbers[value_index]
+        if rule.reciprocal:
+            value = rule.factor / value if value else value
+        else:
+            value = value * rule.factor
+        numbers[value_index] = round(value, rule.digits)
+        codes[unit_index] = rule.target_code
+    if numbers is None:
+        return record
+    return record.replace(numbers, bytes(codes))
+
+
+def convert_car(car: Car, system: UnitSystem) -> Car:
+    """Return the car with every measurement in the given unit system."""
+    if system == UnitSystem.native:
+        return car
+    record = CompactCar.from_car(car)
+    converted = convert_record(record, system)
+    return car if converted is record else converted.to_car()
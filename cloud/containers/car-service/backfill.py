@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Backfill derived fields on existing car documents in Firestore.
+
+Usage:
+    python backfill.py <command> [--dry-run]
+
+Commands:
+    updated-at   Stamp updatedAt on cars written before it was maintained,
+                 so they show up in the /v1/cars/changes feed
+    si           Recompute the _si canonical spec values and derived
+                 metrics used by the min/max/sort filters on GET /v1/cars
+    facets       Recount the facet stats document read by GET /v1/cars/facets
+    keys         Give cars without a slug their default one and write the
+                 car_keys claims that keep volumeIds and slugs unique
+
+Prerequisites:
+    - Set GOOGLE_APPLICATION_CREDENTIALS environment variable to your service account key
+    - Or run in GCP environment with appropriate permissions
+"""
+
+import argparse
+import sys
+import logging
+from pathlib import Path
+
+from google.cloud.firestore import SERVER_TIMESTAMP
+
+# Add the current directory to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.firebase import initialize_firebase, get_firestore_client
+from app.car_keys import CLAIM_CAR_ID_FIELD, KEY_FIELDS, claim_document_id, document_keys, slugify
+from app.facets import FACET_FIELD_PATHS, STATS_COUNTS_FIELD, STATS_TOTAL_FIELD, count_facets, document_facets
+from app.repositories import (
+    CARS_COLLECTION, FACET_STATS_DOCUMENT, KEYS_COLLECTION, STATS_COLLECTION, UPDATED_AT_FIELD,
+)
+from app.schemas import Car
+from app.specs import SI_FIELD, si_fields
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_updated_at(db, dry_run: bool) -> int:
+    """Stamp updatedAt on every car document that lacks it."""
+    writer = None if dry_run else db.bulk_writer()
+    count = 0
+    
+    for doc in db.collection(CARS_COLLECTION).stream():
+        if UPDATED_AT_FIELD in (doc.to_dict() or {}):
+            continue
+        count += 1
+        logger.info(f"{'Would stamp' if dry_run else 'Stamping'} {doc.id}")
+        if writer:
+            writer.update(doc.reference, {UPDATED_AT_FIELD: SERVER_TIMESTAMP})
+    
+    if writer:
+        writer.close()
+    return count
+
+
+def backfill_si(db, dry_run: bool) -> int:
+    """Rewrite _si on every car document whose canonical values are stale."""
+    writer = None if dry_run else db.bulk_writer()
+    count = 0
+    
+    for doc in db.collection(CARS_COLLECTION).stream():
+        car_data = doc.to_dict() or {}
+        try:
+            fields = si_fields(Car(**{**car_data, 'id': doc.id}))
+        except Exception as e:
+            logger.warning(f"Skipping {doc.id}, it doesn't validate: {e}")
+            continue
+        if car_data.get(SI_FIELD) == fields:
+            continue
+        count += 1
+        logger.info(f"{'Would update' if dry_run else 'Updating'} {doc.id}")
+        if writer:
+            writer.update(doc.reference, {SI_FIELD: fields})
+    
+    if writer:
+        writer.close()
+    return count
+
+
+def backfill_facets(db, dry_run: bool) -> int:
+    """Recount every car's facets and overwrite the stats document.
+    
+    Writes landing while it runs may be missed; run it when writes are quiet.
+    """
+    docs = db.collection(CARS_COLLECTION).select(FACET_FIELD_PATHS).stream()
+    total, counts = count_facets((document_facets(doc.to_dict()) for doc in docs), {})
+    stats = {
+        STATS_TOTAL_FIELD: total,
+        STATS_COUNTS_FIELD: {name: dict(values) for name, values in counts.items()},
+    }
+    
+    stats_ref = db.collection(STATS_COLLECTION).document(FACET_STATS_DOCUMENT)
+    stored = stats_ref.get()
+    if stored.exists and stored.to_dict() == stats:
+        return 0
+    logger.info(f"{'Would write' if dry_run else 'Writing'} facet counts of {total} cars")
+    if not dry_run:
+        stats_ref.set(stats)
+    return total
+
+
+def backfill_keys(db, dry_run: bool) -> int:
+    """Default missing slugs and claim every car's volumeId and slug.
+    
+    Cars are visited in ID order, so when two cars share a key value the
+    first keeps it; the other is logged and left for a manual fix. Writes
+    landing while it runs may be missed; run it when writes are quiet.
+    """
+    writer = None if dry_run else db.bulk_writer()
+    owners = {
+        doc.id: (doc.to_dict() or {}).get(CLAIM_CAR_ID_FIELD)
+        for doc in db.collection(KEYS_COLLECTION).stream()
+    }
+    count = 0
+    
+    docs = db.collection(CARS_COLLECTION).select(list(KEY_FIELDS) + ["make", "model", "year"]).stream()
+    for doc in sorted(docs, key=lambda doc: doc.id):
+        car_data = doc.to_dict() or {}
+        keys = document_keys(car_data)
+        updates = {}
+        if "slug" not in keys:
+            slug = slugify(" ".join(str(car_data[part]) for part in ("make", "model", "year") if car_data.get(part)))
+            if slug:
+                if owners.get(claim_document_id("slug", slug)) not in (None, doc.id):
+                    slug = f"{slug}-{doc.id[:8]}"
+                keys["slug"] = updates["slug"] = slug
+        
+        claims = []
+        for field, value in keys.items():
+            claim_id = claim_document_id(field, value)
+            owner = owners.get(claim_id)
+            if owner is None:
+                owners[claim_id] = doc.id
+                claims.append(claim_id)
+            elif owner != doc.id:
+                logger.warning(f"{doc.id} has {field} '{value}', already used by car {owner}; skipping it")
+        if not claims and not updates:
+            continue
+        
+        count += 1
+        logger.info(f"{'Would claim' if dry_run else 'Claiming'} {', '.join(claims) or 'no keys'} for {doc.id}")
+        if writer:
+            for claim_id in claims:
+                writer.create(db.collection(KEYS_COLLECTION).document(claim_id), {CLAIM_CAR_ID_FIELD: doc.id})
+            if updates:
+                # updatedAt lets catalog caches pick up the new slug
+                writer.update(doc.reference, {**updates, UPDATED_AT_FIELD: SERVER_TIMESTAMP})
+    
+    if writer:
+        writer.close()
+    return count
+
+
+COMMANDS = {
+    "updated-at": backfill_updated_at,
+    "si": backfill_si,
+    "facets": backfill_facets,
+    "keys": backfill_keys,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill derived fields on car documents")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+    
+    logger.info("Initializing Firebase...")
+    initialize_firebase()
+    db = get_firestore_client()
+    
+    count = COMMANDS[args.command](db, args.dry_run)
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Backfill '{args.command}' complete! {count} cars {'to update' if args.dry_run else 'updated'}")
+    logger.info(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        logger.error(f"Backfill failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sync (worker thread) and async (AsyncClient) data paths.
+
+Firestore is replaced by an in-process fake that sleeps for a configurable
+round-trip latency, so the numbers isolate what the service itself adds:
+thread handoff and the default 40-thread limiter on the sync path versus
+awaiting directly on the event loop on the async path.
+
+Usage:
+    python benchmarks/bench_data_path.py [--requests 2000] [--concurrency 200] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from app.main import app
+import app.routes as routes
+
+CAR_ID = str(uuid4())
+CAR_DATA = {
+    "make": "BMW",
+    "model": "M3",
+    "year": 2020,
+    "bodyStyle": "Sedan",
+    "engine": {"displacement": {"value": 3.0, "unit": "liters"}, "cylinders": 6},
+    "performance": {"horsepower": {"value": 473, "unit": "horsepower"}},
+}
+
+
+class _Snapshot:
+    id = CAR_ID
+    exists = True
+
+    def to_dict(self):
+        return dict(CAR_DATA)
+
+
+class _SyncDocRef:
+    def __init__(self, latency):
+        self._latency = latency
+
+    def get(self):
+        time.sleep(self._latency)
+        return _Snapshot()
+
+
+class _AsyncDocRef(_SyncDocRef):
+    async def get(self):
+        await asyncio.sleep(self._latency)
+        return _Snapshot()
+
+
+class _FakeClient:
+    def __init__(self, doc_ref):
+        self._doc_ref = doc_ref
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return self._doc_ref
+
+
+async def _run(path: str, requests: int, concurrency: int) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/v1/cars/{CAR_ID}")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        with patch.object(routes, "CAR_DATA_PATH", path):
+            await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def _report(path: str, latencies: list, elapsed: float) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{path:>5}: {len(latencies) / elapsed:8.0f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+        f"p99 {p99 * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    print(
+        f"GET /v1/cars/{{carId}}: {args.requests} requests, "
+        f"concurrency {args.concurrency}, Firestore latency {args.latency_ms} ms"
+    )
+
+    with patch("app.repositories.get_firestore_client", return_value=_FakeClient(_SyncDocRef(latency))), \
+         patch("app.async_repositories.get_async_firestore_client", return_value=_FakeClient(_AsyncDocRef(latency))):
+        for path in ("sync", "async"):
+            start = time.perf_counter()
+            latencies = asyncio.run(_run(path, args.requests, args.concurrency))
+            _report(path, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare ways of turning a page of Firestore car documents into Car models:
+per-document validation (the old loop), one TypeAdapter call per page, and
+model_construct as a lower bound for skipping validation.
+
+Usage:
+    python benchmarks/bench_document_parsing.py [--cars 300] [--iterations 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_serialization import DOCUMENT
+from app.documents import parse_car_documents
+from app.schemas import Car
+
+
+def make_docs(count: int):
+    docs = []
+    for _ in range(count):
+        data = dict(DOCUMENT)
+        doc = MagicMock()
+        doc.id = str(uuid4())
+        doc.exists = True
+        doc.to_dict = lambda data=data: dict(data)
+        docs.append(doc)
+    return docs
+
+
+def per_document(docs):
+    cars = []
+    for doc in docs:
+        car_data = doc.to_dict()
+        car_data['id'] = doc.id
+        cars.append(Car(**car_data))
+    return cars
+
+
+def flat_construct(docs):
+    # Top level only: nested structures stay plain dicts, so this is not a
+    # usable Car, just the floor for any construct-based shortcut
+    return [Car.model_construct(id=doc.id, **doc.to_dict()) for doc in docs]
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    docs = make_docs(args.cars)
+
+    scenarios = {
+        "per-document": lambda: per_document(docs),
+        "page": lambda: parse_car_documents(docs),
+        "construct": lambda: flat_construct(docs),
+    }
+    print(f"Parsing {args.cars} documents, {args.iterations} iterations")
+    baseline = None
+    for name, fn in scenarios.items():
+        elapsed = per_call(fn, args.iterations)
+        baseline = baseline or elapsed
+        print(f"{name:>14} {elapsed * 1000:8.2f} ms/page  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare peak memory and time-to-first-byte of the JSON list and NDJSON stream.
+
+Firestore is replaced by an in-process fake that yields documents lazily, the
+way the real document stream pages through the collection. Signing is
+stubbed out so only the service's own buffering is measured.
+
+list:   repo.get_cars() -> one JSON array (whole catalog in memory)
+stream: repo.iter_cars() -> NDJSON windows of NDJSON_WINDOW_SIZE cars
+
+Usage:
+    python benchmarks/bench_ndjson_stream.py [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.get_cars import get_cars
+from app.services.stream_cars import stream_cars
+
+DOCUMENT = {
+    "make": "BMW",
+    "model": "M3",
+    "blurb": "A sporty sedan with impressive performance",
+    "year": 2020,
+    "bodyStyle": "Sedan",
+    "engine": {"displacement": {"value": 3.0, "unit": "liters"}, "cylinders": 6, "code": "S58"},
+    "performance": {"horsepower": {"value": 473, "unit": "horsepower"}},
+    "dimensions": {"curbWeight": {"value": 3830, "unit": "pounds"}},
+}
+
+
+class _Snapshot:
+    exists = True
+
+    def __init__(self):
+        self.id = str(uuid4())
+
+    def to_dict(self):
+        return dict(DOCUMENT)
+
+
+class _FakeClient:
+    def __init__(self, size):
+        self._size = size
+
+    def collection(self, name):
+        return self
+
+    def stream(self):
+        return (_Snapshot() for _ in range(self._size))
+
+
+def measure(render, size: int):
+    """Return (time to first chunk, total time, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    for _ in render():
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'cars':>7} {'mode':>7} {'ttfb ms':>9} {'total ms':>9} {'peak MiB':>9}")
+    for size in args.sizes:
+        with patch('app.repositories.get_firestore_client', return_value=_FakeClient(size)):
+            for mode, render in (
+                ("list", lambda: [get_cars({}).body]),
+                ("stream", lambda: stream_cars({})),
+            ):
+                first, total, peak = measure(render, size)
+                print(f"{size:>7} {mode:>7} {first * 1000:9.1f} {total * 1000:9.1f} {peak / 2 ** 20:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Time the full-text search index over synthetic catalogs: a cold build that
+tokenizes every car, a build from a disk snapshot, an incremental update
+of a few changed cars, and BM25 queries.
+
+Usage:
+    python benchmarks/bench_search.py [--cars 1000 10000 100000] [--changed 10]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.catalog import Catalog
+from app.compact import leaf_slot
+from app.search import SearchIndex
+from bench_spec_index import make_catalog
+
+LATER = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+MAKES = ["BMW", "Audi", "Mercedes", "Toyota", "Honda", "Porsche", "Volkswagen", "Citroën", "Ford", "Mazda"]
+WORDS = (
+    "turbo sedan coupe hatch wagon sport touring limited hybrid diesel quattro xdrive "
+    "carbon ceramic brakes adaptive suspension launch control track pack heritage edition"
+).split()
+QUERIES = ["bmw", "turbo coupe", "carbon ceramic brakes", "citroen hybrid touring", "nonexistent"]
+
+
+def with_text(catalog: Catalog) -> Catalog:
+    """The catalog with randomized makes, models and blurbs."""
+    rng = random.Random(7)
+    indexes = {name: leaf_slot((name,))[0] for name in ("make", "model", "blurb")}
+    entries = {}
+    for car_id, entry in catalog.entries.items():
+        strings = list(entry.record.strings)
+        strings[indexes["make"]] = rng.choice(MAKES)
+        strings[indexes["model"]] = f"{rng.choice('ABCMSX')}{rng.randint(1, 9)}"
+        strings[indexes["blurb"]] = " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))
+        entry.record.strings = tuple(strings)
+        entries[car_id] = entry
+    return Catalog(catalog.version, MappingProxyType(entries))
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'cars':>8} {'build ms':>9} {'snapshot ms':>12} {'update ms':>10} {'query ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.cars:
+            catalog = with_text(make_catalog(count))
+            path = str(Path(directory) / f"search-{count}.json.gz")
+
+            start = time.perf_counter()
+            cold = SearchIndex(snapshot_path=path)
+            cold.search(catalog, "bmw", 10)
+            build = time.perf_counter() - start
+            # The snapshot is written in the background; wait for it
+            cold.flush()
+
+            index = SearchIndex(snapshot_path=path, snapshot_interval=float("inf"))
+            start = time.perf_counter()
+            index.search(catalog, "bmw", 10)
+            from_snapshot = time.perf_counter() - start
+
+            changed = frozenset(list(catalog.entries)[::max(1, count // args.changed)][:args.changed])
+            entries = dict(catalog.entries)
+            for car_id in changed:
+                entries[car_id] = replace(entries[car_id], update_time=LATER)
+            next_catalog = Catalog(catalog.version + 1, MappingProxyType(entries))
+            start = time.perf_counter()
+            index.on_catalog_change(next_catalog, changed, frozenset())
+            update = time.perf_counter() - start
+
+            query = sum(
+                per_call(lambda: index.search(next_catalog, text, 20), args.iterations) for text in QUERIES
+            ) / len(QUERIES)
+            print(
+                f"{count:>8} {build * 1000:9.1f} {from_snapshot * 1000:12.1f}"
+                f" {update * 1000:10.3f} {query * 1000:9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark CPU per request for the car list serialization path.
+
+before: Car(**doc) -> model_dump(mode='json') -> FastAPI re-validates against
+        response_model=List[Car] -> jsonable_encoder/json.dumps
+after:  Car(**doc) -> TypeAdapter(List[Car]).dump_json (one pass)
+cached: catalog entries -> RenderCache.render_list (joins cached fragments)
+
+Usage:
+    python benchmarks/bench_serialization.py [--cars 50] [--iterations 200]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.catalog import CatalogEntry
+from app.render_cache import RenderCache
+from app.schemas import Car
+from app.serialization import dump_cars_json
+
+DOCUMENT = {
+    "make": "BMW",
+    "model": "M3",
+    "blurb": "A sporty sedan with impressive performance",
+    "iconAssetName": "bmw_m3",
+    "year": 2020,
+    "bodyStyle": "Sedan",
+    "volumeId": "BMW_M4_f82",
+    "engine": {
+        "displacement": {"value": 3.0, "unit": "liters"},
+        "cylinders": 6, "configuration": "I6", "fuel": "gasoline",
+        "induction": "turbocharged", "code": "S58",
+    },
+    "performance": {
+        "horsepower": {"value": 473, "unit": "horsepower"},
+        "torque": {"value": 406, "unit": "poundForceFeet"},
+        "zeroToSixty": {"value": 4.1, "unit": "seconds"},
+        "topSpeed": {"value": 155, "unit": "milesPerHour"},
+        "epaCity": {"value": 16, "unit": "milesPerGallon"},
+        "epaHighway": {"value": 23, "unit": "milesPerGallon"},
+    },
+    "dimensions": {
+        "wheelbase": {"value": 112.8, "unit": "inches"},
+        "length": {"value": 189.1, "unit": "inches"},
+        "width": {"value": 74.3, "unit": "inches"},
+        "height": {"value": 56.9, "unit": "inches"},
+        "curbWeight": {"value": 3830, "unit": "pounds"},
+        "fuelTank": {"value": 15.6, "unit": "gallons"},
+    },
+    "drivetrain": {"layout": "rwd", "transmission": "manual", "gears": 6},
+    "otherSpecs": {"features": "M Sport exhaust, Adaptive M suspension"},
+}
+
+RESPONSE_FIELD = create_response_field(name="Response_get_cars", type_=List[Car], mode="serialization")
+LOOP = asyncio.new_event_loop()
+
+
+def before(documents) -> bytes:
+    cars = [Car(id=doc_id, **doc) for doc_id, doc in documents]
+    content = [car.model_dump(mode='json') for car in cars]
+    validated = LOOP.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=content))
+    return JSONResponse(validated).body
+
+
+def after(documents) -> bytes:
+    return dump_cars_json(Car(id=doc_id, **doc) for doc_id, doc in documents)
+
+
+RENDER_CACHE = RenderCache(32 * 1024 * 1024)
+UPDATE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def cached(entries) -> bytes:
+    # Fixed URL window; cars have modelUrl set, so no signing happens
+    return RENDER_CACHE.render_list(entries, window=0)
+
+
+def measure(fn, documents, iterations: int) -> float:
+    fn(documents)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(documents)
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    documents = [(str(uuid4()), DOCUMENT) for _ in range(args.cars)]
+    print(f"GET /v1/cars with {args.cars} cars, {args.iterations} iterations (CPU time per request)")
+
+    entries = [
+        CatalogEntry(Car(id=doc_id, modelUrl="https://example.com/model.usdz", **doc), UPDATE_TIME)
+        for doc_id, doc in documents
+    ]
+
+    results = {name: measure(fn, documents, args.iterations) for name, fn in (("before", before), ("after", after))}
+    results["cached"] = measure(cached, entries, args.iterations)
+    for name, seconds in results.items():
+        print(f"{name:>6}: {seconds * 1000:8.3f} ms")
+    print(f"speedup: {results['before'] / results['after']:.2f}x (after), "
+          f"{results['before'] / results['cached']:.2f}x (cached)")
+
+
+if __name__ == "__main__":
+    main()
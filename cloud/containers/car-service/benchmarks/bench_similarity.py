@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Time similar-car search over synthetic catalogs: building the normalized
+feature matrix, one uncached query, a cached query, and a batch of queries
+answered by one matrix product.
+
+Usage:
+    python benchmarks/bench_similarity.py [--cars 1000 10000 100000] [--k 10] [--batch 32]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_spec_index import make_catalog
+from app.similarity import SimilarityIndex
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'cars':>8} {'build ms':>9} {'query ms':>9} {'cached us':>10} {'batch ms/car':>13}")
+    for count in args.cars:
+        catalog = make_catalog(count)
+        ids = list(catalog.entries)
+        index = SimilarityIndex()
+
+        start = time.perf_counter()
+        matrix = index.matrix(catalog)
+        build = time.perf_counter() - start
+
+        query = per_call(lambda: index._search(matrix, ids[:1], args.k), args.iterations)
+        cached = per_call(lambda: index.neighbours(catalog, ids[:1], args.k), args.iterations)
+        batch = per_call(lambda: index._search(matrix, ids[:args.batch], args.k), args.iterations)
+        print(
+            f"{count:>8} {build * 1000:9.1f} {query * 1000:9.3f} {cached * 1e6:10.1f}"
+            f" {batch * 1000 / args.batch:13.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
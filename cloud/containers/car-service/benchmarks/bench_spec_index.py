@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare spec range queries over a large cached catalog: the Python loop in
+filter_records against the NumPy columnar index, plus the cost of building
+the columns and of refreshing them after a few cars change.
+
+Usage:
+    python benchmarks/bench_spec_index.py [--cars 100000] [--changed 10] [--iterations 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from uuid import UUID
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_serialization import DOCUMENT
+from app.catalog import Catalog, CatalogEntry
+from app.compact import MEASUREMENT_SLOTS, CompactCar
+from app.schemas import Car
+from app.spec_index import SpecIndex
+from app.specs import filter_records, parse_spec_query
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_catalog(count: int, version: int = 1) -> Catalog:
+    """Catalog of synthetic cars with randomized power, weight and 0-60 times."""
+    rng = random.Random(42)
+    template = CompactCar.from_car(Car(**DOCUMENT))
+    slots = {slot.path: slot for slot in MEASUREMENT_SLOTS}
+    entries = {}
+    for n in range(count):
+        numbers = template.numbers.__copy__()
+        numbers[slots[("performance", "horsepower")].value_index] = rng.uniform(100, 700)
+        numbers[slots[("performance", "zeroToSixty")].value_index] = rng.uniform(2.5, 12)
+        numbers[slots[("dimensions", "curbWeight")].value_index] = rng.uniform(2200, 6000)
+        record = CompactCar(UUID(int=n), template.strings, numbers, template.codes, template.present, None, None)
+        entries[str(record.id)] = CatalogEntry(record, NOW)
+    return Catalog(version, MappingProxyType(dict(sorted(entries.items()))))
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, default=100_000)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.cars)
+    records = [entry.record for entry in catalog.entries.values()]
+    query = parse_spec_query(["power_w:250000"], ["curb_weight_kg:1800", "zero_to_sixty_s:6"], "-power_w")
+
+    index = SpecIndex()
+    columns = index.columns(catalog)
+    assert index.query(catalog, query) == filter_records(records, query)
+
+    # Next catalog version with a handful of cars changed
+    changed = frozenset(list(catalog.entries)[::max(1, args.cars // args.changed)][:args.changed])
+    updated = Catalog(2, catalog.entries)
+
+    def build():
+        index._build(catalog)
+
+    def update():
+        index._update(columns, updated, changed, frozenset())
+
+    print(f"{args.cars} cars, {len(changed)} changed, {args.iterations} iterations")
+    scenarios = {
+        "python filter": lambda: filter_records(records, query),
+        "columnar query": lambda: index.query(catalog, query),
+        "full build": build,
+        "incremental": update,
+    }
+    baseline = None
+    for name, fn in scenarios.items():
+        elapsed = per_call(fn, args.iterations)
+        baseline = baseline or elapsed
+        print(f"{name:>15} {elapsed * 1000:9.2f} ms  {baseline / elapsed:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
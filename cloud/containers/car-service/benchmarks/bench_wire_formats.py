@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compare JSON, MessagePack and CBOR for the car list: payload size, raw and
+gzip-compressed, plus encode and decode CPU time per response.
+
+Usage:
+    python benchmarks/bench_wire_formats.py [--cars 50] [--iterations 200]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add the service root to the path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cbor2
+import msgpack
+
+from bench_serialization import DOCUMENT
+from app.binary_formats import CBOR_FORMAT, JSON_FORMAT, MSGPACK_FORMAT
+from app.schemas import Car
+from app.serialization import dump_cars
+
+DECODERS = {
+    JSON_FORMAT: json.loads,
+    MSGPACK_FORMAT: msgpack.unpackb,
+    CBOR_FORMAT: cbor2.loads,
+}
+
+
+def per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cars", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cars = [Car(id=str(uuid4()), **DOCUMENT) for _ in range(args.cars)]
+    print(f"GET /v1/cars with {args.cars} cars, {args.iterations} iterations")
+    print(f"{'format':>8} {'bytes':>8} {'gzip':>8} {'encode ms':>10} {'decode ms':>10}")
+    for fmt, decode in DECODERS.items():
+        body = dump_cars(cars, fmt)
+        encode_time = per_call(lambda: dump_cars(cars, fmt), args.iterations)
+        decode_time = per_call(lambda: decode(body), args.iterations)
+        print(f"{fmt:>8} {len(body):>8} {len(gzip.compress(body)):>8} "
+              f"{encode_time * 1000:10.3f} {decode_time * 1000:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
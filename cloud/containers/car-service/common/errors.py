@@ -41,9 +41,30 @@ class ConflictError(APIError):
     message = "Resource conflict"
 
 
+class UnauthorizedError(APIError):
+    """401 Unauthorized"""
+    status_code = 401
+    error_code = "UNAUTHORIZED"
+    message = "Authentication required"
+
+
 class ForbiddenError(APIError):
     """403 Forbidden"""
     status_code = 403
     error_code = "FORBIDDEN"
     message = "Access forbidden"
 
+
+
+class PreconditionFailedError(APIError):
+    """412 Precondition Failed"""
+    status_code = 412
+    error_code = "PRECONDITION_FAILED"
+    message = "Precondition failed"
+
+
+class ServiceUnavailableError(APIError):
+    """503 Service Unavailable"""
+    status_code = 503
+    error_code = "SERVICE_UNAVAILABLE"
+    message = "Service unavailable"
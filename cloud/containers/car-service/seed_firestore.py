@@ -17,7 +17,8 @@ from pathlib import Path
 # Add the current directory to the path so we can import app modules
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.firebase import initialize_firebase, get_firestore_client
+from app.firebase import initialize_firebase
+from app.repositories import create_car
 from app.schemas import (
     Car, BodyStyle, Engine, Performance, Dimensions, Drivetrain,
     MeasurementVolume, VolumeUnit, MeasurementPower, PowerUnit,
@@ -30,9 +31,6 @@ from app.schemas import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-CARS_COLLECTION = "cars"
-
-
 def create_cars_data():
     """Create all car objects with their specifications."""
     
@@ -267,7 +265,6 @@ def seed_firestore():
     logger.info("Initializing Firebase...")
     initialize_firebase()
     
-    db = get_firestore_client()
     logger.info("Creating car data...")
     cars = create_cars_data()
     
@@ -275,16 +272,12 @@ def seed_firestore():
     
     success_count = 0
     for car in cars:
-        try:
-            car_id = str(car.id)
-            car_data = car.model_dump(mode='json', exclude={'id'})
-            
-            db.collection(CARS_COLLECTION).document(car_id).set(car_data)
-            logger.info(f"✓ Added {car.make} {car.model} (ID: {car_id})")
+        # Written like the API does, so the facet stats and key claims follow
+        if create_car(car):
+            logger.info(f"✓ Added {car.make} {car.model} (ID: {car.id})")
             success_count += 1
-            
-        except Exception as e:
-            logger.error(f"✗ Failed to add {car.make} {car.model}: {e}")
+        else:
+            logger.error(f"✗ Failed to add {car.make} {car.model}")
     
     logger.info(f"\n{'='*60}")
     logger.info(f"Seeding complete! {success_count}/{len(cars)} cars added successfully")
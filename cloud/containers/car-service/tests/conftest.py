@@ -2,6 +2,8 @@
 Pytest configuration and fixtures for car-service tests.
 """
 import pytest
+from datetime import datetime, timezone
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 from typing import List
@@ -17,15 +19,20 @@ from fastapi.testclient import TestClient
 def mock_firebase():
     """Mock Firebase initialization for all tests."""
     with patch('app.firebase.firebase_admin') as mock_admin, \
-         patch('app.firebase.firestore') as mock_firestore:
-        # Setup mock Firestore client
+         patch('app.firebase.firestore') as mock_firestore, \
+         patch('app.firebase.firestore_async') as mock_firestore_async:
+        # Setup mock Firestore clients
         mock_db = MagicMock()
         mock_firestore.client.return_value = mock_db
+        mock_async_db = MagicMock()
+        mock_firestore_async.client.return_value = mock_async_db
         
         yield {
             'admin': mock_admin,
             'firestore': mock_firestore,
-            'db': mock_db
+            'firestore_async': mock_firestore_async,
+            'db': mock_db,
+            'async_db': mock_async_db
         }
 
 
@@ -56,6 +63,13 @@ def test_client(mock_firebase):
         yield client
 
 
+@pytest.fixture
+def writer_headers():
+    """Authorization header of a user allowed to write cars, with token verification mocked."""
+    with patch('app.auth.auth.verify_id_token', return_value={"uid": "writer", "carWriter": True}):
+        yield {"Authorization": "Bearer writer-token"}
+
+
 @pytest.fixture
 def sample_car_data():
     """Sample car data for testing."""
@@ -127,7 +141,23 @@ def multiple_cars_data(sample_car_data):
         car["make"] = make
         car["model"] = model
         car["iconAssetName"] = f"{make.lower()}_{model.lower()}"
+        # volumeId is unique per car
+        car["volumeId"] = f"{make}_{model}"
         cars.append(car)
     
     return cars
 
+
+# ============================================================
+# Shared helpers
+# ============================================================
+
+CATALOG_UPDATE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_catalog(version, cars, update_time=CATALOG_UPDATE_TIME):
+    """A catalog snapshot of the given cars, in ID order like the catalog cache builds."""
+    from app.catalog import Catalog, CatalogEntry
+    
+    entries = {str(car.id): CatalogEntry.from_car(car, update_time) for car in cars}
+    return Catalog(version, MappingProxyType(dict(sorted(entries.items()))))
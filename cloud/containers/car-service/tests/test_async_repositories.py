@@ -0,0 +1,172 @@
+"""
+Tests for the asyncio repository layer (Firestore AsyncClient).
+"""
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+from app.schemas import Car
+
+
+async def _aiter(items):
+    """Async iterator over items, standing in for Firestore async streams."""
+    for item in items:
+        yield item
+
+
+def _mock_doc(car_data, exists=True):
+    doc = MagicMock()
+    doc.exists = exists
+    doc.id = car_data["id"]
+    doc.to_dict.return_value = {k: v for k, v in car_data.items() if k != "id"}
+    return doc
+
+
+class TestAsyncGetCars:
+    """Tests for async get_cars."""
+    
+    async def test_get_cars_returns_list(self, sample_car_data):
+        """Test that get_cars streams documents and signs URLs in one batch."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client, \
+             patch('app.async_repositories.get_model_urls_for_volume_ids_async', new_callable=AsyncMock) as mock_sign:
+            
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.collection.return_value.stream.return_value = _aiter([_mock_doc(sample_car_data)])
+            mock_sign.return_value = {sample_car_data["volumeId"]: "https://example.com/model.usdz"}
+            
+            from app.async_repositories import get_cars
+            result = await get_cars()
+            
+            assert len(result) == 1
+            assert isinstance(result[0], Car)
+            assert result[0].modelUrl == "https://example.com/model.usdz"
+            mock_sign.assert_awaited_once()
+    
+    async def test_get_cars_handles_error(self):
+        """Test get_cars handles Firestore errors gracefully."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client:
+            mock_get_client.side_effect = Exception("Firestore error")
+            
+            from app.async_repositories import get_cars
+            assert await get_cars() == []
+
+
+class TestAsyncIterCars:
+    """Tests for async iter_cars."""
+    
+    async def test_iter_cars_streams_documents(self, sample_car_data):
+        """Test documents are yielded one at a time without signing."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client, \
+             patch('app.async_repositories.get_model_urls_for_volume_ids_async', new_callable=AsyncMock) as mock_sign:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.collection.return_value.stream.return_value = _aiter([_mock_doc(sample_car_data)])
+            
+            from app.async_repositories import iter_cars
+            result = [car async for car in iter_cars()]
+            
+            assert [str(car.id) for car in result] == [sample_car_data["id"]]
+            mock_sign.assert_not_awaited()
+
+
+class TestAsyncGetCarSummaries:
+    """Tests for async get_car_summaries."""
+    
+    async def test_get_car_summaries_uses_projection(self, sample_car_data):
+        """Test the async path also reads only the summary fields."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.collection.return_value.select.return_value.stream.return_value = _aiter(
+                [_mock_doc({"id": sample_car_data["id"], "make": "BMW", "model": "M4"})]
+            )
+            
+            from app.async_repositories import get_car_summaries
+            result = await get_car_summaries()
+            
+            assert [summary.make for summary in result] == ["BMW"]
+            mock_db.collection.return_value.select.assert_called_once()
+
+
+class TestAsyncGetCar:
+    """Tests for async get_car."""
+    
+    async def test_get_car_success(self, sample_car_data):
+        """Test successful async car retrieval."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client, \
+             patch('app.async_repositories.get_model_urls_for_volume_ids_async', new_callable=AsyncMock) as mock_sign:
+            
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = MagicMock()
+            mock_doc_ref.get = AsyncMock(return_value=_mock_doc(sample_car_data))
+            mock_db.collection.return_value.document.return_value = mock_doc_ref
+            mock_sign.return_value = {}
+            
+            from app.async_repositories import get_car
+            result = await get_car(sample_car_data["id"])
+            
+            assert str(result.id) == sample_car_data["id"]
+    
+    async def test_get_car_not_found(self, sample_car_data):
+        """Test async get_car when document doesn't exist."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = MagicMock()
+            mock_doc_ref.get = AsyncMock(return_value=_mock_doc(sample_car_data, exists=False))
+            mock_db.collection.return_value.document.return_value = mock_doc_ref
+            
+            from app.async_repositories import get_car
+            assert await get_car(sample_car_data["id"]) is None
+    
+    async def test_get_car_invalid_uuid(self):
+        """Test async get_car with invalid UUID format."""
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client:
+            from app.async_repositories import get_car
+            assert await get_car("invalid-uuid") is None
+            mock_get_client.assert_not_called()
+
+
+class TestAsyncGetCarsByIds:
+    """Tests for async get_cars_by_ids."""
+    
+    async def test_get_cars_by_ids(self, sample_car_data):
+        """Test async batch get skips missing documents."""
+        missing = {"id": str(uuid4())}
+        
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client, \
+             patch('app.async_repositories.get_model_urls_for_volume_ids_async', new_callable=AsyncMock) as mock_sign:
+            
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.get_all.return_value = _aiter([
+                _mock_doc(sample_car_data), _mock_doc(missing, exists=False)
+            ])
+            mock_sign.return_value = {}
+            
+            from app.async_repositories import get_cars_by_ids
+            result = await get_cars_by_ids([sample_car_data["id"], missing["id"]])
+            
+            assert list(result.keys()) == [sample_car_data["id"]]
+
+
+class TestAsyncGetCarVersions:
+    """Tests for async get_car_versions."""
+    
+    async def test_get_car_versions(self, sample_car_data):
+        """Test cars come back with their update_time and without signing."""
+        doc = _mock_doc(sample_car_data)
+        doc.update_time = "t1"
+        
+        with patch('app.async_repositories.get_async_firestore_client') as mock_get_client, \
+             patch('app.async_repositories.get_model_urls_for_volume_ids_async', new_callable=AsyncMock) as mock_sign:
+            mock_get_client.return_value.get_all.return_value = _aiter([doc])
+            
+            from app.async_repositories import get_car_versions
+            result = await get_car_versions([sample_car_data["id"]])
+            
+            car, update_time = result[sample_car_data["id"]]
+            assert isinstance(car, Car)
+            assert update_time == "t1"
+            mock_sign.assert_not_called()
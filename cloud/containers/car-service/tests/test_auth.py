@@ -0,0 +1,51 @@
+"""
+Tests for write authentication.
+"""
+import pytest
+from unittest.mock import patch
+
+from firebase_admin import auth
+
+from app.auth import require_car_writer
+from common.errors import ForbiddenError, ServiceUnavailableError, UnauthorizedError
+
+
+class TestRequireCarWriter:
+    """Tests for the car writer dependency."""
+    
+    def test_writer_claims_returned(self):
+        """Test a verified token with the writer claim passes."""
+        claims = {"uid": "writer", "carWriter": True}
+        
+        with patch('app.auth.auth.verify_id_token', return_value=claims) as mock_verify:
+            assert require_car_writer("Bearer token-1") == claims
+            mock_verify.assert_called_once_with("token-1", check_revoked=True)
+    
+    @pytest.mark.parametrize("header", [None, "", "Bearer ", "Basic dXNlcjpwYXNz", "token-1"])
+    def test_missing_token(self, header):
+        """Test requests without a bearer token are 401 without verifying anything."""
+        with patch('app.auth.auth.verify_id_token') as mock_verify:
+            with pytest.raises(UnauthorizedError):
+                require_car_writer(header)
+            mock_verify.assert_not_called()
+    
+    def test_invalid_token(self):
+        """Test a token that fails verification is a 401."""
+        with patch('app.auth.auth.verify_id_token', side_effect=auth.InvalidIdTokenError("bad signature")):
+            with pytest.raises(UnauthorizedError):
+                require_car_writer("Bearer forged")
+    
+    def test_claim_required(self):
+        """Test a signed-in user without the writer claim is a 403."""
+        with patch('app.auth.auth.verify_id_token', return_value={"uid": "reader"}):
+            with pytest.raises(ForbiddenError):
+                require_car_writer("Bearer token-1")
+        with patch('app.auth.auth.verify_id_token', return_value={"uid": "reader", "carWriter": "yes"}):
+            with pytest.raises(ForbiddenError):
+                require_car_writer("Bearer token-1")
+    
+    def test_signing_keys_unavailable(self):
+        """Test failing to fetch Google's signing keys is a 503, not a 401."""
+        with patch('app.auth.auth.verify_id_token', side_effect=auth.CertificateFetchError("timeout", None)):
+            with pytest.raises(ServiceUnavailableError):
+                require_car_writer("Bearer token-1")
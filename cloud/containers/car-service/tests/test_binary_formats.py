@@ -0,0 +1,72 @@
+"""
+Tests for MessagePack / CBOR encodings.
+"""
+import cbor2
+import msgpack
+import pytest
+
+from app.binary_formats import (
+    CBOR_FORMAT, JSON_FORMAT, MSGPACK_FORMAT, encode, encode_array, negotiate_format, to_compact,
+)
+from app.schemas import Car
+
+
+class TestToCompact:
+    """Tests for the schema-driven compact form."""
+    
+    def test_measurements_enums_and_nulls(self, sample_car_data):
+        """Test measurements become [value, unit], enums raw values and None is dropped."""
+        car = Car(**sample_car_data)
+        
+        compact = to_compact(car)
+        
+        assert compact["id"] == sample_car_data["id"]
+        assert compact["bodyStyle"] == sample_car_data["bodyStyle"]
+        assert compact["engine"]["displacement"] == [
+            sample_car_data["engine"]["displacement"]["value"],
+            sample_car_data["engine"]["displacement"]["unit"],
+        ]
+        assert "modelUrl" not in compact
+    
+    def test_minimal_car(self, sample_car_minimal):
+        """Test a car with only required fields stays small."""
+        compact = to_compact(Car(**sample_car_minimal))
+        
+        assert set(compact) == {"id", "make", "model", "otherSpecs"}
+
+
+class TestEncode:
+    """Tests for encode and encode_array."""
+    
+    @pytest.mark.parametrize("fmt, loads", [(MSGPACK_FORMAT, msgpack.unpackb), (CBOR_FORMAT, cbor2.loads)])
+    def test_round_trip(self, sample_car_data, fmt, loads):
+        """Test encoded cars decode back to the compact form."""
+        car = Car(**sample_car_data)
+        
+        assert loads(encode(car, fmt)) == to_compact(car)
+    
+    @pytest.mark.parametrize("fmt, loads", [(MSGPACK_FORMAT, msgpack.unpackb), (CBOR_FORMAT, cbor2.loads)])
+    @pytest.mark.parametrize("length", [0, 5, 20, 300, 70000])
+    def test_array_framing(self, fmt, loads, length):
+        """Test joined fragments decode as one array at every header size."""
+        items = [encode({"n": i}, fmt) for i in range(length)]
+        
+        assert loads(encode_array(items, fmt)) == [{"n": i} for i in range(length)]
+
+
+class TestNegotiateFormat:
+    """Tests for negotiate_format."""
+    
+    def test_defaults_to_json(self):
+        """Test missing or wildcard Accept headers keep JSON."""
+        assert negotiate_format(None) == JSON_FORMAT
+        assert negotiate_format("*/*") == JSON_FORMAT
+    
+    def test_binary_when_asked(self):
+        """Test binary types are chosen when named."""
+        assert negotiate_format("application/msgpack") == MSGPACK_FORMAT
+        assert negotiate_format("application/cbor, application/json") == CBOR_FORMAT
+    
+    def test_q_values(self):
+        """Test JSON wins when ranked higher than the binary type."""
+        assert negotiate_format("application/json, application/msgpack;q=0.5") == JSON_FORMAT
@@ -0,0 +1,54 @@
+"""
+Tests for in-process cache invalidation.
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from app.cache import (
+    invalidate_cars,
+    register_invalidation_listener,
+    unregister_invalidation_listener,
+)
+
+
+@pytest.fixture
+def listener():
+    """Register a mock listener for the duration of a test."""
+    mock_listener = MagicMock()
+    register_invalidation_listener(mock_listener)
+    yield mock_listener
+    unregister_invalidation_listener(mock_listener)
+
+
+class TestInvalidateCars:
+    """Tests for invalidate_cars."""
+    
+    def test_listener_receives_ids(self, listener):
+        """Test listeners get the changed IDs as a frozenset."""
+        invalidate_cars(["a", "b", "a"])
+        
+        listener.assert_called_once_with(frozenset({"a", "b"}))
+    
+    def test_empty_invalidation_is_skipped(self, listener):
+        """Test nothing is dispatched when no IDs changed."""
+        invalidate_cars([])
+        
+        listener.assert_not_called()
+    
+    def test_failing_listener_does_not_block_others(self, listener):
+        """Test one broken listener doesn't stop the rest."""
+        broken = MagicMock(side_effect=Exception("boom"))
+        register_invalidation_listener(broken)
+        try:
+            invalidate_cars(["a"])
+        finally:
+            unregister_invalidation_listener(broken)
+        
+        listener.assert_called_once()
+    
+    def test_register_is_idempotent(self, listener):
+        """Test registering the same listener twice only calls it once."""
+        register_invalidation_listener(listener)
+        invalidate_cars(["a"])
+        
+        listener.assert_called_once()
@@ -0,0 +1,90 @@
+"""
+Tests for volumeId and slug lookups.
+"""
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.car_keys import (
+    car_keys, claim_document_id, default_slug, document_keys, patched_keys, record_keys, slugify, touches_keys,
+)
+from app.catalog import CatalogEntry
+from app.key_index import KeyIndex
+from app.schemas import Car
+from tests.conftest import make_catalog
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+A, B = (str(UUID(int=n)) for n in (1, 2))
+
+
+def _car(car_id, volume_id=None, slug=None):
+    return Car(id=car_id, make="BMW", model="M3", year=2020, volumeId=volume_id, slug=slug)
+
+
+class TestCarKeys:
+    """Tests for reading keys and building slugs."""
+    
+    def test_slugs(self):
+        """Test slugs are lowercase ASCII words joined by hyphens."""
+        assert slugify("Mercedes-Benz G63 2020") == "mercedes-benz-g63-2020"
+        assert slugify("Citroën  C4 (Picasso)") == "citroen-c4-picasso"
+        assert default_slug(_car(A)) == "bmw-m3-2020"
+    
+    def test_car_document_and_record_agree(self):
+        """Test cars, stored documents and cached records give the same keys."""
+        car = _car(A, "BMW_M3_e90", "bmw-m3")
+        expected = {"volumeId": "BMW_M3_e90", "slug": "bmw-m3"}
+        
+        assert car_keys(car) == expected
+        assert document_keys(car.model_dump(mode="json")) == expected
+        assert record_keys(CatalogEntry.from_car(car, T1).record) == expected
+        assert car_keys(_car(A)) == {}
+    
+    def test_patched_keys(self):
+        """Test patches set, replace and delete keys."""
+        from google.cloud.firestore import DELETE_FIELD
+        
+        current = {"volumeId": "BMW_M3_e90", "slug": "bmw-m3"}
+        
+        assert touches_keys({"slug": "m3"})
+        assert not touches_keys({"engine.code": "S58"})
+        assert patched_keys(current, {"slug": "m3", "volumeId": DELETE_FIELD}) == {"slug": "m3"}
+    
+    def test_claim_document_id_escapes_slashes(self):
+        """Test key values can't break out of the claim document path."""
+        assert claim_document_id("volumeId", "a/b") == "volumeId:a%2Fb"
+
+
+class TestKeyIndex:
+    """Tests for in-memory key lookups."""
+    
+    def test_lookup(self):
+        """Test both keys resolve to the car, and unknown values to None."""
+        index = KeyIndex()
+        catalog = make_catalog(1, [_car(A, "BMW_M3_e90", "bmw-m3"), _car(B)])
+        
+        assert index.lookup(catalog, "volumeId", "BMW_M3_e90") == A
+        assert index.lookup(catalog, "slug", "bmw-m3") == A
+        assert index.lookup(catalog, "slug", "bmw-m3-2020") is None
+    
+    def test_follows_catalog_changes(self):
+        """Test changed cars are re-keyed and removed cars dropped."""
+        index = KeyIndex()
+        index.lookup(make_catalog(1, [_car(A, "BMW_M3_e90", "bmw-m3"), _car(B, "BMW_M4_f82")]), "slug", "x")
+        
+        second = make_catalog(2, [_car(A, "BMW_M3_e90", "bmw-m3-e90")])
+        index.on_catalog_change(second, frozenset({A}), frozenset({B}))
+        
+        assert index.lookup(second, "slug", "bmw-m3-e90") == A
+        assert index.lookup(second, "slug", "bmw-m3") is None
+        assert index.lookup(second, "volumeId", "BMW_M4_f82") is None
+    
+    def test_rebuilds_after_missed_change(self):
+        """Test a version gap makes the next lookup rebuild."""
+        index = KeyIndex()
+        index.lookup(make_catalog(1, [_car(A, slug="bmw-m3")]), "slug", "x")
+        
+        third = make_catalog(3, [_car(B, slug="bmw-m3")])
+        index.on_catalog_change(third, frozenset({B}), frozenset({A}))
+        
+        assert index.lookup(third, "slug", "bmw-m3") == B
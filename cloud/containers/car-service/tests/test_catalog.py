@@ -0,0 +1,136 @@
+"""
+Tests for the in-memory catalog cache.
+"""
+import pytest
+from datetime import datetime, timezone
+from uuid import UUID
+from unittest.mock import MagicMock, patch
+
+from app.catalog import Catalog, CatalogCache, CatalogEntry
+from app.schemas import Car
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+T2 = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+A, B, C = (str(UUID(int=n)) for n in (1, 2, 3))
+
+
+def _car(car_id):
+    return Car(id=car_id, make="BMW", model="M4")
+
+
+@pytest.fixture
+def mock_versions():
+    """Patch the repository loader used by the catalog."""
+    with patch('app.catalog.repo.get_car_versions') as mock_get_versions:
+        yield mock_get_versions
+
+
+class TestCatalogCache:
+    """Tests for CatalogCache."""
+    
+    def test_disabled_with_zero_ttl(self):
+        """Test a TTL of zero disables the cache."""
+        assert CatalogCache(0).enabled is False
+        assert CatalogCache(60).enabled is True
+    
+    def test_loads_once_within_ttl(self, mock_versions):
+        """Test the collection is read once and then served from memory."""
+        mock_versions.return_value = {B: (_car(B), T1), A: (_car(A), T1)}
+        cache = CatalogCache(60)
+        
+        first = cache.get()
+        second = cache.get()
+        
+        assert first is second
+        assert list(first.entries) == [A, B]
+        mock_versions.assert_called_once_with()
+    
+    def test_invalidated_ids_are_reloaded_individually(self, mock_versions):
+        """Test a write only re-reads the cars it touched."""
+        mock_versions.return_value = {A: (_car(A), T1), B: (_car(B), T1)}
+        cache = CatalogCache(60)
+        first = cache.get()
+        
+        mock_versions.return_value = {A: (_car(A), T2)}
+        cache.invalidate(frozenset({A, B}))
+        second = cache.get()
+        
+        mock_versions.assert_called_with([A, B])
+        assert second.version == first.version + 1
+        assert second.entries[A].update_time == T2
+        assert B not in second.entries
+    
+    def test_expired_reload_notifies_changes(self, mock_versions):
+        """Test listeners get changed and removed IDs after a full reload."""
+        mock_versions.return_value = {A: (_car(A), T1), B: (_car(B), T1)}
+        cache = CatalogCache(60)
+        listener = MagicMock()
+        cache.add_change_listener(listener)
+        cache.get()
+        listener.reset_mock()
+        
+        mock_versions.return_value = {A: (_car(A), T2), C: (_car(C), T1)}
+        with patch('app.catalog.time.monotonic', return_value=10 ** 9):
+            catalog = cache.get()
+        
+        listener.assert_called_once_with(catalog, frozenset({A, C}), frozenset({B}))
+    
+    def test_expired_reload_serves_previous_snapshot_meanwhile(self, mock_versions):
+        """Test readers get the stale snapshot while one thread reloads the collection."""
+        import threading
+        
+        mock_versions.return_value = {A: (_car(A), T1)}
+        cache = CatalogCache(60)
+        first = cache.get()
+        
+        loading, release = threading.Event(), threading.Event()
+        
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            return {A: (_car(A), T2)}
+        mock_versions.side_effect = slow_load
+        
+        with patch('app.catalog.time.monotonic', return_value=10 ** 9):
+            reloader = threading.Thread(target=cache.get)
+            reloader.start()
+            assert loading.wait(5)
+            
+            assert cache.get() is first
+            release.set()
+            reloader.join(5)
+        
+        assert mock_versions.call_count == 2
+        assert cache.peek().entries[A].update_time == T2
+    
+    def test_failed_refresh_serves_previous_snapshot(self, mock_versions):
+        """Test Firestore errors keep the previous snapshot in service."""
+        mock_versions.return_value = {A: (_car(A), T1)}
+        cache = CatalogCache(60)
+        first = cache.get()
+        
+        mock_versions.side_effect = Exception("Firestore error")
+        cache.invalidate(frozenset({A}))
+        
+        assert cache.get() is first
+    
+    def test_failed_first_load_raises(self, mock_versions):
+        """Test there is nothing to fall back to before the first load."""
+        mock_versions.side_effect = Exception("Firestore error")
+        
+        with pytest.raises(Exception, match="Firestore error"):
+            CatalogCache(60).get()
+
+
+class TestCatalogFingerprint:
+    """Tests for Catalog.fingerprint."""
+    
+    def test_fingerprint_depends_only_on_versions(self):
+        """Test instances with the same versions agree and any write changes it."""
+        first = Catalog(1, {A: CatalogEntry.from_car(_car(A), T1)})
+        same = Catalog(9, {A: CatalogEntry.from_car(_car(A), T1)})
+        written = Catalog(2, {A: CatalogEntry.from_car(_car(A), T2)})
+        
+        assert first.fingerprint == same.fingerprint
+        assert first.fingerprint != written.fingerprint
@@ -0,0 +1,71 @@
+"""
+Tests for the memory-compact read model.
+"""
+import sys
+import tracemalloc
+from uuid import UUID
+
+from app.compact import CompactCar
+from app.schemas import Car, Engine
+from app.serialization import dump_car_json
+
+
+def _bytes_per_car(build, documents):
+    """Bytes allocated per car while building one object per document."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [build(document) for document in documents]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == len(documents)
+    return (after - before) / len(documents)
+
+
+class TestCompactCar:
+    """Tests for CompactCar."""
+    
+    def test_round_trip(self, sample_car_data):
+        """Test a record renders exactly like the car it was built from."""
+        car = Car(**{**sample_car_data, "otherSpecs": {"seats": "5"}})
+        
+        restored = CompactCar.from_car(car).to_car()
+        
+        assert restored == car
+        assert dump_car_json(restored) == dump_car_json(car)
+        assert isinstance(restored.year, int)
+    
+    def test_missing_and_empty_nested_objects_differ(self):
+        """Test an absent engine stays absent and an empty one stays empty."""
+        absent = Car(make="BMW", model="M3")
+        empty = Car(make="BMW", model="M3", engine=Engine())
+        
+        assert CompactCar.from_car(absent).to_car().engine is None
+        assert CompactCar.from_car(empty).to_car().engine == Engine()
+    
+    def test_strings_interned(self, sample_car_data):
+        """Test equal strings from different documents share one object."""
+        make = "".join(["B", "M", "W"])
+        first = CompactCar.from_car(Car(**{**sample_car_data, "make": make}))
+        second = CompactCar.from_car(Car(**{**sample_car_data, "make": "".join(["B", "M", "W"])}))
+        
+        assert first.strings[0] is second.strings[0] is sys.intern("BMW")
+    
+    def test_scalar_accessors(self, sample_car_data):
+        """Test the fields the render cache reads without decoding."""
+        record = CompactCar.from_car(Car(**sample_car_data))
+        
+        assert record.id == UUID(sample_car_data["id"])
+        assert record.volumeId == sample_car_data["volumeId"]
+        assert record.modelUrl is None
+    
+    def test_smaller_than_pydantic_cars(self, sample_car_data):
+        """Test tracemalloc bytes per car for both forms (run with -s to see them)."""
+        documents = [{**sample_car_data, "id": str(UUID(int=n))} for n in range(500)]
+        
+        full = _bytes_per_car(lambda document: Car(**document), documents)
+        compact = _bytes_per_car(lambda document: CompactCar.from_car(Car(**document)), documents)
+        
+        print(f"\nbytes per car: Car {full:.0f}, CompactCar {compact:.0f}")
+        assert compact * 4 < full
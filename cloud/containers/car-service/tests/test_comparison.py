@@ -0,0 +1,141 @@
+"""
+Tests for car comparison tables.
+"""
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.comparison import ComparisonCache, build_comparison
+from app.compact import CompactCar
+from app.schemas import (
+    Car, Engine, Performance, Dimensions,
+    MeasurementPower, MeasurementMass, MeasurementLength, MeasurementFuelEfficiency,
+    PowerUnit, MassUnit, LengthUnit, FuelEfficiencyUnit, UnitSystem,
+)
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+T2 = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+A, B, C = (str(UUID(int=n)) for n in (1, 2, 3))
+
+
+def _record(car_id, power, weight=None, **fields):
+    return CompactCar.from_car(Car(**{
+        "id": car_id, "make": "BMW", "model": "M3",
+        "engine": Engine(cylinders=6),
+        "performance": Performance(horsepower=power),
+        "dimensions": Dimensions(curbWeight=weight) if weight else None,
+        **fields,
+    }))
+
+
+def _hp(value):
+    return MeasurementPower(value=value, unit=PowerUnit.horsepower)
+
+
+def _kw(value):
+    return MeasurementPower(value=value, unit=PowerUnit.kilowatts)
+
+
+def _row(comparison, spec):
+    return next(row for row in comparison.rows if row.spec == spec)
+
+
+class TestBuildComparison:
+    """Tests for build_comparison."""
+    
+    def test_rows_in_one_unit(self):
+        """Test mixed units are quoted in the system's unit for the row."""
+        comparison = build_comparison([_record(A, _hp(473)), _record(B, _kw(300))], UnitSystem.metric)
+        
+        row = _row(comparison, "performance.horsepower")
+        assert row.unit == "kilowatts"
+        assert row.values == [353.0, 300.0]
+        assert [car.id for car in comparison.cars] == [UUID(A), UUID(B)]
+    
+    def test_native_uses_most_common_unit(self):
+        """Test native rows use the unit most cars were entered in, stored values unchanged."""
+        records = [_record(A, _hp(473)), _record(B, _kw(300)), _record(C, _hp(382.5))]
+        
+        row = _row(build_comparison(records, UnitSystem.native), "performance.horsepower")
+        
+        assert row.unit == "horsepower"
+        assert row.values == [473.0, 402.0, 382.5]
+    
+    def test_best_and_worst(self):
+        """Test ranked rows flag every tied best and worst column."""
+        records = [
+            _record(A, _kw(300), MeasurementMass(value=1700, unit=MassUnit.kilograms)),
+            _record(B, _kw(250), MeasurementMass(value=3307, unit=MassUnit.pounds)),
+            _record(C, _kw(300)),
+        ]
+        
+        comparison = build_comparison(records, UnitSystem.metric)
+        
+        power = _row(comparison, "performance.horsepower")
+        assert (power.best, power.worst) == ([0, 2], [1])
+        weight = _row(comparison, "dimensions.curbWeight")
+        assert weight.values == [1700, 1500, None]
+        assert (weight.best, weight.worst) == ([1], [0])
+    
+    def test_equal_values_not_ranked(self):
+        """Test a row where every car ties flags nobody."""
+        row = _row(build_comparison([_record(A, _kw(300)), _record(B, _kw(300))], UnitSystem.metric), "performance.horsepower")
+        
+        assert (row.best, row.worst) == ([], [])
+    
+    def test_consumption_ranks_by_efficiency(self):
+        """Test a lower L/100km is the better fuel economy."""
+        records = [
+            CompactCar.from_car(Car(id=car_id, make="VW", model="Golf", performance=Performance(
+                epaCity=MeasurementFuelEfficiency(value=value, unit=FuelEfficiencyUnit.litersPer100km),
+            )))
+            for car_id, value in ((A, 9.0), (B, 6.5))
+        ]
+        
+        row = _row(build_comparison(records, UnitSystem.metric), "performance.epaCity")
+        
+        assert (row.unit, row.values, row.best, row.worst) == ("litersPer100km", [9.0, 6.5], [1], [0])
+    
+    def test_unranked_and_sparse_rows(self):
+        """Test plain fields, otherSpecs keys, and rows nobody has."""
+        records = [
+            _record(A, _kw(300), otherSpecs={"seats": "5"}, dimensions=Dimensions(length=MeasurementLength(value=4.8, unit=LengthUnit.meters))),
+            _record(B, _kw(250)),
+        ]
+        
+        comparison = build_comparison(records, UnitSystem.metric)
+        specs = [row.spec for row in comparison.rows]
+        
+        assert _row(comparison, "engine.cylinders").values == [6, 6]
+        assert _row(comparison, "otherSpecs.seats").values == ["5", None]
+        assert _row(comparison, "dimensions.length").values == [4800.0, None]
+        assert "performance.torque" not in specs
+        assert "drivetrain.layout" not in specs
+
+
+class TestComparisonCache:
+    """Tests for ComparisonCache."""
+    
+    def test_shared_across_column_orders(self):
+        """Test one table serves every order of the same ID set."""
+        cache = ComparisonCache(10)
+        versions = {A: (_record(A, _kw(300)), T1), B: (_record(B, _kw(250)), T1)}
+        
+        forward = cache.compare([A, B], versions, UnitSystem.metric)
+        backward = cache.compare([B, A], versions, UnitSystem.metric)
+        
+        assert len(cache) == 1
+        assert [car.id for car in backward.cars] == [UUID(B), UUID(A)]
+        assert _row(backward, "performance.horsepower").values == [250.0, 300.0]
+        assert _row(backward, "performance.horsepower").best == [1]
+        assert _row(forward, "performance.horsepower").best == [0]
+    
+    def test_new_version_rebuilds(self):
+        """Test a changed update_time misses the cache."""
+        cache = ComparisonCache(10)
+        
+        cache.compare([A, B], {A: (_record(A, _kw(300)), T1), B: (_record(B, _kw(250)), T1)}, UnitSystem.metric)
+        table = cache.compare([A, B], {A: (_record(A, _kw(100)), T2), B: (_record(B, _kw(250)), T1)}, UnitSystem.metric)
+        
+        assert len(cache) == 2
+        assert _row(table, "performance.horsepower").values == [100.0, 250.0]
@@ -0,0 +1,81 @@
+"""
+Tests for precompressed response bodies.
+"""
+import gzip
+import pytest
+from unittest.mock import patch
+
+from app.compression import CompressedBodyCache, compress_body, negotiate_encoding, COMPRESSORS
+
+BODY = b'{"make": "BMW", "model": "M4"}' * 100
+
+
+class TestNegotiateEncoding:
+    """Tests for negotiate_encoding."""
+    
+    def test_identity_without_header(self):
+        """Test no Accept-Encoding means no compression."""
+        assert negotiate_encoding(None) is None
+        assert negotiate_encoding("identity") is None
+    
+    def test_highest_q_value_wins(self):
+        """Test q-values take priority over server preference."""
+        assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    
+    def test_server_preference_breaks_ties(self):
+        """Test the best available coding is chosen among equals."""
+        assert negotiate_encoding("gzip, br, zstd") == next(iter(COMPRESSORS))
+    
+    def test_zero_q_excludes(self):
+        """Test q=0 refuses an encoding, including via wildcard."""
+        assert negotiate_encoding("gzip;q=0") is None
+        assert negotiate_encoding("*, gzip;q=0") != "gzip"
+
+
+class TestCompressedBodyCache:
+    """Tests for CompressedBodyCache."""
+    
+    def test_compresses_once_per_etag(self):
+        """Test repeat requests for a version reuse the compressed bytes."""
+        cache = CompressedBodyCache(1024 * 1024)
+        
+        first = cache.get_or_compress('"v1"', "gzip", BODY)
+        with patch.dict(COMPRESSORS, {"gzip": lambda body: pytest.fail("recompressed")}):
+            second = cache.get_or_compress('"v1"', "gzip", BODY)
+        
+        assert first is second
+        assert gzip.decompress(first) == BODY
+    
+    def test_unversioned_bodies_are_not_cached(self):
+        """Test bodies without an ETag are compressed every time."""
+        cache = CompressedBodyCache(1024 * 1024)
+        
+        cache.get_or_compress(None, "gzip", BODY)
+        
+        assert len(cache) == 0
+    
+    def test_byte_budget(self):
+        """Test old versions are evicted to stay within budget."""
+        size = len(COMPRESSORS["gzip"](BODY))
+        cache = CompressedBodyCache(size * 2)
+        
+        for version in range(5):
+            cache.get_or_compress(f'"v{version}"', "gzip", BODY)
+        
+        assert len(cache) == 2
+        assert cache.size <= cache.max_bytes
+
+
+class TestCompressBody:
+    """Tests for compress_body."""
+    
+    def test_small_bodies_are_not_compressed(self):
+        """Test bodies under the threshold go out as-is."""
+        assert compress_body(b"[]", '"v1"', "gzip") == (b"[]", None)
+    
+    def test_large_bodies_are_compressed(self):
+        """Test the negotiated encoding is applied above the threshold."""
+        body, encoding = compress_body(BODY, None, "gzip")
+        
+        assert encoding == "gzip"
+        assert gzip.decompress(body) == BODY
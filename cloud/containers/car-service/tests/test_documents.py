@@ -0,0 +1,78 @@
+"""
+Tests for bulk parsing of Firestore car documents.
+"""
+from uuid import UUID
+from unittest.mock import MagicMock, patch
+
+from app.documents import iter_car_documents, parse_car_documents
+from app.schemas import Car
+
+A, B, C = (str(UUID(int=n)) for n in (1, 2, 3))
+
+
+def _doc(doc_id, data, exists=True):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.exists = exists
+    doc.to_dict.side_effect = lambda: dict(data)
+    return doc
+
+
+class TestParseCarDocuments:
+    """Tests for parse_car_documents."""
+    
+    def test_page_validated_in_one_call(self, sample_car_data):
+        """Test a page of documents is validated together as one list."""
+        data = {key: value for key, value in sample_car_data.items() if key != "id"}
+        docs = [_doc(A, data), _doc(B, data)]
+        
+        with patch('app.documents.CAR_LIST_ADAPTER.validate_python', wraps=lambda items: [Car(**item) for item in items]) as mock_validate:
+            parsed = parse_car_documents(docs)
+        
+        mock_validate.assert_called_once()
+        assert [car.id for _, car in parsed] == [UUID(A), UUID(B)]
+        assert parsed[0][1] == Car(**{**data, "id": A})
+    
+    def test_bad_document_isolated(self):
+        """Test a document that fails validation is skipped, not the page."""
+        docs = [
+            _doc(A, {"make": "BMW", "model": "M3"}),
+            _doc(B, {"make": "BMW", "model": "M4", "year": "not a year"}),
+            _doc(C, {"make": "BMW", "model": "M5"}),
+        ]
+        
+        with patch('app.documents.logger') as mock_logger:
+            parsed = parse_car_documents(docs)
+        
+        assert [doc.id for doc, _ in parsed] == [A, C]
+        mock_logger.error.assert_called_once()
+        assert B in mock_logger.error.call_args[0][0]
+        assert "year" in mock_logger.error.call_args[0][0]
+    
+    def test_all_documents_bad(self):
+        """Test a page where nothing validates parses to an empty list."""
+        docs = [_doc(A, {"make": "BMW"}), _doc(B, {"model": "M4"})]
+        
+        assert parse_car_documents(docs) == []
+    
+    def test_empty_page(self):
+        """Test an empty page doesn't call the validator."""
+        assert parse_car_documents([]) == []
+
+
+class TestIterCarDocuments:
+    """Tests for iter_car_documents."""
+    
+    def test_pages_and_skips_missing(self):
+        """Test documents are parsed page by page and missing ones dropped."""
+        docs = [
+            _doc(A, {"make": "BMW", "model": "M3"}),
+            _doc(B, {}, exists=False),
+            _doc(C, {"make": "BMW", "model": "M5"}),
+        ]
+        
+        with patch('app.documents.parse_car_documents', wraps=parse_car_documents) as mock_parse:
+            parsed = list(iter_car_documents(docs, page_size=1))
+        
+        assert [doc.id for doc, _ in parsed] == [A, C]
+        assert mock_parse.call_count == 2
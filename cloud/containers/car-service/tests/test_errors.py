@@ -5,7 +5,8 @@ import pytest
 
 from common.errors import (
     APIError, BadRequestError, NotFoundError, 
-    ConflictError, ForbiddenError
+    ConflictError, ForbiddenError, PreconditionFailedError, ServiceUnavailableError,
+    UnauthorizedError,
 )
 
 
@@ -118,6 +119,18 @@ class TestConflictError:
         assert error.message == "Car already exists"
 
 
+class TestUnauthorizedError:
+    """Tests for UnauthorizedError class."""
+    
+    def test_default_values(self):
+        """Test UnauthorizedError default values."""
+        error = UnauthorizedError()
+        
+        assert error.status_code == 401
+        assert error.error_code == "UNAUTHORIZED"
+        assert error.message == "Authentication required"
+
+
 class TestForbiddenError:
     """Tests for ForbiddenError class."""
     
@@ -136,6 +149,30 @@ class TestForbiddenError:
         assert error.message == "You don't have permission to access this resource"
 
 
+class TestPreconditionFailedError:
+    """Tests for PreconditionFailedError class."""
+    
+    def test_default_values(self):
+        """Test PreconditionFailedError default values."""
+        error = PreconditionFailedError()
+        
+        assert error.status_code == 412
+        assert error.error_code == "PRECONDITION_FAILED"
+        assert error.message == "Precondition failed"
+
+
+class TestServiceUnavailableError:
+    """Tests for ServiceUnavailableError class."""
+    
+    def test_default_values(self):
+        """Test ServiceUnavailableError default values."""
+        error = ServiceUnavailableError()
+        
+        assert error.status_code == 503
+        assert error.error_code == "SERVICE_UNAVAILABLE"
+        assert error.message == "Service unavailable"
+
+
 class TestErrorRaising:
     """Tests for raising and catching errors."""
     
@@ -0,0 +1,76 @@
+"""
+Tests for ETag helpers.
+"""
+import pytest
+from datetime import timezone
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from app.etags import (
+    etag_matches, format_update_time_etag, matching_etag, parse_update_time_etag, with_content_encoding,
+)
+
+
+class TestUpdateTimeEtags:
+    """Tests for update_time ETag formatting and parsing."""
+    
+    def test_round_trip(self):
+        """Test an update_time survives formatting and parsing."""
+        update_time = DatetimeWithNanoseconds(2025, 1, 2, 3, 4, 5, nanosecond=123456789, tzinfo=timezone.utc)
+        
+        etag = format_update_time_etag(update_time)
+        
+        assert etag == '"2025-01-02T03:04:05.123456789Z"'
+        assert parse_update_time_etag(etag) == update_time
+    
+    def test_wildcard(self):
+        """Test '*' means any version."""
+        assert parse_update_time_etag("*") is None
+    
+    def test_weak_etag_rejected(self):
+        """Test weak ETags can't be used as preconditions."""
+        with pytest.raises(ValueError):
+            parse_update_time_etag('W/"2025-01-02T03:04:05Z"')
+    
+    def test_malformed_etag_rejected(self):
+        """Test unquoted or non-timestamp values are rejected."""
+        with pytest.raises(ValueError):
+            parse_update_time_etag("2025-01-02T03:04:05Z")
+        with pytest.raises(ValueError):
+            parse_update_time_etag('"not-a-timestamp"')
+    
+    def test_read_etag_window_suffix_is_ignored_for_preconditions(self):
+        """Test a GET ETag (with URL window) parses back to the update_time."""
+        update_time = DatetimeWithNanoseconds(2025, 1, 2, 3, 4, 5, nanosecond=123456789, tzinfo=timezone.utc)
+        
+        etag = format_update_time_etag(update_time, window=42)
+        
+        assert etag == '"2025-01-02T03:04:05.123456789Z;42"'
+        assert parse_update_time_etag(etag) == update_time
+
+
+class TestEtagMatches:
+    """Tests for If-None-Match comparison."""
+    
+    def test_matches_any_listed_tag(self):
+        """Test a comma-separated list matches if any entry does."""
+        assert etag_matches('"a", "b"', '"b"')
+        assert not etag_matches('"a", "c"', '"b"')
+    
+    def test_weak_comparison(self):
+        """Test W/ prefixes are ignored for If-None-Match."""
+        assert etag_matches('W/"b"', '"b"')
+    
+    def test_wildcard_and_missing(self):
+        """Test '*' matches anything and missing values never match."""
+        assert etag_matches("*", '"b"')
+        assert not etag_matches(None, '"b"')
+        assert not etag_matches('"b"', None)
+    
+    def test_encoded_variants_match(self):
+        """Test a compressed variant's ETag matches and is echoed as sent."""
+        encoded = with_content_encoding('"abc;1"', "br")
+        
+        assert encoded == '"abc;1;br"'
+        assert matching_etag(f'W/{encoded}', '"abc;1"') == encoded
+        assert with_content_encoding('"abc;1"', None) == '"abc;1"'
@@ -0,0 +1,163 @@
+"""
+Tests for facet counts.
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from uuid import UUID
+
+from google.cloud.firestore import DELETE_FIELD
+
+from app.catalog import CatalogEntry
+from app.facet_index import FacetIndex
+from app.facets import (
+    car_facets, count_facets, document_facets, facet_response, parse_facet_selection, patched_facets,
+    record_facets, stats_increments, touches_facets,
+)
+from app.schemas import Car, Drivetrain, Engine, MeasurementPower, Performance
+from app.spec_index import SpecIndex
+from app.specs import parse_spec_query
+from tests.conftest import make_catalog
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+A, B, C, D = (str(UUID(int=n)) for n in (1, 2, 3, 4))
+
+
+def _car(car_id, make, year=None, fuel=None, layout=None, kilowatts=None):
+    return Car(
+        id=car_id,
+        make=make,
+        model="X",
+        year=year,
+        engine=Engine(fuel=fuel) if fuel else None,
+        drivetrain=Drivetrain(layout=layout) if layout else None,
+        performance=Performance(horsepower=MeasurementPower(value=kilowatts, unit="kilowatts")) if kilowatts else None,
+    )
+
+
+CARS = [
+    _car(A, "BMW", 2020, "gasoline", "rwd", 350),
+    _car(B, "BMW", 2021, "diesel", "awd", 200),
+    _car(C, "Audi", 2020, "gasoline", "awd", 400),
+    _car(D, "Tesla", 2021, "electric"),
+]
+
+
+def _plain(counts):
+    return {name: dict(values) for name, values in counts.items() if values}
+
+
+class TestFacetValues:
+    """Tests for reading facet values and stats increments."""
+    
+    def test_car_document_and_record_agree(self):
+        """Test cars, stored documents and cached records give the same facet values."""
+        car = CARS[0]
+        expected = {"make": "BMW", "year": "2020", "fuel": "gasoline", "layout": "rwd"}
+        
+        assert car_facets(car) == expected
+        assert document_facets(car.model_dump(mode="json")) == expected
+        assert record_facets(CatalogEntry.from_car(car, T1).record) == expected
+    
+    def test_touches_facets(self):
+        """Test only paths at or above a facet field count as touching it."""
+        assert touches_facets({"engine.fuel": "diesel"})
+        assert touches_facets({"drivetrain": DELETE_FIELD})
+        assert not touches_facets({"engine.code": "S58"})
+    
+    def test_patched_facets(self):
+        """Test field-path updates, including whole-map replacements and deletes."""
+        current = {"make": "BMW", "engine": {"fuel": "gasoline"}, "drivetrain": {"layout": "rwd"}}
+        
+        assert patched_facets(current, {"engine": {"fuel": "diesel"}, "drivetrain.layout": DELETE_FIELD}) == {
+            "make": "BMW", "fuel": "diesel",
+        }
+    
+    def test_stats_increments(self):
+        """Test unchanged values cancel out and the total moves with creates and deletes."""
+        update = stats_increments({"make": "BMW", "year": "2020"}, {"make": "Audi", "year": "2020"})
+        
+        assert {value: increment.value for value, increment in update["counts"]["make"].items()} == {"BMW": -1, "Audi": 1}
+        assert "year" not in update["counts"]
+        assert "total" not in update
+        assert stats_increments(None, {"make": "BMW"})["total"].value == 1
+        assert stats_increments({"make": "BMW"}, {"make": "BMW"}) == {}
+    
+    def test_parse_facet_selection(self):
+        """Test repeated and comma-separated values, and unknown facets."""
+        assert parse_facet_selection({"make": ["BMW,Audi", "Tesla"], "year": []}) == {
+            "make": frozenset({"BMW", "Audi", "Tesla"}),
+        }
+        with pytest.raises(ValueError):
+            parse_facet_selection({"colour": ["red"]})
+
+
+class TestCountFacets:
+    """Tests for disjunctive counting."""
+    
+    def test_selection_keeps_other_values_of_its_facet(self):
+        """Test each facet is counted over every other facet's selection only."""
+        rows = [car_facets(car) for car in CARS]
+        total, counts = count_facets(rows, {"make": frozenset({"BMW"}), "fuel": frozenset({"gasoline"})})
+        
+        assert total == 1
+        # Makes of the gasoline cars, fuels of the BMWs
+        assert dict(counts["make"]) == {"BMW": 1, "Audi": 1}
+        assert dict(counts["fuel"]) == {"gasoline": 1, "diesel": 1}
+        assert dict(counts["year"]) == {"2020": 1}
+    
+    def test_response_order(self):
+        """Test values are listed most cars first, then by value, without zero counts."""
+        response = facet_response(3, {"make": {"BMW": 1, "Audi": 2, "Tesla": 1, "Fiat": 0}})
+        
+        assert [(item.value, item.cars) for item in response.facets["make"]] == [("Audi", 2), ("BMW", 1), ("Tesla", 1)]
+        assert response.facets["year"] == []
+
+
+class TestFacetIndex:
+    """Tests for columnar counts over the cached catalog."""
+    
+    @pytest.mark.parametrize("selection", [
+        {},
+        {"make": frozenset({"BMW"})},
+        {"make": frozenset({"BMW", "Tesla"}), "year": frozenset({"2021"})},
+        {"fuel": frozenset({"hydrogen"})},
+    ])
+    def test_matches_count_facets(self, selection):
+        """Test vectorized counts equal the reference implementation."""
+        catalog = make_catalog(1, CARS)
+        query = parse_spec_query([], [], None)
+        
+        total, counts = FacetIndex().counts(catalog, query, selection)
+        expected_total, expected = count_facets([car_facets(car) for car in CARS], selection)
+        
+        assert total == expected_total
+        assert _plain(counts) == _plain(expected)
+    
+    def test_spec_filters(self):
+        """Test min/max spec filters narrow every facet, and cars missing the spec drop out."""
+        catalog = make_catalog(1, CARS)
+        query = parse_spec_query(["power_w:300000"], [], None)
+        
+        with patch('app.facet_index.spec_index', SpecIndex()):
+            total, counts = FacetIndex().counts(catalog, query, {})
+        
+        assert total == 2
+        assert _plain(counts)["make"] == {"BMW": 1, "Audi": 1}
+    
+    def test_follows_catalog_changes(self):
+        """Test codes stay valid when cars change and new values appear incrementally."""
+        index = FacetIndex()
+        query = parse_spec_query([], [], None)
+        first = make_catalog(1, CARS)
+        index.counts(first, query, {})
+        
+        second = make_catalog(2, [CARS[0], _car(B, "Lotus", 2021, "hydrogen"), *CARS[2:]])
+        index.on_catalog_change(second, frozenset({B}), frozenset())
+        total, counts = index.counts(second, query, {"fuel": frozenset({"hydrogen"})})
+        
+        assert index.columns(second).version == 2
+        assert total == 1
+        assert dict(counts["make"]) == {"Lotus": 1}
+        assert dict(counts["fuel"]) == {"gasoline": 2, "hydrogen": 1, "electric": 1}
@@ -97,3 +97,34 @@ class TestGetFirestoreClient:
         
         assert "not initialized" in str(exc_info.value)
 
+
+
+class TestGetAsyncFirestoreClient:
+    """Tests for get_async_firestore_client function."""
+    
+    def test_get_async_firestore_client_created_lazily(self, mock_firebase):
+        """Test the async client is created once on first use."""
+        import app.firebase
+        app.firebase._db = MagicMock()
+        app.firebase._async_db = None
+        
+        from app.firebase import get_async_firestore_client
+        first = get_async_firestore_client()
+        second = get_async_firestore_client()
+        
+        assert first is mock_firebase['async_db']
+        assert second is first
+        mock_firebase['firestore_async'].client.assert_called_once()
+        app.firebase._async_db = None
+    
+    def test_get_async_firestore_client_not_initialized(self):
+        """Test error when Firebase not initialized."""
+        import app.firebase
+        app.firebase._db = None
+        
+        from app.firebase import get_async_firestore_client
+        
+        with pytest.raises(RuntimeError) as exc_info:
+            get_async_firestore_client()
+        
+        assert "not initialized" in str(exc_info.value)
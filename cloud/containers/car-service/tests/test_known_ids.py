@@ -0,0 +1,116 @@
+"""
+Tests for the known car ID filter and missing car cache.
+"""
+from datetime import datetime, timezone
+from types import MappingProxyType
+from unittest.mock import patch
+from uuid import uuid4
+
+from app.catalog import Catalog, CatalogEntry
+from app.known_ids import BloomFilter, KnownCarIds
+from app.schemas import Car
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _catalog(version, car_ids):
+    entries = {car_id: CatalogEntry.from_car(Car(id=car_id, make="BMW", model="M3"), T1) for car_id in car_ids}
+    return Catalog(version, MappingProxyType(dict(sorted(entries.items()))))
+
+
+class TestBloomFilter:
+    """Tests for the Bloom filter."""
+    
+    def test_no_false_negatives_and_rate_near_target(self):
+        """Test every added ID is found and unknown IDs mostly aren't."""
+        bloom = BloomFilter(5000, 0.01)
+        added = [str(uuid4()) for _ in range(5000)]
+        for car_id in added:
+            bloom.add(car_id)
+        
+        assert all(car_id in bloom for car_id in added)
+        false_positives = sum(str(uuid4()) in bloom for _ in range(5000))
+        assert false_positives < 5000 * 0.03
+        assert 0.005 < bloom.false_positive_rate < 0.015
+    
+    def test_sized_from_target_rate(self):
+        """Test a lower target rate means more bits and hashes."""
+        loose, tight = BloomFilter(1000, 0.05), BloomFilter(1000, 0.001)
+        
+        assert tight.bits > loose.bits
+        assert tight.hashes > loose.hashes
+
+
+class TestKnownCarIds:
+    """Tests for skipping reads of cars that don't exist."""
+    
+    def test_without_filter_everything_might_exist(self):
+        """Test only the missing car cache applies before a catalog is seen."""
+        known = KnownCarIds(0.01, 30, 100)
+        car_id = str(uuid4())
+        
+        assert known.might_exist(car_id)
+        known.record_missing(car_id)
+        assert not known.might_exist(car_id)
+        assert known.stats()["missingCacheHits"] == 1
+    
+    def test_missing_cache_expires(self):
+        """Test missing cars are read again once their TTL passes."""
+        known = KnownCarIds(0.01, 30, 100)
+        car_id = str(uuid4())
+        
+        with patch('app.known_ids.time.monotonic', return_value=100.0):
+            known.record_missing(car_id)
+        with patch('app.known_ids.time.monotonic', return_value=131.0):
+            assert known.might_exist(car_id)
+    
+    def test_missing_cache_is_bounded(self):
+        """Test the oldest missing cars are dropped first."""
+        known = KnownCarIds(0.01, 30, 2)
+        first, second, third = (str(uuid4()) for _ in range(3))
+        for car_id in (first, second, third):
+            known.record_missing(car_id)
+        
+        assert known.might_exist(first)
+        assert not known.might_exist(third)
+    
+    def test_filter_follows_catalog_and_writes(self):
+        """Test catalog cars and cars written here pass, and unknown IDs don't."""
+        known = KnownCarIds(0.01, 30, 100)
+        cached, written, missing = (str(uuid4()) for _ in range(3))
+        known.record_missing(written)
+        
+        known.on_catalog_change(_catalog(1, [cached]), frozenset({cached}), frozenset())
+        known.on_invalidate(frozenset({written}))
+        
+        assert known.might_exist(cached)
+        assert known.might_exist(written)
+        assert not known.might_exist(missing)
+        stats = known.stats()
+        assert stats["filteredReads"] == 1
+        assert stats["filterIds"] == 2
+        assert stats["expectedFalsePositiveRate"] < 0.01
+    
+    def test_rebuilds_when_cars_are_removed(self):
+        """Test removed cars stop passing the filter."""
+        known = KnownCarIds(0.01, 30, 100)
+        kept, removed, added = (str(uuid4()) for _ in range(3))
+        known.on_catalog_change(_catalog(1, [kept, removed]), frozenset({kept, removed}), frozenset())
+        
+        known.on_catalog_change(_catalog(2, [kept, added]), frozenset({added}), frozenset({removed}))
+        
+        assert known.might_exist(kept)
+        assert known.might_exist(added)
+        assert not known.might_exist(removed)
+    
+    def test_false_positives_are_counted(self):
+        """Test IDs the filter let through but Firestore didn't have count as false positives."""
+        known = KnownCarIds(0.01, 0, 100)
+        car_id = str(uuid4())
+        known.on_catalog_change(_catalog(1, [car_id]), frozenset({car_id}), frozenset())
+        
+        known.record_missing(car_id)
+        
+        assert known.stats()["observedFalsePositiveRate"] == 1.0
+        # The missing car cache is off
+        assert known.might_exist(car_id)
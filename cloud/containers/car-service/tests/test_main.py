@@ -56,6 +56,15 @@ class TestHealthCheck:
         
         data = response.json()
         assert data["service"] == "car-service"
+    
+    def test_health_reports_car_id_filter(self, test_client):
+        """Test health reports the car ID filter's false-positive rates."""
+        response = test_client.get("/health")
+        
+        known = response.json()["knownCarIds"]
+        assert known["targetFalsePositiveRate"] == 0.01
+        assert "expectedFalsePositiveRate" in known
+        assert "observedFalsePositiveRate" in known
 
 
 class TestExceptionHandler:
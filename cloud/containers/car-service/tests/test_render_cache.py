@@ -0,0 +1,149 @@
+"""
+Tests for the rendered car JSON cache.
+"""
+import json
+import msgpack
+import pytest
+from datetime import datetime, timezone
+from uuid import UUID
+from unittest.mock import patch
+
+from app.catalog import CatalogEntry
+from app.render_cache import RenderCache
+from app.schemas import Car, CarView, UnitSystem, Performance, MeasurementPower, PowerUnit
+from app.serialization import dump_car_json
+
+T1 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+T2 = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+A, B, C = (str(UUID(int=n)) for n in (1, 2, 3))
+
+
+def _entry(car_id, update_time=T1, volume_id=None):
+    return CatalogEntry.from_car(Car(id=car_id, make="BMW", model="M4", volumeId=volume_id), update_time)
+
+
+@pytest.fixture
+def mock_urls():
+    """Patch signed-URL lookup used while rendering."""
+    with patch('app.render_cache.get_cached_model_urls') as mock_get_urls:
+        mock_get_urls.side_effect = lambda ids, window: {v: f"https://example.com/{v}" for v in ids}
+        yield mock_get_urls
+
+
+class TestRenderCache:
+    """Tests for RenderCache."""
+    
+    def test_fragments_match_direct_serialization(self, mock_urls):
+        """Test cached fragments are the same bytes as dump_car_json."""
+        entry = _entry(A, volume_id="vol")
+        cache = RenderCache(1024 * 1024)
+        
+        fragment = cache.render([entry], window=1)[0]
+        
+        expected = entry.car.model_copy(update={"modelUrl": "https://example.com/vol"})
+        assert fragment == dump_car_json(expected)
+    
+    def test_hits_skip_rendering(self, mock_urls):
+        """Test a second render of the same version is served from cache."""
+        cache = RenderCache(1024 * 1024)
+        cache.render([_entry(A, volume_id="vol")], window=1)
+        
+        with patch('app.render_cache.dump_car_json') as mock_dump:
+            cache.render([_entry(A, volume_id="vol")], window=1)
+        
+        mock_dump.assert_not_called()
+        mock_urls.assert_called_once()
+    
+    def test_unsigned_fragments_not_cached(self, mock_urls):
+        """Test a car whose URL failed to sign is retried instead of cached without it."""
+        cache = RenderCache(1024 * 1024)
+        mock_urls.side_effect = lambda ids, window: {v: None for v in ids}
+        
+        first = cache.render([_entry(A, volume_id="vol"), _entry(B)], window=1)
+        
+        assert json.loads(first[0])["modelUrl"] is None
+        assert len(cache) == 1
+        
+        mock_urls.side_effect = lambda ids, window: {v: f"https://example.com/{v}" for v in ids}
+        second = cache.render([_entry(A, volume_id="vol"), _entry(B)], window=1)
+        
+        assert json.loads(second[0])["modelUrl"] == "https://example.com/vol"
+        assert len(cache) == 2
+    
+    def test_new_update_time_or_window_misses(self, mock_urls):
+        """Test fragments are keyed by update_time and URL window."""
+        cache = RenderCache(1024 * 1024)
+        cache.render([_entry(A)], window=1)
+        cache.render([_entry(A, T2)], window=1)
+        cache.render([_entry(A, T2)], window=2)
+        
+        assert len(cache) == 3
+    
+    def test_fragments_keyed_by_unit_system(self, mock_urls):
+        """Test each unit system is rendered once per version and converted."""
+        car = Car(id=A, make="BMW", model="M4", performance=Performance(
+            horsepower=MeasurementPower(value=473, unit=PowerUnit.horsepower)))
+        entry = CatalogEntry.from_car(car, T1)
+        cache = RenderCache(1024 * 1024)
+        
+        native = json.loads(cache.render([entry], window=1)[0])
+        metric = json.loads(cache.render([entry], window=1, units=UnitSystem.metric)[0])
+        cache.render([entry], window=1, units=UnitSystem.metric)
+        
+        assert native["performance"]["horsepower"] == {"value": 473.0, "unit": "horsepower"}
+        assert metric["performance"]["horsepower"] == {"value": 353.0, "unit": "kilowatts"}
+        assert len(cache) == 2
+    
+    def test_render_list_is_json_array(self, mock_urls):
+        """Test render_list joins fragments into a valid array in order."""
+        cache = RenderCache(1024 * 1024)
+        
+        body = cache.render_list([_entry(B), _entry(A)], window=1)
+        
+        assert [car["id"] for car in json.loads(body)] == [B, A]
+        assert cache.render_list([], window=1) == b"[]"
+    
+    def test_byte_budget_evicts_least_recently_used(self, mock_urls):
+        """Test the cache stays within its memory budget."""
+        fragment_size = len(dump_car_json(_entry(A).car))
+        cache = RenderCache(fragment_size * 2)
+        
+        cache.render([_entry(A), _entry(B)], window=1)
+        cache.render([_entry(A)], window=1)
+        cache.render([_entry(C)], window=1)
+        
+        assert cache.size <= cache.max_bytes
+        assert len(cache) == 2
+        with patch('app.render_cache.dump_car_json', wraps=dump_car_json) as mock_dump:
+            cache.render([_entry(A)], window=1)
+        mock_dump.assert_not_called()
+    
+    def test_zero_budget_disables_storage(self, mock_urls):
+        """Test a zero budget renders without caching."""
+        cache = RenderCache(0)
+        
+        cache.render([_entry(A)], window=1)
+        
+        assert len(cache) == 0
+    
+    def test_render_list_msgpack(self, mock_urls):
+        """Test binary lists join cached fragments under an array header."""
+        cache = RenderCache(1024 * 1024)
+        
+        body = cache.render_list([_entry(B), _entry(A)], window=1, fmt="msgpack")
+        
+        assert [car["id"] for car in msgpack.unpackb(body)] == [B, A]
+        cache.render([_entry(A)], window=1)
+        assert len(cache) == 3
+    
+    def test_summary_view_skips_signing_and_window(self, mock_urls):
+        """Test summaries carry no model URL, so they are shared across URL windows."""
+        cache = RenderCache(1024 * 1024)
+        
+        first = cache.render([_entry(A, volume_id="vol")], window=1, view=CarView.summary)
+        cache.render([_entry(A, volume_id="vol")], window=2, view=CarView.summary)
+        
+        assert set(json.loads(first[0])) == {"id", "make", "model"}
+        assert len(cache) == 1
+        mock_urls.assert_not_called()
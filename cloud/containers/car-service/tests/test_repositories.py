@@ -2,8 +2,11 @@
 Tests for repository layer (Firestore operations).
 """
 import pytest
-from unittest.mock import patch, MagicMock, PropertyMock
+from unittest.mock import ANY, call, patch, MagicMock, PropertyMock
 from uuid import uuid4
+from datetime import datetime, timezone
+
+from google.cloud.firestore import DELETE_FIELD
 
 from app.schemas import Car
 
@@ -120,6 +123,25 @@ class TestGetCarRepository:
             
             assert result is None
     
+    def test_get_car_known_missing_skips_read(self):
+        """Test a car known not to exist isn't read, and a missing car is remembered."""
+        car_id = str(uuid4())
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.known_car_ids') as mock_known:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.collection.return_value.document.return_value.get.return_value.exists = False
+            mock_known.might_exist.return_value = True
+            
+            from app.repositories import get_car
+            assert get_car(car_id) is None
+            mock_known.record_missing.assert_called_once_with(car_id)
+            
+            mock_known.might_exist.return_value = False
+            assert get_car(car_id) is None
+            assert mock_db.collection.return_value.document.return_value.get.call_count == 1
+    
     def test_get_car_invalid_uuid(self):
         """Test get_car with invalid UUID format."""
         with patch('app.repositories.get_firestore_client'):
@@ -139,6 +161,7 @@ class TestCreateCarRepository:
             mock_get_client.return_value = mock_db
             
             mock_doc_ref = MagicMock()
+            mock_doc_ref.get.return_value.exists = False
             mock_collection = MagicMock()
             mock_collection.document.return_value = mock_doc_ref
             mock_db.collection.return_value = mock_collection
@@ -148,7 +171,54 @@ class TestCreateCarRepository:
             result = create_car(car)
             
             assert result is True
-            mock_doc_ref.set.assert_called_once()
+            mock_batch = mock_db.batch.return_value
+            (ref, car_data), _ = mock_batch.set.call_args_list[0]
+            assert ref is mock_doc_ref
+            mock_batch.commit.assert_called_once()
+            
+            from google.cloud.firestore import SERVER_TIMESTAMP
+            assert car_data["updatedAt"] is SERVER_TIMESTAMP
+            assert car_data["_si"]["power_w"] > 0
+    
+    def test_create_car_counts_facets(self, sample_car_data):
+        """Test a new car increments its facet counts in the same batch."""
+        from google.cloud.firestore import Increment
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.exists = False
+            
+            from app.repositories import create_car
+            create_car(Car(**sample_car_data))
+            
+            assert mock_doc_ref.get.call_args_list[0] == call(field_paths=[
+                "make", "bodyStyle", "engine.fuel", "drivetrain.transmission", "drivetrain.layout", "year",
+                "volumeId", "slug",
+            ])
+            (_, stats), kwargs = mock_db.batch.return_value.set.call_args_list[1]
+            assert kwargs == {"merge": True}
+            assert stats["total"] == Increment(1)
+            assert stats["counts"]["make"] == {sample_car_data["make"]: Increment(1)}
+            assert stats["counts"]["year"] == {str(sample_car_data["year"]): Increment(1)}
+    
+    def test_create_car_claims_keys(self, sample_car_data):
+        """Test a new car claims its volumeId and default slug in the same batch."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_collection = mock_db.collection.return_value
+            mock_collection.document.return_value.get.return_value.exists = False
+            
+            from app.repositories import create_car
+            create_car(Car(**sample_car_data))
+            
+            claims = {ref_call[0][0] for ref_call in mock_collection.document.call_args_list}
+            assert {"volumeId:bmw_m3_2024", "slug:bmw-m3-2024"} <= claims
+            mock_batch = mock_db.batch.return_value
+            assert mock_batch.create.call_count == 2
+            assert mock_batch.create.call_args[0][1] == {"carId": sample_car_data["id"]}
+            assert mock_batch.set.call_args_list[0][0][1]["slug"] == "bmw-m3-2024"
     
     def test_create_car_error(self, sample_car_data):
         """Test create_car handles errors."""
@@ -188,7 +258,266 @@ class TestUpdateCarRepository:
             result = update_car(car_id, car)
             
             assert result is True
-            mock_doc_ref.update.assert_called_once()
+            mock_batch = mock_db.batch.return_value
+            mock_batch.update.assert_called_once()
+            assert mock_batch.update.call_args[0][0] is mock_doc_ref
+            mock_batch.commit.assert_called_once()
+
+
+class TestPatchCarRepository:
+    """Tests for patch_car repository function."""
+    
+    def test_patch_car_sends_only_field_updates(self):
+        """Test patch_car updates only the given paths."""
+        car_id = str(uuid4())
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars') as mock_invalidate:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.update.return_value.update_time = "new-time"
+            
+            from app.repositories import patch_car
+            result = patch_car(car_id, {"engine.code": "S58"})
+            
+            assert result == "new-time"
+            from google.cloud.firestore import SERVER_TIMESTAMP
+            mock_doc_ref.update.assert_called_once_with(
+                {"engine.code": "S58", "updatedAt": SERVER_TIMESTAMP}, option=None
+            )
+            mock_invalidate.assert_called_once_with([car_id])
+    
+    def test_patch_car_with_precondition(self):
+        """Test patch_car passes a last_update_time write option."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            
+            from app.repositories import patch_car
+            patch_car(str(uuid4()), {"blurb": "x"}, last_update_time="then")
+            
+            mock_db.write_option.assert_called_once_with(last_update_time="then")
+            assert mock_doc_ref.update.call_args[1]["option"] == mock_db.write_option.return_value
+    
+    def test_patch_car_keeps_si_in_step(self):
+        """Test patching a measurement rewrites its canonical shadow field."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.to_dict.return_value = {"_si": {"curb_weight_kg": 1500}}
+            
+            from app.repositories import patch_car
+            patch_car(str(uuid4()), {"performance.horsepower": {"value": 300, "unit": "kilowatts"}})
+            
+            ref, updates = mock_db.batch.return_value.update.call_args[0]
+            assert ref is mock_doc_ref
+            assert updates["_si.power_w"] == 300000
+            assert updates["_si.power_to_weight_w_per_kg"] == 200
+            mock_doc_ref.get.assert_called_once_with(field_paths=["_si"])
+            mock_db.write_option.assert_called_once_with(last_update_time=mock_doc_ref.get.return_value.update_time)
+    
+    def test_patch_car_derived_retries_on_conflict(self):
+        """Test a concurrent write between reading _si and updating is retried."""
+        from google.api_core import exceptions as gcp_exceptions
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.to_dict.return_value = {"_si": {}}
+            mock_db.batch.return_value.commit.side_effect = [
+                gcp_exceptions.FailedPrecondition("changed"), [MagicMock(update_time="t2")],
+            ]
+            
+            from app.repositories import patch_car
+            result = patch_car(str(uuid4()), {"dimensions.curbWeight": DELETE_FIELD})
+            
+            assert result == "t2"
+            assert mock_doc_ref.get.call_count == 2
+    
+    def test_patch_car_derived_honours_precondition(self):
+        """Test an If-Match version that is already stale fails without writing."""
+        from google.api_core import exceptions as gcp_exceptions
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.update_time = "now"
+            
+            from app.repositories import patch_car
+            with pytest.raises(gcp_exceptions.FailedPrecondition):
+                patch_car(str(uuid4()), {"performance": DELETE_FIELD}, last_update_time="then")
+            
+            mock_db.batch.return_value.commit.assert_not_called()
+    
+    def test_patch_car_moves_facet_counts(self):
+        """Test patching a facet field updates the stats document in the same conditional batch."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.to_dict.return_value = {"make": "BMW", "engine": {"fuel": "gasoline"}}
+            mock_batch = mock_db.batch.return_value
+            mock_batch.commit.return_value = [MagicMock(update_time="t2")]
+            
+            from app.repositories import patch_car
+            result = patch_car(str(uuid4()), {"make": "Audi", "engine.code": "DAZA"})
+            
+            assert result == "t2"
+            updates = mock_batch.update.call_args[0][1]
+            assert updates["make"] == "Audi"
+            assert mock_batch.update.call_args[1]["option"] is mock_db.write_option.return_value
+            stats = mock_batch.set.call_args[0][1]
+            assert {value: increment.value for value, increment in stats["counts"]["make"].items()} == {"BMW": -1, "Audi": 1}
+            assert "total" not in stats
+    
+    def test_patch_car_unchanged_facet_skips_stats(self):
+        """Test a facet field patched to its current value writes no stats."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_doc_ref = mock_db.collection.return_value.document.return_value
+            mock_doc_ref.get.return_value.to_dict.return_value = {"year": 2020}
+            
+            from app.repositories import patch_car
+            patch_car(str(uuid4()), {"year": 2020})
+            
+            mock_db.batch.return_value.update.assert_called_once()
+            mock_db.batch.return_value.set.assert_not_called()
+    
+    def test_patch_car_moves_key_claims(self):
+        """Test a new slug is claimed and the old one released in the patch batch."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_collection = mock_db.collection.return_value
+            mock_doc_ref = mock_collection.document.return_value
+            mock_doc_ref.get.return_value.to_dict.return_value = {"slug": "bmw-m3"}
+            car_id = mock_doc_ref.id = str(uuid4())
+            
+            from app.repositories import patch_car
+            patch_car(car_id, {"slug": "bmw-m3-e90"})
+            
+            mock_batch = mock_db.batch.return_value
+            assert mock_batch.create.call_args[0][1] == {"carId": car_id}
+            mock_batch.delete.assert_called_once()
+            assert call("slug:bmw-m3-e90") in mock_collection.document.call_args_list
+            assert call("slug:bmw-m3") in mock_collection.document.call_args_list
+
+
+class TestGetCarByKeyRepository:
+    """Tests for get_car_by_key repository function."""
+    
+    def test_get_car_by_key(self, sample_car_data):
+        """Test an equality query on the key, limited to one car."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_urls:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_urls.return_value = {}
+            mock_doc = MagicMock(id=sample_car_data["id"])
+            mock_doc.to_dict.return_value = {k: v for k, v in sample_car_data.items() if k != "id"}
+            mock_query = mock_db.collection.return_value.where.return_value.limit.return_value
+            mock_query.stream.return_value = [mock_doc]
+            
+            from app.repositories import get_car_by_key
+            result = get_car_by_key("volumeId", "bmw_m3_2024")
+            
+            assert str(result.id) == sample_car_data["id"]
+            field_filter = mock_db.collection.return_value.where.call_args[1]["filter"]
+            assert (field_filter.field_path, field_filter.op_string, field_filter.value) == ("volumeId", "==", "bmw_m3_2024")
+            mock_db.collection.return_value.where.return_value.limit.assert_called_once_with(1)
+    
+    def test_get_car_by_key_not_found(self):
+        """Test no match returns None."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_db.collection.return_value.where.return_value.limit.return_value.stream.return_value = []
+            
+            from app.repositories import get_car_by_key
+            assert get_car_by_key("slug", "nope") is None
+
+
+class TestQueryCarsRepository:
+    """Tests for query_cars repository function."""
+    
+    def test_query_filters_and_orders_on_si_fields(self, sample_car_data):
+        """Test spec bounds become range filters on _si and the sort an order_by."""
+        from app.repositories import query_cars
+        from app.specs import parse_spec_query
+        
+        doc = MagicMock()
+        doc.id = sample_car_data["id"]
+        doc.to_dict.return_value = {k: v for k, v in sample_car_data.items() if k != "id"}
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids', return_value={}):
+            mock_collection = mock_get_client.return_value.collection.return_value
+            mock_query = mock_collection.where.return_value.where.return_value.order_by.return_value
+            mock_query.stream.return_value = [doc]
+            
+            cars = query_cars(parse_spec_query(["power_w:300000"], ["curb_weight_kg:1600"], "-power_w"))
+            
+            assert [str(car.id) for car in cars] == [sample_car_data["id"]]
+            first = mock_collection.where.call_args[1]["filter"]
+            assert (first.field_path, first.op_string, first.value) == ("_si.power_w", ">=", 300000)
+            second = mock_collection.where.return_value.where.call_args[1]["filter"]
+            assert (second.field_path, second.op_string, second.value) == ("_si.curb_weight_kg", "<=", 1600)
+            assert mock_collection.where.return_value.where.return_value.order_by.call_args[0] == ("_si.power_w",)
+
+
+class TestFacetStatsRepository:
+    """Tests for the facet stats reads."""
+    
+    def test_get_facet_stats(self):
+        """Test the stats document is returned as (total, counts, update_time)."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            snapshot = mock_db.collection.return_value.document.return_value.get.return_value
+            snapshot.to_dict.return_value = {"total": 3, "counts": {"make": {"BMW": 2, "Audi": 1}}}
+            snapshot.update_time = "t1"
+            
+            from app.repositories import get_facet_stats
+            assert get_facet_stats() == (3, {"make": {"BMW": 2, "Audi": 1}}, "t1")
+            mock_db.collection.assert_called_with("stats")
+            mock_db.collection.return_value.document.assert_called_with("car_facets")
+    
+    def test_get_facet_stats_missing(self):
+        """Test a missing stats document returns None."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_get_client.return_value.collection.return_value.document.return_value.get.return_value.exists = False
+            
+            from app.repositories import get_facet_stats
+            assert get_facet_stats() is None
+    
+    def test_get_facet_rows_projects_and_filters(self):
+        """Test facet rows come from a projection query with the spec filters."""
+        from app.specs import parse_spec_query
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            projection = mock_db.collection.return_value.select.return_value
+            doc = MagicMock()
+            doc.to_dict.return_value = {"make": "BMW", "drivetrain": {"layout": "fr"}}
+            projection.where.return_value.order_by.return_value.stream.return_value = [doc]
+            
+            from app.repositories import get_facet_rows
+            rows = get_facet_rows(parse_spec_query(["power_w:300000"], [], None))
+            
+            assert rows == [{"make": "BMW", "layout": "fr"}]
+            assert "drivetrain.layout" in mock_db.collection.return_value.select.call_args[0][0]
+            projection.where.assert_called_once()
 
 
 class TestDeleteCarRepository:
@@ -203,6 +532,7 @@ class TestDeleteCarRepository:
             mock_get_client.return_value = mock_db
             
             mock_doc_ref = MagicMock()
+            mock_doc_ref.get.return_value.to_dict.return_value = {"make": "BMW", "year": 2020}
             mock_collection = MagicMock()
             mock_collection.document.return_value = mock_doc_ref
             mock_db.collection.return_value = mock_collection
@@ -211,5 +541,502 @@ class TestDeleteCarRepository:
             result = delete_car(car_id)
             
             assert result is True
-            mock_doc_ref.delete.assert_called_once()
+            mock_batch = mock_db.batch.return_value
+            mock_batch.delete.assert_called_once_with(mock_doc_ref)
+            # Tombstone, then the facet stats decrement
+            assert mock_batch.set.call_count == 2
+            stats = mock_batch.set.call_args_list[1][0][1]
+            assert stats["total"].value == -1
+            assert stats["counts"] == {"make": {"BMW": ANY}, "year": {"2020": ANY}}
+            assert stats["counts"]["make"]["BMW"].value == -1
+            mock_batch.commit.assert_called_once()
+
+
+
+class TestGetCarsByIdsRepository:
+    """Tests for get_cars_by_ids repository function."""
+    
+    def test_get_cars_by_ids_single_round_trip(self, sample_car_data):
+        """Test that all IDs are fetched with one get_all call and signed in batch."""
+        car_id = sample_car_data["id"]
+        missing_id = str(uuid4())
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_get_urls:
+            
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_get_urls.return_value = {sample_car_data["volumeId"]: "https://example.com/model.usdz"}
+            
+            found_doc = MagicMock()
+            found_doc.exists = True
+            found_doc.id = car_id
+            found_doc.to_dict.return_value = {k: v for k, v in sample_car_data.items() if k != "id"}
+            
+            missing_doc = MagicMock()
+            missing_doc.exists = False
+            missing_doc.id = missing_id
+            
+            mock_db.get_all.return_value = [missing_doc, found_doc]
+            
+            from app.repositories import get_cars_by_ids
+            result = get_cars_by_ids([car_id, missing_id])
+            
+            assert list(result.keys()) == [car_id]
+            assert result[car_id].modelUrl == "https://example.com/model.usdz"
+            mock_db.get_all.assert_called_once()
+            mock_get_urls.assert_called_once()
+    
+    def test_get_cars_by_ids_empty(self):
+        """Test get_cars_by_ids with no IDs does not touch Firestore."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            from app.repositories import get_cars_by_ids
+            result = get_cars_by_ids([])
+            
+            assert result == {}
+            mock_get_client.assert_not_called()
+    
+    def test_get_cars_by_ids_propagates_error(self):
+        """Test get_cars_by_ids doesn't turn a Firestore error into missing cars."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_get_client.return_value.get_all.side_effect = gcp_exceptions.ServiceUnavailable("down")
+            
+            from app.repositories import get_cars_by_ids
+            with pytest.raises(gcp_exceptions.ServiceUnavailable):
+                get_cars_by_ids([str(uuid4())])
+
 
+class TestGetCarSummariesRepository:
+    """Tests for get_car_summaries repository function."""
+    
+    def test_get_car_summaries_uses_projection(self, sample_car_data):
+        """Test only the summary fields are requested and nothing is signed."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_get_urls:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            
+            mock_doc = MagicMock()
+            mock_doc.id = sample_car_data["id"]
+            mock_doc.to_dict.return_value = {"make": "BMW", "model": "M4", "year": 2021}
+            mock_db.collection.return_value.select.return_value.stream.return_value = [mock_doc]
+            
+            from app.repositories import get_car_summaries, CAR_SUMMARY_FIELDS
+            result = get_car_summaries()
+            
+            mock_db.collection.return_value.select.assert_called_once_with(CAR_SUMMARY_FIELDS)
+            assert "id" not in CAR_SUMMARY_FIELDS
+            assert result[0].make == "BMW"
+            assert str(result[0].id) == sample_car_data["id"]
+            mock_get_urls.assert_not_called()
+    
+    def test_get_car_summaries_handles_error(self):
+        """Test get_car_summaries handles Firestore errors gracefully."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_get_client.side_effect = Exception("Firestore error")
+            
+            from app.repositories import get_car_summaries
+            
+            assert get_car_summaries() == []
+
+
+class TestIterCarsRepository:
+    """Tests for iter_cars repository function."""
+    
+    def test_iter_cars_streams_unsigned_cars(self, sample_car_data):
+        """Test documents are yielded lazily without signing URLs."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_get_urls:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            
+            mock_doc = MagicMock()
+            mock_doc.id = sample_car_data["id"]
+            mock_doc.to_dict.return_value = {k: v for k, v in sample_car_data.items() if k != "id"}
+            mock_db.collection.return_value.stream.return_value = iter([mock_doc])
+            
+            from app.repositories import iter_cars
+            cars = iter_cars()
+            mock_get_client.assert_not_called()
+            
+            result = list(cars)
+            
+            assert [str(car.id) for car in result] == [sample_car_data["id"]]
+            mock_get_urls.assert_not_called()
+    
+    def test_iter_cars_stops_on_error(self):
+        """Test a Firestore error ends the stream instead of raising."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_get_client.side_effect = Exception("Firestore error")
+            
+            from app.repositories import iter_cars
+            
+            assert list(iter_cars()) == []
+
+
+class TestBulkUpsertCarsRepository:
+    """Tests for bulk_upsert_cars repository function."""
+    
+    def _writer(self, mock_db, fail_ids=()):
+        """Mock BulkWriter that acknowledges writes when closed."""
+        writer = MagicMock()
+        callbacks = {}
+        writer.on_write_result.side_effect = lambda cb: callbacks.__setitem__('result', cb)
+        writer.on_write_error.side_effect = lambda cb: callbacks.__setitem__('error', cb)
+        refs = []
+        writer.set.side_effect = lambda ref, data: refs.append(ref)
+        
+        def close():
+            for ref in refs:
+                if ref.id in fail_ids:
+                    failure = MagicMock(attempts=99, code=3, message="invalid")
+                    failure.operation.reference = ref
+                    assert callbacks['error'](failure, writer) is False
+                else:
+                    callbacks['result'](ref, MagicMock(), writer)
+        writer.close.side_effect = close
+        mock_db.bulk_writer.return_value = writer
+        
+        refs_by_id = {}
+        
+        def document(car_id):
+            if car_id not in refs_by_id:
+                refs_by_id[car_id] = MagicMock()
+                refs_by_id[car_id].id = car_id
+            return refs_by_id[car_id]
+        mock_db.collection.return_value.document.side_effect = document
+        return writer
+    
+    def _documents(self, mock_db, docs):
+        """Serve the given stored cars and claims from get_all, by document ID."""
+        mock_db.get_all.side_effect = lambda refs, field_paths: [docs[ref.id] for ref in refs if ref.id in docs]
+    
+    def _doc(self, doc_id, data, update_time=None):
+        doc = MagicMock(id=doc_id, exists=True, update_time=update_time)
+        doc.to_dict.return_value = data
+        return doc
+    
+    def _stored_keys(self, car):
+        """A stored document holding the car's keys, so writing it claims nothing."""
+        return self._doc(str(car.id), {"volumeId": car.volumeId, "slug": f"car-{car.id}"})
+    
+    def test_bulk_upsert_reports_outcomes_and_invalidates_once(self, multiple_cars_data):
+        """Test per-car outcomes and a single cache invalidation per batch."""
+        cars = [Car(**data) for data in multiple_cars_data]
+        failed_id = str(cars[0].id)
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars') as mock_invalidate:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            writer = self._writer(mock_db, fail_ids={failed_id})
+            self._documents(mock_db, {str(car.id): self._stored_keys(car) for car in cars})
+            
+            from app.repositories import bulk_upsert_cars
+            result = bulk_upsert_cars(iter(cars))
+            
+            assert result[failed_id] == "invalid"
+            assert all(result[str(car.id)] is None for car in cars[1:])
+            # Keys are unchanged, so nothing is claimed
+            assert writer.set.call_count == len(cars)
+            mock_db.batch.assert_not_called()
+            writer.close.assert_called_once()
+            mock_invalidate.assert_called_once()
+            assert set(mock_invalidate.call_args[0][0]) == {str(car.id) for car in cars[1:]}
+    
+    def test_bulk_upsert_updates_facet_stats_once(self, multiple_cars_data):
+        """Test stored facets are read per chunk and only successful writes are counted."""
+        cars = [Car(**data) for data in multiple_cars_data]
+        failed_id = str(cars[0].id)
+        replaced = cars[1]
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'), \
+             patch('app.repositories.BULK_FACET_READ_BATCH', 2):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            self._writer(mock_db, fail_ids={failed_id})
+            self._documents(mock_db, {
+                failed_id: self._stored_keys(cars[0]),
+                str(replaced.id): self._doc(str(replaced.id), {"make": "Old make"}),
+            })
+            
+            from app.repositories import bulk_upsert_cars
+            bulk_upsert_cars(iter(cars))
+            
+            # Stored cars and claims, per chunk of two
+            assert mock_db.get_all.call_count == 4
+            stats_ref = mock_db.collection.return_value.document.side_effect("car_facets")
+            stats_ref.set.assert_called_once()
+            stats = stats_ref.set.call_args[0][0]
+            # One replaced car plus two new ones (the first car's write failed)
+            assert stats["total"].value == len(cars) - 2
+            makes = {value: increment.value for value, increment in stats["counts"]["make"].items()}
+            assert makes["Old make"] == -1
+            assert cars[0].make not in makes
+    
+    def test_bulk_upsert_rejects_taken_keys(self, multiple_cars_data):
+        """Test a car whose volumeId another car holds is rejected and the rest claim theirs."""
+        cars = [Car(**data) for data in multiple_cars_data]
+        taken = cars[1]
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            writer = self._writer(mock_db)
+            claim_id = f"volumeId:{taken.volumeId}"
+            self._documents(mock_db, {claim_id: self._doc(claim_id, {"carId": "someone-else"})})
+            
+            from app.repositories import bulk_upsert_cars
+            result = bulk_upsert_cars(iter(cars))
+            
+            assert result[str(taken.id)] == f"volumeId '{taken.volumeId}' is already used by car someone-else"
+            assert all(result[str(car.id)] is None for car in cars if car is not taken)
+            # Cars are written in one batch with their claims
+            writer.set.assert_not_called()
+            batch = mock_db.batch.return_value
+            batch.commit.assert_called_once()
+            assert batch.set.call_count == len(cars) - 1
+            # A volumeId and a default slug per accepted car, created so a holder fails the batch
+            assert batch.create.call_count == 2 * (len(cars) - 1)
+    
+    def test_bulk_upsert_claim_conflict_fails_one_car(self, multiple_cars_data):
+        """Test a claim created elsewhere since it was read fails only its car."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        cars = [Car(**data) for data in multiple_cars_data]
+        conflicted = cars[2]
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars') as mock_invalidate:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            self._writer(mock_db)
+            self._documents(mock_db, {})
+            batches = []
+            
+            def batch():
+                written = []
+                new_batch = MagicMock()
+                new_batch.set.side_effect = lambda ref, data: written.append(ref.id)
+                
+                def commit():
+                    if str(conflicted.id) in written:
+                        raise gcp_exceptions.AlreadyExists("claim exists")
+                    return []
+                new_batch.commit.side_effect = commit
+                batches.append(new_batch)
+                return new_batch
+            mock_db.batch.side_effect = batch
+            
+            from app.repositories import bulk_upsert_cars
+            result = bulk_upsert_cars(iter(cars))
+            
+            assert result[str(conflicted.id)] == "volumeId or slug already used by another car"
+            assert all(result[str(car.id)] is None for car in cars if car is not conflicted)
+            # The chunk's batch, then one per car
+            assert len(batches) == 1 + len(cars)
+            assert str(conflicted.id) not in mock_invalidate.call_args[0][0]
+    
+    def test_bulk_upsert_releases_only_owned_claims(self, multiple_cars_data):
+        """Test a replaced claim is deleted only if the car owns it and it hasn't changed since read."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        cars = [Car(**data) for data in multiple_cars_data[:2]]
+        owned, lost = cars
+        read_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            self._writer(mock_db)
+            self._documents(mock_db, {
+                str(owned.id): self._doc(str(owned.id), {"volumeId": "old-owned"}),
+                str(lost.id): self._doc(str(lost.id), {"volumeId": "old-lost"}),
+                "volumeId:old-owned": self._doc("volumeId:old-owned", {"carId": str(owned.id)}, read_at),
+                "volumeId:old-lost": self._doc("volumeId:old-lost", {"carId": "someone-else"}, read_at),
+            })
+            batch = mock_db.batch.return_value
+            
+            from app.repositories import bulk_upsert_cars
+            result = bulk_upsert_cars(iter(cars))
+            
+            assert result == {str(owned.id): None, str(lost.id): None}
+            batch.delete.assert_called_once()
+            assert batch.delete.call_args[0][0].id == "volumeId:old-owned"
+            assert batch.delete.call_args[1]["option"] is mock_db.write_option.return_value
+            mock_db.write_option.assert_called_once_with(last_update_time=read_at)
+            
+            # A claim that changed since it was read fails the car instead
+            mock_db.batch.reset_mock()
+            batch.commit.side_effect = gcp_exceptions.FailedPrecondition("changed")
+            result = bulk_upsert_cars(iter(cars[:1]))
+            
+            assert result == {str(owned.id): "volumeId or slug changed concurrently; retry"}
+    
+    def test_bulk_upsert_read_failure_fails_chunk(self, multiple_cars_data):
+        """Test a failed read of stored cars fails that chunk's cars and the rest are still written."""
+        cars = [Car(**data) for data in multiple_cars_data]
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.invalidate_cars'), \
+             patch('app.repositories.BULK_FACET_READ_BATCH', 2):
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            self._writer(mock_db)
+            reads = []
+            
+            def get_all(refs, field_paths):
+                reads.append(refs)
+                if len(reads) == 1:
+                    raise Exception("deadline exceeded")
+                return []
+            mock_db.get_all.side_effect = get_all
+            
+            from app.repositories import bulk_upsert_cars
+            result = bulk_upsert_cars(iter(cars))
+            
+            assert all("deadline exceeded" in result[str(car.id)] for car in cars[:2])
+            assert all(result[str(car.id)] is None for car in cars[2:])
+    
+    def test_bulk_upsert_retries_transient_errors(self):
+        """Test the error callback asks BulkWriter to retry below the attempt limit."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            writer = self._writer(mock_db)
+            
+            from app.repositories import bulk_upsert_cars
+            bulk_upsert_cars(iter([]))
+            
+            on_error = writer.on_write_error.call_args[0][0]
+            assert on_error(MagicMock(attempts=1), writer) is True
+
+
+class TestWritesInvalidateCaches:
+    """Tests that single-document writes invalidate caches."""
+    
+    def test_delete_car_invalidates(self):
+        """Test delete_car invalidates the deleted car."""
+        car_id = str(uuid4())
+        
+        with patch('app.repositories.get_firestore_client'), \
+             patch('app.repositories.invalidate_cars') as mock_invalidate:
+            from app.repositories import delete_car
+            delete_car(car_id)
+            
+            mock_invalidate.assert_called_once_with([car_id])
+
+
+class TestGetChangesRepository:
+    """Tests for get_changes repository function."""
+    
+    def test_get_changes_reads_both_collections_after_cursors(self, sample_car_data):
+        """Test cars and tombstones are read in feed order after their cursors."""
+        from datetime import datetime, timezone
+        
+        updated_at = datetime(2025, 1, 2, tzinfo=timezone.utc)
+        deleted_at = datetime(2025, 1, 3, tzinfo=timezone.utc)
+        
+        car_doc = MagicMock()
+        car_doc.id = sample_car_data["id"]
+        car_doc.to_dict.return_value = {
+            **{k: v for k, v in sample_car_data.items() if k != "id"}, "updatedAt": updated_at
+        }
+        broken_doc = MagicMock()
+        broken_doc.id = str(uuid4())
+        broken_doc.to_dict.return_value = {"updatedAt": updated_at}
+        tombstone_doc = MagicMock()
+        tombstone_doc.id = str(uuid4())
+        tombstone_doc.to_dict.return_value = {"deletedAt": deleted_at}
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_get_urls:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            mock_get_urls.return_value = {}
+            
+            collections = {"cars": MagicMock(), "car_tombstones": MagicMock()}
+            mock_db.collection.side_effect = collections.__getitem__
+            
+            def ordered(collection, docs):
+                query = collection.order_by.return_value.order_by.return_value
+                query.start_after.return_value = query
+                query.limit.return_value.stream.return_value = docs
+                return query
+            
+            car_query = ordered(collections["cars"], [car_doc, broken_doc])
+            ordered(collections["car_tombstones"], [tombstone_doc])
+            
+            from app.repositories import get_changes
+            cursor = (datetime(2025, 1, 1, tzinfo=timezone.utc), "prev-id")
+            changed, deleted = get_changes(cursor, None, 10)
+            
+            assert [(c[0], c[1]) for c in changed] == [
+                (updated_at, car_doc.id), (updated_at, broken_doc.id)
+            ]
+            assert isinstance(changed[0][2], Car)
+            assert changed[1][2] is None
+            assert deleted == [(deleted_at, tombstone_doc.id)]
+            car_query.start_after.assert_called_once_with(
+                {"updatedAt": cursor[0], "__name__": "prev-id"}
+            )
+            collections["car_tombstones"].order_by.return_value.order_by.return_value \
+                .start_after.assert_not_called()
+
+
+class TestGetCarVersions:
+    """Tests for get_car_versions repository function."""
+    
+    def test_get_car_versions_whole_collection(self, sample_car_data):
+        """Test the whole collection is read with update times and no signing."""
+        car_id = sample_car_data["id"]
+        update_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        
+        with patch('app.repositories.get_firestore_client') as mock_get_client, \
+             patch('app.repositories.get_model_urls_for_volume_ids') as mock_get_urls:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            
+            doc = MagicMock()
+            doc.exists = True
+            doc.id = car_id
+            doc.update_time = update_time
+            doc.to_dict.return_value = {k: v for k, v in sample_car_data.items() if k != "id"}
+            mock_db.collection.return_value.stream.return_value = [doc]
+            
+            from app.repositories import get_car_versions
+            result = get_car_versions()
+            
+            car, version = result[car_id]
+            assert version == update_time
+            assert car.modelUrl is None
+            mock_get_urls.assert_not_called()
+    
+    def test_get_car_versions_by_ids_skips_missing(self):
+        """Test selected IDs are fetched with get_all and missing docs are skipped."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_db = MagicMock()
+            mock_get_client.return_value = mock_db
+            missing_doc = MagicMock()
+            missing_doc.exists = False
+            mock_db.get_all.return_value = [missing_doc]
+            
+            from app.repositories import get_car_versions
+            
+            assert get_car_versions([str(uuid4())]) == {}
+            mock_db.get_all.assert_called_once()
+    
+    def test_get_car_versions_propagates_errors(self):
+        """Test Firestore errors are raised so caches keep their old data."""
+        with patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_get_client.side_effect = Exception("Firestore error")
+            
+            from app.repositories import get_car_versions
+            
+            with pytest.raises(Exception, match="Firestore error"):
+                get_car_versions()
@@ -1,11 +1,14 @@
 """
 Tests for API routes.
 """
+import json
+import msgpack
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from uuid import uuid4
 
-from app.schemas import Car
+from app.schemas import Car, CarView, UnitSystem
+from app.serialization import RenderedBody, dump_car_json, dump_cars_json
 
 
 class TestHealthEndpoint:
@@ -29,7 +32,7 @@ class TestGetCarsEndpoint:
         mock_car = Car(**sample_car_data)
         
         with patch('app.routes.get_cars_service') as mock_service:
-            mock_service.return_value = [mock_car.model_dump(mode='json')]
+            mock_service.return_value = RenderedBody(dump_cars_json([mock_car]))
             
             response = test_client.get("/v1/cars")
             
@@ -41,7 +44,7 @@ class TestGetCarsEndpoint:
     def test_get_cars_empty(self, test_client):
         """Test get_cars when no cars exist."""
         with patch('app.routes.get_cars_service') as mock_service:
-            mock_service.return_value = []
+            mock_service.return_value = RenderedBody(b"[]")
             
             response = test_client.get("/v1/cars")
             
@@ -54,13 +57,149 @@ class TestGetCarsEndpoint:
         mock_cars = [Car(**data).model_dump(mode='json') for data in multiple_cars_data]
         
         with patch('app.routes.get_cars_service') as mock_service:
-            mock_service.return_value = mock_cars
+            mock_service.return_value = RenderedBody(json.dumps(mock_cars).encode())
             
             response = test_client.get("/v1/cars")
             
             assert response.status_code == 200
             data = response.json()
             assert len(data) == len(multiple_cars_data)
+    
+    def test_get_cars_etag_and_cache_control(self, test_client):
+        """Test versioned bodies carry ETag and Cache-Control headers."""
+        with patch('app.routes.get_cars_service') as mock_service, \
+             patch('app.routes.CAR_CACHE_MAX_AGE_SECONDS', 30), \
+             patch('app.routes.CAR_CACHE_STALE_WHILE_REVALIDATE_SECONDS', 300):
+            mock_service.return_value = RenderedBody(b"[]", '"abc;1"')
+            
+            response = test_client.get("/v1/cars")
+            
+            assert response.headers["etag"] == '"abc;1"'
+            assert response.headers["cache-control"] == "max-age=30, stale-while-revalidate=300"
+    
+    def test_get_cars_not_modified(self, test_client):
+        """Test an unrendered body becomes an empty 304 and If-None-Match is forwarded."""
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(None, '"abc;1"')
+            
+            response = test_client.get("/v1/cars", headers={"If-None-Match": '"abc;1"'})
+            
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == '"abc;1"'
+            assert response.headers["cache-control"] == "no-cache"
+            mock_service.assert_called_once_with({"ifNoneMatch": '"abc;1"', "format": "json", "view": CarView.full, "units": UnitSystem.native,
+                                                  "min": [], "max": [], "sort": None})
+    
+    def test_get_cars_compressed(self, test_client):
+        """Test large bodies are compressed and the ETag names the encoding."""
+        body = b"[" + b",".join([b'{"make": "BMW"}'] * 200) + b"]"
+        
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(body, '"abc;1"')
+            
+            response = test_client.get("/v1/cars", headers={"Accept-Encoding": "gzip"})
+            
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["etag"] == '"abc;1;gzip"'
+            assert response.headers["vary"] == "Accept, Accept-Encoding"
+            assert response.content == body
+    
+    def test_compressed_cache_per_query(self, test_client):
+        """Test differently parameterized responses sharing an ETag don't share a compressed body."""
+        from app.compression import compressed_cache
+        
+        first = b"[" + b",".join([b'{"make": "BMW"}'] * 200) + b"]"
+        second = b"[" + b",".join([b'{"make": "Audi"}'] * 200) + b"]"
+        compressed_cache.clear()
+        
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(first, '"abc;1"')
+            assert test_client.get("/v1/cars?sort=power_w", headers={"Accept-Encoding": "gzip"}).content == first
+            
+            mock_service.return_value = RenderedBody(second, '"abc;1"')
+            response = test_client.get("/v1/cars?sort=-power_w", headers={"Accept-Encoding": "gzip"})
+            
+            assert response.content == second
+    
+    def test_filtered_lists_compressed_separately(self, test_client, multiple_cars_data):
+        """Test two differently sorted catalog lists each get their own compressed body and ETag."""
+        from app.compression import compressed_cache
+        from tests.conftest import CATALOG_UPDATE_TIME, make_catalog
+        
+        for horsepower, data in zip((500, 400, 300, 200), multiple_cars_data):
+            data["performance"] = {"horsepower": {"value": horsepower, "unit": "horsepower"}}
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], CATALOG_UPDATE_TIME)
+        compressed_cache.clear()
+        
+        with patch('app.services.get_cars.catalog_cache') as mock_catalog, \
+             patch('app.render_cache.get_cached_model_urls', return_value={}), \
+             patch('app.compression.COMPRESSION_MIN_BYTES', 0):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            
+            ascending = test_client.get("/v1/cars?sort=power_w", headers={"Accept-Encoding": "gzip"})
+            descending = test_client.get("/v1/cars?sort=-power_w", headers={"Accept-Encoding": "gzip"})
+            
+            assert ascending.headers["content-encoding"] == descending.headers["content-encoding"] == "gzip"
+            assert ascending.headers["etag"] != descending.headers["etag"]
+            assert [car["make"] for car in ascending.json()] == ["Toyota", "Mercedes", "Audi", "BMW"]
+            assert [car["make"] for car in descending.json()] == ["BMW", "Audi", "Mercedes", "Toyota"]
+    
+    def test_get_cars_ndjson_streams(self, test_client):
+        """Test Accept: application/x-ndjson streams the catalog line by line."""
+        with patch('app.routes.stream_cars_service') as mock_stream, \
+             patch('app.routes.get_cars_service') as mock_service:
+            mock_stream.return_value = iter([b'{"make": "BMW"}\n', b'{"make": "Audi"}\n'])
+            
+            response = test_client.get("/v1/cars", headers={"Accept": "application/x-ndjson"})
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            assert [json.loads(line)["make"] for line in response.text.splitlines()] == ["BMW", "Audi"]
+            mock_service.assert_not_called()
+    
+    def test_get_cars_msgpack(self, test_client, sample_car_data):
+        """Test Accept: application/msgpack returns a binary array."""
+        with patch('app.services.get_cars.repo') as mock_repo:
+            mock_repo.get_cars.return_value = [Car(**sample_car_data)]
+            
+            response = test_client.get("/v1/cars", headers={"Accept": "application/msgpack"})
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/msgpack"
+            assert msgpack.unpackb(response.content)[0]["id"] == sample_car_data["id"]
+    
+    def test_get_cars_view_param(self, test_client):
+        """Test the view query parameter is validated and passed to the service."""
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(b"[]")
+            
+            assert test_client.get("/v1/cars?view=summary").status_code == 200
+            assert mock_service.call_args[0][0]["view"] == CarView.summary
+            assert test_client.get("/v1/cars?view=tiny").status_code == 422
+    
+    def test_get_cars_units_param(self, test_client):
+        """Test the units query parameter is validated and passed to the service."""
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(b"[]")
+            
+            assert test_client.get("/v1/cars?units=metric").status_code == 200
+            assert mock_service.call_args[0][0]["units"] == UnitSystem.metric
+            assert test_client.get("/v1/cars?units=nautical").status_code == 422
+    
+    def test_get_cars_spec_params(self, test_client):
+        """Test repeated min/max bounds and sort are passed to the service."""
+        with patch('app.routes.get_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(b"[]")
+            
+            response = test_client.get("/v1/cars?min=power_w:300000&min=torque_nm:400&max=curb_weight_kg:1600&sort=-power_w")
+            
+            assert response.status_code == 200
+            payload = mock_service.call_args[0][0]
+            assert payload["min"] == ["power_w:300000", "torque_nm:400"]
+            assert payload["max"] == ["curb_weight_kg:1600"]
+            assert payload["sort"] == "-power_w"
 
 
 class TestGetCarEndpoint:
@@ -72,7 +211,7 @@ class TestGetCarEndpoint:
         mock_car = Car(**sample_car_data)
         
         with patch('app.routes.get_car_service') as mock_service:
-            mock_service.return_value = mock_car.model_dump(mode='json')
+            mock_service.return_value = RenderedBody(dump_car_json(mock_car))
             
             response = test_client.get(f"/v1/cars/{car_id}")
             
@@ -81,13 +220,25 @@ class TestGetCarEndpoint:
             assert data["id"] == car_id
             assert data["make"] == sample_car_data["make"]
     
+    def test_get_car_not_found(self, test_client):
+        """Test a missing car is a 404."""
+        from common.errors import NotFoundError
+        
+        with patch('app.routes.get_car_service') as mock_service:
+            mock_service.side_effect = NotFoundError("Car with ID x not found")
+            
+            response = test_client.get(f"/v1/cars/{uuid4()}")
+            
+            assert response.status_code == 404
+            assert response.json()["error"]["code"] == "NOT_FOUND"
+    
     def test_get_car_with_full_data(self, test_client, sample_car_data):
         """Test get_car returns complete car data including nested objects."""
         car_id = sample_car_data["id"]
         mock_car = Car(**sample_car_data)
         
         with patch('app.routes.get_car_service') as mock_service:
-            mock_service.return_value = mock_car.model_dump(mode='json')
+            mock_service.return_value = RenderedBody(dump_car_json(mock_car))
             
             response = test_client.get(f"/v1/cars/{car_id}")
             
@@ -101,6 +252,372 @@ class TestGetCarEndpoint:
             assert "drivetrain" in data
 
 
+class TestGetCarByKeyEndpoints:
+    """Tests for GET /v1/cars/by-volume/{volumeId} and /v1/cars/by-slug/{slug}."""
+    
+    @pytest.mark.parametrize("path, field, value", [
+        ("by-volume/BMW_M4_f82", "volumeId", "BMW_M4_f82"),
+        ("by-slug/bmw-m4-2021", "slug", "bmw-m4-2021"),
+    ])
+    def test_get_car_by_key(self, test_client, sample_car_data, path, field, value):
+        """Test the key and units reach the service and the car is returned."""
+        mock_car = Car(**sample_car_data)
+        
+        with patch('app.routes.get_car_by_key_service') as mock_service:
+            mock_service.return_value = RenderedBody(dump_car_json(mock_car))
+            
+            response = test_client.get(f"/v1/cars/{path}?units=metric")
+            
+            assert response.status_code == 200
+            assert response.json()["id"] == sample_car_data["id"]
+            payload = mock_service.call_args[0][0]
+            assert (payload["field"], payload["value"], payload["units"]) == (field, value, "metric")
+    
+    def test_get_car_by_key_not_found(self, test_client):
+        """Test an unknown key is a 404."""
+        from common.errors import NotFoundError
+        
+        with patch('app.routes.get_car_by_key_service') as mock_service:
+            mock_service.side_effect = NotFoundError("Car with slug nope not found")
+            
+            response = test_client.get("/v1/cars/by-slug/nope")
+            
+            assert response.status_code == 404
+
+
+class TestBatchGetCarsEndpoint:
+    """Tests for GET/POST /v1/cars:batchGet endpoints."""
+    
+    def test_batch_get_query_string(self, test_client, sample_car_data):
+        """Test batch get with IDs in the query string."""
+        car_id = sample_car_data["id"]
+        missing_id = str(uuid4())
+        mock_car = Car(**sample_car_data)
+        
+        with patch('app.routes.batch_get_cars_service') as mock_service:
+            mock_service.return_value = json.dumps({"results": [
+                {"id": car_id, "found": True, "car": mock_car.model_dump(mode='json')},
+                {"id": missing_id, "found": False, "car": None},
+            ]}).encode()
+            
+            response = test_client.get(f"/v1/cars:batchGet?ids={car_id},{missing_id}")
+            
+            assert response.status_code == 200
+            data = response.json()
+            assert [r["found"] for r in data["results"]] == [True, False]
+            mock_service.assert_called_once_with({"ids": [f"{car_id},{missing_id}"], "format": "json", "units": UnitSystem.native})
+    
+    def test_batch_get_post_body(self, test_client):
+        """Test batch get with IDs in a POST body."""
+        ids = [str(uuid4()) for _ in range(3)]
+        
+        with patch('app.routes.batch_get_cars_service') as mock_service:
+            mock_service.return_value = json.dumps({"results": [
+                {"id": car_id, "found": False, "car": None} for car_id in ids
+            ]}).encode()
+            
+            response = test_client.post("/v1/cars:batchGet", json={"ids": ids})
+            
+            assert response.status_code == 200
+            assert len(response.json()["results"]) == 3
+            mock_service.assert_called_once_with({"ids": ids, "format": "json", "units": UnitSystem.native})
+    
+    def test_batch_get_invalid_id(self, test_client):
+        """Test batch get rejects malformed IDs with 400."""
+        response = test_client.get("/v1/cars:batchGet?ids=not-a-uuid")
+        
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "BAD_REQUEST"
+    
+    def test_batch_get_firestore_outage(self, test_client):
+        """Test a Firestore outage is a 503, not a list of cars not found."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        with patch('app.services.batch_get_cars.repo') as mock_repo, \
+             patch('app.services.batch_get_cars.async_repo') as mock_async_repo:
+            mock_repo.get_cars_by_ids.side_effect = gcp_exceptions.ServiceUnavailable("down")
+            mock_async_repo.get_cars_by_ids = AsyncMock(side_effect=gcp_exceptions.ServiceUnavailable("down"))
+            
+            response = test_client.get(f"/v1/cars:batchGet?ids={uuid4()}")
+            
+            assert response.status_code == 503
+            assert response.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+
+
+class TestCompareCarsEndpoint:
+    """Tests for GET /v1/cars:compare endpoint."""
+    
+    def test_compare_defaults_to_metric(self, test_client):
+        """Test compare passes the IDs through with metric units by default."""
+        ids = f"{uuid4()},{uuid4()}"
+        
+        with patch('app.routes.compare_cars_service') as mock_service:
+            mock_service.return_value = b'{"units":"metric","cars":[],"rows":[]}'
+            
+            response = test_client.get(f"/v1/cars:compare?ids={ids}")
+            
+            assert response.status_code == 200
+            assert response.json()["units"] == "metric"
+            mock_service.assert_called_once_with({"ids": [ids], "format": "json", "units": UnitSystem.metric})
+    
+    def test_compare_needs_two_cars(self, test_client):
+        """Test a single ID is rejected with 400."""
+        response = test_client.get(f"/v1/cars:compare?ids={uuid4()}")
+        
+        assert response.status_code == 400
+
+
+class TestBulkUpsertEndpoint:
+    """Tests for POST /v1/cars:bulkUpsert endpoint."""
+    
+    def test_bulk_upsert_streams_body(self, test_client, sample_car_data, writer_headers):
+        """Test the NDJSON body is streamed through to the service."""
+        import json
+        
+        body = (json.dumps(sample_car_data) + "\n") * 2
+        
+        with patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            mock_repo.bulk_upsert_cars.side_effect = lambda cars: {str(c.id): None for c in cars}
+            
+            response = test_client.post(
+                "/v1/cars:bulkUpsert",
+                content=body,
+                headers={"Content-Type": "application/x-ndjson", **writer_headers},
+            )
+            
+            assert response.status_code == 200
+            data = response.json()
+            assert data["written"] == 2
+            assert data["failed"] == 0
+    
+    def test_bulk_upsert_requires_token(self, test_client, sample_car_data):
+        """Test an anonymous upload is rejected before anything is written."""
+        import json
+        
+        with patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            response = test_client.post(
+                "/v1/cars:bulkUpsert",
+                content=json.dumps(sample_car_data) + "\n",
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            
+            assert response.status_code == 401
+            assert response.json()["error"]["code"] == "UNAUTHORIZED"
+            mock_repo.bulk_upsert_cars.assert_not_called()
+
+
+class TestPatchCarEndpoint:
+    """Tests for PATCH /v1/cars/{carId} endpoint."""
+    
+    def test_patch_car_merge_patch(self, test_client, writer_headers):
+        """Test a merge patch is accepted and the new ETag returned."""
+        from datetime import timezone
+        from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+        
+        car_id = str(uuid4())
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.return_value = DatetimeWithNanoseconds(2025, 1, 1, tzinfo=timezone.utc)
+            
+            response = test_client.patch(
+                f"/v1/cars/{car_id}",
+                content='{"blurb": "New blurb", "engine": {"code": "S58"}}',
+                headers={
+                    "Content-Type": "application/merge-patch+json",
+                    "If-Match": '"2024-12-31T00:00:00Z"',
+                    **writer_headers,
+                },
+            )
+            
+            assert response.status_code == 200
+            assert response.headers["ETag"] == '"2025-01-01T00:00:00.000000Z"'
+            assert response.json()["updatedFields"] == ["blurb", "engine.code"]
+    
+    def test_patch_car_stale_if_match(self, test_client, writer_headers):
+        """Test a stale If-Match returns 412."""
+        from google.api_core import exceptions as gcp_exceptions
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.side_effect = gcp_exceptions.FailedPrecondition("stale")
+            
+            response = test_client.patch(
+                f"/v1/cars/{uuid4()}",
+                json={"blurb": "x"},
+                headers={"If-Match": '"2024-12-31T00:00:00Z"', **writer_headers},
+            )
+            
+            assert response.status_code == 412
+            assert response.json()["error"]["code"] == "PRECONDITION_FAILED"
+    
+    def test_patch_car_requires_writer_claim(self, test_client):
+        """Test a signed-in user without the writer claim can't patch."""
+        with patch('app.services.patch_car.repo') as mock_repo, \
+             patch('app.auth.auth.verify_id_token', return_value={"uid": "reader"}):
+            response = test_client.patch(
+                f"/v1/cars/{uuid4()}",
+                json={"blurb": "x"},
+                headers={"Authorization": "Bearer reader-token"},
+            )
+            
+            assert response.status_code == 403
+            assert response.json()["error"]["code"] == "FORBIDDEN"
+            mock_repo.patch_car.assert_not_called()
+
+
+class TestChangesEndpoint:
+    """Tests for GET /v1/cars/changes endpoint."""
+    
+    def test_changes_not_shadowed_by_car_id_route(self, test_client):
+        """Test /changes is routed to the change feed, not treated as a car ID."""
+        with patch('app.routes.get_changes_service') as mock_service:
+            mock_service.return_value = {
+                "changed": [], "deleted": [], "nextToken": "abc", "hasMore": False
+            }
+            
+            response = test_client.get("/v1/cars/changes?since=xyz&limit=50")
+            
+            assert response.status_code == 200
+            assert response.json()["nextToken"] == "abc"
+            mock_service.assert_called_once_with({"since": "xyz", "limit": 50})
+
+
+class TestSimilarCarsEndpoint:
+    """Tests for GET /v1/cars/{carId}/similar endpoint."""
+    
+    def test_similar_cars(self, test_client, sample_car_data):
+        """Test the car ID, k and representation options reach the service."""
+        car_id = sample_car_data["id"]
+        
+        with patch('app.routes.get_similar_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(dump_cars_json([Car(**sample_car_data)]), '"abc;0"')
+            
+            response = test_client.get(f"/v1/cars/{car_id}/similar?k=3&units=metric")
+            
+            assert response.status_code == 200
+            assert response.json()[0]["id"] == car_id
+            assert response.headers["ETag"].startswith('"abc;0')
+            mock_service.assert_called_once_with({
+                "carId": car_id,
+                "k": 3,
+                "ifNoneMatch": None,
+                "format": "json",
+                "view": CarView.full,
+                "units": UnitSystem.metric,
+            })
+    
+    def test_similar_cars_k_bounds(self, test_client):
+        """Test k outside 1..100 is rejected before the service runs."""
+        with patch('app.routes.get_similar_cars_service') as mock_service:
+            assert test_client.get("/v1/cars/abc/similar?k=0").status_code == 422
+            assert test_client.get("/v1/cars/abc/similar?k=101").status_code == 422
+            mock_service.assert_not_called()
+
+
+class TestSearchCarsEndpoint:
+    """Tests for GET /v1/cars/search endpoint."""
+    
+    def test_search_cars(self, test_client, sample_car_data):
+        """Test the query, limit and representation options reach the service."""
+        with patch('app.routes.search_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(dump_cars_json([Car(**sample_car_data)]), '"search;0"')
+            
+            response = test_client.get("/v1/cars/search?q=golf%20gti&limit=5&view=summary")
+            
+            assert response.status_code == 200
+            assert response.json()[0]["id"] == sample_car_data["id"]
+            mock_service.assert_called_once_with({
+                "q": "golf gti",
+                "limit": 5,
+                "ifNoneMatch": None,
+                "format": "json",
+                "view": CarView.summary,
+                "units": UnitSystem.native,
+            })
+    
+    def test_search_requires_query(self, test_client):
+        """Test a missing q or out-of-range limit is rejected before the service runs."""
+        with patch('app.routes.search_cars_service') as mock_service:
+            assert test_client.get("/v1/cars/search").status_code == 422
+            assert test_client.get("/v1/cars/search?q=m3&limit=0").status_code == 422
+            mock_service.assert_not_called()
+
+
+class TestSuggestCarsEndpoint:
+    """Tests for GET /v1/cars/suggest endpoint."""
+    
+    def test_suggest_cars(self, test_client):
+        """Test the prefix reaches the service and the ETag is sent back."""
+        with patch('app.routes.suggest_cars_service') as mock_service:
+            mock_service.return_value = RenderedBody(b'[{"text":"BMW","kind":"make","cars":3}]', '"suggest"')
+            
+            response = test_client.get("/v1/cars/suggest?prefix=bm")
+            
+            assert response.status_code == 200
+            assert response.json() == [{"text": "BMW", "kind": "make", "cars": 3}]
+            assert response.headers["ETag"] == '"suggest"'
+            mock_service.assert_called_once_with({"prefix": "bm", "ifNoneMatch": None, "format": "json"})
+    
+    def test_suggest_requires_prefix(self, test_client):
+        """Test a missing prefix is rejected before the service runs."""
+        with patch('app.routes.suggest_cars_service') as mock_service:
+            assert test_client.get("/v1/cars/suggest").status_code == 422
+            mock_service.assert_not_called()
+
+
+class TestGetFacetsEndpoint:
+    """Tests for GET /v1/cars/facets endpoint."""
+    
+    def test_get_facets(self, test_client):
+        """Test spec filters and facet selections reach the service."""
+        with patch('app.routes.get_facets_service') as mock_service:
+            mock_service.return_value = RenderedBody(b'{"total":0,"facets":{}}', '"facets"')
+            
+            response = test_client.get("/v1/cars/facets?make=BMW,Audi&make=Tesla&bodyStyle=Sedan&min=power_w:300000")
+            
+            assert response.status_code == 200
+            assert response.json() == {"total": 0, "facets": {}}
+            assert response.headers["ETag"] == '"facets"'
+            payload = mock_service.call_args[0][0]
+            assert payload["min"] == ["power_w:300000"]
+            assert payload["facets"]["make"] == ["BMW,Audi", "Tesla"]
+            assert payload["facets"]["bodyStyle"] == ["Sedan"]
+            assert payload["facets"]["year"] == []
+
+
+class TestAsyncDataPath:
+    """Tests for routing through the asyncio data path."""
+    
+    def test_get_cars_uses_async_service(self, test_client, sample_car_data):
+        """Test CAR_DATA_PATH=async awaits the async service instead of a thread."""
+        mock_car = Car(**sample_car_data)
+        
+        with patch('app.routes.CAR_DATA_PATH', 'async'), \
+             patch('app.routes.get_cars_service') as mock_sync, \
+             patch('app.routes.get_cars_async_service', new_callable=AsyncMock) as mock_async:
+            mock_async.return_value = RenderedBody(dump_cars_json([mock_car]))
+            
+            response = test_client.get("/v1/cars")
+            
+            assert response.status_code == 200
+            assert len(response.json()) == 1
+            mock_async.assert_awaited_once()
+            mock_sync.assert_not_called()
+    
+    def test_get_car_uses_async_service(self, test_client, sample_car_data):
+        """Test single car lookups also follow the configured data path."""
+        car_id = sample_car_data["id"]
+        mock_car = Car(**sample_car_data)
+        
+        with patch('app.routes.CAR_DATA_PATH', 'async'), \
+             patch('app.routes.get_car_async_service', new_callable=AsyncMock) as mock_async:
+            mock_async.return_value = RenderedBody(dump_car_json(mock_car))
+            
+            response = test_client.get(f"/v1/cars/{car_id}")
+            
+            assert response.status_code == 200
+            mock_async.assert_awaited_once_with({"carId": car_id, "ifNoneMatch": None, "format": "json", "units": UnitSystem.native})
+
+
 class TestAPIErrorHandling:
     """Tests for API error handling."""
     
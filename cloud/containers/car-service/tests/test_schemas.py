@@ -5,7 +5,7 @@ import pytest
 from uuid import UUID, uuid4
 
 from app.schemas import (
-    Car, Engine, Performance, Dimensions, Drivetrain,
+    Car, CarSummary, Engine, Performance, Dimensions, Drivetrain,
     MeasurementVolume, MeasurementPower, MeasurementTorque,
     MeasurementDuration, MeasurementSpeed, MeasurementLength, MeasurementMass,
     VolumeUnit, PowerUnit, TorqueUnit, SpeedUnit, LengthUnit, MassUnit,
@@ -278,3 +278,17 @@ class TestCar:
         assert car.otherSpecs["feature1"] == "value1"
         assert car.otherSpecs["feature2"] == "value2"
 
+
+class TestCarSummary:
+    """Tests for CarSummary model."""
+    
+    def test_from_car_projects_summary_fields(self, sample_car_data):
+        """Test a summary carries only the grid fields of the car."""
+        car = Car(**sample_car_data)
+        
+        summary = CarSummary.from_car(car)
+        
+        assert summary.id == car.id
+        assert summary.make == car.make
+        assert summary.bodyStyle == car.bodyStyle
+        assert set(summary.model_dump()) == {"id", "make", "model", "year", "bodyStyle", "iconAssetName"}
@@ -0,0 +1,155 @@
+"""
+Tests for full-text search.
+"""
+import threading
+from datetime import datetime, timezone
+from types import MappingProxyType
+from unittest.mock import patch
+from uuid import UUID
+
+from app.catalog import Catalog, CatalogEntry
+from app.schemas import Car, Engine, Drivetrain
+from app.search import SearchIndex, document_terms, tokenize
+from app.compact import CompactCar
+from tests.conftest import make_catalog
+
+T2 = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+A, B, C, D = (str(UUID(int=n)) for n in (1, 2, 3, 4))
+
+
+def _car(car_id, make, model, blurb=None, code=None, **other_specs):
+    return Car(
+        id=car_id, make=make, model=model, blurb=blurb,
+        engine=Engine(code=code) if code else None,
+        otherSpecs=other_specs,
+    )
+
+
+CARS = [
+    _car(A, "BMW", "M3", "The benchmark sports sedan", code="S58"),
+    _car(B, "BMW", "M4", "Coupe version of the M3", code="S58"),
+    _car(C, "Volkswagen", "Golf GTI", "Hot hatch", code="EA888", seats="5"),
+    _car(D, "Citroën", "C4"),
+]
+
+
+class TestTokenize:
+    """Tests for tokenize and document_terms."""
+    
+    def test_case_and_accents_folded(self):
+        """Test words are lower-cased, accent-free and split on punctuation."""
+        assert tokenize("Citroën C4 (e-HDi)") == ["citroen", "c4", "e", "hdi"]
+    
+    def test_document_fields(self):
+        """Test every searched field and otherSpecs values are indexed, but not keys."""
+        car = _car(A, "BMW", "M3", "Sedan", code="S58", seats="Five")
+        car.drivetrain = Drivetrain(differential="Active M")
+        
+        terms = document_terms(CompactCar.from_car(car))
+        
+        assert terms == {"bmw": 1, "m3": 1, "sedan": 1, "s58": 1, "active": 1, "m": 1, "five": 1}
+
+
+class TestSearchIndex:
+    """Tests for BM25 ranking and index maintenance."""
+    
+    def test_ranks_by_bm25(self):
+        """Test the car matching more (and rarer) words ranks first."""
+        index = SearchIndex(snapshot_path="")
+        
+        hits = index.search(make_catalog(1, CARS), "bmw m3", 10)
+        
+        assert [hit.car_id for hit in hits] == [A, B]
+        assert hits[0].score > hits[1].score
+    
+    def test_ties_broken_by_id_and_limited(self):
+        """Test equal scores come back in ID order, cut at the limit."""
+        index = SearchIndex(snapshot_path="")
+        
+        assert [hit.car_id for hit in index.search(make_catalog(1, CARS), "S58", 1)] == [A]
+        assert index.search(make_catalog(1, CARS), "porsche", 10) == []
+        assert index.search(make_catalog(1, CARS), "!!", 10) == []
+    
+    def test_incremental_update_matches_rebuild(self):
+        """Test changes applied through the listener rank like a fresh build."""
+        index = SearchIndex(snapshot_path="")
+        index.search(make_catalog(1, CARS), "bmw", 10)
+        updated = [_car(A, "Porsche", "911"), CARS[1], CARS[2]]
+        catalog = make_catalog(2, updated, T2)
+        
+        with patch('app.search.document_terms', wraps=document_terms) as mock_terms:
+            index.on_catalog_change(catalog, frozenset({A}), frozenset({D}))
+            
+            assert mock_terms.call_count == 1
+        
+        for text in ("bmw", "porsche 911", "citroen", "s58 hatch"):
+            assert index.search(catalog, text, 10) == SearchIndex(snapshot_path="").search(catalog, text, 10)
+    
+    def test_missed_change_resyncs(self):
+        """Test a skipped catalog version is re-synced on the next search."""
+        index = SearchIndex(snapshot_path="")
+        index.search(make_catalog(1, CARS), "bmw", 10)
+        
+        index.on_catalog_change(make_catalog(3, CARS[:1]), frozenset(), frozenset({B}))
+        
+        assert [hit.car_id for hit in index.search(make_catalog(3, CARS[:1]), "bmw", 10)] == [A]
+    
+    def test_snapshot_skips_unchanged_cars(self, tmp_path):
+        """Test a new index loads the snapshot and only tokenizes changed cars."""
+        path = str(tmp_path / "search.json.gz")
+        first = SearchIndex(snapshot_path=path)
+        first.search(make_catalog(1, CARS), "bmw", 10)
+        first.flush()
+        
+        with patch('app.search.document_terms', wraps=document_terms) as mock_terms:
+            hits = SearchIndex(snapshot_path=path).search(make_catalog(1, CARS), "citroen", 10)
+        
+        assert [hit.car_id for hit in hits] == [D]
+        assert mock_terms.call_count == 0
+    
+    def test_snapshot_refreshes_changed_cars(self, tmp_path):
+        """Test cars whose update_time differs from the snapshot are re-tokenized."""
+        path = str(tmp_path / "search.json.gz")
+        first = SearchIndex(snapshot_path=path)
+        first.search(make_catalog(1, CARS), "bmw", 10)
+        first.flush()
+        
+        entries = dict(make_catalog(1, CARS).entries)
+        entries[D] = CatalogEntry.from_car(_car(D, "Citroën", "C5"), T2)
+        catalog = Catalog(1, MappingProxyType(entries))
+        with patch('app.search.document_terms', wraps=document_terms) as mock_terms:
+            hits = SearchIndex(snapshot_path=path).search(catalog, "c5", 10)
+        
+        assert [hit.car_id for hit in hits] == [D]
+        assert mock_terms.call_count == 1
+    
+    def test_one_snapshot_write_at_a_time(self, tmp_path):
+        """Test concurrent changes start a single snapshot write while one is running."""
+        index = SearchIndex(snapshot_path=str(tmp_path / "search.json.gz"), snapshot_interval=0)
+        index.search(make_catalog(1, CARS), "bmw", 10)
+        index.flush()
+        release = threading.Event()
+        
+        with patch.object(index, '_save_snapshot', side_effect=lambda documents: release.wait(5)) as mock_save:
+            threads = [
+                threading.Thread(target=index.on_catalog_change, args=(make_catalog(version, CARS), frozenset({A}), frozenset()))
+                for version in range(2, 10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            release.set()
+            index.flush()
+        
+        assert mock_save.call_count == 1
+    
+    def test_unreadable_snapshot_ignored(self, tmp_path):
+        """Test a corrupt snapshot falls back to tokenizing everything."""
+        path = tmp_path / "search.json.gz"
+        path.write_bytes(b"not gzip")
+        
+        hits = SearchIndex(snapshot_path=str(path)).search(make_catalog(1, CARS), "golf", 10)
+        
+        assert [hit.car_id for hit in hits] == [C]
@@ -0,0 +1,60 @@
+"""
+Tests for single-pass JSON serialization.
+"""
+import json
+import warnings
+
+from app.schemas import Car, BatchGetResponse, BatchGetResult
+from app.serialization import (
+    JSONBytesResponse, dump_batch_get_json, dump_car_json, dump_cars_json
+)
+
+
+class TestDumpJson:
+    """Tests for the dump_*_json helpers."""
+    
+    def test_dump_car_matches_model_dump(self, sample_car_data):
+        """Test bytes decode to the same document model_dump(mode='json') produced."""
+        car = Car(**sample_car_data)
+        
+        assert json.loads(dump_car_json(car)) == car.model_dump(mode='json')
+    
+    def test_dump_cars_is_json_array(self, multiple_cars_data):
+        """Test a list of cars serializes to a JSON array in order."""
+        cars = [Car(**data) for data in multiple_cars_data]
+        
+        result = json.loads(dump_cars_json(cars))
+        
+        assert [c["id"] for c in result] == [data["id"] for data in multiple_cars_data]
+    
+    def test_dump_cars_accepts_iterables(self, sample_car_data):
+        """Test generators are accepted as well as lists."""
+        result = dump_cars_json(Car(**sample_car_data) for _ in range(2))
+        
+        assert len(json.loads(result)) == 2
+    
+    def test_dump_batch_get_from_constructed_models(self, sample_car_data):
+        """Test model_construct'ed batch results serialize without warnings."""
+        car = Car(**sample_car_data)
+        response = BatchGetResponse.model_construct(results=[
+            BatchGetResult.model_construct(id=str(car.id), found=True, car=car),
+            BatchGetResult.model_construct(id="missing", found=False, car=None),
+        ])
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = json.loads(dump_batch_get_json(response))
+        
+        assert result["results"][0]["car"]["make"] == sample_car_data["make"]
+        assert result["results"][1] == {"id": "missing", "found": False, "car": None}
+
+
+class TestJSONBytesResponse:
+    """Tests for JSONBytesResponse."""
+    
+    def test_passes_bytes_through(self):
+        """Test the body is sent as-is with a JSON content type."""
+        response = JSONBytesResponse(b'{"a":1}')
+        
+        assert response.body == b'{"a":1}'
+        assert response.media_type == "application/json"
@@ -1,13 +1,20 @@
 """
 Tests for service layer functions.
 """
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from uuid import uuid4
+from datetime import timezone
 
 from app.services.get_car import get_car
 from app.services.get_cars import get_cars
 from app.schemas import Car
+from common.errors import NotFoundError
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from tests.conftest import make_catalog
+
+UPDATE_TIME = DatetimeWithNanoseconds(2025, 1, 1, tzinfo=timezone.utc)
 
 
 class TestGetCarsService:
@@ -21,7 +28,7 @@ class TestGetCarsService:
         with patch('app.services.get_cars.repo') as mock_repo:
             mock_repo.get_cars.return_value = [mock_car]
             
-            result = get_cars({})
+            result = json.loads(get_cars({}).body)
             
             assert isinstance(result, list)
             assert len(result) == 1
@@ -32,7 +39,7 @@ class TestGetCarsService:
         with patch('app.services.get_cars.repo') as mock_repo:
             mock_repo.get_cars.return_value = []
             
-            result = get_cars({})
+            result = json.loads(get_cars({}).body)
             
             assert result == []
     
@@ -43,7 +50,7 @@ class TestGetCarsService:
         with patch('app.services.get_cars.repo') as mock_repo:
             mock_repo.get_cars.return_value = mock_cars
             
-            result = get_cars({})
+            result = json.loads(get_cars({}).body)
             
             assert len(result) == len(multiple_cars_data)
     
@@ -54,12 +61,141 @@ class TestGetCarsService:
         with patch('app.services.get_cars.repo') as mock_repo:
             mock_repo.get_cars.return_value = [mock_car]
             
-            result = get_cars({})
+            result = json.loads(get_cars({}).body)
             
             # ID should be a string (JSON serialized)
             assert isinstance(result[0]["id"], str)
 
 
+    def test_get_cars_missing_index(self, mock_firebase):
+        """Test a spec query without its composite index is a 503, not an unhandled error."""
+        from google.api_core import exceptions as gcp_exceptions
+        from common.errors import ServiceUnavailableError
+        
+        with patch('app.services.get_cars.repo') as mock_repo:
+            mock_repo.query_cars.side_effect = gcp_exceptions.FailedPrecondition("The query requires an index")
+            
+            with pytest.raises(ServiceUnavailableError):
+                get_cars({"min": ["power_w:300000"], "max": ["curb_weight_kg:1600"]})
+    
+    def test_get_cars_spec_filters(self, mock_firebase, multiple_cars_data):
+        """Test spec filters run as a repository query, or over the catalog when cached."""
+        from app.catalog import Catalog, CatalogEntry
+        
+        cars = [Car(**data) for data in multiple_cars_data]
+        payload = {"min": ["power_w:0"], "sort": "-power_w"}
+        
+        with patch('app.services.get_cars.repo') as mock_repo:
+            mock_repo.query_cars.return_value = cars[:1]
+            
+            result = json.loads(get_cars(payload).body)
+            
+            assert [car["id"] for car in result] == [str(cars[0].id)]
+            assert mock_repo.query_cars.call_args[0][0].descending is True
+            mock_repo.get_cars.assert_not_called()
+        
+        catalog = Catalog(1, {str(car.id): CatalogEntry.from_car(car, UPDATE_TIME) for car in cars})
+        with patch('app.services.get_cars.catalog_cache') as mock_catalog, \
+             patch('app.render_cache.get_cached_model_urls', return_value={}):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            
+            result = json.loads(get_cars(payload).body)
+            
+            powers = [car["performance"]["horsepower"]["value"] for car in result]
+            assert powers == sorted(powers, reverse=True)
+    
+    def test_get_cars_etag_per_spec_query(self, mock_firebase, multiple_cars_data):
+        """Test filtered and unfiltered lists of one catalog get different ETags."""
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        
+        with patch('app.services.get_cars.catalog_cache') as mock_catalog, \
+             patch('app.render_cache.get_cached_model_urls', return_value={}):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            
+            etags = {
+                get_cars({}).etag,
+                get_cars({"min": ["power_w:400000"]}).etag,
+                get_cars({"min": ["power_w:300000"]}).etag,
+                get_cars({"min": ["power_w:300000"], "sort": "-power_w"}).etag,
+            }
+            
+            assert len(etags) == 4
+            assert get_cars({"min": ["power_w:400000"]}).etag == get_cars({"min": ["power_w:400000.0"]}).etag
+    
+    def test_get_cars_invalid_spec_filter(self, mock_firebase):
+        """Test an unknown spec is a bad request."""
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            get_cars({"sort": "horsepower"})
+    
+    def test_get_cars_uses_catalog_cache(self, mock_firebase, sample_car_data):
+        """Test the enabled catalog cache serves rendered fragments without Firestore."""
+        from app.catalog import Catalog, CatalogEntry
+        
+        car = Car(**sample_car_data)
+        catalog = Catalog(1, {sample_car_data["id"]: CatalogEntry.from_car(car, UPDATE_TIME)})
+        
+        with patch('app.services.get_cars.repo') as mock_repo, \
+             patch('app.services.get_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.get_cars.render_cache') as mock_render:
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            mock_render.render_list.return_value = b"[]"
+            
+            assert get_cars({}).body == b"[]"
+            
+            mock_repo.get_cars.assert_not_called()
+            assert list(mock_render.render_list.call_args[0][0]) == list(catalog.entries.values())
+    
+    def test_get_cars_not_modified_skips_rendering(self, mock_firebase, sample_car_data):
+        """Test a matching If-None-Match returns the ETag without rendering."""
+        from app.catalog import Catalog, CatalogEntry
+        
+        catalog = Catalog(1, {sample_car_data["id"]: CatalogEntry.from_car(Car(**sample_car_data), UPDATE_TIME)})
+        
+        with patch('app.services.get_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.get_cars.render_cache') as mock_render, \
+             patch('app.services.get_cars.current_url_window', return_value=7):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            mock_render.render_list.return_value = b"[]"
+            
+            etag = get_cars({}).etag
+            result = get_cars({"ifNoneMatch": f'"other", W/{etag}'})
+            
+            assert etag == f'"{catalog.fingerprint};7"'
+            assert result.body is None
+            assert result.etag == etag
+            mock_render.render_list.assert_called_once()
+    
+    def test_get_cars_omits_nulls(self, mock_firebase, sample_car_minimal):
+        """Test the list leaves out null fields instead of sending explicit nulls."""
+        with patch('app.services.get_cars.repo') as mock_repo:
+            mock_repo.get_cars.return_value = [Car(**sample_car_minimal)]
+            
+            result = json.loads(get_cars({}).body)
+            
+            assert "blurb" not in result[0]
+            assert "engine" not in result[0]
+    
+    def test_get_cars_summary_view(self, mock_firebase, sample_car_data):
+        """Test view=summary reads projected summaries instead of full cars."""
+        from app.schemas import CarSummary
+        
+        summary = CarSummary.from_car(Car(**sample_car_data))
+        
+        with patch('app.services.get_cars.repo') as mock_repo:
+            mock_repo.get_car_summaries.return_value = [summary]
+            
+            result = json.loads(get_cars({"view": "summary"}).body)
+            
+            assert set(result[0]) <= {"id", "make", "model", "year", "bodyStyle", "iconAssetName"}
+            mock_repo.get_cars.assert_not_called()
+
+
 class TestGetCarService:
     """Tests for get_car service function."""
     
@@ -71,7 +207,7 @@ class TestGetCarService:
         with patch('app.services.get_car.repo') as mock_repo:
             mock_repo.get_car.return_value = mock_car
             
-            result = get_car({"carId": car_id})
+            result = json.loads(get_car({"carId": car_id}).body)
             
             assert result["id"] == car_id
             assert result["make"] == sample_car_data["make"]
@@ -82,7 +218,7 @@ class TestGetCarService:
         with patch('app.services.get_car.repo') as mock_repo:
             mock_repo.get_car.return_value = None
             
-            with pytest.raises(LookupError) as exc_info:
+            with pytest.raises(NotFoundError) as exc_info:
                 get_car({"carId": "non-existent-id"})
             
             assert "not found" in str(exc_info.value)
@@ -115,10 +251,882 @@ class TestGetCarService:
         with patch('app.services.get_car.repo') as mock_repo:
             mock_repo.get_car.return_value = mock_car
             
-            result = get_car({"carId": sample_car_data["id"]})
+            result = get_car({"carId": sample_car_data["id"]}).body
+            
+            # Verify result is serialized JSON
+            assert isinstance(result, bytes)
+            assert json.loads(result)["id"] == sample_car_data["id"]
+
+    
+    def test_get_car_cache_hit_and_miss(self, mock_firebase, sample_car_data):
+        """Test cached cars skip Firestore and unknown IDs fall back to it."""
+        from app.catalog import Catalog, CatalogEntry
+        
+        car_id = sample_car_data["id"]
+        entry = CatalogEntry.from_car(Car(**sample_car_data), UPDATE_TIME)
+        
+        with patch('app.services.get_car.repo') as mock_repo, \
+             patch('app.services.get_car.catalog_cache') as mock_catalog, \
+             patch('app.services.get_car.render_cache') as mock_render:
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = Catalog(1, {car_id: entry})
+            mock_render.render.return_value = [b"{}"]
+            mock_repo.get_car.return_value = None
+            
+            assert get_car({"carId": car_id}).body == b"{}"
+            assert mock_render.render.call_args[0][0] == [entry]
+            mock_repo.get_car.assert_not_called()
+            
+            with pytest.raises(NotFoundError):
+                get_car({"carId": str(uuid4())})
+            mock_repo.get_car.assert_called_once()
+    
+    def test_get_car_unknown_ids_skip_firestore(self, mock_firebase, multiple_cars_data):
+        """Test random IDs missing from the loaded catalog 404 without a Firestore read."""
+        from app.known_ids import KnownCarIds
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data])
+        known = KnownCarIds(0.01, 0, 100)
+        known.on_catalog_change(catalog, frozenset(catalog.entries), frozenset())
+        
+        with patch('app.services.get_car.catalog_cache') as mock_catalog, \
+             patch('app.repositories.known_car_ids', known), \
+             patch('app.repositories.get_firestore_client') as mock_get_client:
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            mock_get_client.return_value.collection.return_value.document.return_value.get.return_value.exists = False
+            
+            for _ in range(200):
+                with pytest.raises(NotFoundError):
+                    get_car({"carId": str(uuid4())})
+            
+            reads = mock_get_client.return_value.collection.return_value.document.return_value.get.call_count
+            # Only the filter's false positives reach Firestore
+            assert reads < 200 * 0.05
+            assert known.stats()["filteredReads"] == 200 - reads
+    
+    def test_get_car_etag_tracks_update_time(self, mock_firebase, sample_car_data):
+        """Test the car ETag is its update_time plus URL window and honors If-None-Match."""
+        from app.catalog import Catalog, CatalogEntry
+        
+        car_id = sample_car_data["id"]
+        entry = CatalogEntry.from_car(Car(**sample_car_data), UPDATE_TIME)
+        
+        with patch('app.services.get_car.catalog_cache') as mock_catalog, \
+             patch('app.services.get_car.render_cache') as mock_render, \
+             patch('app.services.get_car.current_url_window', return_value=7):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = Catalog(1, {car_id: entry})
+            
+            result = get_car({"carId": car_id, "ifNoneMatch": f'"{UPDATE_TIME.rfc3339()};7"'})
+            
+            assert result.body is None
+            assert result.etag == f'"{UPDATE_TIME.rfc3339()};7"'
+            mock_render.render.assert_not_called()
+            
+            metric = get_car({"carId": car_id, "units": "metric", "ifNoneMatch": f'"{UPDATE_TIME.rfc3339()};7"'})
+            
+            assert metric.etag == f'"{UPDATE_TIME.rfc3339()};7;metric"'
+            assert metric.body is not None
+
+
+class TestBatchGetCarsService:
+    """Tests for batch_get_cars service function."""
+    
+    def test_batch_get_preserves_order_and_marks_missing(self, mock_firebase, sample_car_data):
+        """Test results follow request order with not-found markers."""
+        from app.services.batch_get_cars import batch_get_cars
+        
+        car_id = sample_car_data["id"]
+        missing_id = str(uuid4())
+        mock_car = Car(**sample_car_data)
+        
+        with patch('app.services.batch_get_cars.repo') as mock_repo:
+            mock_repo.get_cars_by_ids.return_value = {car_id: mock_car}
+            
+            result = json.loads(batch_get_cars({"ids": [missing_id, car_id]}))
+            
+            assert [r["id"] for r in result["results"]] == [missing_id, car_id]
+            assert result["results"][0]["found"] is False
+            assert result["results"][1]["found"] is True
+            assert result["results"][1]["car"]["make"] == sample_car_data["make"]
+    
+    def test_batch_get_firestore_error_is_503(self, mock_firebase):
+        """Test a failed read is a 503 rather than every car not found."""
+        from google.api_core import exceptions as gcp_exceptions
+        from app.services.batch_get_cars import batch_get_cars
+        from common.errors import ServiceUnavailableError
+        
+        with patch('app.services.batch_get_cars.repo') as mock_repo:
+            mock_repo.get_cars_by_ids.side_effect = gcp_exceptions.DeadlineExceeded("timeout")
+            
+            with pytest.raises(ServiceUnavailableError):
+                batch_get_cars({"ids": [str(uuid4())]})
+    
+    def test_batch_get_deduplicates_ids(self, mock_firebase):
+        """Test duplicate and comma-separated IDs are collapsed."""
+        from app.services.batch_get_cars import batch_get_cars
+        
+        car_id = str(uuid4())
+        
+        with patch('app.services.batch_get_cars.repo') as mock_repo:
+            mock_repo.get_cars_by_ids.return_value = {}
+            
+            result = json.loads(batch_get_cars({"ids": [f"{car_id},{car_id.upper()}", car_id]}))
+            
+            mock_repo.get_cars_by_ids.assert_called_once_with([car_id])
+            assert len(result["results"]) == 1
+    
+    def test_batch_get_invalid_uuid(self, mock_firebase):
+        """Test invalid IDs are rejected."""
+        from app.services.batch_get_cars import batch_get_cars
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError) as exc_info:
+            batch_get_cars({"ids": ["not-a-uuid"]})
+        
+        assert "not-a-uuid" in str(exc_info.value)
+    
+    def test_batch_get_too_many_ids(self, mock_firebase):
+        """Test the batch size limit is enforced."""
+        from app.services.batch_get_cars import batch_get_cars
+        from common.errors import BadRequestError
+        
+        with patch('app.services.batch_get_cars.MAX_BATCH_GET_IDS', 2):
+            with pytest.raises(BadRequestError):
+                batch_get_cars({"ids": [str(uuid4()) for _ in range(3)]})
+
+
+class TestCompareCarsService:
+    """Tests for compare_cars service function."""
+    
+    def _versions(self, multiple_cars_data):
+        return {data["id"]: (Car(**data), UPDATE_TIME) for data in multiple_cars_data[:2]}
+    
+    def test_compare_from_one_batched_read(self, mock_firebase, multiple_cars_data):
+        """Test the uncached path reads every car in one get_car_versions call."""
+        from app.comparison import ComparisonCache
+        from app.services.compare_cars import compare_cars
+        
+        versions = self._versions(multiple_cars_data)
+        ids = list(reversed(versions))
+        
+        with patch('app.services.compare_cars.repo') as mock_repo, \
+             patch('app.services.compare_cars.comparison_cache', ComparisonCache(10)):
+            mock_repo.get_car_versions.return_value = versions
+            
+            result = json.loads(compare_cars({"ids": [",".join(ids)], "units": "imperial"}))
+            
+            assert result["units"] == "imperial"
+            assert [car["id"] for car in result["cars"]] == ids
+            assert all(len(row["values"]) == 2 for row in result["rows"])
+            mock_repo.get_car_versions.assert_called_once_with(ids)
+    
+    def test_compare_uses_catalog_cache(self, mock_firebase, multiple_cars_data):
+        """Test cached cars are compared without Firestore."""
+        from app.catalog import Catalog, CatalogEntry
+        from app.services.compare_cars import compare_cars
+        
+        versions = self._versions(multiple_cars_data)
+        catalog = Catalog(1, {car_id: CatalogEntry.from_car(car, UPDATE_TIME) for car_id, (car, _) in versions.items()})
+        
+        with patch('app.services.compare_cars.repo') as mock_repo, \
+             patch('app.services.compare_cars.catalog_cache') as mock_catalog:
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            
+            result = json.loads(compare_cars({"ids": list(versions)}))
+            
+            assert [car["make"] for car in result["cars"]] == [car.make for car, _ in versions.values()]
+            mock_repo.get_car_versions.assert_not_called()
+    
+    def test_compare_missing_car(self, mock_firebase, multiple_cars_data):
+        """Test an unknown ID is a 404 naming it."""
+        from app.services.compare_cars import compare_cars
+        from common.errors import NotFoundError
+        
+        versions = self._versions(multiple_cars_data)
+        missing_id = str(uuid4())
+        
+        with patch('app.services.compare_cars.repo') as mock_repo:
+            mock_repo.get_car_versions.return_value = versions
+            
+            with pytest.raises(NotFoundError) as exc_info:
+                compare_cars({"ids": list(versions) + [missing_id]})
+            
+            assert missing_id in str(exc_info.value)
+
+
+class TestBulkUpsertCarsService:
+    """Tests for bulk_upsert_cars service function."""
+    
+    def test_bulk_upsert_reports_each_line(self, mock_firebase, sample_car_data):
+        """Test valid and invalid lines are reported in line order."""
+        import json
+        from app.services.bulk_upsert_cars import bulk_upsert_cars
+        
+        body = (json.dumps(sample_car_data) + "\n" + '{"make": "BMW"}\n\nnot json\n').encode()
+        
+        with patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            mock_repo.bulk_upsert_cars.side_effect = lambda cars: {str(c.id): None for c in cars}
+            
+            # Split the body mid-record to exercise chunk reassembly
+            result = bulk_upsert_cars({"chunks": [body[:25], body[25:]]})
+            
+            assert result["written"] == 1
+            assert result["failed"] == 2
+            assert [r["line"] for r in result["results"]] == [1, 2, 4]
+            assert result["results"][0] == {
+                "line": 1, "id": sample_car_data["id"], "status": "ok", "error": None
+            }
+            assert "model" in result["results"][1]["error"]
+    
+    def test_bulk_upsert_write_failure(self, mock_firebase, sample_car_data):
+        """Test write failures from the repository are reported per record."""
+        import json
+        from app.services.bulk_upsert_cars import bulk_upsert_cars
+        
+        with patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            mock_repo.bulk_upsert_cars.side_effect = lambda cars: {str(c.id): "denied" for c in cars}
+            
+            result = bulk_upsert_cars({"chunks": [json.dumps(sample_car_data).encode()]})
+            
+            assert result["written"] == 0
+            assert result["results"][0]["error"] == "denied"
+    
+    def test_bulk_upsert_record_limit(self, mock_firebase, sample_car_minimal):
+        """Test records beyond the limit are rejected."""
+        import json
+        from app.services.bulk_upsert_cars import bulk_upsert_cars
+        
+        body = "\n".join(json.dumps(sample_car_minimal) for _ in range(3)).encode()
+        
+        with patch('app.services.bulk_upsert_cars.BULK_UPSERT_MAX_RECORDS', 2), \
+             patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            mock_repo.bulk_upsert_cars.side_effect = lambda cars: {str(c.id): None for c in cars}
+            
+            result = bulk_upsert_cars({"chunks": [body]})
+            
+            assert result["results"][-1]["status"] == "error"
+            assert "exceeds" in result["results"][-1]["error"]
+
+    
+    def test_bulk_upsert_line_limit(self, mock_firebase, sample_car_data):
+        """Test an oversized line is rejected without buffering it, and later lines still load."""
+        import json
+        from app.services.bulk_upsert_cars import bulk_upsert_cars
+        
+        line = json.dumps(sample_car_data).encode()
+        oversized = b'{"blurb": "' + b"x" * len(line) + b'"}'
+        body = oversized + b"\n" + line
+        
+        with patch('app.services.bulk_upsert_cars.BULK_UPSERT_MAX_LINE_BYTES', len(line)), \
+             patch('app.services.bulk_upsert_cars.repo') as mock_repo:
+            mock_repo.bulk_upsert_cars.side_effect = lambda cars: {str(c.id): None for c in cars}
+            
+            # Chunks smaller than the oversized line, so it spans several
+            result = bulk_upsert_cars({"chunks": [body[i:i + 64] for i in range(0, len(body), 64)]})
+            
+            assert result["results"][0] == {
+                "line": 1, "id": None, "status": "error", "error": f"Record exceeds {len(line)} bytes",
+            }
+            assert result["results"][1]["status"] == "ok"
+
+class TestPatchCarService:
+    """Tests for patch_car service function and merge-patch translation."""
+    
+    def test_merge_patch_to_field_paths(self):
+        """Test nested objects become dotted paths and null deletes."""
+        from google.cloud.firestore import DELETE_FIELD
+        from app.services.patch_car import merge_patch_to_field_updates
+        
+        updates = merge_patch_to_field_updates({
+            "blurb": "Updated",
+            "engine": {"code": "S58", "cylinders": None},
+            "otherSpecs": {"0-60 time": "3.9s", "old": None},
+        })
+        
+        assert updates == {
+            "blurb": "Updated",
+            "engine.code": "S58",
+            "engine.cylinders": DELETE_FIELD,
+            "otherSpecs.`0-60 time`": "3.9s",
+            "otherSpecs.old": DELETE_FIELD,
+        }
+    
+    def test_measurements_replaced_whole(self):
+        """Test measurement structs are validated and written as one value."""
+        from app.services.patch_car import merge_patch_to_field_updates
+        
+        updates = merge_patch_to_field_updates({
+            "performance": {"horsepower": {"value": 503, "unit": "horsepower"}}
+        })
+        
+        assert updates == {"performance.horsepower": {"value": 503.0, "unit": "horsepower"}}
+    
+    @pytest.mark.parametrize("patch_doc", [
+        {"unknown": 1},
+        {"id": "abc"},
+        {"make": None},
+        {"year": 1500},
+        {"bodyStyle": "Spaceship"},
+        {"performance": {"horsepower": {"value": 503}}},
+        {"otherSpecs": {"x": 1}},
+    ])
+    def test_invalid_patches_rejected(self, patch_doc):
+        """Test unknown, immutable, required and invalid fields are rejected."""
+        from app.services.patch_car import merge_patch_to_field_updates
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            merge_patch_to_field_updates(patch_doc)
+    
+    def test_patch_car_success(self, mock_firebase):
+        """Test patch_car returns the new version and ETag."""
+        from datetime import timezone
+        from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+        from app.services.patch_car import patch_car
+        
+        car_id = str(uuid4())
+        update_time = DatetimeWithNanoseconds(2025, 1, 1, tzinfo=timezone.utc)
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.return_value = update_time
+            
+            result = patch_car({
+                "carId": car_id,
+                "patch": {"blurb": "x"},
+                "ifMatch": '"2024-12-31T00:00:00Z"',
+            })
+            
+            assert result["updatedFields"] == ["blurb"]
+            assert result["etag"] == '"2025-01-01T00:00:00.000000Z"'
+            args = mock_repo.patch_car.call_args[0]
+            assert args[0] == car_id
+            assert args[2].year == 2024
+    
+    def test_patch_car_not_found(self, mock_firebase):
+        """Test a missing car maps to NotFoundError."""
+        from google.api_core import exceptions as gcp_exceptions
+        from app.services.patch_car import patch_car
+        from common.errors import NotFoundError
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.side_effect = gcp_exceptions.NotFound("missing")
+            
+            with pytest.raises(NotFoundError):
+                patch_car({"carId": str(uuid4()), "patch": {"blurb": "x"}})
+    
+    def test_patch_car_precondition_failed(self, mock_firebase):
+        """Test a stale If-Match maps to PreconditionFailedError."""
+        from google.api_core import exceptions as gcp_exceptions
+        from app.services.patch_car import patch_car
+        from common.errors import PreconditionFailedError
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.side_effect = gcp_exceptions.FailedPrecondition("stale")
+            
+            with pytest.raises(PreconditionFailedError):
+                patch_car({
+                    "carId": str(uuid4()),
+                    "patch": {"blurb": "x"},
+                    "ifMatch": '"2024-12-31T00:00:00Z"',
+                })
+    
+    def test_patch_car_key_conflict(self, mock_firebase):
+        """Test a volumeId or slug another car holds maps to ConflictError."""
+        from google.api_core import exceptions as gcp_exceptions
+        from app.services.patch_car import patch_car
+        from common.errors import ConflictError
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            mock_repo.patch_car.side_effect = gcp_exceptions.AlreadyExists("claimed")
+            
+            with pytest.raises(ConflictError) as exc_info:
+                patch_car({"carId": str(uuid4()), "patch": {"slug": "bmw-m3"}})
             
-            # Verify result is JSON serializable
-            import json
-            json_str = json.dumps(result)
-            assert json_str is not None
+            assert "slug" in str(exc_info.value)
+    
+    def test_patch_car_invalid_if_match(self, mock_firebase):
+        """Test malformed If-Match values are rejected before writing."""
+        from app.services.patch_car import patch_car
+        from common.errors import BadRequestError
+        
+        with patch('app.services.patch_car.repo') as mock_repo:
+            with pytest.raises(BadRequestError):
+                patch_car({"carId": str(uuid4()), "patch": {"blurb": "x"}, "ifMatch": "yesterday"})
+            mock_repo.patch_car.assert_not_called()
+
 
+class TestGetChangesService:
+    """Tests for get_changes service function."""
+    
+    def _times(self):
+        from datetime import datetime, timezone
+        return [datetime(2025, 1, day, tzinfo=timezone.utc) for day in range(1, 5)]
+    
+    def test_full_sync_merges_timeline(self, mock_firebase, sample_car_data):
+        """Test writes and deletions are merged by timestamp into one page."""
+        from app.services.get_changes import get_changes, decode_token
+        
+        t1, t2, t3, _ = self._times()
+        car = Car(**sample_car_data)
+        deleted_id = str(uuid4())
+        
+        with patch('app.services.get_changes.repo') as mock_repo:
+            mock_repo.get_changes.return_value = ([(t1, str(car.id), car)], [(t2, deleted_id)])
+            
+            result = get_changes({"since": None, "limit": 10})
+            
+            mock_repo.get_changes.assert_called_once_with(None, None, 11)
+            assert [c["id"] for c in result["changed"]] == [str(car.id)]
+            assert result["deleted"][0]["id"] == deleted_id
+            assert result["hasMore"] is False
+            
+            car_cursor, tombstone_cursor = decode_token(result["nextToken"])
+            assert car_cursor == (t1, str(car.id))
+            assert tombstone_cursor == (t2, deleted_id)
+    
+    def test_page_cut_keeps_unreturned_items_for_next_page(self, mock_firebase, sample_car_data):
+        """Test the cursor only advances past items actually returned."""
+        from app.services.get_changes import get_changes, decode_token
+        
+        t1, t2, t3, _ = self._times()
+        car = Car(**sample_car_data)
+        
+        with patch('app.services.get_changes.repo') as mock_repo:
+            mock_repo.get_changes.return_value = (
+                [(t1, str(car.id), car), (t3, str(uuid4()), car)],
+                [(t2, "deleted-id")],
+            )
+            
+            result = get_changes({"since": None, "limit": 2})
+            
+            assert result["hasMore"] is True
+            assert len(result["changed"]) == 1
+            assert len(result["deleted"]) == 1
+            car_cursor, _ = decode_token(result["nextToken"])
+            assert car_cursor == (t1, str(car.id))
+    
+    def test_token_round_trip(self, mock_firebase):
+        """Test a token passed back as since is decoded into repository cursors."""
+        from app.services.get_changes import get_changes, encode_token
+        
+        t1, t2, _, _ = self._times()
+        token = encode_token((t1, "car-id"), (t2, "deleted-id"))
+        
+        with patch('app.services.get_changes.repo') as mock_repo:
+            mock_repo.get_changes.return_value = ([], [])
+            
+            result = get_changes({"since": token})
+            
+            args = mock_repo.get_changes.call_args[0]
+            assert args[0] == (t1, "car-id")
+            assert args[1] == (t2, "deleted-id")
+            assert result["changed"] == [] and result["deleted"] == []
+            assert result["nextToken"] == token
+    
+    def test_invalid_token(self, mock_firebase):
+        """Test garbage tokens are rejected."""
+        from app.services.get_changes import get_changes
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            get_changes({"since": "not-a-token"})
+    
+    def test_limit_bounds(self, mock_firebase):
+        """Test the page size is capped."""
+        from app.services.get_changes import get_changes
+        from common.errors import BadRequestError
+        
+        with patch('app.services.get_changes.CHANGES_MAX_PAGE_SIZE', 5):
+            with pytest.raises(BadRequestError):
+                get_changes({"limit": 6})
+
+
+class TestStreamCarsService:
+    """Tests for stream_cars service functions."""
+    
+    def _cars(self, multiple_cars_data):
+        return [Car(**data) for data in multiple_cars_data]
+    
+    def test_stream_cars_signs_in_windows(self, mock_firebase, multiple_cars_data):
+        """Test cars are signed and emitted one window per chunk."""
+        from app.services.stream_cars import stream_cars
+        
+        cars = self._cars(multiple_cars_data)
+        
+        with patch('app.services.stream_cars.repo') as mock_repo, \
+             patch('app.services.stream_cars.get_cached_model_urls') as mock_urls, \
+             patch('app.services.stream_cars.NDJSON_WINDOW_SIZE', 2):
+            mock_repo.iter_cars.return_value = iter(cars)
+            mock_urls.side_effect = lambda ids: {v: f"https://example.com/{v}" for v in ids}
+            
+            chunks = list(stream_cars({}))
+            
+            lines = b"".join(chunks).splitlines()
+            assert len(chunks) == (len(cars) + 1) // 2
+            assert mock_urls.call_count == len(chunks)
+            assert [json.loads(line)["id"] for line in lines] == [str(car.id) for car in cars]
+    
+    def test_stream_cars_from_catalog(self, mock_firebase, sample_car_data):
+        """Test the catalog cache streams rendered fragments without Firestore."""
+        from app.catalog import Catalog, CatalogEntry
+        from app.services.stream_cars import stream_cars
+        
+        entry = CatalogEntry.from_car(Car(**sample_car_data), UPDATE_TIME)
+        
+        with patch('app.services.stream_cars.repo') as mock_repo, \
+             patch('app.services.stream_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.stream_cars.render_cache') as mock_render:
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = Catalog(1, {sample_car_data["id"]: entry})
+            mock_render.render.return_value = [b"{}"]
+            
+            assert list(stream_cars({})) == [b"{}\n"]
+            mock_repo.iter_cars.assert_not_called()
+    
+    async def test_stream_cars_async_preserves_order(self, mock_firebase, multiple_cars_data):
+        """Test overlapping window signing still emits cars in stream order."""
+        from app.services.stream_cars import stream_cars_async
+        
+        cars = self._cars(multiple_cars_data)
+        
+        async def _aiter():
+            for car in cars:
+                yield car
+        
+        with patch('app.services.stream_cars.async_repo') as mock_repo, \
+             patch('app.services.stream_cars.get_cached_model_urls', return_value={}), \
+             patch('app.services.stream_cars.NDJSON_WINDOW_SIZE', 2):
+            mock_repo.iter_cars.return_value = _aiter()
+            
+            body = b"".join([chunk async for chunk in stream_cars_async({})])
+            
+            assert [json.loads(line)["id"] for line in body.splitlines()] == [str(car.id) for car in cars]
+
+
+class TestGetSimilarCarsService:
+    """Tests for get_similar_cars service function."""
+    
+    def test_renders_neighbours_in_order(self, mock_firebase, multiple_cars_data):
+        """Test the neighbours' catalog entries are rendered nearest first."""
+        from app.services.get_similar_cars import get_similar_cars
+        from app.similarity import Neighbour
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        car_id = next(iter(catalog.entries))
+        entries = list(catalog.entries.values())
+        
+        with patch('app.services.get_similar_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.get_similar_cars.similarity_index') as mock_index, \
+             patch('app.services.get_similar_cars.render_cache') as mock_render, \
+             patch('app.services.get_similar_cars.current_url_window', return_value=7):
+            mock_catalog.get.return_value = catalog
+            mock_index.neighbours.return_value = [[Neighbour(2, 0.5), Neighbour(1, 0.7)]]
+            mock_render.render_list.return_value = b"[]"
+            
+            result = get_similar_cars({"carId": car_id, "k": 2})
+            
+            assert result.etag.startswith(f'"{catalog.fingerprint};7;')
+            mock_index.neighbours.assert_called_once_with(catalog, [car_id], 2)
+            assert mock_render.render_list.call_args[0][0] == [entries[2], entries[1]]
+    
+    def test_requires_catalog_cache(self, mock_firebase):
+        """Test the endpoint is unavailable rather than reloading the catalog per request."""
+        from app.services.get_similar_cars import get_similar_cars
+        from common.errors import ServiceUnavailableError
+        
+        with patch('app.services.get_similar_cars.catalog_cache') as mock_catalog:
+            mock_catalog.enabled = False
+            
+            with pytest.raises(ServiceUnavailableError):
+                get_similar_cars({"carId": str(uuid4())})
+            mock_catalog.get.assert_not_called()
+    
+    def test_end_to_end_excludes_car(self, mock_firebase, multiple_cars_data):
+        """Test a real search returns the other cars and never the car itself."""
+        from app.services.get_similar_cars import get_similar_cars
+        from app.similarity import SimilarityIndex
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        car_id = next(iter(catalog.entries))
+        
+        with patch('app.services.get_similar_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.get_similar_cars.similarity_index', SimilarityIndex()), \
+             patch('app.render_cache.get_cached_model_urls', return_value={}):
+            mock_catalog.get.return_value = catalog
+            
+            result = json.loads(get_similar_cars({"carId": car_id, "k": 10}).body)
+            
+            assert {car["id"] for car in result} == set(catalog.entries) - {car_id}
+    
+    def test_etag_per_car_and_k(self, mock_firebase, multiple_cars_data):
+        """Test neighbour lists of different cars or sizes get different ETags."""
+        from app.services.get_similar_cars import get_similar_cars
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        first, second = list(catalog.entries)[:2]
+        
+        with patch('app.services.get_similar_cars.catalog_cache') as mock_catalog, \
+             patch('app.render_cache.get_cached_model_urls', return_value={}):
+            mock_catalog.get.return_value = catalog
+            
+            etags = {
+                get_similar_cars({"carId": first, "k": 2}).etag,
+                get_similar_cars({"carId": second, "k": 2}).etag,
+                get_similar_cars({"carId": first, "k": 3}).etag,
+            }
+            
+            assert len(etags) == 3
+    
+    def test_unknown_car(self, mock_firebase, multiple_cars_data):
+        """Test an ID outside the catalog is a 404."""
+        from app.services.get_similar_cars import get_similar_cars
+        from common.errors import NotFoundError
+        
+        with patch('app.services.get_similar_cars.catalog_cache') as mock_catalog:
+            mock_catalog.get.return_value = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+            
+            with pytest.raises(NotFoundError):
+                get_similar_cars({"carId": "missing"})
+
+
+class TestSearchCarsService:
+    """Tests for search_cars service function."""
+    
+    def test_renders_hits_in_order(self, mock_firebase, multiple_cars_data):
+        """Test the hits' catalog entries are rendered best match first."""
+        from app.services.search_cars import search_cars
+        from app.search import SearchHit
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        ids = list(catalog.entries)
+        
+        with patch('app.services.search_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.search_cars.search_index') as mock_index, \
+             patch('app.services.search_cars.render_cache') as mock_render, \
+             patch('app.services.search_cars.current_url_window', return_value=7):
+            mock_catalog.get.return_value = catalog
+            mock_index.search.return_value = [SearchHit(ids[2], 2.0), SearchHit(ids[0], 1.0)]
+            mock_render.render_list.return_value = b"[]"
+            
+            result = search_cars({"q": " audi ", "limit": 5})
+            
+            assert result.etag.startswith(f'"{catalog.fingerprint};7;')
+            mock_index.search.assert_called_once_with(catalog, "audi", 5)
+            assert mock_render.render_list.call_args[0][0] == [catalog.entries[ids[2]], catalog.entries[ids[0]]]
+            
+            # The same terms share an ETag; other terms or limits don't
+            assert search_cars({"q": "AUDI", "limit": 5}).etag == result.etag
+            assert search_cars({"q": "bmw", "limit": 5}).etag != result.etag
+            assert search_cars({"q": "audi", "limit": 6}).etag != result.etag
+    
+    def test_end_to_end(self, mock_firebase, multiple_cars_data):
+        """Test a real search returns only the matching car."""
+        from app.services.search_cars import search_cars
+        from app.search import SearchIndex
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        
+        with patch('app.services.search_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.search_cars.search_index', SearchIndex(snapshot_path="")), \
+             patch('app.render_cache.get_cached_model_urls', return_value={}):
+            mock_catalog.get.return_value = catalog
+            
+            result = json.loads(search_cars({"q": "Toyota"}).body)
+            
+            assert [car["model"] for car in result] == ["Supra"]
+    
+    def test_blank_query(self, mock_firebase):
+        """Test a query without text is a 400."""
+        from app.services.search_cars import search_cars
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            search_cars({"q": "  "})
+    
+    def test_requires_catalog_cache(self, mock_firebase):
+        """Test search is unavailable rather than reloading the catalog per request."""
+        from app.services.search_cars import search_cars
+        from common.errors import ServiceUnavailableError
+        
+        with patch('app.services.search_cars.catalog_cache') as mock_catalog:
+            mock_catalog.enabled = False
+            
+            with pytest.raises(ServiceUnavailableError):
+                search_cars({"q": "audi"})
+            mock_catalog.get.assert_not_called()
+
+
+class TestSuggestCarsService:
+    """Tests for suggest_cars service function."""
+    
+    def test_suggestions_with_prefix_etag(self, mock_firebase, multiple_cars_data):
+        """Test suggestions are rendered with an ETag that 304s on the next request."""
+        from app.services.suggest_cars import suggest_cars
+        from app.suggest import SuggestIndex
+        
+        with patch('app.services.suggest_cars.catalog_cache') as mock_catalog, \
+             patch('app.services.suggest_cars.suggest_index', SuggestIndex()):
+            mock_catalog.get.return_value = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+            
+            result = suggest_cars({"prefix": "to"})
+            cached = suggest_cars({"prefix": "To", "ifNoneMatch": result.etag})
+            
+            assert [item["text"] for item in json.loads(result.body)] == ["Toyota", "Toyota Supra"]
+            assert cached.body is None
+            assert cached.etag == result.etag
+    
+    def test_blank_prefix(self, mock_firebase):
+        """Test a prefix without text is a 400."""
+        from app.services.suggest_cars import suggest_cars
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            suggest_cars({"prefix": " "})
+    
+    def test_requires_catalog_cache(self, mock_firebase):
+        """Test suggestions are unavailable rather than reloading the catalog per keystroke."""
+        from app.services.suggest_cars import suggest_cars
+        from common.errors import ServiceUnavailableError
+        
+        with patch('app.services.suggest_cars.catalog_cache') as mock_catalog:
+            mock_catalog.enabled = False
+            
+            with pytest.raises(ServiceUnavailableError):
+                suggest_cars({"prefix": "to"})
+            mock_catalog.get.assert_not_called()
+
+
+class TestGetFacetsService:
+    """Tests for get_facets service function."""
+    
+    def test_cached_counts_with_catalog_etag(self, mock_firebase, multiple_cars_data):
+        """Test counts come from the catalog with an ETag that 304s on the next request."""
+        from app.services.get_facets import get_facets
+        from app.facet_index import FacetIndex
+        
+        catalog = make_catalog(1, [Car(**data) for data in multiple_cars_data], UPDATE_TIME)
+        
+        with patch('app.services.get_facets.catalog_cache') as mock_catalog, \
+             patch('app.services.get_facets.facet_index', FacetIndex()):
+            mock_catalog.enabled = True
+            mock_catalog.get.return_value = catalog
+            
+            result = get_facets({"facets": {"make": ["BMW,Audi"]}})
+            cached = get_facets({"facets": {"make": ["Audi", "BMW"]}, "ifNoneMatch": result.etag})
+            unfiltered = get_facets({"ifNoneMatch": result.etag})
+            
+            body = json.loads(result.body)
+            assert body["total"] == 2
+            assert len(body["facets"]["make"]) == len(multiple_cars_data)
+            assert body["facets"]["year"] == [{"value": "2024", "cars": 2}]
+            assert result.etag.startswith(f'"{catalog.fingerprint};')
+            assert cached.body is None
+            # Other filters are a different representation
+            assert unfiltered.body is not None
+            assert unfiltered.etag == f'"{catalog.fingerprint}"'
+            assert get_facets({"min": ["power_w:0"]}).etag not in (result.etag, unfiltered.etag)
+    
+    def test_unfiltered_uses_stats_document(self, mock_firebase):
+        """Test unfiltered counts without the catalog cache come from the stats document."""
+        from app.services.get_facets import get_facets
+        
+        with patch('app.services.get_facets.catalog_cache') as mock_catalog, \
+             patch('app.services.get_facets.repo') as mock_repo:
+            mock_catalog.enabled = False
+            mock_repo.get_facet_stats.return_value = (3, {"make": {"BMW": 2, "Audi": 1, "Fiat": 0}}, UPDATE_TIME)
+            
+            result = get_facets({})
+            
+            assert json.loads(result.body)["facets"]["make"] == [{"value": "BMW", "cars": 2}, {"value": "Audi", "cars": 1}]
+            assert result.etag == f'"{UPDATE_TIME.rfc3339()}"'
+            mock_repo.get_facet_rows.assert_not_called()
+    
+    def test_filtered_counts_projection(self, mock_firebase):
+        """Test filtered counts without the catalog cache count a projection query."""
+        from app.services.get_facets import get_facets
+        
+        with patch('app.services.get_facets.catalog_cache') as mock_catalog, \
+             patch('app.services.get_facets.repo') as mock_repo:
+            mock_catalog.enabled = False
+            mock_repo.get_facet_rows.return_value = [{"make": "BMW", "year": "2020"}, {"make": "Audi", "year": "2021"}]
+            
+            result = get_facets({"min": ["power_w:300000"], "facets": {"year": ["2020"]}})
+            
+            body = json.loads(result.body)
+            assert body["total"] == 1
+            assert body["facets"]["year"] == [{"value": "2020", "cars": 1}, {"value": "2021", "cars": 1}]
+            assert result.etag is None
+            assert mock_repo.get_facet_rows.call_args[0][0].active
+            mock_repo.get_facet_stats.assert_not_called()
+    
+    def test_invalid_filters(self, mock_firebase):
+        """Test unknown specs and facets are a 400."""
+        from app.services.get_facets import get_facets
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            get_facets({"min": ["nope:1"]})
+        with pytest.raises(BadRequestError):
+            get_facets({"facets": {"colour": ["red"]}})
+
+
+class TestGetCarByKeyService:
+    """Tests for get_car_by_key service function."""
+    
+    def test_cached_lookup_delegates_to_get_car(self, mock_firebase):
+        """Test a key known to the index is served like GET /v1/cars/{carId}."""
+        from app.services.get_car_by_key import get_car_by_key
+        from app.serialization import RenderedBody
+        
+        with patch('app.services.get_car_by_key.catalog_cache') as mock_catalog, \
+             patch('app.services.get_car_by_key.key_index') as mock_index, \
+             patch('app.services.get_car_by_key.get_car') as mock_get_car, \
+             patch('app.services.get_car_by_key.repo') as mock_repo:
+            mock_catalog.enabled = True
+            mock_index.lookup.return_value = "car-1"
+            mock_get_car.return_value = RenderedBody(b"{}", '"etag"')
+            
+            result = get_car_by_key({"field": "slug", "value": "bmw-m3-2020", "format": "json"})
+            
+            assert result.etag == '"etag"'
+            mock_index.lookup.assert_called_once_with(mock_catalog.get.return_value, "slug", "bmw-m3-2020")
+            assert mock_get_car.call_args[0][0]["carId"] == "car-1"
+            mock_repo.get_car_by_key.assert_not_called()
+    
+    def test_uncached_lookup_queries_firestore(self, mock_firebase, sample_car_data):
+        """Test lookups without the cache, or unknown to the index, query Firestore."""
+        from app.services.get_car_by_key import get_car_by_key
+        
+        with patch('app.services.get_car_by_key.catalog_cache') as mock_catalog, \
+             patch('app.services.get_car_by_key.repo') as mock_repo:
+            mock_catalog.enabled = False
+            mock_repo.get_car_by_key.return_value = Car(**sample_car_data)
+            
+            result = json.loads(get_car_by_key({"field": "volumeId", "value": "BMW_M4_f82"}).body)
+            
+            assert result["id"] == sample_car_data["id"]
+            mock_repo.get_car_by_key.assert_called_once_with("volumeId", "BMW_M4_f82")
+    
+    def test_not_found(self, mock_firebase):
+        """Test an unknown key is a 404."""
+        from app.services.get_car_by_key import get_car_by_key
+        from common.errors import NotFoundError
+        
+        with patch('app.services.get_car_by_key.catalog_cache') as mock_catalog, \
+             patch('app.services.get_car_by_key.repo') as mock_repo:
+            mock_catalog.enabled = False
+            mock_repo.get_car_by_key.return_value = None
+            
+            with pytest.raises(NotFoundError):
+                get_car_by_key({"field": "slug", "value": "nope"})
+    
+    def test_invalid_field(self, mock_firebase):
+        """Test only volumeId and slug can be looked up."""
+        from app.services.get_car_by_key import get_car_by_key
+        from common.errors import BadRequestError
+        
+        with pytest.raises(BadRequestError):
+            get_car_by_key({"field": "make", "value": "BMW"})
@@ -0,0 +1,101 @@
+"""
+Tests for similar-car search.
+"""
+import pytest
+from uuid import UUID
+
+import numpy as np
+
+from app.schemas import (
+    Car, BodyStyle, Engine, Performance, Dimensions,
+    MeasurementPower, MeasurementMass, PowerUnit, MassUnit,
+)
+from app.similarity import SimilarityIndex
+from tests.conftest import make_catalog
+
+A, B, C, D, E = (str(UUID(int=n)) for n in (1, 2, 3, 4, 5))
+
+
+def _car(car_id, hp, kg, body=BodyStyle.sedan, cylinders=6):
+    return Car(
+        id=car_id, make="BMW", model="M3", bodyStyle=body,
+        engine=Engine(cylinders=cylinders),
+        performance=Performance(horsepower=MeasurementPower(value=hp, unit=PowerUnit.horsepower)),
+        dimensions=Dimensions(curbWeight=MeasurementMass(value=kg, unit=MassUnit.kilograms)),
+    )
+
+
+CARS = [
+    _car(A, 473, 1700),
+    _car(B, 480, 1720),
+    _car(C, 150, 1200, BodyStyle.hatchback, 4),
+    _car(D, 160, 1250, BodyStyle.hatchback, 4),
+    _car(E, 480, 1720, BodyStyle.suv),
+]
+
+
+def _ids(catalog, neighbours):
+    ids = list(catalog.entries)
+    return [ids[neighbour.position] for neighbour in neighbours]
+
+
+class TestSimilarityIndex:
+    """Tests for SimilarityIndex."""
+    
+    def test_nearest_first_without_self(self):
+        """Test the closest specs come first and the car itself is left out."""
+        catalog = make_catalog(1, CARS)
+        
+        neighbours = SimilarityIndex().neighbours(catalog, [A, C], 3)
+        
+        assert _ids(catalog, neighbours[0]) == [B, E, D]
+        assert _ids(catalog, neighbours[1])[0] == D
+        assert [n.distance for n in neighbours[0]] == sorted(n.distance for n in neighbours[0])
+    
+    def test_body_style_mismatch_counts(self):
+        """Test identical specs in a different body style are further away."""
+        catalog = make_catalog(1, CARS)
+        
+        (neighbours,) = SimilarityIndex().neighbours(catalog, [B], 2)
+        
+        assert _ids(catalog, neighbours) == [A, E]
+        assert neighbours[1].distance == pytest.approx(1.0, rel=1e-5)
+    
+    def test_k_larger_than_catalog(self):
+        """Test asking for more cars than exist returns every other car."""
+        catalog = make_catalog(1, CARS[:2])
+        
+        assert _ids(catalog, SimilarityIndex().neighbours(catalog, [A], 10)[0]) == [B]
+        assert SimilarityIndex().neighbours(make_catalog(1, CARS[:1]), [A], 10) == [[]]
+    
+    def test_missing_specs_imputed(self):
+        """Test a car without specs still gets finite distances."""
+        catalog = make_catalog(1, CARS + [Car(id=str(UUID(int=9)), make="Fiat", model="500")])
+        
+        (neighbours,) = SimilarityIndex().neighbours(catalog, [str(UUID(int=9))], 5)
+        
+        assert len(neighbours) == 5
+        assert all(np.isfinite(neighbour.distance) for neighbour in neighbours)
+    
+    def test_incremental_update_matches_rebuild(self):
+        """Test raw features refresh only changed cars and match a full build."""
+        index = SimilarityIndex()
+        index.matrix(make_catalog(1, CARS))
+        
+        catalog = make_catalog(2, [_car(A, 150, 1200, BodyStyle.hatchback, 4)] + CARS[1:])
+        index.on_catalog_change(catalog, frozenset({A}), frozenset())
+        
+        assert index.columns(catalog).values.tobytes() == SimilarityIndex().columns(catalog).values.tobytes()
+        assert _ids(catalog, index.neighbours(catalog, [C], 1)[0]) == [A]
+    
+    def test_results_cached_per_catalog_version(self):
+        """Test repeat queries reuse results until the catalog changes."""
+        index = SimilarityIndex()
+        catalog = make_catalog(1, CARS)
+        
+        first = index.neighbours(catalog, [A], 2)[0]
+        assert index.neighbours(catalog, [A], 2)[0] is first
+        
+        changed = make_catalog(2, CARS)
+        index.on_catalog_change(changed, frozenset({B}), frozenset())
+        assert index.neighbours(changed, [A], 2)[0] is not first
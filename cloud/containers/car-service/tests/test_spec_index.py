@@ -0,0 +1,113 @@
+"""
+Tests for the columnar spec index.
+"""
+import pytest
+from uuid import UUID
+
+from app.schemas import (
+    Car, Performance, Dimensions,
+    MeasurementPower, MeasurementMass, MeasurementFuelEfficiency,
+    PowerUnit, MassUnit, FuelEfficiencyUnit,
+)
+from app.spec_index import ColumnIndex, SpecIndex
+from app.specs import filter_records, parse_spec_query
+from tests.conftest import make_catalog
+
+A, B, C, D, E = (str(UUID(int=n)) for n in (1, 2, 3, 4, 5))
+
+
+def _car(car_id, power=None, weight=None, city=None):
+    return Car(
+        id=car_id, make="BMW", model="M3",
+        performance=Performance(horsepower=power, epaCity=city) if power or city else None,
+        dimensions=Dimensions(curbWeight=weight) if weight else None,
+    )
+
+
+def _kw(value):
+    return MeasurementPower(value=value, unit=PowerUnit.kilowatts)
+
+
+CARS = [
+    _car(A, _kw(250), MeasurementMass(value=1500, unit=MassUnit.kilograms)),
+    _car(B, MeasurementPower(value=400, unit=PowerUnit.horsepower), MeasurementMass(value=3600, unit=MassUnit.pounds)),
+    _car(C, _kw(250), MeasurementMass(value=2000, unit=MassUnit.kilograms)),
+    _car(D, city=MeasurementFuelEfficiency(value=0, unit=FuelEfficiencyUnit.litersPer100km)),
+    _car(E, _kw(298.28), city=MeasurementFuelEfficiency(value=6.5, unit=FuelEfficiencyUnit.litersPer100km)),
+]
+
+QUERIES = [
+    (["power_w:200000"], ["curb_weight_kg:1700"], "-power_w"),
+    ([], [], "power_w"),
+    ([], [], "-power_w"),
+    (["power_w:0"], [], None),
+    ([], ["epa_city_km_per_l:100"], "-epa_city_km_per_l"),
+    ([], [], "zero_to_sixty_s"),
+    (["power_to_weight_w_per_kg:100"], [], "-power_to_weight_w_per_kg"),
+    ([], ["power_to_weight_w_per_kg:150"], None),
+]
+
+
+def _records(catalog):
+    return [entry.record for entry in catalog.entries.values()]
+
+
+class TestSpecIndex:
+    """Tests for SpecIndex."""
+    
+    def test_column_index_needs_convert(self):
+        """Test ColumnIndex can't be used without a _convert implementation."""
+        with pytest.raises(TypeError):
+            ColumnIndex()
+    
+    @pytest.mark.parametrize("minimums,maximums,sort", QUERIES)
+    def test_matches_python_filter(self, minimums, maximums, sort):
+        """Test vectorized queries return exactly what filter_records does, ties included."""
+        catalog = make_catalog(1, CARS)
+        query = parse_spec_query(minimums, maximums, sort)
+        
+        assert SpecIndex().query(catalog, query) == filter_records(_records(catalog), query)
+    
+    def test_incremental_update_matches_rebuild(self):
+        """Test changed, added and removed cars are reflected without a full rebuild."""
+        index = SpecIndex()
+        index.columns(make_catalog(1, CARS[:4]))
+        
+        updated = [_car(A, _kw(100)), CARS[1], CARS[2], CARS[4]]
+        catalog = make_catalog(2, updated)
+        index.on_catalog_change(catalog, frozenset({A, E}), frozenset({D}))
+        
+        incremental = index.columns(catalog)
+        rebuilt = SpecIndex().columns(catalog)
+        assert incremental.version == 2
+        assert list(incremental.ids) == list(rebuilt.ids) == [A, B, C, E]
+        assert incremental.values.tobytes() == rebuilt.values.tobytes()
+    
+    def test_edited_cars_updated_in_place(self):
+        """Test an edit that keeps the same IDs reuses the ID column."""
+        index = SpecIndex()
+        before = index.columns(make_catalog(1, CARS))
+        
+        catalog = make_catalog(2, [_car(C, _kw(50)) if str(car.id) == C else car for car in CARS])
+        index.on_catalog_change(catalog, frozenset({C}), frozenset())
+        
+        after = index.columns(catalog)
+        assert after.ids is before.ids
+        assert after.values.tobytes() == SpecIndex().columns(catalog).values.tobytes()
+        assert index.query(catalog, parse_spec_query([], [], "power_w")) == [2, 0, 1, 4]
+    
+    def test_stale_columns_rebuilt(self):
+        """Test a catalog version the index hasn't seen is rebuilt on query."""
+        index = SpecIndex()
+        query = parse_spec_query([], [], "power_w")
+        index.query(make_catalog(1, CARS[:1]), query)
+        
+        assert index.query(make_catalog(2, CARS[:3]), query) == [0, 2, 1]
+    
+    def test_change_before_first_query_ignored(self):
+        """Test change notifications don't build columns nobody has asked for."""
+        index = SpecIndex()
+        
+        index.on_catalog_change(make_catalog(1, CARS), frozenset({A}), frozenset())
+        
+        assert index._columns is None
@@ -0,0 +1,164 @@
+"""
+Tests for canonical SI spec values and spec queries.
+"""
+import pytest
+from uuid import UUID
+
+from google.cloud.firestore import DELETE_FIELD
+
+from app.compact import CompactCar
+from app.schemas import (
+    Car, Performance, Dimensions,
+    MeasurementPower, MeasurementMass, MeasurementFuelEfficiency,
+    PowerUnit, MassUnit, FuelEfficiencyUnit,
+)
+from app.specs import (
+    SPECS_BY_NAME, derived_field_updates, filter_records, parse_spec_query, record_si_value,
+    si_field_updates, si_fields, touches_derived_specs,
+)
+
+A, B, C, D = (str(UUID(int=n)) for n in (1, 2, 3, 4))
+
+
+def _car(car_id, power=None, weight=None):
+    return Car(
+        id=car_id, make="BMW", model="M3",
+        performance=Performance(horsepower=power) if power else None,
+        dimensions=Dimensions(curbWeight=weight) if weight else None,
+    )
+
+
+class TestSiFields:
+    """Tests for si_fields and record_si_value."""
+    
+    def test_mixed_units_normalized(self):
+        """Test horsepower and kilowatts land on the same scale."""
+        hp = si_fields(_car(A, MeasurementPower(value=473, unit=PowerUnit.horsepower)))
+        kw = si_fields(_car(B, MeasurementPower(value=353, unit=PowerUnit.kilowatts)))
+        
+        assert hp["power_w"] == pytest.approx(352716, rel=1e-5)
+        assert kw["power_w"] == 353000
+    
+    def test_fuel_efficiency_reciprocal(self):
+        """Test mpg and L/100km both become km per liter."""
+        car = Car(make="VW", model="Golf", performance=Performance(
+            epaCity=MeasurementFuelEfficiency(value=30, unit=FuelEfficiencyUnit.milesPerGallon),
+            epaHighway=MeasurementFuelEfficiency(value=5, unit=FuelEfficiencyUnit.litersPer100km),
+        ))
+        
+        fields = si_fields(car)
+        
+        assert fields["epa_city_km_per_l"] == pytest.approx(12.754, rel=1e-3)
+        assert fields["epa_highway_km_per_l"] == 20
+    
+    def test_derived_specs(self):
+        """Test derived metrics are stored alongside the specs they come from."""
+        fields = si_fields(_car(A, MeasurementPower(value=300, unit=PowerUnit.kilowatts), MeasurementMass(value=1500, unit=MassUnit.kilograms)))
+        
+        assert fields["power_to_weight_w_per_kg"] == 200
+        assert "specific_output_w_per_m3" not in fields
+    
+    def test_derived_spec_of_record(self):
+        """Test derived metrics of cached records match the write path."""
+        car = _car(A, MeasurementPower(value=473, unit=PowerUnit.horsepower), MeasurementMass(value=3600, unit=MassUnit.pounds))
+        
+        value = record_si_value(CompactCar.from_car(car), SPECS_BY_NAME["power_to_weight_w_per_kg"])
+        
+        assert value == si_fields(car)["power_to_weight_w_per_kg"]
+        assert record_si_value(CompactCar.from_car(_car(B)), SPECS_BY_NAME["power_to_weight_w_per_kg"]) is None
+    
+    def test_missing_specs_omitted(self):
+        """Test cars only carry the specs they have."""
+        assert si_fields(_car(A)) == {}
+    
+    def test_record_value_matches_write_path(self, sample_car_data):
+        """Test cached records canonicalize exactly like the write path."""
+        car = Car(**sample_car_data)
+        record = CompactCar.from_car(car)
+        
+        for name, value in si_fields(car).items():
+            assert record_si_value(record, SPECS_BY_NAME[name]) == value
+
+
+class TestSiFieldUpdates:
+    """Tests for si_field_updates."""
+    
+    def test_replaced_measurement(self):
+        """Test a patched measurement rewrites its shadow field."""
+        updates = si_field_updates({"performance.horsepower": {"value": 300, "unit": "kilowatts"}})
+        
+        assert updates == {"_si.power_w": 300000}
+    
+    def test_removed_measurement_and_parent(self):
+        """Test removing a measurement or its parent object removes the shadow fields."""
+        assert si_field_updates({"performance.torque": DELETE_FIELD}) == {"_si.torque_nm": DELETE_FIELD}
+        assert si_field_updates({"dimensions": DELETE_FIELD})["_si.curb_weight_kg"] is DELETE_FIELD
+    
+    def test_unrelated_fields(self):
+        """Test fields that aren't measurements leave _si alone."""
+        assert si_field_updates({"engine.code": "S58", "blurb": "x"}) == {}
+    
+    def test_derived_specs_recomputed(self):
+        """Test changing an input recomputes derived specs from the stored _si map."""
+        si_updates = si_field_updates({"performance.horsepower": {"value": 300, "unit": "kilowatts"}})
+        current = {"power_w": 200000, "curb_weight_kg": 1500, "displacement_m3": 0.003}
+        
+        assert touches_derived_specs(si_updates)
+        assert derived_field_updates(si_updates, current) == {
+            "_si.power_to_weight_w_per_kg": 200,
+            "_si.specific_output_w_per_m3": 100000000,
+        }
+    
+    def test_derived_specs_removed_with_input(self):
+        """Test derived specs whose inputs are gone are deleted."""
+        si_updates = si_field_updates({"dimensions": DELETE_FIELD})
+        
+        updates = derived_field_updates(si_updates, {"power_w": 200000, "curb_weight_kg": 1500})
+        
+        assert updates["_si.power_to_weight_w_per_kg"] is DELETE_FIELD
+        assert not touches_derived_specs(si_field_updates({"dimensions.length": DELETE_FIELD}))
+
+
+class TestSpecQuery:
+    """Tests for parse_spec_query and filter_records."""
+    
+    def test_invalid_specs_rejected(self):
+        """Test unknown specs and non-numeric bounds raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_spec_query(["horsepower:300"], [], None)
+        with pytest.raises(ValueError):
+            parse_spec_query(["power_w:lots"], [], None)
+        with pytest.raises(ValueError):
+            parse_spec_query([], [], "-speed")
+    
+    def test_filter_and_sort(self):
+        """Test range filters apply across units and sorting breaks ties by ID."""
+        records = [CompactCar.from_car(car) for car in (
+            _car(A, MeasurementPower(value=250, unit=PowerUnit.kilowatts), MeasurementMass(value=1500, unit=MassUnit.kilograms)),
+            _car(B, MeasurementPower(value=400, unit=PowerUnit.horsepower), MeasurementMass(value=3600, unit=MassUnit.pounds)),
+            _car(C, MeasurementPower(value=250, unit=PowerUnit.kilowatts), MeasurementMass(value=2000, unit=MassUnit.kilograms)),
+            _car(D),
+        )]
+        
+        query = parse_spec_query(["power_w:200000"], ["curb_weight_kg:1700"], "-power_w")
+        
+        assert filter_records(records, query) == [1, 0]
+        assert filter_records(records, parse_spec_query([], [], "power_w")) == [0, 2, 1]
+    
+    def test_filters_without_sort_order_by_first_filter(self):
+        """Test results are ordered by the first filtered spec, like Firestore."""
+        records = [CompactCar.from_car(car) for car in (
+            _car(A, MeasurementPower(value=300, unit=PowerUnit.kilowatts)),
+            _car(B, MeasurementPower(value=200, unit=PowerUnit.kilowatts)),
+        )]
+        
+        assert filter_records(records, parse_spec_query(["power_w:0"], [], None)) == [1, 0]
+    
+    def test_canonical(self):
+        """Test equal queries share a canonical form and any difference changes it."""
+        query = parse_spec_query(["power_w:400000"], [], "-power_w")
+        
+        assert query.canonical == parse_spec_query(["power_w:400000.0"], [], "-power_w").canonical
+        assert query.canonical != parse_spec_query(["power_w:300000"], [], "-power_w").canonical
+        assert query.canonical != parse_spec_query(["power_w:400000"], [], "power_w").canonical
+        assert parse_spec_query([], [], None).canonical == ""
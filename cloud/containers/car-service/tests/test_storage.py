@@ -181,3 +181,76 @@ class TestModelExists:
         
         assert result is False
 
+
+
+class TestGetModelUrlsForVolumeIds:
+    """Tests for get_model_urls_for_volume_ids function."""
+    
+    def test_batch_signing_reuses_client(self, mock_storage):
+        """Test duplicates are signed once with a single client."""
+        from app.storage import get_model_urls_for_volume_ids
+        
+        result = get_model_urls_for_volume_ids(["car_a", "car_b", "car_a", None])
+        
+        assert result == {
+            "car_a": "https://storage.googleapis.com/signed-url",
+            "car_b": "https://storage.googleapis.com/signed-url",
+        }
+        mock_storage['client'].assert_called_once()
+        assert mock_storage['blob'].generate_signed_url.call_count == 2
+    
+    def test_batch_signing_missing_blob(self, mock_storage):
+        """Test missing models map to None."""
+        from app.storage import get_model_urls_for_volume_ids
+        
+        mock_storage['blob'].exists.return_value = False
+        result = get_model_urls_for_volume_ids(["missing"])
+        
+        assert result == {"missing": None}
+    
+    def test_batch_signing_empty(self):
+        """Test an empty batch returns an empty mapping."""
+        from app.storage import get_model_urls_for_volume_ids
+        
+        assert get_model_urls_for_volume_ids([]) == {}
+
+
+class TestGetCachedModelUrls:
+    """Tests for the signed-URL window cache."""
+    
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        from app.storage import clear_url_cache
+        clear_url_cache()
+        yield
+        clear_url_cache()
+    
+    def test_reuses_urls_within_window(self, mock_storage):
+        """Test a URL is signed once per volumeId per window."""
+        from app.storage import get_cached_model_urls
+        
+        first = get_cached_model_urls(["car_a"], window=1)
+        second = get_cached_model_urls(["car_a", "car_b"], window=1)
+        
+        assert first == {"car_a": "https://storage.googleapis.com/signed-url"}
+        assert set(second) == {"car_a", "car_b"}
+        assert mock_storage['blob'].generate_signed_url.call_count == 2
+    
+    def test_new_window_resigns(self, mock_storage):
+        """Test a new window signs again instead of reusing old URLs."""
+        from app.storage import get_cached_model_urls
+        
+        get_cached_model_urls(["car_a"], window=1)
+        get_cached_model_urls(["car_a"], window=2)
+        
+        assert mock_storage['blob'].generate_signed_url.call_count == 2
+    
+    def test_missing_models_are_not_cached(self, mock_storage):
+        """Test a missing model is looked up again on the next call."""
+        from app.storage import get_cached_model_urls
+        
+        mock_storage['blob'].exists.return_value = False
+        assert get_cached_model_urls(["missing"], window=1) == {"missing": None}
+        get_cached_model_urls(["missing"], window=1)
+        
+        assert mock_storage['blob'].exists.call_count == 2
@@ -0,0 +1,81 @@
+"""
+Tests for typeahead suggestions.
+"""
+from uuid import UUID
+
+from app.schemas import Car, Engine, SuggestionKind
+from app.suggest import SuggestIndex, normalize
+from tests.conftest import make_catalog
+
+A, B, C, D, E = (str(UUID(int=n)) for n in (1, 2, 3, 4, 5))
+
+
+def _car(car_id, make, model, code=None):
+    return Car(id=car_id, make=make, model=model, engine=Engine(code=code) if code else None)
+
+
+CARS = [
+    _car(A, "BMW", "M3", "S58"),
+    _car(B, "BMW", "M4", "S58"),
+    _car(C, "BMW", "M3", "S55"),
+    _car(D, "Citroën", "C4"),
+]
+
+
+def _texts(suggestions):
+    return [item.text for item in suggestions.items]
+
+
+class TestSuggestIndex:
+    """Tests for prefix lookups and incremental maintenance."""
+    
+    def test_normalize(self):
+        """Test prefixes are matched case- and accent-insensitively."""
+        assert normalize("  Citroën  C4 ") == "citroen c4"
+    
+    def test_ranked_by_popularity(self):
+        """Test suggestions with more cars come first, then makes before models."""
+        suggestions = SuggestIndex().suggest(make_catalog(1, CARS), "b")
+        
+        assert _texts(suggestions) == ["BMW", "BMW M3", "BMW M4"]
+        assert [item.cars for item in suggestions.items] == [3, 2, 1]
+        assert suggestions.items[0].kind == SuggestionKind.make
+    
+    def test_any_word_matches(self):
+        """Test later words of a suggestion, and engine codes, are found."""
+        index = SuggestIndex()
+        catalog = make_catalog(1, CARS)
+        
+        assert _texts(index.suggest(catalog, "m3")) == ["BMW M3"]
+        assert _texts(index.suggest(catalog, "bmw m")) == ["BMW M3", "BMW M4"]
+        assert _texts(index.suggest(catalog, "S5")) == ["S58", "S55"]
+        assert _texts(index.suggest(catalog, "citroen c")) == ["Citroën C4"]
+        assert _texts(index.suggest(catalog, "porsche")) == []
+    
+    def test_top_k(self):
+        """Test only the top k suggestions are kept per prefix."""
+        assert _texts(SuggestIndex(top_k=1).suggest(make_catalog(1, CARS), "bmw")) == ["BMW"]
+    
+    def test_incremental_update_matches_rebuild(self):
+        """Test changes applied through the listener give the same answers as a fresh build."""
+        index = SuggestIndex()
+        index.suggest(make_catalog(1, CARS), "b")
+        catalog = make_catalog(2, [CARS[0], _car(B, "Bmw", "M2"), CARS[2], _car(E, "Porsche", "911", "MA1")])
+        
+        index.on_catalog_change(catalog, frozenset({B, E}), frozenset({D}))
+        
+        for prefix in ("b", "bmw m", "m4", "s5", "c", "p", "9", "ma"):
+            assert index.suggest(catalog, prefix) == SuggestIndex().suggest(catalog, prefix)
+        assert _texts(index.suggest(catalog, "m")) == ["BMW M3", "Bmw M2", "MA1"]
+        assert index.suggest(catalog, "citroen").items == ()
+    
+    def test_unchanged_prefix_keeps_digest(self):
+        """Test a prefix whose suggestions didn't change keeps its ETag digest."""
+        index = SuggestIndex()
+        before = index.suggest(make_catalog(1, CARS), "citroen")
+        
+        catalog = make_catalog(2, CARS[:3] + [_car(D, "Citroën", "C4"), _car(E, "BMW", "M4")])
+        index.on_catalog_change(catalog, frozenset({E}), frozenset())
+        
+        assert index.suggest(catalog, "citroen").digest == before.digest
+        assert index.suggest(catalog, "bmw").digest != index.suggest(make_catalog(1, CARS), "bmw").digest
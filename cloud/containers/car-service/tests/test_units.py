@@ -0,0 +1,92 @@
+"""
+Tests for unit-system conversion.
+"""
+import pytest
+
+from app.compact import CompactCar
+from app.schemas import (
+    Car, Engine, Performance, Dimensions, UnitSystem,
+    MeasurementVolume, MeasurementPower, MeasurementTorque, MeasurementSpeed,
+    MeasurementLength, MeasurementMass, MeasurementFuelEfficiency,
+    VolumeUnit, PowerUnit, TorqueUnit, SpeedUnit, LengthUnit, MassUnit, FuelEfficiencyUnit,
+)
+from app.units import convert_car, convert_record
+
+
+@pytest.fixture
+def imperial_car(sample_car_data):
+    """The sample car, whose specs are mostly in US units."""
+    return Car(**sample_car_data)
+
+
+class TestConvertCar:
+    """Tests for convert_car."""
+    
+    def test_native_is_unchanged(self, imperial_car):
+        """Test native returns the car as stored."""
+        assert convert_car(imperial_car, UnitSystem.native) is imperial_car
+    
+    def test_imperial_to_metric(self, imperial_car):
+        """Test every US measurement is converted to its metric unit."""
+        car = convert_car(imperial_car, UnitSystem.metric)
+        
+        assert car.performance.horsepower == MeasurementPower(value=353, unit=PowerUnit.kilowatts)
+        assert car.performance.torque == MeasurementTorque(value=550, unit=TorqueUnit.newtonMeters)
+        assert car.performance.topSpeed == MeasurementSpeed(value=249, unit=SpeedUnit.kilometersPerHour)
+        assert car.dimensions.length == MeasurementLength(value=4803, unit=LengthUnit.millimeters)
+        assert car.dimensions.curbWeight == MeasurementMass(value=1737, unit=MassUnit.kilograms)
+        assert car.make == imperial_car.make
+        assert car.performance.zeroToSixty == imperial_car.performance.zeroToSixty
+    
+    def test_fuel_efficiency_is_reciprocal(self):
+        """Test mpg and L/100km convert through the reciprocal."""
+        car = Car(make="VW", model="Golf", performance=Performance(
+            epaCity=MeasurementFuelEfficiency(value=30, unit=FuelEfficiencyUnit.milesPerGallon),
+            epaHighway=MeasurementFuelEfficiency(value=5.9, unit=FuelEfficiencyUnit.litersPer100km),
+        ))
+        
+        metric = convert_car(car, UnitSystem.metric).performance
+        imperial = convert_car(car, UnitSystem.imperial).performance
+        
+        assert metric.epaCity == MeasurementFuelEfficiency(value=7.8, unit=FuelEfficiencyUnit.litersPer100km)
+        assert metric.epaHighway == car.performance.epaHighway
+        assert imperial.epaHighway == MeasurementFuelEfficiency(value=40, unit=FuelEfficiencyUnit.milesPerGallon)
+    
+    def test_units_already_in_system_kept(self):
+        """Test metric units other than the target (centimeters) aren't rewritten."""
+        car = Car(make="BMW", model="M3", dimensions=Dimensions(
+            height=MeasurementLength(value=144.5, unit=LengthUnit.centimeters),
+            fuelTank=MeasurementVolume(value=59, unit=VolumeUnit.liters),
+        ))
+        
+        metric = convert_car(car, UnitSystem.metric)
+        imperial = convert_car(car, UnitSystem.imperial)
+        
+        assert metric is car
+        assert imperial.dimensions.height == MeasurementLength(value=56.9, unit=LengthUnit.inches)
+        assert imperial.dimensions.fuelTank == MeasurementVolume(value=15.6, unit=VolumeUnit.gallons)
+    
+    def test_displacement_stays_in_liters(self):
+        """Test engine displacement is quoted in liters in every system."""
+        car = Car(make="BMW", model="M3", engine=Engine(
+            displacement=MeasurementVolume(value=0.79, unit=VolumeUnit.gallons)))
+        
+        for system in (UnitSystem.metric, UnitSystem.imperial):
+            converted = convert_car(car, system).engine.displacement
+            assert converted == MeasurementVolume(value=3.0, unit=VolumeUnit.liters)
+
+
+class TestConvertRecord:
+    """Tests for convert_record."""
+    
+    def test_source_record_untouched(self, imperial_car):
+        """Test conversion copies the packed arrays instead of mutating them."""
+        record = CompactCar.from_car(imperial_car)
+        numbers, codes = bytes(record.numbers), record.codes
+        
+        converted = convert_record(record, UnitSystem.metric)
+        
+        assert converted is not record
+        assert bytes(record.numbers) == numbers
+        assert record.codes == codes
+        assert record.to_car() == imperial_car